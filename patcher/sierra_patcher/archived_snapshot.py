@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import shutil
 import sys
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
 
 from . import web_download
-
-ARCHIVED_SNAPSHOT_FORMAT_VERSION = 1
+from .hash_cache import cached_sha256
+from .manifest_index import write_manifest_index
+from .media_io import ReadPlan, disk_order, plan_reads
+from .snapshot_pack import (
+    DEFAULT_SEGMENT_BYTES,
+    PackedObjectStore,
+    PackReport,
+    SnapshotPackError,
+    has_pack_index,
+    pack_objects,
+)
+
+# Version 2 lists every release stored over the shared objects/ tree;
+# version 1 markers (one release) are still read.
+ARCHIVED_SNAPSHOT_FORMAT_VERSION = 2
+_SUPPORTED_SNAPSHOT_VERSIONS = (1, 2)
 ARCHIVED_SNAPSHOT_MARKER = "archived_snapshot.json"
 
 
@@ -24,6 +40,7 @@ class ArchivedSnapshotInfo:
     package_id: str
     manifest_path: Path
     object_root: Path
+    releases: tuple[str, ...] = ()
 
 
 def _raise_if_cancelled(cancel_event) -> None:
@@ -41,7 +58,69 @@ def _atomic_json(path: Path, data: dict) -> None:
         temp.unlink(missing_ok=True)
 
 
-def read_archived_snapshot(snapshot_root: str | Path) -> ArchivedSnapshotInfo:
+def _object_path(object_root: Path, object_id: str) -> Path:
+    return object_root / object_id[:2] / object_id
+
+
+def _object_store(info: ArchivedSnapshotInfo) -> Path | PackedObjectStore:
+    """The loose object directory, or a pack store when the snapshot has segments."""
+
+    if not has_pack_index(info.root):
+        return info.object_root
+    try:
+        return PackedObjectStore(info.root)
+    except SnapshotPackError as exc:
+        raise ArchivedSnapshotError(str(exc)) from exc
+
+
+def _store_root(store: Path | PackedObjectStore) -> Path:
+    return store.root if isinstance(store, PackedObjectStore) else store.parent
+
+
+def _ordered_objects(
+    objects_by_id: dict[str, int],
+    object_root: Path | PackedObjectStore,
+    plan: ReadPlan,
+) -> list[tuple[str, int]]:
+    items = list(objects_by_id.items())
+    if isinstance(object_root, PackedObjectStore):
+        return sorted(items, key=lambda item: object_root.read_order(item[0]))
+    if not plan.sequential:
+        return items
+    return disk_order(
+        items,
+        lambda item: Path(web_download._io_path(_object_path(object_root, item[0]))),
+    )
+
+
+def _ordered_files(files: list, object_root: Path | PackedObjectStore, plan: ReadPlan) -> list:
+    """Order logical files by where their first object sits on the snapshot disk."""
+
+    if isinstance(object_root, PackedObjectStore):
+        return sorted(
+            files,
+            key=lambda spec: object_root.read_order(spec.objects[0].object_id)
+            if spec.objects
+            else (-1, 0, ""),
+        )
+    if not plan.sequential:
+        return files
+    return disk_order(
+        files,
+        lambda spec: Path(
+            web_download._io_path(_object_path(object_root, spec.objects[0].object_id))
+        )
+        if spec.objects
+        else None,
+    )
+
+
+def read_archived_snapshot(
+    snapshot_root: str | Path,
+    package_id: str | None = None,
+) -> ArchivedSnapshotInfo:
+    """Read a snapshot marker and select ``package_id`` (default: the newest release)."""
+
     root = Path(snapshot_root).resolve()
     marker_path = root / ARCHIVED_SNAPSHOT_MARKER
     if not marker_path.is_file():
@@ -53,24 +132,35 @@ def read_archived_snapshot(snapshot_root: str | Path) -> ArchivedSnapshotInfo:
     except Exception as exc:
         raise ArchivedSnapshotError("Archived snapshot marker is not valid JSON") from exc
 
-    if marker.get("format_version") != ARCHIVED_SNAPSHOT_FORMAT_VERSION:
+    if marker.get("format_version") not in _SUPPORTED_SNAPSHOT_VERSIONS:
         raise ArchivedSnapshotError(
             f"Unsupported Archived snapshot version: {marker.get('format_version')!r}"
         )
     if marker.get("type") != "sierra_archived_snapshot":
         raise ArchivedSnapshotError("Folder is not a Sierra Archived snapshot")
-    package_id = str(marker.get("package_id", "")).strip()
-    if not package_id:
+    default_id = str(marker.get("package_id", "")).strip()
+    if not default_id:
         raise ArchivedSnapshotError("Archived snapshot package_id is missing")
+    releases = [default_id]
+    if marker.get("format_version") >= 2:
+        raw_releases = marker.get("releases")
+        if not isinstance(raw_releases, list) or default_id not in raw_releases:
+            raise ArchivedSnapshotError("Archived snapshot release list is invalid")
+        releases = [str(item).strip() for item in raw_releases if str(item).strip()]
+    package_id = (package_id or default_id).strip()
+    if package_id not in releases:
+        raise ArchivedSnapshotError(
+            f"Archived snapshot does not contain release {package_id}"
+        )
 
     manifest_path = root / "releases" / package_id / "manifest.json"
     object_root = root / "objects"
     if not manifest_path.is_file():
         raise ArchivedSnapshotError("Archived snapshot manifest is missing")
-    if not object_root.is_dir():
+    if not object_root.is_dir() and not has_pack_index(root):
         raise ArchivedSnapshotError("Archived snapshot object store is missing")
 
-    return ArchivedSnapshotInfo(root, package_id, manifest_path, object_root)
+    return ArchivedSnapshotInfo(root, package_id, manifest_path, object_root, tuple(releases))
 
 
 def _load_manifest(info: ArchivedSnapshotInfo) -> dict:
@@ -78,7 +168,7 @@ def _load_manifest(info: ArchivedSnapshotInfo) -> dict:
         manifest = json.loads(info.manifest_path.read_text(encoding="utf-8"))
     except Exception as exc:
         raise ArchivedSnapshotError("Archived snapshot manifest is not valid JSON") from exc
-    if manifest.get("format_version") != 1:
+    if manifest.get("format_version") not in web_download.SUPPORTED_MANIFEST_VERSIONS:
         raise ArchivedSnapshotError(
             f"Unsupported package manifest version: {manifest.get('format_version')!r}"
         )
@@ -111,21 +201,22 @@ def _prepare_archived_object_cache(
 ) -> None:
     """Verify resumable local objects before trusting them as download cache."""
 
+    plan = plan_reads(object_root.parent, min(int(workers), 32))
     existing = []
-    for object_id, size in objects_by_id.items():
-        path = object_root / object_id[:2] / object_id
+    for object_id, size in _ordered_objects(objects_by_id, object_root, plan):
+        path = _object_path(object_root, object_id)
         if web_download._exists(path):
             existing.append((object_id, size, path))
     if not existing:
         return
 
-    max_workers = max(1, min(int(workers), 32))
+    max_workers = plan.workers
     completed = 0
 
     def verify(item):
         object_id, size, path = item
         _raise_if_cancelled(cancel_event)
-        if not web_download._verify_file(path, size, object_id, cancel_event):
+        if not web_download._verify_file(path, size, object_id, cancel_event, plan.block_size):
             web_download._unlink(path)
             return object_id, False
         return object_id, True
@@ -150,6 +241,130 @@ def _prepare_archived_object_cache(
                 )
 
 
+def _same_volume(first: Path, second: Path) -> bool:
+    try:
+        return os.stat(web_download._io_path(first)).st_dev == os.stat(web_download._io_path(second)).st_dev
+    except OSError:
+        return False
+
+
+def _seed_one_object(
+    source: Path,
+    target: Path,
+    object_id: str,
+    *,
+    link: bool,
+    block_size: int,
+    cancel_event=None,
+) -> str:
+    _raise_if_cancelled(cancel_event)
+    web_download._mkdir(target.parent)
+    temp = target.with_name(f"{target.name}.seed-{os.getpid()}-{threading.get_ident()}")
+    web_download._unlink(temp)
+    try:
+        if link:
+            digest = cached_sha256(
+                source,
+                lambda: web_download._sha256_file(source, block_size, cancel_event=cancel_event),
+            )
+            if digest != object_id:
+                return "corrupt"
+            try:
+                os.link(web_download._io_path(source), web_download._io_path(temp))
+            except OSError:
+                link = False  # e.g. FAT/exFAT sticks or a share without hard links
+            else:
+                os.replace(web_download._io_path(temp), web_download._io_path(target))
+                return "linked"
+
+        # Copy and hash in one pass; the copy itself is what gets verified.
+        object_hash = hashlib.sha256()
+        with open(web_download._io_path(source), "rb") as reader, open(
+            web_download._io_path(temp), "wb"
+        ) as writer:
+            while True:
+                _raise_if_cancelled(cancel_event)
+                block = reader.read(block_size)
+                if not block:
+                    break
+                writer.write(block)
+                object_hash.update(block)
+        if object_hash.hexdigest() != object_id:
+            return "corrupt"
+        os.replace(web_download._io_path(temp), web_download._io_path(target))
+        return "copied"
+    finally:
+        web_download._unlink(temp)
+
+
+def _seed_objects_from_cache(
+    objects_by_id: dict[str, int],
+    cache_objects: Path,
+    object_root: Path,
+    *,
+    workers: int,
+    on_progress=None,
+    cancel_event=None,
+) -> dict[str, int]:
+    """Fill the snapshot from verified web-cache objects before downloading.
+
+    Objects are hard-linked when the cache and the snapshot share a volume and
+    copied otherwise; either way the SHA-256 is checked first, so a damaged
+    cache object is discarded and downloaded again instead of archived.
+    """
+
+    candidates = []
+    for object_id, size in objects_by_id.items():
+        source = _object_path(cache_objects, object_id)
+        if web_download._exists(_object_path(object_root, object_id)):
+            continue
+        if web_download._exists(source) and web_download._size(source) == size:
+            candidates.append((object_id, source))
+    counts = {"linked": 0, "copied": 0, "corrupt": 0}
+    if not candidates:
+        return counts
+
+    web_download._mkdir(object_root)
+    link = _same_volume(cache_objects, object_root)
+    plan = plan_reads(cache_objects, min(int(workers), 32))
+    completed = 0
+
+    def seed(item: tuple[str, Path]) -> str:
+        object_id, source = item
+        result = _seed_one_object(
+            source,
+            _object_path(object_root, object_id),
+            object_id,
+            link=link,
+            block_size=plan.block_size,
+            cancel_event=cancel_event,
+        )
+        if result == "corrupt":
+            web_download._unlink(source)
+        return result
+
+    with ThreadPoolExecutor(max_workers=plan.workers) as executor:
+        futures = {executor.submit(seed, item): item[0] for item in candidates}
+        for future in as_completed(futures):
+            _raise_if_cancelled(cancel_event)
+            try:
+                result = future.result()
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                raise
+            counts[result] += 1
+            completed += 1
+            if on_progress:
+                on_progress(
+                    "archive:seed",
+                    completed,
+                    len(candidates),
+                    f"{result} {futures[future][:12]} from web cache",
+                )
+    return counts
+
+
 def archive_web_release(
     package_id: str,
     snapshot_root: str | Path,
@@ -159,8 +374,16 @@ def archive_web_release(
     on_progress=None,
     cancel_event=None,
     include_patcher: bool = True,
+    reuse_web_cache: bool = True,
 ) -> ArchivedSnapshotInfo:
-    """Download a release as an object-only portable Archived snapshot."""
+    """Download a release as an object-only portable Archived snapshot.
+
+    An existing snapshot folder gains ``package_id`` as another release over
+    its shared ``objects/`` tree, so only objects it lacks are fetched.
+    Objects already in ``cache_root/objects`` (for example from installing the
+    same release) are verified and linked or copied in; only the rest is
+    downloaded.
+    """
 
     _raise_if_cancelled(cancel_event)
     root = Path(snapshot_root).resolve()
@@ -177,12 +400,9 @@ def archive_web_release(
                 "Archived snapshot destination contains unrelated files: "
                 + ", ".join(sorted(unexpected)[:5])
             )
+    releases: list[str] = []
     if existing_marker.is_file():
-        existing = read_archived_snapshot(root)
-        if existing.package_id != package_id:
-            raise ArchivedSnapshotError(
-                f"This folder already contains Archived snapshot {existing.package_id}."
-            )
+        releases = list(read_archived_snapshot(root).releases)
 
     if on_progress:
         on_progress("web:manifest", 0, 1, "Downloading manifest for Archived snapshot")
@@ -191,6 +411,15 @@ def archive_web_release(
         on_progress("web:manifest", 1, 1, "Manifest ready")
 
     _, objects_by_id = web_download._parse_manifest(manifest)
+    if has_pack_index(root):
+        try:
+            packed = PackedObjectStore(root).objects
+        except SnapshotPackError as exc:
+            raise ArchivedSnapshotError(str(exc)) from exc
+        # New objects go to objects/ as loose files; pack again to append them.
+        objects_by_id = {
+            object_id: size for object_id, size in objects_by_id.items() if object_id not in packed
+        }
     _prepare_archived_object_cache(
         objects_by_id,
         root / "objects",
@@ -198,6 +427,15 @@ def archive_web_release(
         on_progress=on_progress,
         cancel_event=cancel_event,
     )
+    if reuse_web_cache:
+        _seed_objects_from_cache(
+            objects_by_id,
+            Path(cache_root).resolve() / "objects",
+            root / "objects",
+            workers=download_workers,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+        )
     web_download._download_objects(
         objects_by_id,
         root / "objects",
@@ -209,27 +447,53 @@ def archive_web_release(
 
     manifest_path = root / "releases" / package_id / "manifest.json"
     _atomic_json(manifest_path, manifest)
+    write_manifest_index(manifest_path)
+    releases = [release for release in releases if release != package_id] + [package_id]
     _atomic_json(
         root / "catalog.json",
-        {"format_version": 1, "releases": [{"id": package_id}]},
+        {"format_version": 1, "releases": [{"id": release} for release in releases]},
     )
     if include_patcher:
         _copy_current_patcher(root)
 
+    # The marker goes last: until it names the new release, installers keep
+    # seeing the snapshot as it was before.
     _atomic_json(
         root / ARCHIVED_SNAPSHOT_MARKER,
         {
             "format_version": ARCHIVED_SNAPSHOT_FORMAT_VERSION,
             "type": "sierra_archived_snapshot",
             "package_id": package_id,
+            "releases": releases,
         },
     )
-    return read_archived_snapshot(root)
+    return read_archived_snapshot(root, package_id)
+
+
+def _packed_object_matches(
+    store: PackedObjectStore,
+    object_id: str,
+    size: int,
+    block_size: int,
+    cancel_event=None,
+) -> bool:
+    object_hash = hashlib.sha256()
+    try:
+        with store.open_object(object_id, size) as reader:
+            while True:
+                _raise_if_cancelled(cancel_event)
+                block = reader.read(block_size)
+                if not block:
+                    break
+                object_hash.update(block)
+    except (OSError, web_download.DownloadError):
+        return False
+    return object_hash.hexdigest() == object_id
 
 
 def _verify_archived_objects(
     objects_by_id: dict[str, int],
-    object_root: Path,
+    object_root: Path | PackedObjectStore,
     *,
     workers: int,
     on_progress=None,
@@ -241,29 +505,41 @@ def _verify_archived_objects(
         return
 
     total_objects = len(objects_by_id)
+    plan = plan_reads(_store_root(object_root), min(int(workers), 32))
     if on_progress:
         on_progress(
             "archive:objects",
             0,
             total_objects,
-            f"verifying 0/{total_objects} objects",
+            f"verifying 0/{total_objects} objects ({plan.describe()})",
         )
 
-    max_workers = max(1, min(int(workers), 32))
+    max_workers = plan.workers
     completed = 0
 
     def verify(item: tuple[str, int]) -> str:
         object_id, size = item
         _raise_if_cancelled(cancel_event)
-        path = object_root / object_id[:2] / object_id
-        if not web_download._exists(path):
-            raise ArchivedSnapshotError(f"Archived object is missing: {object_id}")
-        if not web_download._verify_file(path, size, object_id, cancel_event):
+        if isinstance(object_root, PackedObjectStore):
+            if object_id not in object_root:
+                raise ArchivedSnapshotError(f"Archived object is missing: {object_id}")
+            valid = _packed_object_matches(
+                object_root, object_id, size, plan.block_size, cancel_event
+            )
+        else:
+            path = _object_path(object_root, object_id)
+            if not web_download._exists(path):
+                raise ArchivedSnapshotError(f"Archived object is missing: {object_id}")
+            valid = web_download._verify_file(path, size, object_id, cancel_event, plan.block_size)
+        if not valid:
             raise ArchivedSnapshotError(f"Archived object failed SHA-256 verification: {object_id}")
         return object_id
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(verify, item): item[0] for item in objects_by_id.items()}
+        futures = {
+            executor.submit(verify, item): item[0]
+            for item in _ordered_objects(objects_by_id, object_root, plan)
+        }
         for future in as_completed(futures):
             _raise_if_cancelled(cancel_event)
             try:
@@ -289,30 +565,68 @@ def materialize_archived_snapshot(
     materialize_workers: int = web_download.DEFAULT_MATERIALIZE_WORKERS,
     on_progress=None,
     cancel_event=None,
+    path_filter=None,
+    verify_objects_first: bool = False,
+    package_id: str | None = None,
 ):
-    """Reconstruct an Archived snapshot into cache without modifying the snapshot."""
+    """Reconstruct an Archived snapshot into cache without modifying the snapshot.
 
-    info = read_archived_snapshot(snapshot_root)
+    ``package_id`` selects one release of a multi-release snapshot; the
+    default is the release added last.
+
+    ``path_filter`` works as in ``materialize_web_package``: only the accepted
+    files, and only the objects they reference, are verified and rebuilt.
+
+    Object and file hashes are checked in the same streaming pass that writes
+    the package, so each snapshot byte is read once. ``verify_objects_first``
+    restores the old separate object scan, which reports every damaged object
+    up front and is only meant for diagnosing a bad snapshot.
+
+    Reads are planned for the snapshot's medium: SSDs use
+    ``materialize_workers`` threads, while HDD, USB and network snapshots are
+    read by one or two streams in on-disk order with large blocks. Packed
+    snapshots are always read segment by segment, front to back.
+    """
+
+    info = read_archived_snapshot(snapshot_root, package_id)
     manifest = _load_manifest(info)
     files, objects_by_id = web_download._parse_manifest(manifest)
-    _verify_archived_objects(
-        objects_by_id,
-        info.object_root,
-        workers=materialize_workers,
-        on_progress=on_progress,
-        cancel_event=cancel_event,
-    )
+    if path_filter is not None:
+        files = [spec for spec in files if path_filter(spec.path)]
+        objects_by_id = {
+            object_spec.object_id: object_spec.size
+            for spec in files
+            for object_spec in spec.objects
+        }
+    store = _object_store(info)
+    if verify_objects_first:
+        _verify_archived_objects(
+            objects_by_id,
+            store,
+            workers=materialize_workers,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+        )
 
     package_root = Path(cache_root).resolve() / "packages" / info.package_id
     web_download._mkdir(package_root)
-    web_download._materialize_files(
-        files,
-        package_root,
-        info.object_root,
-        workers=materialize_workers,
-        on_progress=on_progress,
-        cancel_event=cancel_event,
-    )
+    plan = plan_reads(info.root, min(int(materialize_workers), 32))
+    if on_progress:
+        on_progress("web:materialize", 0, max(1, len(files)), f"Reading snapshot ({plan.describe()})")
+    try:
+        web_download._materialize_files(
+            _ordered_files(files, store, plan),
+            package_root,
+            store,
+            workers=plan.workers,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+            verify_objects=not verify_objects_first,
+            block_size=plan.block_size,
+        )
+    except web_download.DownloadError as exc:
+        _raise_if_cancelled(cancel_event)
+        raise ArchivedSnapshotError(f"Archived snapshot {exc}") from exc
     _raise_if_cancelled(cancel_event)
     return web_download.MaterializedPackage(
         root=package_root,
@@ -320,3 +634,38 @@ def materialize_archived_snapshot(
         storage_root=package_root / "storage",
         manifest_path=info.manifest_path,
     )
+
+
+def pack_archived_snapshot(
+    snapshot_root: str | Path,
+    *,
+    segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    keep_loose: bool = False,
+    on_progress=None,
+    cancel_event=None,
+) -> PackReport:
+    """Move a snapshot's loose objects into append-only pack segments.
+
+    Objects are written in manifest order, release by release, so a later
+    install reads each segment front to back.
+    """
+
+    info = read_archived_snapshot(snapshot_root)
+    object_ids: list[str] = []
+    for release in info.releases:
+        manifest = _load_manifest(read_archived_snapshot(info.root, release))
+        files, _ = web_download._parse_manifest(manifest)
+        object_ids.extend(
+            object_spec.object_id for spec in files for object_spec in spec.objects
+        )
+    try:
+        return pack_objects(
+            info.root,
+            object_ids,
+            segment_bytes=segment_bytes,
+            keep_loose=keep_loose,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+        )
+    except SnapshotPackError as exc:
+        raise ArchivedSnapshotError(str(exc)) from exc
@@ -1,25 +1,46 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import shutil
 import threading
 import time
 from pathlib import Path
 
+from .archived_snapshot import pack_archived_snapshot
 from .delete_list import build_delete_list, finalize
+from .distributed_generation import DEFAULT_LEASE_SECONDS, generate_patches_distributed, run_worker
+from .hash_cache import FORCE_REHASH_ENV, set_force_rehash
+from .hybrid_payload import generate_release_set
+from .install_receipt import (
+    clear_install_receipt,
+    read_install_receipt,
+    register_install,
+    write_install_receipt,
+)
 from .metadata import Meta, stamp_from_game_exe
 from .package_source import LocalPackageSource, WebPackageSource
 from .patch_audit import audit_patch_files
 from .prereqs import ensure_prereqs
 from .registry import exe_version, query_install
+from .repair import find_damaged_files, package_filter_for, repair_files
+from .sibling_install import destination_is_empty, reuse_sibling_install
+from .repository_tools import (
+    DEFAULT_VERIFY_WORKERS,
+    collect_garbage,
+    sync_repository_index,
+    verify_releases,
+)
 from .storage import apply_storage, pack_additional
 from .system import check_resources, optimal_threads
 from .web_delivery import (
     DEFAULT_CHUNK_SIZE,
     DEFAULT_PUBLISH_WORKERS,
+    _safe_package_id,
     publish_web_package,
 )
+from .web_catalog import fetch_release_catalog_details, find_upgrade
 from .web_download import DEFAULT_DOWNLOAD_WORKERS, DEFAULT_MATERIALIZE_WORKERS
 from .zstd_patch import apply_all_patches, generate_patches
 from .paths import (
@@ -30,8 +51,6 @@ from .paths import (
     WORKING_DIR,
 )
 
-_DEF_DELETE_LIST_out = str(Path(STORAGE_out_DIR) / "delete_list.txt")
-_DEF_INFO_PATH_out = str(Path(STORAGE_out_DIR) / "metadata.info")
 
 
 # Keep CLI generation behavior aligned with the tested GUI presets. In
@@ -52,6 +71,11 @@ class _ConsoleProgress:
         "web:objects": "Downloading objects",
         "web:materialize": "Reconstructing package",
         "audit:patches": "Auditing patches",
+        "repository:verify": "Verifying repository",
+        "archive:pack": "Packing snapshot",
+        "repair:scan": "Checking installed files",
+        "repair:apply": "Repairing files",
+        "install:sibling": "Reusing installed release",
     }
 
     def __init__(self, min_interval: float = 0.10):
@@ -64,7 +88,7 @@ class _ConsoleProgress:
 
     @staticmethod
     def _amount(phase: str, current: int, total: int) -> str:
-        if phase == "web:objects":
+        if phase in ("web:objects", "archive:pack"):
             mib = 1024 * 1024
             return f"{current / mib:,.1f}/{total / mib:,.1f} MiB"
         return f"{current:,}/{total:,}"
@@ -117,6 +141,12 @@ def _positive_workers(value: int, name: str) -> int:
     return value
 
 
+def _positive_seconds(value: float, name: str) -> float:
+    if value <= 0:
+        raise SystemExit(f"{name} must be greater than zero")
+    return value
+
+
 def _resolve_diff(args: argparse.Namespace) -> tuple[str, list[str]]:
     prof = (getattr(args, "diff", None) or "balanced").strip().lower()
     if prof not in _DIFF_PRESETS:
@@ -124,57 +154,47 @@ def _resolve_diff(args: argparse.Namespace) -> tuple[str, list[str]]:
     return prof, _DIFF_PRESETS[prof]
 
 
-def _cmd_generate(args: argparse.Namespace) -> None:
-    source = args.source
-    dest = args.dest
-    if not source or not dest:
-        raise SystemExit("Missing --source/--dest. Run with --help for usage.")
+def _finish_package(
+    args: argparse.Namespace,
+    source: str,
+    dest: str,
+    package_root: Path,
+    title: str | None,
+    diff_profile: str,
+    zstd_args: list[str],
+    threads: int,
+    upgrade_from: str | None = None,
+    upgrade_to: str | None = None,
+) -> None:
+    """Pack payloads, write the delete list and metadata, and audit one package."""
 
-    delivery = getattr(args, "delivery", "standalone")
-    if delivery in ("web", "both") and not args.package_id:
-        raise SystemExit("--package-id is required for web/both delivery (example: --package-id 4.0.13).")
-
-    os.makedirs(PATCH_out_DIR, exist_ok=True)
-    os.makedirs(MISSING_out_DIR, exist_ok=True)
-    os.makedirs(STORAGE_out_DIR, exist_ok=True)
-
-    check_resources()
-    threads = args.threads or optimal_threads()
-
-    diff_profile, zstd_args = _resolve_diff(args)
-
-    print(f"Creating ZSTD patches (diff={diff_profile})...")
-    generate_patches(
-        source,
-        dest,
-        PATCH_out_DIR,
-        MISSING_out_DIR,
-        workers=threads,
-        zstd_args=zstd_args,
-    )
-
-    pack_additional(MISSING_out_DIR, STORAGE_out_DIR)
+    storage_root = package_root / "storage"
+    pack_additional(str(package_root / "additional_files"), str(storage_root))
 
     print("Building delete list...")
-    build_delete_list(source, dest, _DEF_DELETE_LIST_out)
+    build_delete_list(source, dest, str(storage_root / "delete_list.txt"))
 
-    if args.title and args.date:
+    if title and args.date:
         print("Stamping metadata...")
         stamp_from_game_exe(
-            _DEF_INFO_PATH_out,
+            str(storage_root / "metadata.info"),
             source,
-            args.title,
+            title,
             args.date,
             diff_profile=diff_profile,
             zstd_patch_args=zstd_args,
+            upgrade_from=upgrade_from,
+            upgrade_to=upgrade_to,
         )
     else:
         print("Skipping metadata stamp (no --title/--date provided)")
 
     print("Auditing produced patch package...")
-    if not audit_patch_files(workers=threads):
+    if not audit_patch_files(package_root / "patchfiles", workers=threads):
         raise SystemExit("Generated patch package failed its final audit.")
 
+
+def _publish_package(args: argparse.Namespace, package_root: Path, package_id: str, delivery: str) -> None:
     if delivery in ("web", "both"):
         repository_root = Path(
             args.web_repo_output or (Path(WORKING_DIR) / "web_repo_output")
@@ -187,13 +207,13 @@ def _cmd_generate(args: argparse.Namespace) -> None:
             "--web-publish-workers",
         )
 
-        print(f"Publishing web package {args.package_id} with {publish_workers} workers...")
+        print(f"Publishing web package {package_id} with {publish_workers} workers...")
         progress = _ConsoleProgress()
         try:
             result = publish_web_package(
-                OUTPUT_DIR,
+                str(package_root),
                 repository_root,
-                args.package_id,
+                package_id,
                 chunk_size=chunk_size,
                 workers=publish_workers,
                 on_progress=progress,
@@ -210,15 +230,163 @@ def _cmd_generate(args: argparse.Namespace) -> None:
         if delivery == "web":
             # The canonical package is staging for web-only output. Keep the
             # separate repository result and remove staging only after success.
-            shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
+            shutil.rmtree(package_root, ignore_errors=True)
             print("Removed canonical staging package (web-only delivery).")
 
     if delivery in ("standalone", "both"):
-        print("Standalone package ready →", OUTPUT_DIR)
+        print("Standalone package ready →", package_root)
+
+
+def _cmd_generate(args: argparse.Namespace) -> None:
+    source = args.source
+    dest = args.dest
+    targets = getattr(args, "target", None) or []
+    if targets:
+        return _cmd_generate_release_set(args, targets)
+    if not source or not dest:
+        raise SystemExit("Missing --source/--dest. Run with --help for usage.")
+
+    delivery = getattr(args, "delivery", "standalone")
+    if delivery in ("web", "both") and not args.package_id:
+        raise SystemExit("--package-id is required for web/both delivery (example: --package-id 4.0.13).")
+    upgrade_from = (getattr(args, "upgrade_from", None) or "").strip() or None
+    upgrade_to = (getattr(args, "upgrade_to", None) or "").strip() or None
+    if bool(upgrade_from) != bool(upgrade_to):
+        raise SystemExit("--upgrade-from and --upgrade-to must be given together.")
+    if upgrade_from and not (args.title and args.date):
+        raise SystemExit("Upgrade packages need --title/--date so the from/to pair is stamped into metadata.")
+
+    os.makedirs(PATCH_out_DIR, exist_ok=True)
+    os.makedirs(MISSING_out_DIR, exist_ok=True)
+    os.makedirs(STORAGE_out_DIR, exist_ok=True)
+
+    check_resources()
+    threads = args.threads or optimal_threads()
+
+    diff_profile, zstd_args = _resolve_diff(args)
+
+    if args.queue:
+        print(f"Creating ZSTD patches on the workers of {args.queue} (diff={diff_profile})...")
+        generate_patches_distributed(
+            source,
+            dest,
+            PATCH_out_DIR,
+            MISSING_out_DIR,
+            args.queue,
+            workers=threads,
+            zstd_args=zstd_args,
+            lease_seconds=_positive_seconds(args.lease_seconds, "--lease-seconds"),
+        )
+    else:
+        print(f"Creating ZSTD patches (diff={diff_profile})...")
+        generate_patches(
+            source,
+            dest,
+            PATCH_out_DIR,
+            MISSING_out_DIR,
+            workers=threads,
+            zstd_args=zstd_args,
+        )
+
+    _finish_package(
+        args,
+        source,
+        dest,
+        Path(OUTPUT_DIR),
+        args.title,
+        diff_profile,
+        zstd_args,
+        threads,
+        upgrade_from=upgrade_from,
+        upgrade_to=upgrade_to,
+    )
+    _publish_package(args, Path(OUTPUT_DIR), args.package_id, delivery)
+
+    print("Generation complete.")
+
+
+def _cmd_generate_release_set(args: argparse.Namespace, targets: list[list[str]]) -> None:
+    """Generate several releases against one --source in a single run.
+
+    Each ``--target DEST PACKAGE_ID TITLE`` gets its own canonical package in
+    patch_output/<PACKAGE_ID>/ and, for web delivery, its own publish.
+    """
+
+    source = args.source
+    if not source:
+        raise SystemExit("Missing --source. Run with --help for usage.")
+    if args.dest or args.package_id or args.title:
+        raise SystemExit("--target replaces --dest/--package-id/--title; do not combine them.")
+    if args.queue:
+        raise SystemExit("--queue generates a single --dest; it cannot be used with --target.")
+    if getattr(args, "upgrade_from", None) or getattr(args, "upgrade_to", None):
+        raise SystemExit("--upgrade-from/--upgrade-to need a single --dest; they cannot be used with --target.")
+    try:
+        package_ids = [_safe_package_id(package_id) for _dest, package_id, _title in targets]
+    except ValueError as exc:
+        raise SystemExit(f"Invalid --target package ID: {exc}") from exc
+    # Each package is staged in patch_output/<PACKAGE_ID>/.
+    reserved = sorted(set(package_ids) & {".", "..", "patchfiles", "additional_files", "payloads", "storage"})
+    if reserved:
+        raise SystemExit(f"These --target package IDs are reserved: {', '.join(reserved)}")
+    duplicates = sorted({package_id for package_id in package_ids if package_ids.count(package_id) > 1})
+    if duplicates:
+        raise SystemExit(f"Each --target needs its own package ID; repeated: {', '.join(duplicates)}")
+    for dest, _package_id, _title in targets:
+        if not os.path.isdir(dest):
+            raise SystemExit(f"Target folder not found: {dest}")
+
+    delivery = getattr(args, "delivery", "standalone")
+    check_resources()
+    threads = args.threads or optimal_threads()
+    diff_profile, zstd_args = _resolve_diff(args)
+
+    package_roots = [Path(OUTPUT_DIR) / package_id for package_id in package_ids]
+    print(f"Creating ZSTD patches for {len(targets)} releases (diff={diff_profile})...")
+    generate_release_set(
+        source,
+        [
+            (dest, str(package_root / "patchfiles"), str(package_root / "additional_files"))
+            for (dest, _package_id, _title), package_root in zip(targets, package_roots)
+        ],
+        workers=threads,
+        zstd_args=zstd_args,
+    )
+
+    for (dest, package_id, title), package_root in zip(targets, package_roots):
+        print(f"Finishing package {package_id} ({dest})...")
+        _finish_package(args, source, dest, package_root, title, diff_profile, zstd_args, threads)
+        _publish_package(args, package_root, package_id, delivery)
 
     print("Generation complete.")
 
 
+def _cmd_generate_worker(args: argparse.Namespace) -> None:
+    threads = _positive_workers(int(args.threads or optimal_threads()), "--threads")
+    print(f"Serving generation jobs from {args.queue} with {threads} threads (Ctrl+C to stop)...")
+    jobs = run_worker(args.queue, source_root=args.source, dest_root=args.dest, threads=threads)
+    print(f"Generation run finished; this worker completed {jobs} job(s).")
+
+
+def _upgrade_package_for(args: argparse.Namespace) -> str:
+    """Swap a full release for its upgrade package when --dir already holds the from-release."""
+    if args.no_upgrade or not args.dir:
+        return args.web_release
+    receipt = read_install_receipt(args.dir)
+    if receipt is None or receipt.package_id == args.web_release:
+        return args.web_release
+    try:
+        releases = fetch_release_catalog_details()
+    except Exception as exc:
+        print(f"Could not check for an upgrade package ({exc}); installing the full release.")
+        return args.web_release
+    upgrade = find_upgrade(releases, receipt.package_id, args.web_release)
+    if upgrade is None:
+        return args.web_release
+    print(f"{receipt.package_id} is installed in --dir; using upgrade package {upgrade.id}.")
+    return upgrade.id
+
+
 def _cmd_install(args: argparse.Namespace) -> None:
     if args.web_release:
         cache_root = Path(args.web_cache or (Path(WORKING_DIR) / "web_cache"))
@@ -235,11 +403,14 @@ def _cmd_install(args: argparse.Namespace) -> None:
             f"({download_workers} download / {materialize_workers} reconstruction workers)..."
         )
         source = WebPackageSource(
-            args.web_release,
+            _upgrade_package_for(args),
             cache_root,
             download_workers=download_workers,
             materialize_workers=materialize_workers,
         )
+        if args.dir and not args.no_sibling and destination_is_empty(args.dir):
+            if _install_from_sibling(args, source):
+                return
         progress = _ConsoleProgress()
         try:
             layout = source.prepare(on_progress=progress)
@@ -282,6 +453,7 @@ def _cmd_install(args: argparse.Namespace) -> None:
         if missing:
             raise SystemExit("Missing required .NET dependencies. Install them from the links above, then run again.")
 
+    clear_install_receipt(dest)
     print("Applying patches...")
     total, succeeded, failed = apply_all_patches(
         dest,
@@ -297,9 +469,216 @@ def _cmd_install(args: argparse.Namespace) -> None:
     if failed:
         print(f"Some patches failed ({failed}/{total}). See logs above.")
     else:
+        installed_id = meta.upgrade_to or layout.package_id
+        if installed_id:
+            write_install_receipt(dest, installed_id, live_version=meta.version or None)
+            register_install(dest)
         print(f"Done. Applied {succeeded}/{total} patches. Have fun!")
 
 
+def _install_from_sibling(args: argparse.Namespace, source: WebPackageSource) -> bool:
+    """Build an empty --dir from another install of the same release, if one exists."""
+    progress = _ConsoleProgress()
+    try:
+        storage_root = source.prepare_storage(on_progress=progress)
+        meta = Meta.read(storage_root)
+        installation = query_install()
+        reused = reuse_sibling_install(
+            source,
+            storage_root,
+            args.dir,
+            meta.upgrade_to or source.package_id,
+            live_root=installation["install_path"] if installation else None,
+            workers=args.threads or optimal_threads(),
+            on_progress=progress,
+        )
+    finally:
+        progress.finish()
+    if reused is None:
+        return False
+    write_install_receipt(args.dir, meta.upgrade_to or source.package_id, live_version=meta.version or None)
+    register_install(args.dir)
+    print(
+        f"Done. Built from {reused.sibling}: {reused.linked} linked, "
+        f"{reused.copied} copied, {reused.repaired} rebuilt. Have fun!"
+    )
+    return True
+
+
+def _cmd_repair(args: argparse.Namespace) -> None:
+    dest = Path(args.dir).resolve()
+    if not dest.is_dir():
+        raise SystemExit(f"Installed folder not found: {dest}")
+    workers = _positive_workers(int(args.workers or optimal_threads()), "--workers")
+
+    release = args.web_release
+    if not release:
+        receipt = read_install_receipt(dest)
+        release = receipt.package_id if receipt is not None else None
+
+    source = None
+    progress = _ConsoleProgress()
+    try:
+        if release:
+            print(f"Fetching storage/ of web package {release}...")
+            source = WebPackageSource(
+                release,
+                Path(args.web_cache or (Path(WORKING_DIR) / "web_cache")),
+                download_workers=DEFAULT_DOWNLOAD_WORKERS,
+                materialize_workers=DEFAULT_MATERIALIZE_WORKERS,
+            )
+            storage_root = source.prepare_storage(on_progress=progress)
+        else:
+            layout = LocalPackageSource().prepare()
+            storage_root = layout.storage_root
+        scan = find_damaged_files(storage_root, dest, workers=workers, on_progress=progress)
+    finally:
+        progress.finish()
+    if scan is None:
+        raise SystemExit(
+            "This package has no storage/target_hashes.json; it was generated before repair "
+            "support. Reinstall it instead."
+        )
+    checked, damaged = scan
+    print(f"Checked {checked} file(s): {len(damaged)} damaged.")
+    for item in damaged:
+        print(f" [{item.reason}] {item.path}")
+    if not damaged or args.dry_run:
+        return
+
+    if source is not None:
+        # Only the patches/payloads of damaged files are downloaded.
+        progress = _ConsoleProgress()
+        try:
+            layout = source.prepare(on_progress=progress, path_filter=package_filter_for(damaged, storage_root))
+        finally:
+            progress.finish()
+
+    live_root = args.live
+    if not live_root:
+        installation = query_install()
+        live_root = installation["install_path"] if installation else None
+
+    progress = _ConsoleProgress()
+    try:
+        repaired, failed = repair_files(
+            damaged,
+            dest,
+            patch_root=layout.patch_root,
+            payload_root=layout.payload_root,
+            storage_root=layout.storage_root,
+            live_root=live_root,
+            workers=workers,
+            on_progress=progress,
+        )
+    finally:
+        progress.finish()
+    print(f"Repaired {len(repaired)}/{len(damaged)} file(s).")
+    for path, reason in failed:
+        print(f" could not repair {path}: {reason}")
+    if failed:
+        raise SystemExit(f"{len(failed)} file(s) could not be repaired; reinstall this release.")
+
+
+def _repository_root(args: argparse.Namespace) -> Path:
+    return Path(args.repo or (Path(WORKING_DIR) / "web_repo_output")).resolve()
+
+
+def _cmd_repository_gc(args: argparse.Namespace) -> None:
+    root = _repository_root(args)
+    dry_run = not args.apply
+    report = collect_garbage(
+        root,
+        dry_run=dry_run,
+        quarantine=args.quarantine,
+        grace_seconds=float(args.grace_minutes) * 60,
+    )
+    mib = 1024 * 1024
+    print("Repository:", root)
+    print(" Releases:", report.release_count)
+    print(" Live objects:", report.live_object_count)
+    print(
+        " Unreferenced objects:",
+        report.unreferenced_object_count,
+        f"({report.unreferenced_bytes / mib:,.1f} MiB)",
+    )
+    print(
+        " Abandoned temp files:",
+        report.abandoned_temp_count,
+        f"({report.abandoned_temp_bytes / mib:,.1f} MiB)",
+    )
+    if dry_run:
+        print(f"Dry run: {report.reclaimable_bytes / mib:,.1f} MiB reclaimable. Re-run with --apply to collect.")
+    elif report.quarantine_root is not None:
+        print("Quarantined to", report.quarantine_root)
+    else:
+        print(f"Reclaimed {report.reclaimable_bytes / mib:,.1f} MiB.")
+
+
+def _cmd_repository_index(args: argparse.Namespace) -> None:
+    root = _repository_root(args)
+    refreshed = sync_repository_index(root)
+    print("Repository index:", root / "repository_index.sqlite")
+    print(" Re-indexed releases:", ", ".join(refreshed) if refreshed else "(none; index was current)")
+
+
+def _cmd_repository_verify(args: argparse.Namespace) -> None:
+    root = _repository_root(args)
+    workers = _positive_workers(int(args.workers), "--workers")
+    progress = _ConsoleProgress()
+    try:
+        report = verify_releases(
+            root,
+            args.release or None,
+            workers=workers,
+            on_progress=lambda current, total, message: progress(
+                "repository:verify", current, total, message
+            ),
+        )
+    finally:
+        progress.finish()
+
+    if args.report:
+        report_path = Path(args.report)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+        print("Report:", report_path)
+
+    print(
+        f"Verified {len(report.releases)} release(s), "
+        f"{report.unique_object_count} unique object(s), "
+        f"{report.unique_object_bytes / (1024 * 1024):,.1f} MiB read."
+    )
+    for issue in report.issues:
+        subject = issue.object_id or issue.path or "-"
+        print(f" [{issue.package_id}] {issue.problem}: {subject} {issue.detail}")
+    if not report.ok:
+        raise SystemExit(f"Verification found {len(report.issues)} problem(s).")
+
+
+def _cmd_snapshot_pack(args: argparse.Namespace) -> None:
+    root = Path(args.path).resolve()
+    segment_mib = _positive_workers(int(args.segment_mib), "--segment-mib")
+    progress = _ConsoleProgress()
+    try:
+        report = pack_archived_snapshot(
+            root,
+            segment_bytes=segment_mib * 1024 * 1024,
+            keep_loose=args.keep_loose,
+            on_progress=progress,
+        )
+    finally:
+        progress.finish()
+    print("Snapshot:", root)
+    print(
+        f" Packed {report.packed_objects} object(s), "
+        f"{report.packed_bytes / (1024 * 1024):,.1f} MiB, "
+        f"into {len(report.new_segments)} new segment(s)."
+    )
+    if report.removed_loose:
+        print(f" Removed {report.removed_loose} loose object file(s).")
+
+
 def build_parser(dev: bool) -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="sierra-patcher", description="Sierra's patch tool")
     sub = parser.add_subparsers(dest="cmd", required=False)
@@ -324,13 +703,69 @@ def build_parser(dev: bool) -> argparse.ArgumentParser:
         default=DEFAULT_MATERIALIZE_WORKERS,
         help=f"Concurrent file reconstruction workers (default: {DEFAULT_MATERIALIZE_WORKERS})",
     )
+    install.add_argument(
+        "--no-upgrade",
+        action="store_true",
+        help="Always install the full release, even if --dir holds a release with an upgrade package",
+    )
+    install.add_argument(
+        "--no-sibling",
+        action="store_true",
+        help="Patch normally even if this release is already installed in another folder",
+    )
+    install.add_argument(
+        "--rehash",
+        action="store_true",
+        help=f"Ignore cached file hashes and read every source file again (also: {FORCE_REHASH_ENV}=1)",
+    )
     install.add_argument("-y", "--yes", action="store_true", help="Assume yes for prompts")
     install.set_defaults(func=_cmd_install)
 
+    repair = sub.add_parser("repair", help="Re-check an installed folder and rebuild only damaged files")
+    repair.add_argument("--dir", type=str, required=True, help="Installed SPT folder to check")
+    repair.add_argument(
+        "--web-release",
+        type=str,
+        help="Web release installed in --dir (default: from its install receipt; else the local package)",
+    )
+    repair.add_argument("--web-cache", type=str, help="Web object/package cache directory (default: ./web_cache beside the patcher)")
+    repair.add_argument("--live", type=str, help="Live Tarkov folder used to rebuild delta targets (default: detected)")
+    repair.add_argument("--workers", type=int, help="Hashing and repair worker threads")
+    repair.add_argument("--dry-run", action="store_true", help="Only report damaged files")
+    repair.add_argument(
+        "--rehash",
+        action="store_true",
+        help=f"Ignore cached file hashes and read every installed file again (also: {FORCE_REHASH_ENV}=1)",
+    )
+    repair.set_defaults(func=_cmd_repair)
+
+    snapshot = sub.add_parser("snapshot", help="Maintain an Archived snapshot folder")
+    snapshot_sub = snapshot.add_subparsers(dest="snapshot_cmd", required=True)
+    pack = snapshot_sub.add_parser(
+        "pack",
+        help="Store the snapshot's objects in a few large segment files for fast copying",
+    )
+    pack.add_argument("--path", type=str, required=True, help="Archived snapshot folder")
+    pack.add_argument(
+        "--segment-mib",
+        type=int,
+        default=1024,
+        help="Maximum segment size in MiB (default: 1024; FAT32 allows at most 4095)",
+    )
+    pack.add_argument("--keep-loose", action="store_true", help="Keep objects/ after packing")
+    pack.set_defaults(func=_cmd_snapshot_pack)
+
     if dev:
         generate = sub.add_parser("generate", help="(dev) Create a patch package from dest vs source")
         generate.add_argument("--source", type=str, help="Clean game folder")
         generate.add_argument("--dest", type=str, help="SPT target folder")
+        generate.add_argument(
+            "--target",
+            nargs=3,
+            action="append",
+            metavar=("DEST", "PACKAGE_ID", "TITLE"),
+            help="Generate several releases against one --source in a single run; repeat per release",
+        )
         generate.add_argument("--threads", type=int, help="Patch-generation worker threads")
         generate.add_argument("--title", type=str, help="Release title (e.g., SPT 3.10)")
         generate.add_argument("--date", type=str, help="Date string to stamp")
@@ -347,6 +782,16 @@ def build_parser(dev: bool) -> argparse.ArgumentParser:
             help="Package delivery output. Web/both publish manifest + content-addressed objects.",
         )
         generate.add_argument("--package-id", type=str, help="Machine-safe web release ID, e.g. 4.0.13")
+        generate.add_argument(
+            "--upgrade-from",
+            type=str,
+            help="Build an upgrade package: release ID of the installed SPT tree given as --source",
+        )
+        generate.add_argument(
+            "--upgrade-to",
+            type=str,
+            help="Release ID that --dest represents; installs of --upgrade-from are upgraded to it",
+        )
         generate.add_argument("--web-repo-output", type=str, help="Directory to receive releases/ and objects/ for HFS upload")
         generate.add_argument(
             "--chunk-size-mib",
@@ -360,8 +805,65 @@ def build_parser(dev: bool) -> argparse.ArgumentParser:
             default=DEFAULT_PUBLISH_WORKERS,
             help=f"Concurrent web publishing workers (default: {DEFAULT_PUBLISH_WORKERS})",
         )
+        generate.add_argument(
+            "--rehash",
+            action="store_true",
+            help="Ignore cached file hashes and read every delta source again",
+        )
+        generate.add_argument(
+            "--queue",
+            type=str,
+            help="Shared folder; hand patch jobs to generate-worker processes on this or other hosts",
+        )
+        generate.add_argument(
+            "--lease-seconds",
+            type=float,
+            default=DEFAULT_LEASE_SECONDS,
+            help="Requeue a job whose worker sent no heartbeat for this long (default: 60)",
+        )
         generate.set_defaults(func=_cmd_generate)
 
+        worker = sub.add_parser("generate-worker", help="(dev) Process patch jobs of a generate --queue run")
+        worker.add_argument("--queue", type=str, required=True, help="The coordinator's --queue folder")
+        worker.add_argument("--source", type=str, help="Clean game folder as seen from this host")
+        worker.add_argument("--dest", type=str, help="SPT target folder as seen from this host")
+        worker.add_argument("--threads", type=int, help="Patch-generation worker threads")
+        worker.set_defaults(func=_cmd_generate_worker)
+
+        repository = sub.add_parser("repository", help="(dev) Maintain a local web repository")
+        repository_sub = repository.add_subparsers(dest="repository_cmd", required=True)
+
+        gc = repository_sub.add_parser("gc", help="Collect objects no release manifest references")
+        gc.add_argument("--repo", type=str, help="Local web repository (default: ./web_repo_output)")
+        gc.add_argument("--apply", action="store_true", help="Remove garbage instead of only reporting it")
+        gc.add_argument("--quarantine", action="store_true", help="Move garbage to quarantine/<timestamp>/ instead of deleting it")
+        gc.add_argument(
+            "--grace-minutes",
+            type=float,
+            default=60,
+            help="Leave files younger than this alone; a publish may still be writing them (default: 60)",
+        )
+        gc.set_defaults(func=_cmd_repository_gc)
+
+        index = repository_sub.add_parser(
+            "index",
+            help="Create or refresh the local SQLite index used by repository tools",
+        )
+        index.add_argument("--repo", type=str, help="Local web repository (default: ./web_repo_output)")
+        index.set_defaults(func=_cmd_repository_index)
+
+        verify = repository_sub.add_parser("verify", help="Verify releases, hashing each shared object once")
+        verify.add_argument("--repo", type=str, help="Local web repository (default: ./web_repo_output)")
+        verify.add_argument("--release", action="append", help="Release ID to verify; repeat for several (default: all)")
+        verify.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_VERIFY_WORKERS,
+            help=f"Concurrent hashing workers (default: {DEFAULT_VERIFY_WORKERS})",
+        )
+        verify.add_argument("--report", type=str, help="Write a JSON verification report to this path")
+        verify.set_defaults(func=_cmd_repository_verify)
+
     return parser
 
 
@@ -374,4 +876,6 @@ def run_cli(argv: list[str] | None = None, dev: bool = False) -> None:
 
         return gui_main(dev=dev)
 
+    if getattr(args, "rehash", False):
+        set_force_rehash(True)
     args.func(args)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from .zstd_patch import _python_io_path
+
+
+# Per-file compression decisions for hybrid generation. Before any zstd run
+# the target is sampled: a few blocks spread over the file are deflated at
+# level 1, which costs a fraction of a millisecond per block and is a good
+# enough estimate of how much any compressor can win. Already-compressed
+# data (video, audio banks, LZ4/LZMA Unity bundles) then has its full-file
+# candidate compressed at a low level instead of the configured preset, or
+# skipped whenever the delta would win even against the best full size the
+# sample suggests, as long as the sample covers enough of the file to
+# suggest anything. Deltas always use the preset.
+PROBE_BLOCK_BYTES = 64 * 1024
+PROBE_BLOCKS = 4
+INCOMPRESSIBLE_RATIO = 0.97
+# zstd at high levels can beat deflate -1 by a few percent even on data the
+# sample calls incompressible; the full-size floor allows for that.
+FULL_ESTIMATE_MARGIN = 0.05
+# The floor is only an estimate: a large bundle or audio bank can hide
+# compressible regions between the sampled blocks. It is trusted only when
+# the blocks cover at least this fraction of the file.
+FLOOR_MIN_SAMPLE_FRACTION = 0.25
+
+_CLASS_EXTENSIONS = {
+    "media": {
+        ".mp4", ".webm", ".ogv", ".ogg", ".mp3", ".bank", ".png", ".jpg", ".jpeg",
+        ".zip", ".7z", ".rar", ".gz", ".zst",
+    },
+    "bundle": {".bundle"},
+    "text": {
+        ".json", ".txt", ".xml", ".cfg", ".ini", ".yaml", ".yml", ".md", ".csv",
+        ".js", ".css", ".html",
+    },
+}
+# Highest zstd level worth running per class; ``None`` keeps the preset.
+# Bundles stay below --ultra, whose huge windows only pay off on raw data.
+CLASS_LEVEL_CAPS: dict[str, int | None] = {
+    "media": 3,
+    "incompressible": 3,
+    "bundle": 19,
+    "text": None,
+    "binary": None,
+}
+
+
+@dataclass(frozen=True)
+class CompressionDecision:
+    file_class: str
+    sample_ratio: float
+    zstd_args: list[str]
+    level: int | None
+    sample_fraction: float = 1.0
+
+    def full_size_floor(self, target_size: int) -> int | None:
+        """Estimated smallest full payload; ``None`` when the sample is too thin."""
+
+        if self.sample_ratio < INCOMPRESSIBLE_RATIO or self.sample_fraction < FLOOR_MIN_SAMPLE_FRACTION:
+            return None
+        return int(target_size * max(self.sample_ratio - FULL_ESTIMATE_MARGIN, 0.0))
+
+
+def file_class(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower()
+    for name, extensions in _CLASS_EXTENSIONS.items():
+        if suffix in extensions:
+            return name
+    return "binary"
+
+
+def sample_ratio(path: str | Path) -> float:
+    """Deflate-1 ratio of up to PROBE_BLOCKS blocks spread across the file."""
+
+    size = os.path.getsize(_python_io_path(path))
+    if size == 0:
+        return 1.0
+    if size <= PROBE_BLOCK_BYTES * PROBE_BLOCKS:
+        offsets = [0]
+        length = size
+    else:
+        step = (size - PROBE_BLOCK_BYTES) // (PROBE_BLOCKS - 1)
+        offsets = [index * step for index in range(PROBE_BLOCKS)]
+        length = PROBE_BLOCK_BYTES
+    raw = 0
+    packed = 0
+    with open(_python_io_path(path), "rb") as handle:
+        for offset in offsets:
+            handle.seek(offset)
+            block = handle.read(length)
+            raw += len(block)
+            packed += len(zlib.compress(block, 1))
+    return min(packed / max(raw, 1), 1.0)
+
+
+def zstd_level(zstd_args: list[str]) -> int | None:
+    level = None
+    for arg in zstd_args:
+        if len(arg) > 1 and arg[0] == "-" and arg[1:].isdigit():
+            level = int(arg[1:])
+    return level
+
+
+def cap_zstd_level(zstd_args: list[str], cap: int | None) -> list[str]:
+    """Lower the level in ``zstd_args`` to ``cap``; other flags are kept."""
+
+    level = zstd_level(zstd_args)
+    if cap is None or (level if level is not None else 3) <= cap:
+        return list(zstd_args)
+    kept = [
+        arg
+        for arg in zstd_args
+        if arg != "--ultra" and not (len(arg) > 1 and arg[0] == "-" and arg[1:].isdigit())
+    ]
+    return [f"-{cap}", *kept]
+
+
+def decide(path: str | Path, zstd_args: list[str]) -> CompressionDecision:
+    ratio = sample_ratio(path)
+    size = os.path.getsize(_python_io_path(path))
+    fraction = min(PROBE_BLOCK_BYTES * PROBE_BLOCKS, size) / size if size else 1.0
+    name = "incompressible" if ratio >= INCOMPRESSIBLE_RATIO else file_class(path)
+    args = cap_zstd_level(zstd_args, CLASS_LEVEL_CAPS.get(name))
+    return CompressionDecision(name, round(ratio, 4), args, zstd_level(args), fraction)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import filecmp
+import json
+import os
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from .hygiene import is_package_excluded
+from .source_integrity import _safe_relative_path, _sha256_file
+from .zstd_patch import _python_io_path
+
+
+# Targets with no Live file at their own path (assets BSG or SPT moved or
+# renamed between versions) can still delta against a Live file elsewhere.
+# storage/delta_references.json maps such a target to the Live path its patch
+# was made from; the installer passes that file to --patch-from and
+# source_hashes.json records its hash like any other delta source.
+#
+# Only Live files the install leaves alone until patching ends are used as
+# references: files absent from the target tree (deleted after patching) or
+# identical in it. A file that is itself patched or replaced could change
+# under a concurrent --patch-from.
+DELTA_REFERENCES_FILENAME = "delta_references.json"
+DELTA_REFERENCES_FORMAT_VERSION = 1
+
+# Similarity sketch: CRC-32 of the 64-byte blocks in the first 4 MiB, reduced
+# to the 256 smallest values (bottom-k MinHash). Catches moved files that were
+# edited in place or re-serialized with the same layout.
+_SKETCH_BLOCK = 64
+_SKETCH_BYTES = 4 * 1024 * 1024
+_SKETCH_SIZE = 256
+SKETCH_MIN_SIMILARITY = 0.25
+_SKETCH_SIZE_RATIO = 2.0
+_SKETCH_MAX_CANDIDATES = 32
+
+
+@dataclass(frozen=True)
+class DeltaReference:
+    path: str
+    match: str  # "identical", "name" or "sketch"
+
+
+def _sketch(path: str | Path) -> frozenset[int]:
+    with open(_python_io_path(path), "rb") as handle:
+        data = handle.read(_SKETCH_BYTES)
+    blocks = {
+        zlib.crc32(data[offset : offset + _SKETCH_BLOCK])
+        for offset in range(0, len(data) - _SKETCH_BLOCK + 1, _SKETCH_BLOCK)
+    }
+    return frozenset(sorted(blocks)[:_SKETCH_SIZE])
+
+
+def _similarity(first: frozenset[int], second: frozenset[int]) -> float:
+    union = sorted(first | second)[:_SKETCH_SIZE]
+    if not union:
+        return 0.0
+    return sum(1 for value in union if value in first and value in second) / len(union)
+
+
+class SourceIndex:
+    """One walk of the Live tree, shared by every target generated from it.
+
+    Also memoizes the SHA-256 and similarity sketch of each Live file, so a
+    multi-release run reads a reference candidate once for all targets.
+    """
+
+    def __init__(self, source_root: str | Path, cancel_event=None) -> None:
+        self.source_root = Path(source_root)
+        self._cancel_event = cancel_event
+        self.by_size: dict[int, list[str]] = {}
+        self.by_name: dict[str, list[str]] = {}
+        self.by_suffix: dict[str, list[tuple[str, int]]] = {}
+        self.sizes: dict[str, int] = {}
+        self._digests: dict[str, str] = {}
+        self._sketches: dict[str, frozenset[int]] = {}
+        self._lock = threading.Lock()
+
+        for current, dirnames, filenames in os.walk(_python_io_path(self.source_root)):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = Path(current) / name
+                if is_package_excluded(path, _python_io_path(self.source_root)):
+                    continue
+                relative = path.relative_to(_python_io_path(self.source_root)).as_posix()
+                size = path.stat().st_size
+                self.sizes[relative] = size
+                self.by_size.setdefault(size, []).append(relative)
+                self.by_name.setdefault(name.lower(), []).append(relative)
+                self.by_suffix.setdefault(Path(name).suffix.lower(), []).append((relative, size))
+
+    def sha256(self, relative: str) -> str:
+        with self._lock:
+            known = self._digests.get(relative)
+        if known is None:
+            known = _sha256_file(self.source_root / relative, self._cancel_event)
+            with self._lock:
+                self._digests[relative] = known
+        return known
+
+    def sketch(self, relative: str) -> frozenset[int]:
+        with self._lock:
+            known = self._sketches.get(relative)
+        if known is None:
+            known = _sketch(self.source_root / relative)
+            with self._lock:
+                self._sketches[relative] = known
+        return known
+
+
+class ReferenceFinder:
+    """Find a Live file to delta a target against when its own path is new."""
+
+    def __init__(
+        self,
+        source_root: str | Path,
+        target_root: str | Path,
+        cancel_event=None,
+        index: SourceIndex | None = None,
+    ) -> None:
+        self._source_root = Path(source_root)
+        self._target_root = Path(target_root)
+        self._cancel_event = cancel_event
+        self._index = index if index is not None else SourceIndex(source_root, cancel_event)
+        self._stable: dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def _is_stable(self, relative: str) -> bool:
+        with self._lock:
+            known = self._stable.get(relative)
+        if known is not None:
+            return known
+        target = self._target_root / relative
+        stable = not os.path.exists(_python_io_path(target)) or filecmp.cmp(
+            _python_io_path(self._source_root / relative), _python_io_path(target), shallow=False
+        )
+        with self._lock:
+            self._stable[relative] = stable
+        return stable
+
+    def find(self, relative: str, target_file: str | Path) -> DeltaReference | None:
+        relative = Path(relative).as_posix()
+        size = os.path.getsize(_python_io_path(target_file))
+
+        index = self._index
+        same_size = [path for path in index.by_size.get(size, []) if path != relative]
+        if same_size:
+            digest = _sha256_file(target_file, self._cancel_event)
+            for candidate in same_size:
+                if index.sha256(candidate) == digest and self._is_stable(candidate):
+                    return DeltaReference(candidate, "identical")
+
+        named = sorted(
+            (path for path in index.by_name.get(Path(relative).name.lower(), []) if path != relative),
+            key=lambda path: (abs(index.sizes[path] - size), path),
+        )
+        for candidate in named:
+            if self._is_stable(candidate):
+                return DeltaReference(candidate, "name")
+
+        if size == 0:
+            return None
+        nearby = sorted(
+            (
+                (abs(candidate_size - size), path)
+                for path, candidate_size in index.by_suffix.get(Path(relative).suffix.lower(), [])
+                if candidate_size
+                and path != relative
+                and 1 / _SKETCH_SIZE_RATIO <= candidate_size / size <= _SKETCH_SIZE_RATIO
+            )
+        )[:_SKETCH_MAX_CANDIDATES]
+        if not nearby:
+            return None
+        target_sketch = _sketch(target_file)
+        best: tuple[float, str] | None = None
+        for _distance, candidate in nearby:
+            similarity = _similarity(target_sketch, index.sketch(candidate))
+            if similarity >= SKETCH_MIN_SIMILARITY and (best is None or similarity > best[0]):
+                if self._is_stable(candidate):
+                    best = (similarity, candidate)
+        return DeltaReference(best[1], "sketch") if best else None
+
+
+def write_delta_references(storage_root: str | Path, references: dict[str, str]) -> Path | None:
+    """Write the target -> reference map; an empty map removes the file."""
+
+    output = Path(storage_root) / DELTA_REFERENCES_FILENAME
+    if not references:
+        try:
+            os.unlink(_python_io_path(output))
+        except FileNotFoundError:
+            pass
+        return None
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temp = output.with_name(output.name + ".tmp")
+    try:
+        temp.write_text(
+            json.dumps(
+                {
+                    "format_version": DELTA_REFERENCES_FORMAT_VERSION,
+                    "files": [
+                        {"path": path, "reference": references[path]} for path in sorted(references)
+                    ],
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(_python_io_path(temp), _python_io_path(output))
+    finally:
+        try:
+            os.unlink(_python_io_path(temp))
+        except FileNotFoundError:
+            pass
+    return output
+
+
+def load_delta_references(storage_root: str | Path) -> dict[str, str]:
+    """Target path -> Live reference path; empty for packages without any."""
+
+    manifest_path = Path(storage_root) / DELTA_REFERENCES_FILENAME
+    if not os.path.isfile(_python_io_path(manifest_path)):
+        return {}
+    try:
+        data = json.loads(Path(_python_io_path(manifest_path)).read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise RuntimeError("delta reference manifest is not valid JSON") from exc
+    if not isinstance(data, dict):
+        raise RuntimeError("delta reference manifest must be a JSON object")
+    if data.get("format_version") != DELTA_REFERENCES_FORMAT_VERSION:
+        raise RuntimeError(
+            f"unsupported delta reference manifest version: {data.get('format_version')!r}"
+        )
+    references = {}
+    for item in data.get("files") or []:
+        if not isinstance(item, dict):
+            raise RuntimeError("delta reference manifest contains an invalid entry")
+        path = _safe_relative_path(str(item.get("path", ""))).as_posix()
+        references[path] = _safe_relative_path(str(item.get("reference", ""))).as_posix()
+    return references
+
+
+def package_delta_references(patch_root: str | Path) -> dict[str, str]:
+    """References of the package whose patchfiles/ is ``patch_root``."""
+
+    return load_delta_references(Path(patch_root).parent / "storage")
@@ -0,0 +1,557 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from .delta_references import ReferenceFinder, SourceIndex
+from .hybrid_payload import _TargetRun, _normalize_args, _process_target_file
+from .proc import Cancelled
+from .source_integrity import _safe_relative_path
+from .zstd_patch import _python_io_path
+
+
+# Hybrid generation spread over worker processes on one or more hosts. The
+# coordinator and its workers share a queue directory (a local folder or an
+# SMB/NFS share every host can reach):
+#
+#   run.json                  roots, zstd args and lease length of this run
+#   jobs/<id>.json            a batch of target paths, largest batches first
+#   leases/<id>.json          claim of a running job; rewritten as heartbeat
+#   results/<id>/             result.json plus the job's patchfiles/ and
+#                             additional_files/ artifacts
+#   done.json                 end of the run; workers exit when they see it
+#
+# A worker claims a job by creating its lease exclusively, processes it
+# exactly like a local run and publishes the result by renaming its private
+# staging folder, so a result is either complete or absent. The coordinator
+# deletes a job's file once its result is accepted, so it is never claimed
+# again. A lease the
+# coordinator sees unchanged for lease_seconds (by its own clock, so host
+# clocks need not agree) belongs to a dead worker; it is removed and another
+# worker repeats the job. Every artifact is hashed by the worker and checked
+# by the coordinator before it enters the package.
+QUEUE_FORMAT_VERSION = 1
+RUN_FILENAME = "run.json"
+DONE_FILENAME = "done.json"
+RESULT_FILENAME = "result.json"
+ARTIFACT_DIRS = ("patchfiles", "additional_files")
+DEFAULT_LEASE_SECONDS = 60.0
+JOB_TARGET_BYTES = 256 * 1024 * 1024
+JOB_MAX_FILES = 256
+MAX_JOB_ATTEMPTS = 3
+_POLL_SECONDS = 0.5
+
+
+def _raise_if_cancelled(cancel_event) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise Cancelled()
+
+
+def _write_json(path: Path, data: dict) -> None:
+    temp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        temp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(_python_io_path(temp), _python_io_path(path))
+    finally:
+        try:
+            os.unlink(_python_io_path(temp))
+        except FileNotFoundError:
+            pass
+
+
+def _read_json(path: Path) -> dict | None:
+    """The JSON object at ``path``; ``None`` while it is absent or being replaced."""
+
+    try:
+        data = json.loads(Path(_python_io_path(path)).read_text(encoding="utf-8"))
+    except (FileNotFoundError, PermissionError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(_python_io_path(path), "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def partition_jobs(sizes: dict[str, int]) -> list[list[str]]:
+    """Batch target paths into jobs of about JOB_TARGET_BYTES, largest first.
+
+    Large files become jobs of their own and small ones are batched, so
+    every job costs about the same and the biggest are handed out first,
+    leaving no long job to start last.
+    """
+
+    jobs: list[list[str]] = []
+    current: list[str] = []
+    current_bytes = 0
+    for path in sorted(sizes, key=lambda item: (-sizes[item], item)):
+        current.append(path)
+        current_bytes += sizes[path]
+        if current_bytes >= JOB_TARGET_BYTES or len(current) >= JOB_MAX_FILES:
+            jobs.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        jobs.append(current)
+    return jobs
+
+
+def _target_path(dest_root: str, relative: str) -> str:
+    return os.path.join(dest_root, *relative.split("/"))
+
+
+class _Queue:
+    def __init__(self, queue_root: str | Path) -> None:
+        self.root = Path(queue_root)
+        self.jobs = self.root / "jobs"
+        self.leases = self.root / "leases"
+        self.results = self.root / "results"
+
+    def lease(self, job: str) -> Path:
+        return self.leases / f"{job}.json"
+
+    def result(self, job: str) -> Path:
+        return self.results / job
+
+    def clear(self) -> None:
+        for directory in (self.jobs, self.leases, self.results):
+            shutil.rmtree(_python_io_path(directory), ignore_errors=True)
+        for name in (RUN_FILENAME, DONE_FILENAME):
+            try:
+                os.unlink(_python_io_path(self.root / name))
+            except FileNotFoundError:
+                pass
+
+    def done(self, run_id: str) -> dict | None:
+        done = _read_json(self.root / DONE_FILENAME)
+        return done if done is not None and done.get("run_id") == run_id else None
+
+
+# ----- COORDINATOR -----
+
+def generate_patches_distributed(
+    source_root: str,
+    dest_root: str,
+    out_root: str,
+    missing_root: str,
+    queue_root: str | Path,
+    workers: int = 8,
+    on_progress=None,
+    cancel_event=None,
+    zstd_args: list[str] | None = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> int:
+    """Generate a hybrid package with the workers serving ``queue_root``.
+
+    Produces the same ``out_root``/``missing_root`` trees and manifests as
+    ``generate_patches``; ``workers`` is accepted for the post-generation
+    hooks and not used here. Returns the number of target files.
+    """
+
+    del workers
+    args = _normalize_args(zstd_args)
+    queue = _Queue(queue_root)
+    run = _TargetRun(source_root, dest_root, out_root, missing_root, None, cancel_event)
+    run_id = uuid.uuid4().hex
+    queue.clear()
+    for directory in (queue.jobs, queue.leases, queue.results):
+        os.makedirs(_python_io_path(directory), exist_ok=True)
+    _write_json(
+        queue.root / RUN_FILENAME,
+        {
+            "format_version": QUEUE_FORMAT_VERSION,
+            "run_id": run_id,
+            "source_root": str(source_root),
+            "dest_root": str(dest_root),
+            "zstd_args": args,
+            "lease_seconds": float(lease_seconds),
+        },
+    )
+    print(f"distributed generation: run {run_id} waiting for workers on {queue.root}")
+
+    total = len(run.files)
+    completed = 0
+    next_job = 0
+
+    def report_progress(kind: str) -> None:
+        if on_progress:
+            on_progress(
+                "generate:patch",
+                completed,
+                total,
+                f"processed {completed}/{total} ({kind})",
+            )
+
+    def settled(kind: str) -> None:
+        nonlocal completed
+        completed += 1
+        report_progress(kind)
+
+    def import_result(job: str) -> bool:
+        """Move a verified result into the package; ``False`` if it was rejected."""
+
+        nonlocal completed
+        result_dir = queue.result(job)
+        result = _read_json(result_dir / RESULT_FILENAME)
+        if result is None:
+            return False
+        if result.get("error"):
+            raise RuntimeError(f"hybrid package generation failed for {result['error']}")
+        artifacts = []
+        for name, expected in (result.get("artifacts") or {}).items():
+            relative = _safe_relative_path(name)
+            if relative.parts[0] not in ARTIFACT_DIRS or len(relative.parts) < 2:
+                return False
+            artifact = result_dir / relative
+            if (
+                not os.path.isfile(_python_io_path(artifact))
+                or os.path.getsize(_python_io_path(artifact)) != expected.get("size")
+                or _sha256_of(artifact) != expected.get("sha256")
+            ):
+                return False
+            artifacts.append((artifact, relative))
+        for artifact, relative in artifacts:
+            root = out_root if relative.parts[0] == "patchfiles" else missing_root
+            destination = Path(root, *relative.parts[1:])
+            os.makedirs(_python_io_path(destination.parent), exist_ok=True)
+            shutil.move(_python_io_path(artifact), _python_io_path(destination))
+        for entry in result.get("files") or []:
+            run.record(
+                _target_path(dest_root, entry["path"]),
+                entry["kind"],
+                int(entry["packed_bytes"]),
+                int(entry["target_bytes"]),
+                entry.get("decision"),
+            )
+            completed += 1
+            report_progress(entry["kind"])
+        return True
+
+    def process(paths: list[str]) -> None:
+        nonlocal next_job
+        sizes = {
+            Path(run.relative(path)).as_posix(): os.path.getsize(_python_io_path(path)) for path in paths
+        }
+        pending = set()
+        for batch in partition_jobs(sizes):
+            job = f"{next_job:06d}"
+            next_job += 1
+            _write_json(queue.jobs / f"{job}.json", {"files": batch, "bytes": sum(sizes[path] for path in batch)})
+            pending.add(job)
+
+        attempts: dict[str, int] = {}
+        leases_seen: dict[str, tuple[bytes, float]] = {}
+        while pending:
+            _raise_if_cancelled(cancel_event)
+            for job in sorted(pending):
+                if not os.path.isdir(_python_io_path(queue.result(job))):
+                    continue
+                if import_result(job):
+                    pending.discard(job)
+                    try:
+                        os.unlink(_python_io_path(queue.jobs / f"{job}.json"))
+                    except FileNotFoundError:
+                        pass
+                else:
+                    attempts[job] = attempts.get(job, 0) + 1
+                    if attempts[job] >= MAX_JOB_ATTEMPTS:
+                        raise RuntimeError(f"distributed job {job} returned unverifiable results {attempts[job]} times")
+                    print(f"distributed generation: result of job {job} failed verification; requeued")
+                shutil.rmtree(_python_io_path(queue.result(job)), ignore_errors=True)
+                try:
+                    os.unlink(_python_io_path(queue.lease(job)))
+                except FileNotFoundError:
+                    pass
+
+            now = time.monotonic()
+            for lease in sorted(queue.leases.glob("*.json")):
+                job = lease.stem
+                try:
+                    content = lease.read_bytes()
+                except (FileNotFoundError, PermissionError):
+                    continue
+                seen = leases_seen.get(job)
+                if seen is None or seen[0] != content:
+                    leases_seen[job] = (content, now)
+                elif now - seen[1] >= lease_seconds and job in pending:
+                    holder = (_read_json(lease) or {}).get("worker", "?")
+                    try:
+                        os.unlink(_python_io_path(lease))
+                    except FileNotFoundError:
+                        pass
+                    leases_seen.pop(job, None)
+                    print(f"distributed generation: lease on job {job} held by {holder} expired; requeued")
+            if pending:
+                time.sleep(min(_POLL_SECONDS, lease_seconds / 4))
+
+    status = "failed"
+    try:
+        process(run.first_pass())
+        process(run.resolve_fanout(settled))
+        status = "complete"
+    except Cancelled:
+        status = "cancelled"
+        raise
+    finally:
+        _write_json(queue.root / DONE_FILENAME, {"run_id": run_id, "status": status})
+        for directory in (queue.jobs, queue.leases, queue.results):
+            shutil.rmtree(_python_io_path(directory), ignore_errors=True)
+
+    run.finish(args)
+    return total
+
+
+# ----- WORKER -----
+
+class _Heartbeat:
+    """Keep a job's lease fresh and stop the job when the run ends."""
+
+    def __init__(self, queue: _Queue, job: str, worker_id: str, run_id: str, lease_seconds: float, cancel_event):
+        self._queue = queue
+        self._job = job
+        self._worker_id = worker_id
+        self._run_id = run_id
+        self._interval = max(lease_seconds / 4, 0.05)
+        self._outer = cancel_event
+        self.cancel_event = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"sierra-lease-{job}", daemon=True)
+
+    def __enter__(self) -> _Heartbeat:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self) -> None:
+        beat = 0
+        while not self._stopped.wait(self._interval):
+            if (self._outer is not None and self._outer.is_set()) or self._queue.done(self._run_id):
+                self.cancel_event.set()
+                return
+            beat += 1
+            try:
+                _write_json(self._queue.lease(self._job), {"worker": self._worker_id, "beat": beat})
+            except OSError:
+                pass
+
+
+def _claim(queue: _Queue, worker_id: str) -> str | None:
+    for path in sorted(queue.jobs.glob("*.json")):
+        job = path.stem
+        if os.path.exists(_python_io_path(queue.lease(job))) or os.path.isdir(_python_io_path(queue.result(job))):
+            continue
+        try:
+            handle = os.open(_python_io_path(queue.lease(job)), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except (FileExistsError, FileNotFoundError):
+            continue
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump({"worker": worker_id, "beat": 0}, stream)
+        # The job may have finished between the listing and the claim.
+        if os.path.isdir(_python_io_path(queue.result(job))) or not path.exists():
+            _release(queue, job, worker_id)
+            continue
+        return job
+    return None
+
+
+def _release(queue: _Queue, job: str, worker_id: str) -> None:
+    lease = queue.lease(job)
+    if (_read_json(lease) or {}).get("worker") == worker_id:
+        try:
+            os.unlink(_python_io_path(lease))
+        except FileNotFoundError:
+            pass
+
+
+def _run_job(
+    queue: _Queue,
+    run_id: str,
+    job: str,
+    files: list[str],
+    worker_id: str,
+    source_root: str,
+    dest_root: str,
+    zstd_args: list[str],
+    references: ReferenceFinder,
+    threads: int,
+    cancel_event,
+) -> None:
+    staging = queue.results / f".{job}.{worker_id}.tmp"
+    shutil.rmtree(_python_io_path(staging), ignore_errors=True)
+    patch_root = staging / "patchfiles"
+    stage_root = staging / "additional_files"
+    # mkdir, not makedirs: results/ is gone once the run ends and must not
+    # be recreated by a worker that is still busy.
+    os.mkdir(_python_io_path(staging))
+    try:
+        os.mkdir(_python_io_path(patch_root))
+        os.mkdir(_python_io_path(stage_root))
+        entries = []
+        error = None
+        with ThreadPoolExecutor(max_workers=max(1, min(int(threads), len(files)))) as executor:
+            futures = {
+                executor.submit(
+                    _process_target_file,
+                    source_root,
+                    dest_root,
+                    _target_path(dest_root, relative),
+                    str(patch_root),
+                    str(stage_root),
+                    zstd_args,
+                    cancel_event,
+                    references,
+                ): relative
+                for relative in files
+            }
+            for future in as_completed(futures):
+                _raise_if_cancelled(cancel_event)
+                relative = futures[future]
+                try:
+                    kind, packed_bytes, target_bytes, decision = future.result()
+                except Cancelled:
+                    raise
+                except Exception as exc:
+                    for pending in futures:
+                        pending.cancel()
+                    error = f"{relative}: {exc}"
+                    break
+                entries.append(
+                    {
+                        "path": relative,
+                        "kind": kind,
+                        "packed_bytes": packed_bytes,
+                        "target_bytes": target_bytes,
+                        "decision": decision,
+                    }
+                )
+
+        artifacts = {}
+        if error is None:
+            for directory in ARTIFACT_DIRS:
+                for path in sorted((staging / directory).rglob("*")):
+                    if path.is_file():
+                        artifacts[path.relative_to(staging).as_posix()] = {
+                            "size": path.stat().st_size,
+                            "sha256": _sha256_of(path),
+                        }
+        _write_json(
+            staging / RESULT_FILENAME,
+            {
+                "worker": worker_id,
+                "error": error,
+                "files": sorted(entries, key=lambda entry: entry["path"]) if error is None else [],
+                "artifacts": artifacts,
+            },
+        )
+        if queue.done(run_id):
+            return
+        try:
+            os.rename(_python_io_path(staging), _python_io_path(queue.result(job)))
+        except OSError:
+            # Another worker already published this job after our lease expired.
+            pass
+    finally:
+        shutil.rmtree(_python_io_path(staging), ignore_errors=True)
+
+
+def run_worker(
+    queue_root: str | Path,
+    source_root: str | None = None,
+    dest_root: str | None = None,
+    threads: int = 4,
+    worker_id: str | None = None,
+    cancel_event=None,
+    wait_seconds: float | None = None,
+) -> int:
+    """Process jobs from ``queue_root`` until its run is done.
+
+    ``source_root``/``dest_root`` override the coordinator's paths for hosts
+    that mount the Live and SPT trees elsewhere. Waits for a run to start,
+    at most ``wait_seconds`` when given. Returns the number of jobs done.
+    """
+
+    queue = _Queue(queue_root)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    started = time.monotonic()
+    while True:
+        _raise_if_cancelled(cancel_event)
+        config = _read_json(queue.root / RUN_FILENAME)
+        if config is not None and not queue.done(str(config.get("run_id"))):
+            break
+        if wait_seconds is not None and time.monotonic() - started >= wait_seconds:
+            return 0
+        time.sleep(_POLL_SECONDS)
+    if config.get("format_version") != QUEUE_FORMAT_VERSION:
+        raise RuntimeError(f"unsupported generation queue version: {config.get('format_version')!r}")
+
+    run_id = str(config["run_id"])
+    source_root = source_root or config["source_root"]
+    dest_root = dest_root or config["dest_root"]
+    zstd_args = list(config["zstd_args"])
+    lease_seconds = float(config["lease_seconds"])
+    print(f"distributed worker {worker_id}: joined run {run_id}")
+
+    references = None
+    completed = 0
+    while not queue.done(run_id):
+        _raise_if_cancelled(cancel_event)
+        job = _claim(queue, worker_id)
+        if job is None:
+            time.sleep(min(_POLL_SECONDS, lease_seconds / 4))
+            continue
+        try:
+            files = (_read_json(queue.jobs / f"{job}.json") or {}).get("files")
+            if not files:
+                continue
+            if references is None:
+                references = ReferenceFinder(source_root, dest_root, cancel_event, index=SourceIndex(source_root))
+            with _Heartbeat(queue, job, worker_id, run_id, lease_seconds, cancel_event) as heartbeat:
+                try:
+                    _run_job(
+                        queue,
+                        run_id,
+                        job,
+                        files,
+                        worker_id,
+                        source_root,
+                        dest_root,
+                        zstd_args,
+                        references,
+                        threads,
+                        heartbeat.cancel_event,
+                    )
+                except Cancelled:
+                    _raise_if_cancelled(cancel_event)
+                    break
+                except OSError:
+                    # The coordinator removes the queue folders when the run
+                    # ends, possibly under a job still in progress here.
+                    if queue.done(run_id):
+                        break
+                    raise
+            completed += 1
+        finally:
+            _release(queue, job, worker_id)
+    if queue.done(run_id):
+        # A job that raced the end of the run may have left results/ behind.
+        try:
+            os.rmdir(_python_io_path(queue.results))
+        except OSError:
+            pass
+    print(f"distributed worker {worker_id}: run {run_id} ended after {completed} job(s)")
+    return completed
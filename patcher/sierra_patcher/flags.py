@@ -38,3 +38,13 @@ def is_dev_mode() -> bool:
         candidates.add(Path(sys.executable).resolve().parent / "dev.enable")
 
     return any(path.is_file() for path in candidates)
+
+
+def archive_verify_objects_first() -> bool:
+    """Return True when Archived snapshots should use the separate object scan.
+
+    SIERRA_ARCHIVE_VERIFY_OBJECTS=1 re-reads every object before rebuilding
+    the package, so support can list all damaged objects of a snapshot.
+    """
+
+    return _truthy_env("SIERRA_ARCHIVE_VERIFY_OBJECTS")
@@ -5,14 +5,27 @@ import json
 import ntpath
 import os
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from typing import Iterable
 
 from . import proc
+from .hash_cache import cached_sha256, remember_sha256
 
 COPY_STATE_FILENAME = ".sierra-copy-state.json"
 _COPY_STATE_FORMAT_VERSION = 1
 _COPY_CHUNK_BYTES = 4 * 1024 * 1024
+# Files at least this large get a worker to themselves; smaller files are
+# grouped into batches bounded by both count and bytes.
+_LARGE_FILE_BYTES = 64 * 1024 * 1024
+_BATCH_MAX_FILES = 256
+_BATCH_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_COPY_WORKERS = min(8, max(2, os.cpu_count() or 2))
+# Linux FICLONE ioctl: a copy-on-write clone on btrfs/XFS and friends.
+_FICLONE = 0x40049409
 
 
 def _io_path(path: str | os.PathLike) -> str:
@@ -157,15 +170,107 @@ def _disk_usage_root(path: Path) -> Path:
 
 
 def _sha256_file(path: Path, cancel_event=None) -> str:
-    digest = hashlib.sha256()
-    with open(_io_path(path), "rb") as stream:
-        while True:
-            _raise_if_cancelled(cancel_event)
-            chunk = stream.read(_COPY_CHUNK_BYTES)
-            if not chunk:
-                break
-            digest.update(chunk)
-    return digest.hexdigest()
+    def compute() -> str:
+        digest = hashlib.sha256()
+        with open(_io_path(path), "rb") as stream:
+            while True:
+                _raise_if_cancelled(cancel_event)
+                chunk = stream.read(_COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    return cached_sha256(_io_path(path), compute)
+
+
+def _relative_key(value: str | os.PathLike) -> str:
+    return os.path.normcase(os.path.join(*PurePosixPath(str(value).replace("\\", "/")).parts))
+
+
+def package_touched_paths(storage_root: str | os.PathLike) -> set[str]:
+    """Return the Live-relative paths a package patches, replaces or deletes.
+
+    Link copy keeps these as real copies. Delta sources come from
+    source_hashes.json and deletions from delete_list.txt; payload targets are
+    added when the package's payloads/ tree is already present, and the paths
+    payload_fanout.json copies a payload to in any case.
+    """
+
+    from .source_integrity import _load_source_hash_manifest
+
+    storage_path = Path(storage_root)
+    touched = {entry["path"] for entry in _load_source_hash_manifest(storage_path) or []}
+    delete_list = storage_path / "delete_list.txt"
+    if os.path.isfile(_io_path(delete_list)):
+        with open(_io_path(delete_list), "r", encoding="utf-8") as stream:
+            touched.update(line.strip() for line in stream if line.strip())
+    from .hybrid_payload import payload_fanout_sources
+
+    touched.update(payload_fanout_sources(storage_path))
+    payload_root = storage_path.parent / "payloads"
+    if os.path.isdir(_io_path(payload_root)):
+        from .hybrid_payload import SOLID_DIR, solid_member_paths
+
+        touched.update(solid_member_paths(payload_root))
+        for root, dirnames, filenames in os.walk(_io_path(payload_root)):
+            if root == _io_path(payload_root) and SOLID_DIR in dirnames:
+                dirnames.remove(SOLID_DIR)
+            for name in filenames:
+                if name.endswith(".zst"):
+                    relative = os.path.relpath(os.path.join(root, name), _io_path(payload_root))
+                    touched.add(PurePosixPath(*Path(relative).parts).as_posix()[: -len(".zst")])
+    return touched
+
+
+def _same_volume(source: Path, destination: Path) -> bool:
+    try:
+        return (
+            os.stat(_io_path(source)).st_dev
+            == os.stat(_io_path(_disk_usage_root(destination))).st_dev
+        )
+    except OSError:
+        return False
+
+
+def _clone_file(source: Path, destination: Path) -> bool:
+    """Reflink ``source`` to ``destination``; False means the volume cannot.
+
+    The clone shares blocks copy-on-write, so writing either file never
+    changes the other.
+    """
+
+    if os.name == "nt":
+        return False
+    try:
+        import fcntl
+
+        with open(_io_path(source), "rb") as source_stream, open(
+            _io_path(destination), "wb"
+        ) as destination_stream:
+            fcntl.ioctl(destination_stream.fileno(), _FICLONE, source_stream.fileno())
+        shutil.copystat(_io_path(source), _io_path(destination))
+        return True
+    except (ImportError, OSError):
+        _remove_failed_copy(destination)
+        return False
+
+
+def _link_file(source: Path, destination: Path) -> bool:
+    """Clone or hard-link ``source`` to ``destination``; False means copy instead.
+
+    A reflink is preferred because it shares blocks copy-on-write. A hard link
+    shares the inode, which is safe here because every install stage replaces
+    or unlinks destination paths and never writes into an existing file.
+    """
+
+    if _clone_file(source, destination):
+        return True
+    try:
+        os.link(_io_path(source), _io_path(destination))
+        return True
+    except OSError:
+        return False
 
 
 def _remove_failed_copy(path: Path) -> None:
@@ -177,20 +282,69 @@ def _remove_failed_copy(path: Path) -> None:
         pass
 
 
+def _copy_units(files: list[tuple[Path, Path, int]]) -> list[list[tuple[Path, Path, int]]]:
+    """Group the sorted copy list into pool work units.
+
+    Large files are a unit of their own so they stream without sharing a worker;
+    runs of small files are batched so per-file open/stat/close latency is
+    amortised instead of costing one pool round trip each.
+    """
+
+    units: list[list[tuple[Path, Path, int]]] = []
+    batch: list[tuple[Path, Path, int]] = []
+    batch_bytes = 0
+    for item in files:
+        size = item[2]
+        if batch and (
+            size >= _LARGE_FILE_BYTES
+            or len(batch) >= _BATCH_MAX_FILES
+            or batch_bytes + size > _BATCH_MAX_BYTES
+        ):
+            units.append(batch)
+            batch, batch_bytes = [], 0
+        if size >= _LARGE_FILE_BYTES:
+            units.append([item])
+            continue
+        batch.append(item)
+        batch_bytes += size
+    if batch:
+        units.append(batch)
+    return units
+
+
 def copy_live_game(
     source: str | os.PathLike,
     destination: str | os.PathLike,
     *,
     source_version: str | None = None,
+    workers: int | None = None,
+    link_unchanged: bool = False,
+    modified_paths: Iterable[str] = (),
+    full_verify_paths: Iterable[str] | None = None,
     on_progress=None,
     cancel_event=None,
-) -> None:
+) -> dict[str, str]:
     """Copy Live into a new SPT folder, resume safely, and verify every file.
 
-    Source SHA-256 is calculated while new files are being read for the copy.
-    Reused resume files are hashed from the source. After the copy pass, every
-    destination file is hashed and compared before the resume-state marker is
-    removed. A bad destination file is deleted so the next resume recopies it.
+    Files are copied by a bounded worker pool. Source SHA-256 is calculated
+    while new files are being read for the copy; reused resume files are
+    hashed from the source. Each worker then checks the destination file it
+    wrote before moving on, and the resume-state marker is removed only after
+    every file passed. A bad destination file is deleted so the next resume
+    recopies it.
+
+    By default every destination file is hashed again. When
+    ``full_verify_paths`` is given, only those files (the ones patches will
+    read) get a full SHA-256 read-back; other freshly copied files are checked
+    by size and a hash of their final block. Reused resume files are always
+    hashed in full.
+
+    With ``link_unchanged`` and both folders on one volume, files outside
+    ``modified_paths`` are reflinked or hard-linked instead of copied.
+
+    Returns the verified SHA-256 of every copied or reused file, keyed by its
+    POSIX path relative to the install root, so the source preflight can use
+    these digests instead of reading the files again.
     """
 
     source_path = Path(source)
@@ -205,16 +359,23 @@ def copy_live_game(
 
     files: list[tuple[Path, Path, int]] = []
     directories: list[Path] = []
+    linkable: set[Path] = set()
     total_bytes = 0
     remaining_bytes = 0
     source_root = _io_path(source_path)
+    link_files = link_unchanged and _same_volume(source_path, destination_path)
+    keep_separate = {_relative_key(path) for path in modified_paths}
+    full_verify = (
+        None if full_verify_paths is None else {_relative_key(path) for path in full_verify_paths}
+    )
     for root, dirnames, filenames in os.walk(source_root):
         _raise_if_cancelled(cancel_event)
+        dirnames.sort()
         root_path = Path(root)
         relative = os.path.relpath(root, source_root)
         relative_root = Path() if relative == "." else Path(relative)
         directories.extend(destination_path / relative_root / name for name in dirnames)
-        for name in filenames:
+        for name in sorted(filenames):
             if name == COPY_STATE_FILENAME:
                 continue
             source_file = root_path / name
@@ -222,6 +383,9 @@ def copy_live_game(
             size = os.path.getsize(_io_path(source_file))
             files.append((source_file, destination_file, size))
             total_bytes += size
+            if link_files and _relative_key(relative_root / name) not in keep_separate:
+                linkable.add(source_file)
+                continue
             if not _same_file(source_file, destination_file):
                 try:
                     existing_size = os.path.getsize(_io_path(destination_file))
@@ -244,56 +408,97 @@ def copy_live_game(
     for directory in directories:
         os.makedirs(_io_path(directory), exist_ok=True)
 
-    copied_bytes = 0
     progress_total = max(total_bytes, 1)
-    expected_hashes: dict[Path, str] = {}
-
-    for source_file, destination_file, size in files:
+    progress_lock = threading.Lock()
+    done_bytes = 0
+    moved_bytes = 0
+    started = time.monotonic()
+    # Set when any unit fails so the other workers stop at their next chunk.
+    abort = threading.Event()
+
+    def check() -> None:
         _raise_if_cancelled(cancel_event)
-        if _same_file(source_file, destination_file):
-            # Resume reuse is still verified cryptographically. Size+mtime is
-            # only a fast copy-skip hint, never the final integrity decision.
-            expected_hashes[destination_file] = _sha256_file(source_file, cancel_event)
-            copied_bytes += size
+        if abort.is_set():
+            raise proc.Cancelled("Live game copy aborted")
+
+    def rate() -> float:
+        elapsed = time.monotonic() - started
+        return moved_bytes / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+
+    def advance(amount: int, message: str, *, copied: bool) -> None:
+        nonlocal done_bytes, moved_bytes
+        with progress_lock:
+            done_bytes += amount
+            if copied:
+                moved_bytes += amount
             if on_progress is not None:
                 on_progress(
                     "install:copy",
-                    copied_bytes,
+                    done_bytes,
                     progress_total,
-                    f"Reusing {source_file.name}",
+                    f"{message} ({rate():.0f} MB/s)",
                 )
-            continue
 
-        os.makedirs(_io_path(destination_file.parent), exist_ok=True)
+    def copy_file(source_file: Path, destination_file: Path) -> tuple[str | None, tuple[int, str] | None]:
+        """Copy one file.
+
+        Returns its source SHA-256 (None if it was linked) and, for a fresh
+        copy, the offset and SHA-256 of its final block.
+        """
+        if source_file in linkable:
+            # A link or clone is the same bytes by construction, so there is
+            # nothing to hash; a resumed hard link is simply kept.
+            try:
+                linked = os.path.samefile(_io_path(source_file), _io_path(destination_file))
+            except OSError:
+                linked = False
+            if not linked:
+                _remove_failed_copy(destination_file)
+                linked = _link_file(source_file, destination_file)
+            if linked:
+                advance(os.path.getsize(_io_path(source_file)), f"Linking {source_file.name}", copied=False)
+                return None, None
+
+        if _same_file(source_file, destination_file):
+            # Resume reuse is still verified cryptographically. Size+mtime is
+            # only a fast copy-skip hint, never the final integrity decision.
+            digest = _sha256_file(source_file, cancel_event)
+            advance(os.path.getsize(_io_path(source_file)), f"Reusing {source_file.name}", copied=False)
+            return digest, None
+
+        source_stat = os.stat(_io_path(source_file))
         source_digest = hashlib.sha256()
+        offset = 0
+        last_chunk = b""
         with open(_io_path(source_file), "rb") as source_stream, open(
             _io_path(destination_file), "wb"
         ) as destination_stream:
             while True:
-                _raise_if_cancelled(cancel_event)
+                check()
                 chunk = source_stream.read(_COPY_CHUNK_BYTES)
                 if not chunk:
                     break
                 source_digest.update(chunk)
                 destination_stream.write(chunk)
-                copied_bytes += len(chunk)
-                if on_progress is not None:
-                    on_progress(
-                        "install:copy",
-                        copied_bytes,
-                        progress_total,
-                        f"Copying {source_file.name}",
-                    )
+                offset += len(last_chunk)
+                last_chunk = chunk
+                advance(len(chunk), f"Copying {source_file.name}", copied=True)
         shutil.copystat(_io_path(source_file), _io_path(destination_file))
-        expected_hashes[destination_file] = source_digest.hexdigest()
-
-    # Full copy verification protects files that are not part of source_hashes.json
-    # (for example files unchanged between Live and the target SPT release).
-    verify_total = max(len(files), 1)
-    for index, (source_file, destination_file, expected_size) in enumerate(files, 1):
-        _raise_if_cancelled(cancel_event)
+        digest = source_digest.hexdigest()
+        remember_sha256(_io_path(source_file), digest, source_stat)
+        return digest, (offset, hashlib.sha256(last_chunk).hexdigest())
+
+    def verify_file(
+        source_file: Path,
+        destination_file: Path,
+        expected_size: int,
+        expected_hash: str | None,
+        tail: tuple[int, str] | None = None,
+    ) -> None:
+        # Per-file verification protects files that are not part of
+        # source_hashes.json (for example files unchanged between Live and the
+        # target SPT release).
         relative = os.path.relpath(_io_path(source_file), source_root)
-
         if not os.path.isfile(_io_path(destination_file)):
             raise RuntimeError(f"Live game copy verification failed: missing {relative}")
         actual_size = os.path.getsize(_io_path(destination_file))
@@ -303,9 +508,20 @@ def copy_live_game(
                 "Live game copy verification failed: "
                 f"{relative} size changed (expected {expected_size}, found {actual_size})"
             )
-
+        if expected_hash is None:
+            return
+        if tail is not None:
+            offset, expected_tail = tail
+            with open(_io_path(destination_file), "rb") as stream:
+                stream.seek(offset)
+                actual_tail = hashlib.sha256(stream.read()).hexdigest()
+            if actual_tail != expected_tail:
+                _remove_failed_copy(destination_file)
+                raise RuntimeError(
+                    f"Live game copy verification failed: {relative} final block does not match"
+                )
+            return
         actual_hash = _sha256_file(destination_file, cancel_event)
-        expected_hash = expected_hashes[destination_file]
         if actual_hash != expected_hash:
             _remove_failed_copy(destination_file)
             raise RuntimeError(
@@ -313,13 +529,34 @@ def copy_live_game(
                 f"{relative} SHA-256 mismatch (expected {expected_hash}, found {actual_hash})"
             )
 
-        if on_progress is not None:
-            on_progress(
-                "install:copy",
-                index,
-                verify_total,
-                f"verified {index}/{len(files)} source files",
-            )
+    verified: dict[str, str] = {}
+
+    def run_unit(unit: list[tuple[Path, Path, int]]) -> None:
+        for source_file, destination_file, size in unit:
+            check()
+            expected_hash, tail = copy_file(source_file, destination_file)
+            check()
+            relative = Path(os.path.relpath(_io_path(source_file), source_root))
+            if full_verify is None or _relative_key(relative) in full_verify:
+                tail = None
+            verify_file(source_file, destination_file, size, expected_hash, tail)
+            if expected_hash is not None:
+                with progress_lock:
+                    verified[relative.as_posix()] = expected_hash
+
+    units = _copy_units(files)
+    if units:
+        max_workers = max(1, min(int(workers or DEFAULT_COPY_WORKERS), len(units), 32))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_unit, unit) for unit in units]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                abort.set()
+                for pending in futures:
+                    pending.cancel()
+                raise
 
     # A resume destination should mirror the current Live file set. Unexpected
     # files mean the destination was changed independently or came from a stale
@@ -352,5 +589,6 @@ def copy_live_game(
             "install:copy",
             1,
             1,
-            "Live game copy complete",
+            f"Live game copy complete ({rate():.0f} MB/s)",
         )
+    return verified
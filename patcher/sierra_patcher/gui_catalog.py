@@ -15,6 +15,7 @@ from .web_catalog import (
     CATALOG_PLACEHOLDER,
     CatalogRelease,
     fetch_release_catalog_details,
+    find_upgrade,
 )
 
 
@@ -143,7 +144,9 @@ class CatalogSierraPatcherGUI(IntegratedSierraPatcherGUI):
                 self._release_probe_loading.clear()
                 self._release_probe_checked.clear()
 
-                release_ids = tuple(release.id for release in releases)
+                # Upgrade packages are applied automatically when the chosen
+                # folder holds their from-release; never offer them directly.
+                release_ids = tuple(release.id for release in releases if not release.is_upgrade)
                 values = (tr(CATALOG_PLACEHOLDER), *release_ids)
                 self.i_web_release.configure(values=values)
                 self.i_web_release_var.set(tr(CATALOG_PLACEHOLDER))
@@ -216,6 +219,13 @@ class CatalogSierraPatcherGUI(IntegratedSierraPatcherGUI):
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _upgrade_release_for(self, installed_id: str | None, target_id: str):
+        return find_upgrade(
+            getattr(self, "_catalog_release_details", {}).values(),
+            installed_id,
+            target_id,
+        )
+
     def _selected_release_probe_loading(self) -> bool:
         release = self._selected_catalog_release()
         return bool(release and release.id in self._release_probe_loading)
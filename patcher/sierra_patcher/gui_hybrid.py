@@ -14,6 +14,7 @@ from .archived_snapshot import (
     read_archived_snapshot,
 )
 from .delete_list import finalize as _finalize_now
+from .flags import archive_verify_objects_first
 from .gui import _hide_console_on_windows, _safe_call
 from .gui_resilient import ResilientSierraPatcherGUI
 from .i18n import canonical_choice, tr
@@ -47,7 +48,7 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
         gui_web.finalize = self._defer_delete_finalize
         gui_web.apply_storage = self._apply_payloads_then_finalize
         self._pending_delete_finalize: tuple[str, str] | None = None
-        self._offline_source_config: tuple[str, str, int] | None = None
+        self._offline_source_config: tuple[str, str, int, str | None] | None = None
         self._archived_cleanup_pending = False
         self._archived_cleanup_package_id: str | None = None
         self._archived_cleanup_cache: Path | None = None
@@ -161,7 +162,25 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
         )
         self._archive_badge.grid(row=0, column=3, sticky="w", padx=(6, 0))
 
-        self.i_archive_path_var.trace_add("write", lambda *_: self._validate_install_ready())
+        # Multi-release snapshots share one objects/ tree; pick which to install.
+        self.i_archive_release_var = tk.StringVar()
+        ttk.Label(
+            self._archive_path_frame,
+            text=tr("Release"),
+            font=("Segoe UI", 9, "bold"),
+        ).grid(row=2, column=0, sticky="w", padx=(0, 8), pady=(6, 2))
+        self.i_archive_release = ttk.Combobox(
+            self._archive_path_frame,
+            textvariable=self.i_archive_release_var,
+            state="readonly",
+            values=(),
+        )
+        self.i_archive_release.grid(row=2, column=1, sticky="ew", pady=(6, 2))
+        self.i_archive_release.bind(
+            "<<ComboboxSelected>>", lambda _event: self._refresh_status()
+        )
+
+        self.i_archive_path_var.trace_add("write", lambda *_: self._archive_path_changed())
 
         local_marker = Path(WORKING_DIR) / ARCHIVED_SNAPSHOT_MARKER
         if local_marker.is_file():
@@ -175,12 +194,14 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
     def _selected_offline_source(self):
         config = self._offline_source_config
         if config is not None and config[0] == "Archived snapshot":
-            _, snapshot_path, workers = config
+            _, snapshot_path, workers, package_id = config
             cache_root = self._archived_cleanup_cache or (Path(WORKING_DIR) / "web_cache")
             return ArchivedSnapshotSource(
                 snapshot_path,
                 cache_root,
                 materialize_workers=workers,
+                verify_objects_first=archive_verify_objects_first(),
+                package_id=package_id,
             )
         return _RealLocalPackageSource()
 
@@ -189,6 +210,25 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
         if selected:
             self.i_archive_path_var.set(selected)
 
+    def _selected_archive_release(self) -> str | None:
+        if not hasattr(self, "i_archive_release_var"):
+            return None
+        return self.i_archive_release_var.get().strip() or None
+
+    def _archive_path_changed(self) -> None:
+        self._refresh_archive_releases()
+        self._validate_install_ready()
+
+    def _refresh_archive_releases(self) -> None:
+        try:
+            releases = read_archived_snapshot(self.i_archive_path_var.get().strip()).releases
+        except Exception:
+            releases = ()
+        current = self.i_archive_release_var.get().strip()
+        self.i_archive_release.configure(values=releases)
+        if current not in releases:
+            self.i_archive_release_var.set(releases[-1] if releases else "")
+
     def _snapshot_ready(self) -> bool:
         if not hasattr(self, "i_archive_path_var"):
             return False
@@ -196,7 +236,7 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
         if not value:
             return False
         try:
-            read_archived_snapshot(value)
+            read_archived_snapshot(value, self._selected_archive_release())
             return True
         except Exception:
             return False
@@ -289,7 +329,10 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
         ) != "Archived snapshot":
             return result
         try:
-            info = read_archived_snapshot(self.i_archive_path_var.get().strip())
+            info = read_archived_snapshot(
+                self.i_archive_path_var.get().strip(),
+                self._selected_archive_release(),
+            )
             manifest = json.loads(info.manifest_path.read_text(encoding="utf-8"))
             patch_count = sum(
                 1
@@ -358,6 +401,7 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
                     return
                 self._set_phase("Done")
                 self._log(f"[archive] ready: {info.root}")
+                self._log(f"[archive] releases in snapshot: {', '.join(info.releases)}")
                 _safe_call(
                     self,
                     messagebox.showinfo,
@@ -405,7 +449,10 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
                     tr("Select a valid Sierra Archived snapshot folder first."),
                 )
                 return
-            info = read_archived_snapshot(self.i_archive_path_var.get().strip())
+            info = read_archived_snapshot(
+                self.i_archive_path_var.get().strip(),
+                self._selected_archive_release(),
+            )
             cache_text = self.i_web_cache.get().strip()
             self._archived_cleanup_pending = True
             self._archived_cleanup_package_id = info.package_id
@@ -425,6 +472,7 @@ class HybridSierraPatcherGUI(ResilientSierraPatcherGUI):
                 "Archived snapshot",
                 self.i_archive_path_var.get().strip(),
                 materialize_workers,
+                info.package_id,
             )
         else:
             self._offline_source_config = None
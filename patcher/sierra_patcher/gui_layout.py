@@ -156,6 +156,12 @@ class LayoutSierraPatcherGUI(PolishedSierraPatcherGUI):
             foreground="#666",
         )
         self._live_source_detection_label.grid(row=0, column=2, sticky="w", padx=(8, 0))
+        self.i_link_copy_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self._live_source_frame,
+            text=tr("Link unchanged files instead of copying (same drive only)"),
+            variable=self.i_link_copy_var,
+        ).grid(row=1, column=0, columnspan=3, sticky="w", pady=(4, 0))
 
         # A placeholder is visual guidance only. Validation and installation
         # treat it exactly like an empty destination.
@@ -176,6 +182,10 @@ class LayoutSierraPatcherGUI(PolishedSierraPatcherGUI):
         mode = getattr(self, "i_install_mode_var", None)
         return bool(mode is not None and mode.get() == "auto")
 
+    def _link_copy_enabled(self) -> bool:
+        link = getattr(self, "i_link_copy_var", None)
+        return bool(self._automatic_copy_enabled() and link is not None and link.get())
+
     def _destination_placeholder(self) -> str:
         return (
             self._AUTO_DEST_PLACEHOLDER
@@ -12,9 +12,11 @@ from .i18n import canonical_choice, tr
 from .paths import WORKING_DIR
 from .repository_tools import (
     RepositoryToolError,
+    collect_garbage,
     list_releases,
     load_release_metadata,
     rebuild_catalog,
+    sync_repository_index,
     update_release_metadata,
     verify_release,
 )
@@ -152,7 +154,21 @@ class RepositorySierraPatcherGUI(HybridSierraPatcherGUI):
         )
         self.r_btn_catalog.grid(row=2, column=0, sticky="ew", padx=10, pady=4)
 
-        ttk.Separator(maintenance).grid(row=3, column=0, sticky="ew", padx=10, pady=10)
+        self.r_btn_gc = ttk.Button(
+            maintenance,
+            text=tr("Quarantine unreferenced objects..."),
+            command=self._repository_collect_garbage,
+        )
+        self.r_btn_gc.grid(row=3, column=0, sticky="ew", padx=10, pady=4)
+
+        self.r_btn_index = ttk.Button(
+            maintenance,
+            text=tr("Build/refresh local repository index"),
+            command=self._repository_sync_index,
+        )
+        self.r_btn_index.grid(row=4, column=0, sticky="ew", padx=10, pady=4)
+
+        ttk.Separator(maintenance).grid(row=5, column=0, sticky="ew", padx=10, pady=10)
         ttk.Label(
             maintenance,
             text=tr(
@@ -161,7 +177,7 @@ class RepositorySierraPatcherGUI(HybridSierraPatcherGUI):
             ),
             wraplength=330,
             foreground="#666",
-        ).grid(row=4, column=0, sticky="w", padx=10, pady=(0, 10))
+        ).grid(row=6, column=0, sticky="w", padx=10, pady=(0, 10))
 
         self.r_status_var = tk.StringVar(value=tr("Select a repository release."))
         ttk.Label(
@@ -358,7 +374,7 @@ class RepositorySierraPatcherGUI(HybridSierraPatcherGUI):
         self.r_status_var.set(
             tr(
                 "Updated {release} metadata. New object: {object_id}. "
-                "Upload that object and the updated release manifest to HFS; catalog.json is unchanged.",
+                "Upload that object and the updated release manifest.json/manifest.idx to HFS; catalog.json is unchanged.",
                 release=release,
                 object_id=object_id,
             )
@@ -450,6 +466,93 @@ class RepositorySierraPatcherGUI(HybridSierraPatcherGUI):
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _repository_sync_index(self) -> None:
+        root = self._repository_root()
+        self.r_btn_index.configure(state="disabled")
+        self.r_status_var.set(tr("Indexing local repository..."))
+
+        def finish() -> None:
+            self.r_btn_index.configure(state="normal")
+
+        def worker() -> None:
+            try:
+                refreshed = sync_repository_index(root)
+                message = tr(
+                    "Repository index is current; re-indexed {count} release(s). "
+                    "The index is local only and is not uploaded to HFS.",
+                    count=len(refreshed),
+                )
+                _safe_call(self, self.r_status_var.set, message)
+                self._log(f"[repository] index synced releases={len(refreshed)} root={root}")
+            except Exception as exc:
+                self._log(f"[repository] index sync failed: {exc}")
+                _safe_call(self, self.r_status_var.set, tr("Repository index failed: {error}", error=exc))
+            finally:
+                _safe_call(self, finish)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _repository_collect_garbage(self) -> None:
+        root = self._repository_root()
+        self.r_btn_gc.configure(state="disabled")
+        self.r_status_var.set(tr("Scanning repository for unreferenced objects..."))
+
+        def finish() -> None:
+            self.r_btn_gc.configure(state="normal")
+
+        def confirm_and_sweep(report) -> None:
+            mib = report.reclaimable_bytes / (1024 * 1024)
+            if not report.unreferenced_object_count and not report.abandoned_temp_count:
+                self.r_status_var.set(tr("No unreferenced objects found."))
+                finish()
+                return
+            if not messagebox.askyesno(
+                tr("Repository cleanup"),
+                tr(
+                    "{objects} object(s) are not referenced by any of {releases} release manifest(s), "
+                    "and {temps} abandoned temporary file(s) were found ({size:,.1f} MiB).\n\n"
+                    "Move them to the repository quarantine folder?",
+                    objects=report.unreferenced_object_count,
+                    releases=report.release_count,
+                    temps=report.abandoned_temp_count,
+                    size=mib,
+                ),
+            ):
+                self.r_status_var.set(tr("Repository cleanup cancelled."))
+                finish()
+                return
+            threading.Thread(target=sweep, daemon=True).start()
+
+        def scan() -> None:
+            try:
+                report = collect_garbage(root, dry_run=True)
+            except Exception as exc:
+                self._log(f"[repository] cleanup scan failed: {exc}")
+                _safe_call(self, self.r_status_var.set, tr("Repository cleanup failed: {error}", error=exc))
+                _safe_call(self, finish)
+                return
+            _safe_call(self, confirm_and_sweep, report)
+
+        def sweep() -> None:
+            try:
+                report = collect_garbage(root, dry_run=False, quarantine=True)
+                message = tr(
+                    "Moved {objects} object(s) and {temps} temporary file(s) to {path}.",
+                    objects=report.unreferenced_object_count,
+                    temps=report.abandoned_temp_count,
+                    path=report.quarantine_root,
+                )
+                _safe_call(self, self.r_status_var.set, message)
+                self._log(f"[repository] {message}")
+            except Exception as exc:
+                self._log(f"[repository] cleanup failed: {exc}")
+                _safe_call(self, self.r_status_var.set, tr("Repository cleanup failed: {error}", error=exc))
+                _safe_call(self, messagebox.showerror, tr("Repository cleanup"), str(exc))
+            finally:
+                _safe_call(self, finish)
+
+        threading.Thread(target=scan, daemon=True).start()
+
 
 def main(dev: bool = False):
     _hide_console_on_windows()
@@ -39,6 +39,7 @@ class ResilientSierraPatcherGUI(LayoutSierraPatcherGUI):
         dest_dir: Path,
         patch_root: Path,
         cancel_event=None,
+        reference: str | None = None,
     ):
         relative = patch_file.relative_to(patch_root).with_suffix("")
         destination_file = Path(dest_dir) / relative
@@ -60,6 +61,7 @@ class ResilientSierraPatcherGUI(LayoutSierraPatcherGUI):
             Path(dest_dir),
             Path(patch_root),
             cancel_event,
+            reference,
         )
 
     def _apply_patches_for_gui(self, *args, **kwargs):
@@ -11,9 +11,15 @@ from tkinter import filedialog, messagebox, ttk
 
 from . import proc
 from .delete_list import build_delete_list, finalize
-from .game_copy import copy_live_game
+from .game_copy import copy_live_game, package_touched_paths
 from .gui import SierraPatcherGUI, _hide_console_on_windows, _safe_call
 from .i18n import canonical_choice, localized_choices, tr, tr_progress
+from .install_receipt import (
+    clear_install_receipt,
+    read_install_receipt,
+    register_install,
+    write_install_receipt,
+)
 from .metadata import Meta, stamp_from_game_exe
 from .package_source import LocalPackageSource, WebPackageSource
 from .patch_audit import audit_patch_files
@@ -28,6 +34,7 @@ from .paths import (
 )
 from .prereqs import missing_requirements_for_metadata
 from .registry import exe_version, query_install
+from .sibling_install import reuse_sibling_install
 from .storage import apply_storage, pack_additional
 from .system import check_resources, optimal_threads
 from .utils import copy_self_to_output, folder_size, rename_output_folder, summarize_integrity_list
@@ -124,6 +131,9 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
             "web:publish": "Publishing web package",
             "archive:objects": "Verifying archived objects",
             "archive:resume": "Resuming archived snapshot",
+            "archive:seed": "Reusing cached download files",
+            "install:sibling": "Reusing installed release",
+            "repair:apply": "Rebuilding changed files",
             "install:copy": "Copying Live game",
         }
         lock = threading.Lock()
@@ -695,6 +705,67 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _link_copy_enabled(self) -> bool:
+        """Whether Automatic Copy may link files the package never touches."""
+        return False
+
+    def _copy_link_options(self, storage_root) -> dict:
+        if not self._link_copy_enabled():
+            return {}
+        return {
+            "link_unchanged": True,
+            "modified_paths": package_touched_paths(storage_root),
+        }
+
+    def _reuse_sibling_install(self, source, storage_root, destination, workers) -> bool:
+        """Build the new folder from another install of this release, if any."""
+
+        try:
+            meta = Meta.read(storage_root)
+        except Exception:
+            return False
+        package_id = getattr(meta, "upgrade_to", None) or getattr(source, "package_id", None)
+        if not package_id and getattr(source, "snapshot_root", None) is not None:
+            from .archived_snapshot import read_archived_snapshot
+
+            package_id = read_archived_snapshot(source.snapshot_root).package_id
+        if not package_id:
+            return False
+
+        installation = query_install()
+        reused = reuse_sibling_install(
+            source,
+            storage_root,
+            destination,
+            package_id,
+            live_root=installation["install_path"] if installation else None,
+            workers=workers,
+            on_progress=self._web_progress_callback(),
+            cancel_event=self._cancel,
+            log=self._log,
+        )
+        if reused is None:
+            return False
+        write_install_receipt(destination, package_id, live_version=meta.version or None)
+        register_install(destination)
+        self._set_phase("Done")
+        self._log(f"[install] done from sibling install {reused.sibling}")
+        _safe_call(
+            self,
+            messagebox.showinfo,
+            tr("Install"),
+            tr("Patch applied successfully."),
+        )
+        return True
+
+    def _upgrade_release_for(self, installed_id: str | None, target_id: str):
+        """Return a catalog upgrade package from ``installed_id`` to ``target_id``.
+
+        The plain integrated GUI has no catalog details; the catalog GUI fills
+        this in once catalog.json has been loaded.
+        """
+        return None
+
     def _run_install(self):
         if getattr(self, "_install_running", False):
             self._log("[install] duplicate start ignored: installation already running")
@@ -760,45 +831,73 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
         def worker():
             try:
                 self._log(f"[install] start source={source_mode}")
+                automatic_copy_reader = getattr(self, "_automatic_copy_enabled", None)
+                automatic_copy = bool(
+                    automatic_copy_reader()
+                    if callable(automatic_copy_reader)
+                    else False
+                )
                 if source_mode == "Web release":
-                    source = WebPackageSource(
+                    package_id = release_id
+                    # An existing install of an older release can take a small
+                    # upgrade package instead of a full re-patch.
+                    receipt = None if automatic_copy else read_install_receipt(destination)
+                    upgrade = self._upgrade_release_for(
+                        receipt.package_id if receipt else None,
                         release_id,
+                    )
+                    if upgrade is not None:
+                        package_id = upgrade.id
+                        self._log(
+                            f"[install] {receipt.package_id} is installed; "
+                            f"using upgrade package {package_id}"
+                        )
+                    source = WebPackageSource(
+                        package_id,
                         cache_root,
                         download_workers=download_workers,
                         materialize_workers=materialize_workers,
                     )
-
-                    # Check the destination before committing to the download.
-                    # storage/ is roughly 1/5000th of a release but carries
-                    # source_hashes.json, so a wrong folder is rejected in
-                    # seconds instead of after several GB have been fetched.
-                    verify = getattr(self, "_verify_source_files", None)
-                    if verify is not None:
-                        self._set_phase("Checking your Tarkov copy")
-                        storage_root = source.prepare_storage(
-                            on_progress=self._web_progress_callback(),
-                            cancel_event=self._cancel,
-                        )
-                        if not verify(
-                            storage_root,
-                            destination,
-                            patch_workers,
-                            self._cancel,
-                        ):
-                            self._log("[install] stopped before download: source files mismatch")
-                            return
-                        if self._cancel.is_set():
-                            return
-
-                    layout = source.prepare(
-                        on_progress=self._web_progress_callback(),
-                        cancel_event=self._cancel,
-                    )
                 else:
-                    layout = LocalPackageSource().prepare(
+                    source = LocalPackageSource()
+
+                # Check the destination before committing to the download (or,
+                # for an Archived snapshot, to reading the whole archive).
+                # storage/ is roughly 1/5000th of a release but carries
+                # source_hashes.json, so a wrong folder is rejected in seconds
+                # instead of after several GB have been fetched or verified.
+                verify = getattr(self, "_verify_source_files", None)
+                prepare_storage = getattr(source, "prepare_storage", None)
+                if verify is not None and prepare_storage is not None:
+                    self._set_phase("Checking your Tarkov copy")
+                    storage_root = prepare_storage(
                         on_progress=self._web_progress_callback(),
                         cancel_event=self._cancel,
                     )
+                    # A new folder for a release that is already installed
+                    # elsewhere is linked from that install instead.
+                    if automatic_copy and self._reuse_sibling_install(
+                        source, storage_root, destination, patch_workers
+                    ):
+                        return
+                    if not verify(
+                        storage_root,
+                        destination,
+                        patch_workers,
+                        self._cancel,
+                    ):
+                        self._log(
+                            "[install] stopped before the full package was prepared: "
+                            "source files mismatch"
+                        )
+                        return
+                    if self._cancel.is_set():
+                        return
+
+                layout = source.prepare(
+                    on_progress=self._web_progress_callback(),
+                    cancel_event=self._cancel,
+                )
 
                 if self._cancel.is_set():
                     return
@@ -811,12 +910,6 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
                     self._log("[install] stopped for missing dependencies")
                     return
 
-                automatic_copy_reader = getattr(self, "_automatic_copy_enabled", None)
-                automatic_copy = bool(
-                    automatic_copy_reader()
-                    if callable(automatic_copy_reader)
-                    else False
-                )
                 installation = query_install()
                 if automatic_copy and not installation:
                     raise RuntimeError("Tarkov installation not found (registry)")
@@ -851,6 +944,7 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
                         source_version=None if live_version == "-" else live_version,
                         on_progress=self._web_progress_callback(),
                         cancel_event=self._cancel,
+                        **self._copy_link_options(layout.storage_root),
                     )
                     self._log("[copy] Live game copy completed")
                     _safe_call(self, self._refresh_status)
@@ -884,6 +978,9 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
                         )
                         return
 
+                # From here on the folder no longer holds the release its
+                # receipt names; a new receipt is written only on success.
+                clear_install_receipt(destination)
                 total_patches = count_patch_files(layout.patch_root)
                 self._reset_prog(max(total_patches, 1), "Applying patches")
                 total, succeeded, failed = apply_all_patches(
@@ -915,6 +1012,14 @@ class IntegratedSierraPatcherGUI(SierraPatcherGUI):
                 if failed:
                     raise RuntimeError(f"Some patches failed ({failed}/{total})")
 
+                installed_id = getattr(meta, "upgrade_to", None) or layout.package_id
+                if installed_id:
+                    write_install_receipt(
+                        destination,
+                        installed_id,
+                        live_version=meta.version or None,
+                    )
+                    register_install(destination)
                 self._set_phase("Done")
                 self._log(f"[install] done applied={succeeded}/{total}")
                 _safe_call(
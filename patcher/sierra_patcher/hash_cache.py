@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable
+
+
+# Persistent SHA-256 memo shared by the Live copy, the install source
+# preflight and the generator. A row is only trusted while the file's
+# identity (volume + file id) and its size, mtime and ctime are unchanged;
+# any write, rename-over or restore produces a different key and a re-hash.
+HASH_CACHE_NAME = "hash_cache.sqlite"
+FORCE_REHASH_ENV = "SIERRA_FORCE_REHASH"
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (device, inode)
+);
+"""
+
+
+def _stat_key(stat: os.stat_result) -> tuple[int, int, int, int, int] | None:
+    # Some network and FAT volumes report no stable file id; never cache those.
+    if not stat.st_ino:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+
+
+class HashCache:
+    """SQLite-backed SHA-256 cache keyed by file identity and timestamps."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, _SCHEMA_VERSION):
+                raise sqlite3.DatabaseError(f"unsupported hash cache version: {version}")
+            with self._db:
+                self._db.executescript(_SCHEMA)
+                self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        except Exception:
+            self._db.close()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> HashCache:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def lookup(self, path: str | os.PathLike, stat: os.stat_result | None = None) -> str | None:
+        """Return the cached digest if ``path`` is unchanged since it was recorded."""
+        try:
+            key = _stat_key(stat if stat is not None else os.stat(path))
+        except OSError:
+            return None
+        if key is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, ctime_ns, sha256 FROM hashes WHERE device = ? AND inode = ?",
+                key[:2],
+            ).fetchone()
+        if row is None or tuple(row[:3]) != key[2:]:
+            return None
+        return row[3]
+
+    def store(self, path: str | os.PathLike, sha256: str, before: os.stat_result) -> None:
+        """Record ``sha256`` for ``path`` if it still matches the stat taken before hashing."""
+        try:
+            after = os.stat(path)
+        except OSError:
+            return
+        key = _stat_key(before)
+        if key is None or key != _stat_key(after):
+            return
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, sha256.lower()),
+            )
+
+
+_cache: HashCache | None = None
+_cache_lock = threading.Lock()
+_force_rehash = False
+
+
+def enable_hash_cache(path: str | Path | None = None) -> HashCache | None:
+    """Open the process-wide cache; failures leave hashing uncached."""
+
+    global _cache
+    if path is None:
+        from .paths import WORKING_DIR
+
+        path = Path(WORKING_DIR) / HASH_CACHE_NAME
+    with _cache_lock:
+        if _cache is not None and _cache.path == Path(path):
+            return _cache
+        previous, _cache = _cache, None
+        if previous is not None:
+            previous.close()
+        try:
+            _cache = HashCache(path)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"hash cache unavailable ({exc}); files will be hashed in full")
+        return _cache
+
+
+def disable_hash_cache() -> None:
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, None
+    if previous is not None:
+        previous.close()
+
+
+def set_force_rehash(enabled: bool) -> None:
+    """Ignore cached digests (but still refresh them) for the rest of the process."""
+    global _force_rehash
+    _force_rehash = bool(enabled)
+
+
+def force_rehash() -> bool:
+    return _force_rehash or os.environ.get(FORCE_REHASH_ENV, "").strip() not in ("", "0")
+
+
+def known_sha256(path: str | os.PathLike) -> str | None:
+    """Return a still-valid cached digest without hashing anything."""
+    cache = _cache
+    if cache is None or force_rehash():
+        return None
+    try:
+        return cache.lookup(path)
+    except sqlite3.Error:
+        return None
+
+
+def cached_sha256(path: str | os.PathLike, compute: Callable[[], str]) -> str:
+    """Return the digest of ``path``, calling ``compute`` only on a cache miss."""
+    cache = _cache
+    if cache is None:
+        return compute()
+    before = os.stat(path)
+    if not force_rehash():
+        try:
+            cached = cache.lookup(path, before)
+        except sqlite3.Error:
+            cached = None
+        if cached is not None:
+            return cached
+    digest = compute()
+    remember_sha256(path, digest, before)
+    return digest
+
+
+def remember_sha256(path: str | os.PathLike, sha256: str, before: os.stat_result) -> None:
+    """Record a digest computed as a side effect, e.g. while copying a file."""
+    cache = _cache
+    if cache is None:
+        return
+    try:
+        cache.store(path, sha256, before)
+    except sqlite3.Error:
+        pass
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import filecmp
+import hashlib
+import json
 import os
 import shutil
 import subprocess
@@ -8,11 +10,15 @@ import tempfile
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 
+from .compression_policy import decide, zstd_level
+from .delta_references import ReferenceFinder, SourceIndex, write_delta_references
+from .game_copy import _clone_file
 from .hygiene import format_size, is_package_excluded
 from .paths import ZSTD_EXE
 from .proc import Cancelled, run_quiet
+from .source_integrity import _safe_relative_path, _sha256_file
 from .zstd_patch import (
     _called_process_detail,
     _decode_zstd_args,
@@ -29,6 +35,42 @@ FULL_PROBE_RAW_RATIO = 0.85
 GENERAL_DELTA_MAX_RATIO = 0.95
 DEFAULT_PAYLOAD_WORKERS = min(8, max(2, os.cpu_count() or 4))
 _STAGED_PAYLOAD_SUFFIX = ".payload.zst"
+GENERATION_REPORT_NAME = "generation_report.json"
+GENERATION_REPORT_FORMAT_VERSION = 1
+
+# Full/add payloads up to SOLID_MEMBER_LIMIT are not shipped as one .zst per
+# file. Generation stages them raw and finalization concatenates them into
+# solid archives under payloads/.sierra-solid/ (raw stream compressed as one
+# zstd frame, members located through index.json), so thousands of tiny
+# configs and locales share one dictionary window and install with one zstd
+# process per archive instead of one per file.
+SOLID_DIR = ".sierra-solid"
+SOLID_INDEX_NAME = "index.json"
+SOLID_FORMAT_VERSION = 1
+SOLID_MEMBER_LIMIT = 256 * 1024
+SOLID_ARCHIVE_BYTES = 64 * 1024 * 1024
+_SOLID_STAGED_SUFFIX = ".solid"
+_SOLID_ZSTD_ARGS = ["-19", "--long=31"]
+_SOLID_COPY_BYTES = 1024 * 1024
+
+# A zstd dictionary trained on the solid members at generation time and
+# shipped in storage/. Small configs and locales repeat the same keys and
+# boilerplate, which a dictionary primes before the first byte of each
+# archive. Every archive is compressed with and without it and the smaller
+# frame is kept, so a dictionary that does not pay off costs nothing.
+PAYLOAD_DICTIONARY_NAME = "payloads.dict"
+PAYLOAD_DICTIONARY_MAX_BYTES = 112640
+PAYLOAD_DICTIONARY_MIN_SAMPLES = 16
+
+# Payload targets whose bytes also appear at other target paths ship once;
+# storage/payload_fanout.json lists the other paths and the installer copies
+# the decoded file there. Each copy must stay independent of its leader:
+# mods and users edit plugins and configs in place, and a hard link would
+# carry such an edit to every copy. Large copies are reflinked where the
+# volume supports it and written out in full everywhere else.
+PAYLOAD_FANOUT_FILENAME = "payload_fanout.json"
+PAYLOAD_FANOUT_FORMAT_VERSION = 1
+_FANOUT_CLONE_MIN_BYTES = 1024 * 1024
 
 
 def _raise_if_cancelled(cancel_event) -> None:
@@ -167,6 +209,142 @@ def _prefer_delta(target_size: int, delta_size: int, full_size: int) -> bool:
     return delta_size <= int(full_size * GENERAL_DELTA_MAX_RATIO)
 
 
+def _stage_solid_member(target_file: str | Path, payload_stage_root: str, rel: str) -> None:
+    staged = Path(payload_stage_root) / (rel + _SOLID_STAGED_SUFFIX)
+    os.makedirs(_python_io_path(staged.parent), exist_ok=True)
+    shutil.copyfile(_python_io_path(target_file), _python_io_path(staged))
+
+
+def _decision_record(rel: str, decision, full_probe: str | None) -> dict:
+    return {
+        "path": Path(rel).as_posix(),
+        "class": decision.file_class,
+        "sample_ratio": decision.sample_ratio,
+        "level": decision.level,
+        "full_probe": full_probe,
+    }
+
+
+def _write_generation_report(path: Path, data: dict) -> None:
+    temp = path.with_name(path.name + ".tmp")
+    try:
+        temp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(_python_io_path(temp), _python_io_path(path))
+    finally:
+        _remove(temp)
+
+
+def _duplicate_groups(
+    files: list[str],
+    source_root: str,
+    dest_root: str,
+    cancel_event=None,
+) -> list[list[str]]:
+    """Groups of target files with identical contents, leader first.
+
+    Only files sharing a size with another file are hashed. The leader is a
+    path with no Live file where possible, since those become payloads.
+    """
+
+    by_size: dict[int, list[str]] = {}
+    for path in files:
+        size = os.path.getsize(_python_io_path(path))
+        if size:
+            by_size.setdefault(size, []).append(path)
+    groups = []
+    for candidates in by_size.values():
+        if len(candidates) < 2:
+            continue
+        by_digest: dict[str, list[str]] = {}
+        for path in candidates:
+            by_digest.setdefault(_sha256_file(path, cancel_event), []).append(path)
+        for group in by_digest.values():
+            if len(group) > 1:
+                group.sort(
+                    key=lambda path: (
+                        os.path.exists(os.path.join(source_root, os.path.relpath(path, dest_root))),
+                        os.path.relpath(path, dest_root),
+                    )
+                )
+                groups.append(group)
+    groups.sort(key=lambda group: group[0])
+    return groups
+
+
+def write_payload_fanout(storage_root: str | Path, fanout: dict[str, list[str]]) -> None:
+    """Write leader -> copies; an empty map removes the file."""
+
+    output = Path(storage_root) / PAYLOAD_FANOUT_FILENAME
+    if not fanout:
+        _remove(output)
+        return
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temp = output.with_name(output.name + ".tmp")
+    try:
+        temp.write_text(
+            json.dumps(
+                {
+                    "format_version": PAYLOAD_FANOUT_FORMAT_VERSION,
+                    "files": [
+                        {"path": leader, "copies": sorted(fanout[leader])} for leader in sorted(fanout)
+                    ],
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(_python_io_path(temp), _python_io_path(output))
+    finally:
+        _remove(temp)
+    print(f"payload fan-out: {sum(len(copies) for copies in fanout.values())} duplicate file(s) ship once")
+
+
+def load_payload_fanout(storage_root: str | Path) -> dict[str, list[str]]:
+    """Leader path -> paths that receive a copy; empty for packages without any."""
+
+    manifest_path = Path(storage_root) / PAYLOAD_FANOUT_FILENAME
+    if not os.path.isfile(_python_io_path(manifest_path)):
+        return {}
+    try:
+        data = json.loads(Path(_python_io_path(manifest_path)).read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise RuntimeError("payload fan-out manifest is not valid JSON") from exc
+    if not isinstance(data, dict):
+        raise RuntimeError("payload fan-out manifest must be a JSON object")
+    if data.get("format_version") != PAYLOAD_FANOUT_FORMAT_VERSION:
+        raise RuntimeError(f"unsupported payload fan-out manifest version: {data.get('format_version')!r}")
+    fanout = {}
+    for item in data.get("files") or []:
+        if not isinstance(item, dict) or not isinstance(item.get("copies"), list):
+            raise RuntimeError("payload fan-out manifest contains an invalid entry")
+        leader = _safe_relative_path(str(item.get("path", ""))).as_posix()
+        fanout[leader] = [_safe_relative_path(str(copy)).as_posix() for copy in item["copies"]]
+    return fanout
+
+
+def payload_fanout_sources(storage_root: str | Path) -> dict[str, str]:
+    """Copy path -> the leader path its bytes come from."""
+
+    return {
+        copy: leader for leader, copies in load_payload_fanout(storage_root).items() for copy in copies
+    }
+
+
+def _fan_out_copy(source: Path, destination: Path, cancel_event=None) -> None:
+    _raise_if_cancelled(cancel_event)
+    os.makedirs(_python_io_path(destination.parent), exist_ok=True)
+    staged = destination.with_name(destination.name + ".sierra-fanout")
+    _remove(staged)
+    try:
+        size = os.path.getsize(_python_io_path(source))
+        if not (size >= _FANOUT_CLONE_MIN_BYTES and _clone_file(source, staged)):
+            shutil.copyfile(_python_io_path(source), _python_io_path(staged))
+        os.replace(_python_io_path(staged), _python_io_path(destination))
+    finally:
+        _remove(staged)
+
+
 def _process_target_file(
     source_root: str,
     target_root: str,
@@ -175,10 +353,19 @@ def _process_target_file(
     payload_stage_root: str,
     zstd_args: list[str],
     cancel_event=None,
-) -> tuple[str, int, int]:
+    references: ReferenceFinder | None = None,
+) -> tuple[str, int, int, dict | None]:
+    """Package one target file.
+
+    Returns ``(kind, packed_bytes, target_bytes, decision)``; ``decision`` is
+    the compression-policy record for the generation report, or ``None`` when
+    nothing was compressed. A delta made against a Live file at another path
+    has that path in the record's ``reference``.
+    """
+
     _raise_if_cancelled(cancel_event)
     if is_package_excluded(target_file, target_root):
-        return "excluded", 0, 0
+        return "excluded", 0, 0, None
 
     rel = os.path.relpath(target_file, target_root)
     source_file = os.path.join(source_root, rel)
@@ -196,30 +383,49 @@ def _process_target_file(
     try:
         target_for_zstd = _stage_external_input(target_file, stage_dir, "target.bin")
 
+        reference = None
         if not os.path.exists(_python_io_path(source_file)):
+            if target_size <= SOLID_MEMBER_LIMIT:
+                # Solid archives already pack these well, and a per-file
+                # patch would cost the install a zstd run per file again.
+                _stage_solid_member(target_file, payload_stage_root, rel)
+                return "additional", target_size, target_size, None
+            if references is not None:
+                reference = references.find(rel, target_file)
+        if reference is not None:
+            source_file = os.path.join(source_root, reference.path)
+        elif not os.path.exists(_python_io_path(source_file)):
+            decision = decide(target_file, zstd_args)
             _compress_full(
                 target_for_zstd,
                 full_tmp,
-                zstd_args=zstd_args,
+                zstd_args=decision.zstd_args,
                 cancel_event=cancel_event,
             )
             os.makedirs(_python_io_path(payload_file.parent), exist_ok=True)
             _replace_file(full_tmp, payload_file)
-            return "additional", os.path.getsize(_python_io_path(payload_file)), target_size
-
-        if filecmp.cmp(
+            return (
+                "additional",
+                os.path.getsize(_python_io_path(payload_file)),
+                target_size,
+                _decision_record(rel, decision, None),
+            )
+        elif filecmp.cmp(
             _python_io_path(source_file),
             _python_io_path(target_file),
             shallow=False,
         ):
-            return "identical", 0, target_size
+            return "identical", 0, target_size, None
 
+        decision = decide(target_file, zstd_args)
         source_for_zstd = _stage_external_input(source_file, stage_dir, "source.bin")
         _generate_delta(
             source_for_zstd,
             target_for_zstd,
             delta_tmp,
             verify_tmp,
+            # The class cap is for compressing the target alone; a delta
+            # against the source still pays for the configured preset.
             zstd_args=zstd_args,
             cancel_event=cancel_event,
         )
@@ -229,27 +435,295 @@ def _process_target_file(
             target_size <= SMALL_FILE_LIMIT
             or delta_size >= int(max(target_size, 1) * FULL_PROBE_RAW_RATIO)
         )
+        full_probe = "not-needed"
+        if should_probe_full:
+            # Heuristic: when the delta already wins against the smallest
+            # full size the sample suggests, the full candidate is unlikely
+            # to change the outcome. There is no floor when the sample
+            # covers too little of the file to suggest one.
+            floor = decision.full_size_floor(target_size)
+            if floor is not None and _prefer_delta(target_size, delta_size, floor):
+                should_probe_full = False
+                full_probe = "skipped"
+            else:
+                full_probe = "ran"
 
         if should_probe_full:
             _compress_full(
                 target_for_zstd,
                 full_tmp,
-                zstd_args=zstd_args,
+                zstd_args=decision.zstd_args,
                 cancel_event=cancel_event,
             )
             full_size = full_tmp.stat().st_size
             if not _prefer_delta(target_size, delta_size, full_size):
+                record = _decision_record(rel, decision, full_probe)
+                kind = "additional" if reference is not None else "full"
+                if target_size <= SOLID_MEMBER_LIMIT:
+                    _stage_solid_member(target_file, payload_stage_root, rel)
+                    return kind, full_size, target_size, record
                 os.makedirs(_python_io_path(payload_file.parent), exist_ok=True)
                 _replace_file(full_tmp, payload_file)
-                return "full", os.path.getsize(_python_io_path(payload_file)), target_size
+                return kind, os.path.getsize(_python_io_path(payload_file)), target_size, record
 
+        record = _decision_record(rel, decision, full_probe)
+        if reference is not None:
+            record.update(reference=reference.path, match=reference.match)
         os.makedirs(_python_io_path(patch_file.parent), exist_ok=True)
         _replace_file(delta_tmp, patch_file)
-        return "delta", os.path.getsize(_python_io_path(patch_file)), target_size
+        return "delta", os.path.getsize(_python_io_path(patch_file)), target_size, record
     finally:
         shutil.rmtree(stage_dir, ignore_errors=True)
 
 
+class _TargetRun:
+    """Files, statistics and manifests of one target of a generation run."""
+
+    def __init__(
+        self,
+        source_root: str,
+        dest_root: str,
+        out_root: str,
+        missing_root: str,
+        index: SourceIndex | None,
+        cancel_event=None,
+    ) -> None:
+        """``index`` is ``None`` when the files are processed elsewhere."""
+
+        self.source_root = source_root
+        self.dest_root = dest_root
+        self.out_root = out_root
+        self.missing_root = missing_root
+
+        shutil.rmtree(_python_io_path(out_root), ignore_errors=True)
+        shutil.rmtree(_python_io_path(missing_root), ignore_errors=True)
+        os.makedirs(_python_io_path(out_root), exist_ok=True)
+        os.makedirs(_python_io_path(missing_root), exist_ok=True)
+
+        self.files: list[str] = []
+        excluded = 0
+        for root, _, names in os.walk(dest_root):
+            for name in names:
+                path = os.path.join(root, name)
+                if is_package_excluded(path, dest_root):
+                    excluded += 1
+                else:
+                    self.files.append(path)
+
+        self.stats = {
+            "delta": 0,
+            "full": 0,
+            "additional": 0,
+            "identical": 0,
+            "fanout": 0,
+            "excluded": excluded,
+        }
+        self.bytes_by_kind = {"delta": 0, "full": 0, "additional": 0}
+        self.target_bytes_by_kind = {"delta": 0, "full": 0, "additional": 0}
+        self.decisions: list[dict] = []
+        self.kinds: dict[str, str] = {}
+        self.references = (
+            ReferenceFinder(source_root, dest_root, cancel_event, index=index) if index is not None else None
+        )
+
+        # Identical target contents at several paths are packaged once. The
+        # leader of each group is processed like any file; if it became a
+        # payload, the others are recorded in payload_fanout.json and the
+        # installer copies the decoded leader to them. Otherwise (the leader
+        # was a delta or unchanged) they are processed normally afterwards.
+        self.groups = _duplicate_groups(self.files, source_root, dest_root, cancel_event)
+        self._followers = {path for group in self.groups for path in group[1:]}
+        self.fanout: dict[str, list[str]] = {}
+
+    def relative(self, path: str) -> str:
+        return os.path.relpath(path, self.dest_root)
+
+    def first_pass(self) -> list[str]:
+        return [path for path in self.files if path not in self._followers]
+
+    def record(self, path: str, kind: str, packed_bytes: int, target_bytes: int, decision: dict | None) -> None:
+        self.kinds[path] = kind
+        if kind in self.stats:
+            self.stats[kind] += 1
+        if kind in self.bytes_by_kind:
+            self.bytes_by_kind[kind] += packed_bytes
+            self.target_bytes_by_kind[kind] += target_bytes
+        if decision is not None:
+            self.decisions.append({**decision, "kind": kind})
+
+    def resolve_fanout(self, settled) -> list[str]:
+        """Settle the copies of payload leaders; return the files still to process.
+
+        ``settled(kind)`` is called once per copy that needs no processing.
+        """
+
+        remaining: list[str] = []
+        for leader, *copies in self.groups:
+            if self.kinds.get(leader) not in ("full", "additional"):
+                remaining.extend(copies)
+                continue
+            for path in copies:
+                rel = self.relative(path)
+                live = os.path.join(self.source_root, rel)
+                if os.path.isfile(_python_io_path(live)) and filecmp.cmp(
+                    _python_io_path(live), _python_io_path(path), shallow=False
+                ):
+                    self.stats["identical"] += 1
+                    settled("identical")
+                    continue
+                self.fanout.setdefault(Path(self.relative(leader)).as_posix(), []).append(Path(rel).as_posix())
+                self.stats["fanout"] += 1
+                settled("fanout")
+        return remaining
+
+    def finish(self, args: list[str]) -> None:
+        """Write this target's manifests and generation report."""
+
+        stats = self.stats
+        bytes_by_kind = self.bytes_by_kind
+        target_bytes_by_kind = self.target_bytes_by_kind
+        storage_root = Path(self.out_root).parent / "storage"
+        write_payload_fanout(storage_root, self.fanout)
+
+        packed_total = sum(bytes_by_kind.values())
+        raw_total = sum(target_bytes_by_kind.values())
+        print(
+            "hybrid generation summary: "
+            f"delta={stats['delta']}, full={stats['full']}, additional={stats['additional']}, "
+            f"identical={stats['identical']}, fanout={stats['fanout']}, "
+            f"hygiene_skipped={stats['excluded']}"
+        )
+        print(
+            "hybrid payload sizes: "
+            f"delta={format_size(bytes_by_kind['delta'])}, "
+            f"full={format_size(bytes_by_kind['full'])}, "
+            f"additional={format_size(bytes_by_kind['additional'])}, "
+            f"packed_total={format_size(packed_total)}, target_bytes={format_size(raw_total)}"
+        )
+
+        decisions = sorted(self.decisions, key=lambda item: item["path"])
+        moved = {item["path"]: item["reference"] for item in decisions if "reference" in item}
+        write_delta_references(storage_root, moved)
+        if moved:
+            print(f"cross-path deltas: {len(moved)} new or moved file(s) patched from another Live path")
+        classes: dict[str, int] = {}
+        for item in decisions:
+            classes[item["class"]] = classes.get(item["class"], 0) + 1
+        skipped = sum(1 for item in decisions if item["full_probe"] == "skipped")
+        lowered = sum(1 for item in decisions if item["level"] != zstd_level(args))
+        report_path = Path(self.out_root).parent / GENERATION_REPORT_NAME
+        _write_generation_report(
+            report_path,
+            {
+                "format_version": GENERATION_REPORT_FORMAT_VERSION,
+                "zstd_args": args,
+                "summary": {
+                    **stats,
+                    "packed_bytes": bytes_by_kind,
+                    "target_bytes": target_bytes_by_kind,
+                    "files_by_class": dict(sorted(classes.items())),
+                    "full_probes_skipped": skipped,
+                    "cross_path_deltas": len(moved),
+                },
+                "files": decisions,
+            },
+        )
+        print(
+            f"compression policy: {skipped} full-file probe(s) skipped, "
+            f"{lowered} full candidate(s) at a lower level; "
+            f"decisions in {report_path}"
+        )
+
+
+def generate_release_set(
+    source_root: str,
+    targets: list[tuple[str, str, str]],
+    workers: int = 8,
+    on_progress=None,
+    cancel_event=None,
+    zstd_args: list[str] | None = None,
+) -> list[int]:
+    """Generate one hybrid package per ``(dest_root, out_root, missing_root)``.
+
+    Every target is made against the same Live tree, which is walked once;
+    reference lookups share its digests and sketches. The files of all
+    targets go through one worker pool in relative-path order, so the
+    deltas that read the same Live file run back to back while it is still
+    in the page cache. Returns the number of files of each target.
+    """
+
+    args = _normalize_args(zstd_args)
+    index = SourceIndex(source_root, cancel_event)
+    runs = [
+        _TargetRun(source_root, dest_root, out_root, missing_root, index, cancel_event)
+        for dest_root, out_root, missing_root in targets
+    ]
+    total = sum(len(run.files) for run in runs)
+    completed = 0
+    lock = threading.Lock()
+    max_workers = max(1, min(int(workers), 64))
+
+    def report_progress(kind: str) -> None:
+        if on_progress:
+            on_progress(
+                "generate:patch",
+                completed,
+                total,
+                f"processed {completed}/{total} ({kind})",
+            )
+
+    def process(jobs: list[tuple[int, str]]) -> None:
+        nonlocal completed
+        if not jobs:
+            return
+        jobs = sorted(jobs, key=lambda job: (Path(runs[job[0]].relative(job[1])).as_posix(), job[0]))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _process_target_file,
+                    source_root,
+                    runs[number].dest_root,
+                    path,
+                    runs[number].out_root,
+                    runs[number].missing_root,
+                    args,
+                    cancel_event,
+                    runs[number].references,
+                ): (number, path)
+                for number, path in jobs
+            }
+            for future in as_completed(futures):
+                _raise_if_cancelled(cancel_event)
+                number, path = futures[future]
+                try:
+                    kind, packed_bytes, target_bytes, decision = future.result()
+                except Exception as exc:
+                    for pending in futures:
+                        pending.cancel()
+                    rel = runs[number].relative(path)
+                    where = f" of {runs[number].dest_root}" if len(runs) > 1 else ""
+                    raise RuntimeError(f"hybrid package generation failed for {rel}{where}: {exc}") from exc
+
+                with lock:
+                    completed += 1
+                    runs[number].record(path, kind, packed_bytes, target_bytes, decision)
+                report_progress(kind)
+
+    def settled(kind: str) -> None:
+        nonlocal completed
+        completed += 1
+        report_progress(kind)
+
+    process([(number, path) for number, run in enumerate(runs) for path in run.first_pass()])
+    process([(number, path) for number, run in enumerate(runs) for path in run.resolve_fanout(settled)])
+
+    for run in runs:
+        if len(runs) > 1:
+            print(f"hybrid target {run.dest_root}:")
+        run.finish(args)
+    return [len(run.files) for run in runs]
+
+
 def generate_patches(
     source_root: str,
     dest_root: str,
@@ -265,97 +739,20 @@ def generate_patches(
 
     ``out_root`` receives patch-from deltas. ``missing_root`` is used as a
     temporary staging tree for ordinary Zstd payloads; ``pack_additional`` later
-    promotes that tree to top-level ``payloads/``.
+    promotes that tree to top-level ``payloads/``. Deltas made against a Live
+    file at another path are listed in ``storage/delta_references.json``, and
+    duplicate payload targets in ``storage/payload_fanout.json``.
     """
 
     del use_tqdm
-    args = _normalize_args(zstd_args)
-
-    shutil.rmtree(_python_io_path(out_root), ignore_errors=True)
-    shutil.rmtree(_python_io_path(missing_root), ignore_errors=True)
-    os.makedirs(_python_io_path(out_root), exist_ok=True)
-    os.makedirs(_python_io_path(missing_root), exist_ok=True)
-
-    files: list[str] = []
-    excluded = 0
-    for root, _, names in os.walk(dest_root):
-        for name in names:
-            path = os.path.join(root, name)
-            if is_package_excluded(path, dest_root):
-                excluded += 1
-            else:
-                files.append(path)
-
-    total = len(files)
-    stats = {
-        "delta": 0,
-        "full": 0,
-        "additional": 0,
-        "identical": 0,
-        "excluded": excluded,
-    }
-    bytes_by_kind = {"delta": 0, "full": 0, "additional": 0}
-    target_bytes_by_kind = {"delta": 0, "full": 0, "additional": 0}
-    completed = 0
-    lock = threading.Lock()
-    max_workers = max(1, min(int(workers), 64))
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(
-                _process_target_file,
-                source_root,
-                dest_root,
-                path,
-                out_root,
-                missing_root,
-                args,
-                cancel_event,
-            ): path
-            for path in files
-        }
-        for future in as_completed(futures):
-            _raise_if_cancelled(cancel_event)
-            try:
-                kind, packed_bytes, target_bytes = future.result()
-            except Exception as exc:
-                for pending in futures:
-                    pending.cancel()
-                failed = futures[future]
-                rel = os.path.relpath(failed, dest_root)
-                raise RuntimeError(f"hybrid package generation failed for {rel}: {exc}") from exc
-
-            with lock:
-                completed += 1
-                if kind in stats:
-                    stats[kind] += 1
-                if kind in bytes_by_kind:
-                    bytes_by_kind[kind] += packed_bytes
-                    target_bytes_by_kind[kind] += target_bytes
-
-            if on_progress:
-                on_progress(
-                    "generate:patch",
-                    completed,
-                    total,
-                    f"processed {completed}/{total} ({kind})",
-                )
-
-    packed_total = sum(bytes_by_kind.values())
-    raw_total = sum(target_bytes_by_kind.values())
-    print(
-        "hybrid generation summary: "
-        f"delta={stats['delta']}, full={stats['full']}, additional={stats['additional']}, "
-        f"identical={stats['identical']}, hygiene_skipped={stats['excluded']}"
-    )
-    print(
-        "hybrid payload sizes: "
-        f"delta={format_size(bytes_by_kind['delta'])}, "
-        f"full={format_size(bytes_by_kind['full'])}, "
-        f"additional={format_size(bytes_by_kind['additional'])}, "
-        f"packed_total={format_size(packed_total)}, target_bytes={format_size(raw_total)}"
-    )
-    return total
+    return generate_release_set(
+        source_root,
+        [(dest_root, out_root, missing_root)],
+        workers=workers,
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+        zstd_args=zstd_args,
+    )[0]
 
 
 def _compress_raw_payload(source: Path, destination: Path, cancel_event=None) -> None:
@@ -398,8 +795,17 @@ def finalize_payloads(
     if not stage_root.is_dir():
         return
 
-    files = [path for path in stage_root.rglob("*") if path.is_file()]
-    total = len(files)
+    files = []
+    solid_members = []
+    for path in stage_root.rglob("*"):
+        if not path.is_file():
+            continue
+        rel_text = path.relative_to(stage_root).as_posix()
+        if rel_text.endswith(_SOLID_STAGED_SUFFIX):
+            solid_members.append((rel_text[: -len(_SOLID_STAGED_SUFFIX)], path))
+        else:
+            files.append(path)
+    total = len(files) + len(solid_members)
     done = 0
     for source in files:
         _raise_if_cancelled(cancel_event)
@@ -418,8 +824,412 @@ def finalize_payloads(
         if on_progress:
             on_progress("payload:pack", done, max(total, 1), f"compressed {done}/{total}")
 
+    archives, dictionary_note = _write_solid_archives(
+        solid_members,
+        payload_root,
+        storage_root,
+        cancel_event=cancel_event,
+        on_progress=None
+        if on_progress is None
+        else lambda packed: on_progress(
+            "payload:pack", done + packed, max(total, 1), f"compressed {done + packed}/{total}"
+        ),
+    )
+
     shutil.rmtree(_python_io_path(stage_root), ignore_errors=True)
-    print(f"payloads ready: {total} file(s)")
+    print(
+        f"payloads ready: {total} file(s), {len(solid_members)} of them in "
+        f"{archives} solid archive(s)"
+    )
+    if dictionary_note:
+        print(dictionary_note)
+
+
+def _solid_groups(members: list[tuple[str, Path]]) -> list[list[tuple[str, Path, int]]]:
+    """Split members into archives, keeping files of one type next to each other."""
+
+    sized = [
+        (rel, path, os.path.getsize(_python_io_path(path)))
+        for rel, path in sorted(members, key=lambda item: (Path(item[0]).suffix.lower(), item[0]))
+    ]
+    groups: list[list[tuple[str, Path, int]]] = []
+    current: list[tuple[str, Path, int]] = []
+    current_bytes = 0
+    for item in sized:
+        if current and current_bytes + item[2] > SOLID_ARCHIVE_BYTES:
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(item)
+        current_bytes += item[2]
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _train_payload_dictionary(
+    members: list[tuple[str, Path]],
+    storage_root: Path,
+    cancel_event=None,
+) -> Path | None:
+    """Train storage/payloads.dict on the solid members; ``None`` if it cannot."""
+
+    dictionary = storage_root / PAYLOAD_DICTIONARY_NAME
+    _remove(dictionary)
+    if len(members) < PAYLOAD_DICTIONARY_MIN_SAMPLES:
+        return None
+    stage_dir = tempfile.mkdtemp(prefix="sierra_dict_train_", dir=os.fspath(storage_root.parent))
+    try:
+        # Short sample names keep the trainer clear of Windows path limits.
+        samples = Path(stage_dir) / "samples"
+        samples.mkdir()
+        for number, (_rel, path) in enumerate(members):
+            _raise_if_cancelled(cancel_event)
+            shutil.copyfile(_python_io_path(path), samples / f"{number:06d}")
+        trained = Path(stage_dir) / "payloads.dict"
+        run_quiet(
+            [
+                ZSTD_EXE,
+                "--train",
+                "-r",
+                os.fspath(samples),
+                "-o",
+                os.fspath(trained),
+                f"--maxdict={PAYLOAD_DICTIONARY_MAX_BYTES}",
+            ],
+            check=True,
+            capture=True,
+            cancel_event=cancel_event,
+        )
+        _replace_file(trained, dictionary)
+        return dictionary
+    except subprocess.CalledProcessError as exc:
+        # Too few or too uniform samples; the archives simply go without.
+        print(f"payload dictionary skipped: {_called_process_detail(exc)}")
+        return None
+    finally:
+        shutil.rmtree(stage_dir, ignore_errors=True)
+
+
+def _compress_with_dictionary(
+    source_file: Path,
+    output_file: Path,
+    dictionary: Path,
+    cancel_event=None,
+) -> None:
+    _remove(output_file)
+    try:
+        run_quiet(
+            [ZSTD_EXE, *_SOLID_ZSTD_ARGS, "-D", os.fspath(dictionary), "-T1", "-f",
+             os.fspath(source_file), "-o", os.fspath(output_file)],
+            check=True,
+            capture=True,
+            cancel_event=cancel_event,
+        )
+        run_quiet(
+            [ZSTD_EXE, "-t", os.fspath(output_file), "-D", os.fspath(dictionary), "--long=31", "-T1"],
+            check=True,
+            capture=True,
+            cancel_event=cancel_event,
+        )
+    except subprocess.CalledProcessError as exc:
+        _remove(output_file)
+        raise RuntimeError(
+            f"zstd dictionary compression failed: {_called_process_detail(exc)}"
+        ) from exc
+
+
+def _write_solid_archives(
+    members: list[tuple[str, Path]],
+    payload_root: Path,
+    storage_root: Path,
+    cancel_event=None,
+    on_progress=None,
+) -> tuple[int, str | None]:
+    """Write the solid archives and their index.
+
+    Returns the archive count and, when the trained dictionary is shipped, a
+    summary line with its size and what it saved.
+    """
+
+    if not members:
+        _remove(storage_root / PAYLOAD_DICTIONARY_NAME)
+        return 0, None
+    solid_root = payload_root / SOLID_DIR
+    solid_root.mkdir(parents=True, exist_ok=True)
+    dictionary = _train_payload_dictionary(members, storage_root, cancel_event)
+    index = []
+    # (plain candidate, dictionary candidate or None) per archive. Both are
+    # kept until every archive is compressed, because the dictionary only
+    # ships when the whole package saves more than the dictionary weighs.
+    candidates: list[tuple[Path, Path | None]] = []
+    packed = 0
+    stage_root = tempfile.mkdtemp(prefix="sierra_solid_pack_", dir=os.fspath(payload_root.parent))
+    try:
+        for number, group in enumerate(_solid_groups(members)):
+            stage_dir = Path(stage_root) / f"{number:04d}"
+            stage_dir.mkdir()
+            stream = stage_dir / "stream.bin"
+            entries = []
+            offset = 0
+            with open(_python_io_path(stream), "wb") as writer:
+                for rel, path, size in group:
+                    _raise_if_cancelled(cancel_event)
+                    data = Path(_python_io_path(path)).read_bytes()
+                    writer.write(data)
+                    entries.append(
+                        {
+                            "path": rel,
+                            "offset": offset,
+                            "size": size,
+                            "sha256": hashlib.sha256(data).hexdigest(),
+                        }
+                    )
+                    offset += size
+            # Named like other payload candidates so deferred verification
+            # tests the frame before it is promoted.
+            plain = stage_dir / "payload.zst"
+            _compress_full(stream, plain, zstd_args=_SOLID_ZSTD_ARGS, cancel_event=cancel_event)
+            with_dictionary = None
+            if dictionary is not None:
+                # Verified inside _compress_with_dictionary, which knows the
+                # frame needs the dictionary to decode.
+                with_dictionary = stage_dir / "dictionary.zst"
+                _compress_with_dictionary(stream, with_dictionary, dictionary, cancel_event)
+            _remove(stream)
+            candidates.append((plain, with_dictionary))
+            index.append({"name": f"solid-{number:04d}.zst", "size": offset, "members": entries})
+            packed += len(group)
+            if on_progress:
+                on_progress(packed)
+
+        plain_bytes = sum(os.path.getsize(_python_io_path(plain)) for plain, _ in candidates)
+        shipped_bytes = plain_bytes
+        data = {"format_version": SOLID_FORMAT_VERSION, "archives": index}
+        note = None
+        if dictionary is not None:
+            dictionary_size = os.path.getsize(_python_io_path(dictionary))
+            chosen = [
+                min(os.path.getsize(_python_io_path(plain)), os.path.getsize(_python_io_path(other)))
+                for plain, other in candidates
+            ]
+            if sum(chosen) + dictionary_size < plain_bytes:
+                shipped_bytes = sum(chosen)
+                for archive, (plain, _), size in zip(index, candidates, chosen):
+                    if size < os.path.getsize(_python_io_path(plain)):
+                        archive["dictionary"] = True
+                data["dictionary"] = {
+                    "name": PAYLOAD_DICTIONARY_NAME,
+                    "size": dictionary_size,
+                    "sha256": _sha256_of(dictionary),
+                }
+                note = (
+                    f"payload dictionary: {format_size(dictionary_size)}, solid archives "
+                    f"{format_size(plain_bytes)} -> {format_size(shipped_bytes)} "
+                    f"({format_size(plain_bytes - shipped_bytes - dictionary_size)} saved "
+                    "counting the dictionary)"
+                )
+            else:
+                _remove(dictionary)
+                note = (
+                    f"payload dictionary not shipped: it would save less than its own "
+                    f"{format_size(dictionary_size)}"
+                )
+
+        for archive, (plain, with_dictionary) in zip(index, candidates):
+            _replace_file(with_dictionary if archive.get("dictionary") else plain, solid_root / archive["name"])
+    finally:
+        shutil.rmtree(stage_root, ignore_errors=True)
+
+    index_path = solid_root / SOLID_INDEX_NAME
+    temp = index_path.with_name(index_path.name + ".tmp")
+    try:
+        temp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(_python_io_path(temp), _python_io_path(index_path))
+    finally:
+        _remove(temp)
+    return len(index), note
+
+
+def _sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(_python_io_path(path), "rb") as handle:
+        for block in iter(lambda: handle.read(_SOLID_COPY_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _safe_member_path(value) -> str:
+    text = str(value or "")
+    raw = PurePosixPath(text)
+    if not text or "\\" in text or raw.is_absolute() or any(
+        part in ("", ".", "..") or ":" in part for part in raw.parts
+    ):
+        raise RuntimeError(f"solid payload index has an unsafe path: {text!r}")
+    return raw.as_posix()
+
+
+def _load_solid_index(payload_root: str | Path) -> dict | None:
+    index_path = Path(payload_root) / SOLID_DIR / SOLID_INDEX_NAME
+    if not os.path.isfile(_python_io_path(index_path)):
+        return None
+    try:
+        data = json.loads(Path(_python_io_path(index_path)).read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise RuntimeError("solid payload index is not valid JSON") from exc
+    if not isinstance(data, dict) or data.get("format_version") != SOLID_FORMAT_VERSION:
+        raise RuntimeError(f"unsupported solid payload index version: {data.get('format_version')!r}")
+    return data
+
+
+def read_solid_index(payload_root: str | Path) -> list[dict]:
+    """Archives of a package's solid payloads; empty when it has none."""
+
+    data = _load_solid_index(payload_root)
+    if data is None:
+        return []
+    archives = []
+    for archive in data.get("archives") or []:
+        name = str(archive.get("name") or "")
+        if not name or "/" in name or "\\" in name or name in (".", ".."):
+            raise RuntimeError(f"solid payload index has an unsafe archive name: {name!r}")
+        members = [
+            {
+                "path": _safe_member_path(member.get("path")),
+                "offset": int(member["offset"]),
+                "size": int(member["size"]),
+                "sha256": str(member["sha256"]),
+            }
+            for member in archive.get("members") or []
+        ]
+        members.sort(key=lambda member: member["offset"])
+        archives.append({"name": name, "members": members, "dictionary": bool(archive.get("dictionary"))})
+    return archives
+
+
+def solid_payload_dictionary(payload_root: str | Path) -> Path | None:
+    """storage/payloads.dict, checked against the index; ``None`` if unused."""
+
+    data = _load_solid_index(payload_root)
+    entry = (data or {}).get("dictionary")
+    if not entry:
+        return None
+    if entry.get("name") != PAYLOAD_DICTIONARY_NAME:
+        raise RuntimeError(f"solid payload index names an unknown dictionary: {entry.get('name')!r}")
+    dictionary = Path(payload_root).parent / "storage" / PAYLOAD_DICTIONARY_NAME
+    if not os.path.isfile(_python_io_path(dictionary)):
+        raise RuntimeError(f"{PAYLOAD_DICTIONARY_NAME} is missing from the package storage")
+    if _sha256_of(dictionary) != entry.get("sha256"):
+        raise RuntimeError(f"{PAYLOAD_DICTIONARY_NAME} failed SHA-256 verification")
+    return dictionary
+
+
+def solid_member_paths(payload_root: str | Path) -> list[str]:
+    return [member["path"] for archive in read_solid_index(payload_root) for member in archive["members"]]
+
+
+def _decode_solid_archive(
+    archive_file: Path,
+    stage_dir: str,
+    cancel_event=None,
+    dictionary: Path | None = None,
+) -> Path:
+    decoded = Path(stage_dir) / "solid.out"
+    dictionary_args = [] if dictionary is None else ["-D", _stage_external_input(dictionary, stage_dir, "payloads.dict")]
+    try:
+        run_quiet(
+            [
+                ZSTD_EXE,
+                "-d",
+                "-f",
+                _stage_external_input(archive_file, stage_dir, "solid.zst"),
+                "-o",
+                os.fspath(decoded),
+                "-T1",
+                "--long=31",
+                *dictionary_args,
+            ],
+            check=True,
+            capture=True,
+            cancel_event=cancel_event,
+        )
+    except subprocess.CalledProcessError as exc:
+        raise RuntimeError(f"zstd failed on {archive_file.name}: {_called_process_detail(exc)}") from exc
+    return decoded
+
+
+def _copy_member(reader, member: dict, output: Path, cancel_event=None) -> None:
+    reader.seek(member["offset"])
+    remaining = member["size"]
+    digest = hashlib.sha256()
+    with open(_python_io_path(output), "wb") as writer:
+        while remaining:
+            _raise_if_cancelled(cancel_event)
+            block = reader.read(min(remaining, _SOLID_COPY_BYTES))
+            if not block:
+                raise RuntimeError(f"solid payload archive is truncated at {member['path']}")
+            writer.write(block)
+            digest.update(block)
+            remaining -= len(block)
+    if digest.hexdigest() != member["sha256"]:
+        raise RuntimeError(f"solid payload member failed SHA-256 verification: {member['path']}")
+
+
+def _apply_solid_archive(
+    archive: dict,
+    payload_root: Path,
+    dest_root: Path,
+    cancel_event=None,
+    dictionary: Path | None = None,
+) -> None:
+    """Decode one archive with a single zstd run, then write each member atomically."""
+
+    _raise_if_cancelled(cancel_event)
+    stage_dir = tempfile.mkdtemp(prefix="sierra_solid_apply_", dir=os.fspath(dest_root))
+    try:
+        decoded = _decode_solid_archive(
+            payload_root / SOLID_DIR / archive["name"],
+            stage_dir,
+            cancel_event,
+            dictionary if archive["dictionary"] else None,
+        )
+        with open(_python_io_path(decoded), "rb") as reader:
+            for member in archive["members"]:
+                destination = dest_root / member["path"]
+                os.makedirs(_python_io_path(destination.parent), exist_ok=True)
+                output = Path(stage_dir) / "member.out"
+                _copy_member(reader, member, output, cancel_event)
+                _replace_file(output, destination)
+    finally:
+        shutil.rmtree(stage_dir, ignore_errors=True)
+
+
+def extract_solid_member(
+    payload_root: str | Path,
+    relative: str,
+    output: str | Path,
+    cancel_event=None,
+) -> bool:
+    """Write one solid payload member to ``output``; False if no archive holds it."""
+
+    payload_root_path = Path(payload_root)
+    for archive in read_solid_index(payload_root_path):
+        for member in archive["members"]:
+            if member["path"] != relative:
+                continue
+            stage_dir = tempfile.mkdtemp(prefix="sierra_solid_member_", dir=os.fspath(Path(output).parent))
+            try:
+                decoded = _decode_solid_archive(
+                    payload_root_path / SOLID_DIR / archive["name"],
+                    stage_dir,
+                    cancel_event,
+                    solid_payload_dictionary(payload_root_path) if archive["dictionary"] else None,
+                )
+                with open(_python_io_path(decoded), "rb") as reader:
+                    _copy_member(reader, member, Path(output), cancel_event)
+            finally:
+                shutil.rmtree(stage_dir, ignore_errors=True)
+            return True
+    return False
 
 
 def _decode_payload_once(
@@ -477,11 +1287,37 @@ def _decode_payload_with_retry(
     cancel_event=None,
     retries: int = 2,
 ) -> None:
+    rel = payload_file.relative_to(payload_root).with_suffix("").as_posix()
+    _with_retry(
+        lambda: _decode_payload_once(payload_file, payload_root, dest_root, cancel_event),
+        f"full payload failed after {retries + 1} attempts: {rel}",
+        cancel_event,
+        retries,
+    )
+
+
+def _apply_solid_with_retry(
+    archive: dict,
+    payload_root: Path,
+    dest_root: Path,
+    cancel_event=None,
+    dictionary: Path | None = None,
+    retries: int = 2,
+) -> None:
+    _with_retry(
+        lambda: _apply_solid_archive(archive, payload_root, dest_root, cancel_event, dictionary),
+        f"solid payload {archive['name']} failed after {retries + 1} attempts",
+        cancel_event,
+        retries,
+    )
+
+
+def _with_retry(operation, failure: str, cancel_event=None, retries: int = 2) -> None:
     last_error: Exception | None = None
     for attempt in range(retries + 1):
         _raise_if_cancelled(cancel_event)
         try:
-            _decode_payload_once(payload_file, payload_root, dest_root, cancel_event)
+            operation()
             return
         except Cancelled:
             raise
@@ -494,8 +1330,7 @@ def _decode_payload_with_retry(
                         raise Cancelled()
                 else:
                     time.sleep(delay)
-    rel = payload_file.relative_to(payload_root).with_suffix("").as_posix()
-    raise RuntimeError(f"full payload failed after {retries + 1} attempts: {rel}: {last_error}")
+    raise RuntimeError(f"{failure}: {last_error}")
 
 
 def apply_payloads(
@@ -519,24 +1354,66 @@ def apply_payloads(
         print("No payloads found - skipping full-file stage.")
         return
 
-    payloads = sorted(path for path in payload_root.rglob("*.zst") if path.is_file())
-    if not payloads:
+    payloads = sorted(
+        path
+        for path in payload_root.rglob("*.zst")
+        if path.is_file() and path.relative_to(payload_root).parts[0] != SOLID_DIR
+    )
+    archives = read_solid_index(payload_root)
+    dictionary = solid_payload_dictionary(payload_root) if archives else None
+    if not payloads and not archives:
         print("No payloads found - skipping full-file stage.")
         return
 
     destination = Path(dest_dir)
-    max_workers = max(1, min(int(workers), 32, len(payloads)))
+    fanout = load_payload_fanout(storage_dir)
+    copies = [(leader, copy) for leader, targets in fanout.items() for copy in targets]
+    total = len(payloads) + sum(len(archive["members"]) for archive in archives) + len(copies)
+    max_workers = max(1, min(int(workers), 32, len(payloads) + len(archives)))
     completed = 0
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Solid archives hold many files each; start them first so a big one
+        # does not begin last and leave the other workers idle.
         futures = {
             executor.submit(
-                _decode_payload_with_retry,
-                payload,
+                _apply_solid_with_retry,
+                archive,
                 payload_root,
                 destination,
                 cancel_event,
-            ): payload
-            for payload in payloads
+                dictionary,
+            ): (len(archive["members"]), archive["name"])
+            for archive in archives
+        }
+        futures.update(
+            {
+                executor.submit(
+                    _decode_payload_with_retry,
+                    payload,
+                    payload_root,
+                    destination,
+                    cancel_event,
+                ): (1, payload.relative_to(payload_root).with_suffix("").as_posix())
+                for payload in payloads
+            }
+        )
+        for future in as_completed(futures):
+            _raise_if_cancelled(cancel_event)
+            try:
+                future.result()
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                raise
+            count, label = futures[future]
+            completed += count
+            if on_progress:
+                on_progress("payload:apply", completed, total, f"applied {label}")
+
+        # Every leader is decoded by now; give each duplicate path its copy.
+        futures = {
+            executor.submit(_fan_out_copy, destination / leader, destination / copy, cancel_event): copy
+            for leader, copy in copies
         }
         for future in as_completed(futures):
             _raise_if_cancelled(cancel_event)
@@ -548,7 +1425,6 @@ def apply_payloads(
                 raise
             completed += 1
             if on_progress:
-                rel = futures[future].relative_to(payload_root).with_suffix("").as_posix()
-                on_progress("payload:apply", completed, len(payloads), f"applied {rel}")
+                on_progress("payload:apply", completed, total, f"copied {futures[future]}")
 
-    print(f"payloads applied: {completed}/{len(payloads)}")
+    print(f"payloads applied: {completed}/{total}")
@@ -5,6 +5,8 @@ import shutil
 from dataclasses import dataclass
 from pathlib import Path
 
+from .install_receipt import INSTALL_RECEIPT_NAME
+
 
 TEMP_SUFFIXES = (".tmp_out", ".tmp_src", ".new")
 IGNORED_DIRS = {"__pycache__"}
@@ -71,6 +73,11 @@ def is_package_excluded(path: str | Path, root: str | Path) -> bool:
     if is_volatile_runtime_file(path, root):
         return True
 
+    # An installed SPT tree used as a generation target (for example the old
+    # side of an upgrade package) carries the installer's own receipt.
+    if len(parts) == 1 and rel.name == INSTALL_RECEIPT_NAME:
+        return True
+
     name = rel.name.lower()
     return name.endswith(TEMP_SUFFIXES)
 
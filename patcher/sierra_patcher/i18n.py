@@ -101,6 +101,7 @@ _KO = {
     "Select pasted Live folder": "복사해 둔 라이브 폴더 선택",
     "Original": "원본",
     "Auto-detected": "자동 탐지됨",
+    "Link unchanged files instead of copying (same drive only)": "변경되지 않는 파일은 복사 대신 링크 (같은 드라이브만)",
     "Not detected": "탐지되지 않음",
     "Patch threads": "패치 스레드 수",
     "Force (bypass metadata checks)": "강제 진행 (메타데이터 검사 건너뛰기)",
@@ -188,6 +189,9 @@ _KO = {
     "Publishing web package": "웹 패키지 게시 중",
     "Verifying archived objects": "보관된 파일 확인 중",
     "Resuming archived snapshot": "보관 스냅샷 이어받는 중",
+    "Reusing cached download files": "다운로드 캐시 파일 재사용 중",
+    "Reusing installed release": "설치된 릴리스 재사용 중",
+    "Rebuilding changed files": "변경된 파일 다시 생성 중",
     "Copying Live game": "본섭 게임 복사 중",
     "Scanning Live game...": "본섭 게임 파일 확인 중...",
     "Copying {name}": "{name} 복사 중",
@@ -223,6 +227,7 @@ _KO = {
     "Checked: {count}": "검사한 파일: {count}",
     "Matched: {count}": "일치: {count}",
     "Mismatched: {count}": "불일치: {count}",
+    "Not checked: {count}": "검사하지 않은 파일: {count}",
     "No game files were modified.": "대상 폴더의 파일은 변경되지 않았습니다.",
     "Examples:": "예시:",
     "{path}: missing": "{path}: 파일 없음",
@@ -230,6 +235,7 @@ _KO = {
         "{path}: 크기 불일치 (예상 {expected:,}바이트, 실제 {actual:,}바이트)",
     "{path}: SHA-256 mismatch (expected {expected_sha}, found {actual_sha})":
         "{path}: SHA-256 불일치 (예상 {expected_sha}, 실제 {actual_sha})",
+    "{path}: content mismatch in sampled blocks": "{path}: 샘플 블록 내용 불일치",
     "... and {count} more. See Logs for details.":
         "... 외 {count}개가 더 있습니다. 자세한 내용은 로그를 확인해 주세요.",
     "Cache cleanup": "캐시 정리",
@@ -378,8 +384,8 @@ _KO = {
     "Update metadata for {release} in the local repository?\n\nThis creates/reuses a new content-addressed object and updates the local manifest. It does not upload anything to HFS.":
         "로컬 저장소의 {release} 메타데이터를 갱신하시겠습니까?\n\n새 콘텐츠 주소 지정 객체를 만들거나 기존 객체를 재사용하고 로컬 매니페스트를 갱신합니다. HFS에는 직접적으로 업로드하지 않습니다.",
     "Repository metadata": "저장소 메타데이터",
-    "Updated {release} metadata. New object: {object_id}. Upload that object and the updated release manifest to HFS; catalog.json is unchanged.":
-        "{release} 메타데이터를 갱신했음. 새 객체: {object_id}. 이 객체와 갱신된 릴리스 매니페스트를 HFS에 업로드 하십시오. catalog.json은 바뀌지 않았습니다.",
+    "Updated {release} metadata. New object: {object_id}. Upload that object and the updated release manifest.json/manifest.idx to HFS; catalog.json is unchanged.":
+        "{release} 메타데이터를 갱신했음. 새 객체: {object_id}. 이 객체와 갱신된 릴리스 manifest.json/manifest.idx를 HFS에 업로드 하십시오. catalog.json은 바뀌지 않았습니다.",
     "Repository catalog": "저장소 카탈로그",
     "Rebuilt {name} with {count} local release(s): {releases}": "로컬 릴리스 {count}개로 {name}을 다시 만들었음: {releases}",
     "(none)": "(없음)",
@@ -389,6 +395,21 @@ _KO = {
         "{release} 확인 완료: 논리 파일 {files}개, 객체 참조 {objects}개, {size:,.1f} MiB.",
     "Verification failed: {error}": "확인 실패: {error}",
     "Repository verification": "저장소 확인",
+    "Quarantine unreferenced objects...": "참조되지 않는 객체 격리...",
+    "Scanning repository for unreferenced objects...": "참조되지 않는 객체를 찾는 중...",
+    "No unreferenced objects found.": "참조되지 않는 객체가 없습니다.",
+    "Repository cleanup": "저장소 정리",
+    "{objects} object(s) are not referenced by any of {releases} release manifest(s), and {temps} abandoned temporary file(s) were found ({size:,.1f} MiB).\n\nMove them to the repository quarantine folder?":
+        "릴리스 매니페스트 {releases}개 중 어디에서도 참조하지 않는 객체 {objects}개와 버려진 임시 파일 {temps}개를 찾았습니다 ({size:,.1f} MiB).\n\n저장소 격리 폴더로 옮기시겠습니까?",
+    "Repository cleanup cancelled.": "저장소 정리를 취소했습니다.",
+    "Repository cleanup failed: {error}": "저장소 정리 실패: {error}",
+    "Moved {objects} object(s) and {temps} temporary file(s) to {path}.":
+        "객체 {objects}개와 임시 파일 {temps}개를 {path}(으)로 옮겼습니다.",
+    "Build/refresh local repository index": "로컬 저장소 색인 만들기/새로 고침",
+    "Indexing local repository...": "로컬 저장소 색인 작성 중...",
+    "Repository index is current; re-indexed {count} release(s). The index is local only and is not uploaded to HFS.":
+        "저장소 색인이 최신 상태입니다. 릴리스 {count}개를 다시 색인했습니다. 색인은 로컬 전용이며 HFS에 업로드하지 않습니다.",
+    "Repository index failed: {error}": "저장소 색인 실패: {error}",
 }
 
 
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# Written into the destination only after an install finished successfully,
+# and removed before any patch touches it, so a present receipt always names
+# the release the folder currently holds.
+INSTALL_RECEIPT_NAME = ".sierra-install.json"
+INSTALL_RECEIPT_FORMAT_VERSION = 1
+# Beside the patcher: folders this patcher finished installing, so a later
+# install of the same release can reuse one of them. Only a hint list; the
+# receipt inside each folder decides what it holds now.
+INSTALL_REGISTRY_NAME = "installs.json"
+
+
+@dataclass(frozen=True)
+class InstallReceipt:
+    package_id: str
+    live_version: str | None
+    installed_at: str
+
+
+def receipt_path(destination: str | Path) -> Path:
+    return Path(destination) / INSTALL_RECEIPT_NAME
+
+
+def read_install_receipt(destination: str | Path) -> InstallReceipt | None:
+    try:
+        data = json.loads(receipt_path(destination).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("format_version") != INSTALL_RECEIPT_FORMAT_VERSION:
+        return None
+    package_id = str(data.get("package_id") or "").strip()
+    if not package_id:
+        return None
+    live_version = str(data.get("live_version") or "").strip() or None
+    return InstallReceipt(package_id, live_version, str(data.get("installed_at") or ""))
+
+
+def write_install_receipt(
+    destination: str | Path,
+    package_id: str,
+    *,
+    live_version: str | None = None,
+) -> Path:
+    path = receipt_path(destination)
+    temp = path.with_name(path.name + ".tmp")
+    data = {
+        "format_version": INSTALL_RECEIPT_FORMAT_VERSION,
+        "package_id": package_id,
+        "live_version": live_version,
+        "installed_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    try:
+        temp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(temp, path)
+    finally:
+        temp.unlink(missing_ok=True)
+    return path
+
+
+def clear_install_receipt(destination: str | Path) -> None:
+    receipt_path(destination).unlink(missing_ok=True)
+
+
+def _registry_path(registry: str | Path | None) -> Path:
+    if registry is not None:
+        return Path(registry)
+    from .paths import WORKING_DIR
+
+    return Path(WORKING_DIR) / INSTALL_REGISTRY_NAME
+
+
+def _read_registry(path: Path) -> list[str]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    installs = data.get("installs") if isinstance(data, dict) else None
+    return [str(item) for item in installs if isinstance(item, str)] if isinstance(installs, list) else []
+
+
+def _same_folder(left: str | Path, right: str | Path) -> bool:
+    return os.path.normcase(os.path.abspath(left)) == os.path.normcase(os.path.abspath(right))
+
+
+def register_install(destination: str | Path, *, registry: str | Path | None = None) -> None:
+    """Remember ``destination`` after its receipt was written; never raises."""
+
+    path = _registry_path(registry)
+    installs = [
+        item
+        for item in _read_registry(path)
+        if not _same_folder(item, destination) and receipt_path(item).is_file()
+    ]
+    installs.append(os.path.abspath(destination))
+    temp = path.with_name(path.name + ".tmp")
+    try:
+        temp.write_text(json.dumps({"installs": installs}, indent=2), encoding="utf-8")
+        os.replace(temp, path)
+    except OSError as exc:
+        print(f"install registry not updated ({exc})")
+    finally:
+        temp.unlink(missing_ok=True)
+
+
+def find_installs(
+    package_id: str,
+    *,
+    exclude: str | Path | None = None,
+    registry: str | Path | None = None,
+) -> list[Path]:
+    """Registered folders whose receipt currently names ``package_id``, newest first."""
+
+    found = []
+    for item in reversed(_read_registry(_registry_path(registry))):
+        if exclude is not None and _same_folder(item, exclude):
+            continue
+        receipt = read_install_receipt(item)
+        if receipt is not None and receipt.package_id == package_id:
+            found.append(Path(item))
+    return found
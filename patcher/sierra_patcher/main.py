@@ -9,6 +9,7 @@ try:
     from .dark_theme import install_dark_theme, present_main_window
     from .flags import is_dev_mode
     from .generation_guard import enable_generation_guard
+    from .hash_cache import enable_hash_cache
     from .gui import _hide_console_on_windows
     from .patch_failure_hooks import enable_patch_failure_hooks
     from .runtime_requirement_hooks import enable_runtime_requirement_hooks
@@ -20,6 +21,7 @@ except ImportError:  # frozen exe starting main.py as a script
     from sierra_patcher.dark_theme import install_dark_theme, present_main_window
     from sierra_patcher.flags import is_dev_mode
     from sierra_patcher.generation_guard import enable_generation_guard
+    from sierra_patcher.hash_cache import enable_hash_cache
     from sierra_patcher.gui import _hide_console_on_windows
     from sierra_patcher.patch_failure_hooks import enable_patch_failure_hooks
     from sierra_patcher.runtime_requirement_hooks import enable_runtime_requirement_hooks
@@ -42,6 +44,10 @@ def main(argv: list[str] | None = None) -> None:
     enable_source_integrity_hooks()
     enable_runtime_requirement_hooks()
 
+    # Copy, source preflight and generation share one persistent SHA-256
+    # cache, so a retried install does not re-read unchanged Live files.
+    enable_hash_cache()
+
     try:
         if argv:
             return cli.run_cli(argv, dev=dev)
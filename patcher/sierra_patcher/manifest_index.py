@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import uuid
+from pathlib import Path
+from typing import Iterator
+
+
+# manifest.idx sits beside manifest.json. The JSON stays authoritative; the
+# index records the SHA-256 of the exact manifest bytes it was compiled from
+# and is ignored whenever those no longer match. It also records the
+# manifest's size, mtime and ctime: while a stat still shows those, opening
+# the index skips reading and hashing the manifest.
+MANIFEST_INDEX_NAME = "manifest.idx"
+MANIFEST_INDEX_VERSION = 2
+_MAGIC = b"SMIX"
+# magic, version, reserved, file count, object reference count,
+# manifest SHA-256, path blob length, package_id length, chunk size,
+# manifest size, mtime_ns, ctime_ns (all zero when unknown)
+_HEADER = struct.Struct("<4sHHII32sIIQQqq")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_OBJECT = struct.Struct("<32sQ")
+
+
+class ManifestIndexError(RuntimeError):
+    pass
+
+
+def index_path_for(manifest_path: str | Path) -> Path:
+    return Path(manifest_path).with_name(MANIFEST_INDEX_NAME)
+
+
+def _stat_key(stat: os.stat_result) -> tuple[int, int, int]:
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+
+
+def build_manifest_index(
+    manifest: dict,
+    manifest_bytes: bytes,
+    manifest_stat: tuple[int, int, int] | None = None,
+) -> bytes:
+    """Compile a parsed release manifest into the binary index layout.
+
+    Every supported manifest format version shares the ``files`` entries
+    indexed here. Sections follow the header in this order: path offsets (u32, n+1),
+    logical sizes (u64, n), logical SHA-256 digests (32 bytes, n), object
+    start offsets (u32, n+1), object references (digest + u64 size), the
+    UTF-8 path blob and finally the package ID. Paths are sorted bytewise so
+    lookups are a binary search over the offset table.
+    """
+    entries = []
+    for entry in manifest.get("files", []):
+        if not isinstance(entry, dict):
+            raise ManifestIndexError("manifest file entry is invalid")
+        try:
+            path = str(entry["path"]).encode("utf-8")
+            size = int(entry["size"])
+            digest = bytes.fromhex(str(entry["sha256"]))
+            objects = [
+                (bytes.fromhex(str(obj["id"])), int(obj["size"])) for obj in entry["objects"]
+            ]
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ManifestIndexError(f"manifest entry cannot be indexed: {entry!r}") from exc
+        if len(digest) != 32 or any(len(object_id) != 32 for object_id, _ in objects):
+            raise ManifestIndexError(f"manifest entry has an invalid digest: {entry!r}")
+        entries.append((path, size, digest, objects))
+    entries.sort(key=lambda item: item[0])
+    for previous, current in zip(entries, entries[1:]):
+        if previous[0] == current[0]:
+            raise ManifestIndexError(f"duplicate manifest path: {current[0].decode('utf-8')}")
+
+    package_id = str(manifest.get("package_id", "")).encode("utf-8")
+    path_blob = b"".join(item[0] for item in entries)
+    object_count = sum(len(item[3]) for item in entries)
+
+    parts = [
+        _HEADER.pack(
+            _MAGIC,
+            MANIFEST_INDEX_VERSION,
+            0,
+            len(entries),
+            object_count,
+            hashlib.sha256(manifest_bytes).digest(),
+            len(path_blob),
+            len(package_id),
+            int(manifest.get("chunk_size") or 0),
+            *(manifest_stat or (0, 0, 0)),
+        )
+    ]
+    offset = 0
+    for path, *_rest in entries:
+        parts.append(_U32.pack(offset))
+        offset += len(path)
+    parts.append(_U32.pack(offset))
+    parts.extend(_U64.pack(size) for _path, size, _digest, _objects in entries)
+    parts.extend(digest for _path, _size, digest, _objects in entries)
+    start = 0
+    for *_rest, objects in entries:
+        parts.append(_U32.pack(start))
+        start += len(objects)
+    parts.append(_U32.pack(start))
+    for *_rest, objects in entries:
+        parts.extend(_OBJECT.pack(object_id, size) for object_id, size in objects)
+    parts.append(path_blob)
+    parts.append(package_id)
+    return b"".join(parts)
+
+
+def write_manifest_index(manifest_path: str | Path) -> Path:
+    """(Re)compile the sidecar for ``manifest_path`` and replace it atomically."""
+    manifest_path = Path(manifest_path)
+    before = _stat_key(manifest_path.stat())
+    manifest_bytes = manifest_path.read_bytes()
+    # Only a manifest that did not change while it was read gets a stat key.
+    manifest_stat = before if _stat_key(manifest_path.stat()) == before else None
+    try:
+        manifest = json.loads(manifest_bytes.decode("utf-8"))
+    except Exception as exc:
+        raise ManifestIndexError(f"manifest is not valid JSON: {manifest_path}") from exc
+    data = build_manifest_index(manifest, manifest_bytes, manifest_stat)
+    index_path = index_path_for(manifest_path)
+    temp = index_path.with_name(f".{index_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        temp.write_bytes(data)
+        os.replace(temp, index_path)
+    finally:
+        temp.unlink(missing_ok=True)
+    return index_path
+
+
+class ManifestIndex:
+    """Read-only, memory-mapped view of a compiled manifest index."""
+
+    def __init__(self, path: str | Path, *, manifest_sha256: str | None = None):
+        self.path = Path(path)
+        with self.path.open("rb") as stream:
+            size = os.fstat(stream.fileno()).st_size
+            if size < _HEADER.size:
+                raise ManifestIndexError(f"manifest index is truncated: {self.path}")
+            self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse_header(size, manifest_sha256)
+        except Exception:
+            self._map.close()
+            raise
+
+    def _parse_header(self, size: int, manifest_sha256: str | None) -> None:
+        (
+            magic,
+            version,
+            _reserved,
+            self._count,
+            self._object_count,
+            digest,
+            path_blob_size,
+            package_id_size,
+            self.chunk_size,
+            *manifest_stat,
+        ) = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != MANIFEST_INDEX_VERSION:
+            raise ManifestIndexError(f"unsupported manifest index: {self.path}")
+        self.manifest_sha256 = digest.hex()
+        self.manifest_stat = tuple(manifest_stat) if manifest_stat[0] or manifest_stat[1] else None
+        if manifest_sha256 is not None and manifest_sha256.lower() != self.manifest_sha256:
+            raise ManifestIndexError(f"manifest index is stale: {self.path}")
+
+        n = self._count
+        self._path_offsets = _HEADER.size
+        self._sizes = self._path_offsets + 4 * (n + 1)
+        self._digests = self._sizes + 8 * n
+        self._object_starts = self._digests + 32 * n
+        self._objects = self._object_starts + 4 * (n + 1)
+        self._path_blob = self._objects + _OBJECT.size * self._object_count
+        package_id_offset = self._path_blob + path_blob_size
+        if package_id_offset + package_id_size != size:
+            raise ManifestIndexError(f"manifest index is corrupt: {self.path}")
+        self.package_id = bytes(
+            self._map[package_id_offset : package_id_offset + package_id_size]
+        ).decode("utf-8")
+
+    @classmethod
+    def for_manifest(cls, manifest_path: str | Path) -> ManifestIndex | None:
+        """Open the sidecar only if it matches the current manifest.
+
+        A manifest whose size, mtime and ctime are those recorded in the
+        index is trusted after one stat; otherwise its bytes are hashed.
+        """
+        manifest_path = Path(manifest_path)
+        index_path = index_path_for(manifest_path)
+        if not index_path.is_file():
+            return None
+        try:
+            index = cls(index_path)
+        except (OSError, ValueError, ManifestIndexError, struct.error):
+            return None
+        try:
+            if index.manifest_stat is not None and index.manifest_stat == _stat_key(manifest_path.stat()):
+                return index
+            digest = hashlib.sha256(manifest_path.read_bytes()).hexdigest()
+        except OSError:
+            index.close()
+            return None
+        if digest != index.manifest_sha256:
+            index.close()
+            return None
+        return index
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> ManifestIndex:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _u32(self, base: int, index: int) -> int:
+        return _U32.unpack_from(self._map, base + 4 * index)[0]
+
+    def _path_bytes(self, index: int) -> bytes:
+        start = self._path_blob + self._u32(self._path_offsets, index)
+        end = self._path_blob + self._u32(self._path_offsets, index + 1)
+        return self._map[start:end]
+
+    def _entry(self, index: int) -> dict:
+        first = self._u32(self._object_starts, index)
+        last = self._u32(self._object_starts, index + 1)
+        objects = []
+        for position in range(first, last):
+            object_id, size = _OBJECT.unpack_from(self._map, self._objects + _OBJECT.size * position)
+            objects.append({"id": object_id.hex(), "size": size})
+        digest_offset = self._digests + 32 * index
+        return {
+            "path": self._path_bytes(index).decode("utf-8"),
+            "size": _U64.unpack_from(self._map, self._sizes + 8 * index)[0],
+            "sha256": self._map[digest_offset : digest_offset + 32].hex(),
+            "objects": objects,
+        }
+
+    def lookup(self, logical_path: str) -> dict | None:
+        """Return the manifest entry for ``logical_path`` in O(log n)."""
+        key = logical_path.encode("utf-8")
+        index = bisect.bisect_left(range(self._count), key, key=self._path_bytes)
+        if index < self._count and self._path_bytes(index) == key:
+            return self._entry(index)
+        return None
+
+    def iter_entries(self) -> Iterator[dict]:
+        """Yield entries in path order without materializing the whole list."""
+        for index in range(self._count):
+            yield self._entry(index)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, TypeVar
+
+
+# Archived snapshots are portable and often sit on an external HDD, a USB
+# stick or a NAS share. Parallel readers are ideal for SSDs but make a disk
+# head seek between files, so reads are planned per medium: SSDs keep the
+# caller's concurrency, everything else gets one or two streams that follow
+# the on-disk layout with large reads.
+MEDIA_SSD = "ssd"
+MEDIA_ROTATIONAL = "rotational"
+MEDIA_REMOVABLE = "removable"
+MEDIA_NETWORK = "network"
+MEDIA_UNKNOWN = "unknown"
+MEDIA_KINDS = (MEDIA_SSD, MEDIA_ROTATIONAL, MEDIA_REMOVABLE, MEDIA_NETWORK, MEDIA_UNKNOWN)
+MEDIA_OVERRIDE_ENV = "SIERRA_SNAPSHOT_MEDIA"
+
+_SEQUENTIAL_BLOCK_SIZE = 16 * 1024 * 1024
+_DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+_SEQUENTIAL_STREAMS = {MEDIA_ROTATIONAL: 1, MEDIA_REMOVABLE: 2, MEDIA_NETWORK: 2}
+_NETWORK_FILESYSTEMS = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smb3",
+    "smbfs",
+    "9p",
+    "afs",
+    "fuse.sshfs",
+    "fuse.rclone",
+}
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ReadPlan:
+    media: str
+    workers: int
+    block_size: int
+    sequential: bool
+
+    def describe(self) -> str:
+        streams = "stream" if self.workers == 1 else "streams"
+        return f"{self.media} media, {self.workers} read {streams}"
+
+
+def _mount_fstype(path: Path) -> str | None:
+    best, fstype = "", None
+    try:
+        with open("/proc/self/mounts", encoding="utf-8") as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace("\\040", " ")
+                target = str(path)
+                inside = target == mount_point or target.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        return None
+    return fstype
+
+
+def _read_flag(path: Path) -> bool | None:
+    try:
+        return path.read_text(encoding="ascii").strip() == "1"
+    except OSError:
+        return None
+
+
+def _linux_media(path: Path) -> str:
+    stat = os.stat(path)
+    major, minor = os.major(stat.st_dev), os.minor(stat.st_dev)
+    if major == 0:
+        # Anonymous devices: network shares, FUSE, overlay and tmpfs mounts.
+        fstype = _mount_fstype(path.resolve())
+        return MEDIA_NETWORK if fstype in _NETWORK_FILESYSTEMS else MEDIA_UNKNOWN
+
+    device = Path(f"/sys/dev/block/{major}:{minor}")
+    try:
+        device = device.resolve(strict=True)
+    except OSError:
+        return MEDIA_UNKNOWN
+    if not (device / "queue").is_dir():
+        device = device.parent  # a partition; the queue belongs to the disk
+    rotational = _read_flag(device / "queue" / "rotational")
+    removable = _read_flag(device / "removable") or "/usb" in device.as_posix()
+    if rotational:
+        return MEDIA_ROTATIONAL
+    if removable:
+        return MEDIA_REMOVABLE
+    if rotational is False:
+        return MEDIA_SSD
+    return MEDIA_UNKNOWN
+
+
+def _windows_media(path: Path) -> str:
+    import ctypes
+    from ctypes import wintypes
+
+    drive = os.path.splitdrive(os.path.abspath(path))[0]
+    if not drive or drive.startswith(("\\\\", "//")):
+        return MEDIA_NETWORK if drive else MEDIA_UNKNOWN
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    drive_type = kernel32.GetDriveTypeW(ctypes.c_wchar_p(drive + "\\"))
+    if drive_type == 4:  # DRIVE_REMOTE
+        return MEDIA_NETWORK
+
+    class StoragePropertyQuery(ctypes.Structure):
+        _fields_ = [
+            ("PropertyId", wintypes.DWORD),
+            ("QueryType", wintypes.DWORD),
+            ("AdditionalParameters", ctypes.c_ubyte * 1),
+        ]
+
+    class SeekPenaltyDescriptor(ctypes.Structure):
+        _fields_ = [
+            ("Version", wintypes.DWORD),
+            ("Size", wintypes.DWORD),
+            ("IncursSeekPenalty", wintypes.BOOLEAN),
+        ]
+
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = [
+        wintypes.LPCWSTR,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.HANDLE,
+    ]
+    kernel32.DeviceIoControl.argtypes = [
+        wintypes.HANDLE,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        ctypes.POINTER(wintypes.DWORD),
+        wintypes.LPVOID,
+    ]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    # Zero access rights are enough for the property query and need no admin.
+    handle = kernel32.CreateFileW(f"\\\\.\\{drive}", 0, 0x3, None, 3, 0, None)
+    if handle in (None, wintypes.HANDLE(-1).value):
+        return MEDIA_REMOVABLE if drive_type == 2 else MEDIA_UNKNOWN
+    try:
+        query = StoragePropertyQuery(7, 0)  # StorageDeviceSeekPenaltyProperty
+        result = SeekPenaltyDescriptor()
+        returned = wintypes.DWORD()
+        ok = kernel32.DeviceIoControl(
+            handle,
+            0x2D1400,  # IOCTL_STORAGE_QUERY_PROPERTY
+            ctypes.byref(query),
+            ctypes.sizeof(query),
+            ctypes.byref(result),
+            ctypes.sizeof(result),
+            ctypes.byref(returned),
+            None,
+        )
+    finally:
+        kernel32.CloseHandle(handle)
+    if ok and result.IncursSeekPenalty:
+        return MEDIA_ROTATIONAL
+    if drive_type == 2:  # DRIVE_REMOVABLE
+        return MEDIA_REMOVABLE
+    return MEDIA_SSD if ok else MEDIA_UNKNOWN
+
+
+def detect_media(path: str | Path) -> str:
+    """Classify the storage holding ``path``; never raises."""
+
+    override = (os.environ.get(MEDIA_OVERRIDE_ENV) or "").strip().lower()
+    if override in MEDIA_KINDS:
+        return override
+    try:
+        if os.name == "nt":
+            return _windows_media(Path(path))
+        if os.path.isdir("/sys/dev/block"):
+            return _linux_media(Path(path))
+    except (OSError, AttributeError, ValueError):
+        pass
+    return MEDIA_UNKNOWN
+
+
+def plan_reads(path: str | Path, requested_workers: int) -> ReadPlan:
+    requested = max(1, int(requested_workers))
+    media = detect_media(path)
+    streams = _SEQUENTIAL_STREAMS.get(media)
+    if streams is None:
+        return ReadPlan(media, requested, _DEFAULT_BLOCK_SIZE, False)
+    return ReadPlan(media, min(requested, streams), _SEQUENTIAL_BLOCK_SIZE, True)
+
+
+_FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_HEADER = struct.Struct("=QQIIII")
+_FIEMAP_EXTENT = struct.Struct("=QQQQQIIII")
+
+
+def _physical_offset(path: Path) -> int | None:
+    """First physical byte of ``path`` on Linux (FIEMAP), else None."""
+
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    _FIEMAP_HEADER.pack_into(request, 0, 0, 2**64 - 1, 0, 0, 1, 0)
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.ioctl(descriptor, _FS_IOC_FIEMAP, request)
+    except OSError:
+        return None
+    finally:
+        os.close(descriptor)
+    mapped = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+    if not mapped:
+        return None
+    return _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)[1]
+
+
+def disk_order(items: Iterable[T], path_of: Callable[[T], Path | None]) -> list[T]:
+    """Sort ``items`` by where their files start on disk.
+
+    Uses the first extent where the filesystem reports it and the file id
+    otherwise, which follows allocation order on NTFS and ext4. Items without
+    a file come first; missing files keep their relative order at the end so
+    the caller reports them.
+    """
+
+    keyed = []
+    for index, item in enumerate(items):
+        path = path_of(item)
+        if path is None:
+            keyed.append(((-1, 0, 0, index), item))
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            keyed.append(((2, 0, 0, index), item))
+            continue
+        offset = _physical_offset(path)
+        if offset is not None:
+            keyed.append(((0, stat.st_dev, offset, index), item))
+        else:
+            keyed.append(((1, stat.st_dev, stat.st_ino, index), item))
+    keyed.sort(key=lambda pair: pair[0])
+    return [item for _, item in keyed]
+
+
+def advise_sequential(handle) -> None:
+    """Ask the OS for aggressive read-ahead on an open file where supported."""
+
+    advise = getattr(os, "posix_fadvise", None)
+    if advise is None:
+        return
+    try:
+        advise(handle.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
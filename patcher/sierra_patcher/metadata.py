@@ -18,6 +18,8 @@ class Meta:
         diff_profile: str | None = None,
         zstd_patch_args: list[str] | None = None,
         runtime_requirements: list[dict] | None = None,
+        upgrade_from: str | None = None,
+        upgrade_to: str | None = None,
     ):
         self.version = version
         self.title = title
@@ -27,6 +29,9 @@ class Meta:
         self.diff_profile = diff_profile
         self.zstd_patch_args = zstd_patch_args
         self.runtime_requirements: list[dict] = runtime_requirements or []
+        # Set only for release-to-release upgrade packages.
+        self.upgrade_from = upgrade_from
+        self.upgrade_to = upgrade_to
 
     @staticmethod
     def read(info_dir: str | Path) -> "Meta":
@@ -60,6 +65,8 @@ class Meta:
                 diff_profile=data.get("diff_profile"),
                 zstd_patch_args=data.get("zstd_patch_args"),
                 runtime_requirements=runtime_requirements or [],
+                upgrade_from=data.get("upgrade_from"),
+                upgrade_to=data.get("upgrade_to"),
             )
 
         # Legacy 3-line format: version, title, description, [dependencies?]
@@ -87,6 +94,8 @@ class Meta:
         diff_profile: str | None = None,
         zstd_patch_args: list[str] | None = None,
         runtime_requirements: list[dict] | None = None,
+        upgrade_from: str | None = None,
+        upgrade_to: str | None = None,
     ) -> None:
         """Write JSON metadata (new format)."""
 
@@ -111,6 +120,9 @@ class Meta:
             data["zstd_patch_args"] = zstd_patch_args
         if runtime_requirements:
             data["runtime_requirements"] = runtime_requirements
+        if upgrade_from and upgrade_to:
+            data["upgrade_from"] = upgrade_from
+            data["upgrade_to"] = upgrade_to
 
         p.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
@@ -124,6 +136,8 @@ def stamp_from_game_exe(
     diff_profile: str | None = None,
     zstd_patch_args: list[str] | None = None,
     runtime_requirements: list[dict] | None = None,
+    upgrade_from: str | None = None,
+    upgrade_to: str | None = None,
 ) -> None:
     """Convenience for generator: stamp version from EscapeFromTarkov.exe."""
 
@@ -137,4 +151,6 @@ def stamp_from_game_exe(
         diff_profile=diff_profile,
         zstd_patch_args=zstd_patch_args,
         runtime_requirements=runtime_requirements,
+        upgrade_from=upgrade_from,
+        upgrade_to=upgrade_to,
     )
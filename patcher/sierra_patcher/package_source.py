@@ -21,9 +21,16 @@ class PackageLayout:
     payload_root: Path
     storage_root: Path
     source_type: str
+    package_id: str | None = None
 
 
-def _layout(root: Path, patch_root: Path, storage_root: Path, source_type: str) -> PackageLayout:
+def _layout(
+    root: Path,
+    patch_root: Path,
+    storage_root: Path,
+    source_type: str,
+    package_id: str | None = None,
+) -> PackageLayout:
     legacy = storage_root / "storage.sierra"
     if legacy.is_file():
         raise RuntimeError(
@@ -36,11 +43,14 @@ def _layout(root: Path, patch_root: Path, storage_root: Path, source_type: str)
         payload_root=root / "payloads",
         storage_root=storage_root,
         source_type=source_type,
+        package_id=package_id,
     )
 
 
 class LocalPackageSource:
-    def prepare(self, on_progress=None, cancel_event=None) -> PackageLayout:
+    def prepare(self, on_progress=None, cancel_event=None, path_filter=None) -> PackageLayout:
+        # A local package is already complete on disk; ``path_filter`` only
+        # narrows what remote sources fetch.
         root = Path(WORKING_DIR)
         return _layout(
             root,
@@ -90,6 +100,7 @@ class WebPackageSource:
         self,
         on_progress: Callable[[str, int, int, str], None] | None = None,
         cancel_event=None,
+        path_filter: Callable[[Path], bool] | None = None,
     ) -> PackageLayout:
         materialized: MaterializedPackage = materialize_web_package(
             self.package_id,
@@ -98,12 +109,14 @@ class WebPackageSource:
             materialize_workers=self.materialize_workers,
             on_progress=on_progress,
             cancel_event=cancel_event,
+            path_filter=path_filter,
         )
         return _layout(
             materialized.root,
             materialized.patch_root,
             materialized.storage_root,
             "web",
+            self.package_id,
         )
 
 
@@ -114,17 +127,47 @@ class ArchivedSnapshotSource:
         cache_root: str | Path,
         *,
         materialize_workers: int = DEFAULT_MATERIALIZE_WORKERS,
+        verify_objects_first: bool = False,
+        package_id: str | None = None,
     ):
         self.snapshot_root = Path(snapshot_root)
         self.cache_root = Path(cache_root)
         self.materialize_workers = materialize_workers
+        self.verify_objects_first = verify_objects_first
+        self.package_id = package_id
+
+    def prepare_storage(
+        self,
+        on_progress: Callable[[str, int, int, str], None] | None = None,
+        cancel_event=None,
+    ) -> Path:
+        """Verify and rebuild only the snapshot's ``storage/`` tree.
+
+        Lets the installer check the destination before reading the multi-GB
+        patch and payload objects from a slow USB or network snapshot.
+        """
+
+        from .archived_snapshot import materialize_archived_snapshot
+
+        materialized: MaterializedPackage = materialize_archived_snapshot(
+            self.snapshot_root,
+            self.cache_root,
+            materialize_workers=self.materialize_workers,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+            path_filter=is_storage_path,
+            verify_objects_first=self.verify_objects_first,
+            package_id=self.package_id,
+        )
+        return materialized.storage_root
 
     def prepare(
         self,
         on_progress: Callable[[str, int, int, str], None] | None = None,
         cancel_event=None,
+        path_filter: Callable[[Path], bool] | None = None,
     ) -> PackageLayout:
-        from .archived_snapshot import materialize_archived_snapshot
+        from .archived_snapshot import materialize_archived_snapshot, read_archived_snapshot
 
         materialized: MaterializedPackage = materialize_archived_snapshot(
             self.snapshot_root,
@@ -132,10 +175,14 @@ class ArchivedSnapshotSource:
             materialize_workers=self.materialize_workers,
             on_progress=on_progress,
             cancel_event=cancel_event,
+            path_filter=path_filter,
+            verify_objects_first=self.verify_objects_first,
+            package_id=self.package_id,
         )
         return _layout(
             materialized.root,
             materialized.patch_root,
             materialized.storage_root,
             "archived_snapshot",
+            read_archived_snapshot(self.snapshot_root, self.package_id).package_id,
         )
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable
 
+from .delta_references import package_delta_references
 from .paths import PATCH_read_DIR, ZSTD_EXE
 from .proc import Cancelled, run_quiet
 from .zstd_patch import (
@@ -139,32 +140,38 @@ def _apply_single_detailed(
     dest_dir: Path,
     patch_root: Path,
     cancel_event=None,
+    reference: str | None = None,
 ) -> PatchAttemptResult:
     if cancel_event is not None and cancel_event.is_set():
         raise Cancelled()
 
     relative = patch_file.relative_to(patch_root).with_suffix("")
     relative_text = relative.as_posix()
-    old_file = dest_dir / relative
+    # ``reference`` is the Live path a cross-path delta was made from
+    # (delta_references.json); the patch then creates ``relative``.
+    target_file = dest_dir / relative
+    old_file = dest_dir / reference if reference else target_file
 
     if not os.path.exists(_python_io_path(old_file)):
         return _failure(
             patch_file,
             relative_text,
             "MISSING_SOURCE",
-            "required Live/source file does not exist in the selected destination",
+            "required Live/source file does not exist in the selected destination"
+            + (f": {reference}" if reference else ""),
         )
 
     needs_stage = (
         _external_path_is_long(old_file)
         or _external_path_is_long(patch_file)
-        or _external_path_is_long(old_file.with_suffix(old_file.suffix + ".new"))
+        or _external_path_is_long(target_file.with_suffix(target_file.suffix + ".new"))
     )
 
     if not needs_stage:
-        tmp = old_file.with_suffix(old_file.suffix + ".new")
+        tmp = target_file.with_suffix(target_file.suffix + ".new")
         _remove_file(tmp)
         try:
+            os.makedirs(_python_io_path(target_file.parent), exist_ok=True)
             try:
                 run_quiet(
                     [
@@ -203,7 +210,7 @@ def _apply_single_detailed(
                 )
 
             try:
-                os.replace(_python_io_path(tmp), _python_io_path(old_file))
+                os.replace(_python_io_path(tmp), _python_io_path(target_file))
             except OSError as exc:
                 return _failure(
                     patch_file,
@@ -233,6 +240,7 @@ def _apply_single_detailed(
 
     stage_dir: str | None = None
     try:
+        os.makedirs(_python_io_path(target_file.parent), exist_ok=True)
         stage_dir = tempfile.mkdtemp(prefix="sierra_apply_", dir=str(dest_dir))
         staged_output = os.path.join(stage_dir, "patched.out")
         source_for_zstd = _stage_external_input(old_file, stage_dir, "source.bin")
@@ -276,7 +284,7 @@ def _apply_single_detailed(
             )
 
         try:
-            _replace_file(staged_output, old_file)
+            _replace_file(staged_output, target_file)
         except OSError as exc:
             return _failure(
                 patch_file,
@@ -360,6 +368,7 @@ def _run_attempt_batch(
     abort_event = threading.Event()
     fatal_lock = threading.Lock()
     fatal_seen = 0
+    references = package_delta_references(patch_root)
 
     def guarded_apply(patch_file: Path) -> PatchAttemptResult | None:
         nonlocal fatal_seen
@@ -368,7 +377,13 @@ def _run_attempt_batch(
 
         # Resolved from module globals on purpose: gui_resilient replaces
         # _apply_single_detailed to skip volatile runtime files.
-        result = _apply_single_detailed(patch_file, destination, patch_root, cancel_event)
+        result = _apply_single_detailed(
+            patch_file,
+            destination,
+            patch_root,
+            cancel_event,
+            references.get(patch_file.relative_to(patch_root).with_suffix("").as_posix()),
+        )
 
         if not result.ok and result.code in FATAL_SOURCE_FAILURE_CODES:
             with fatal_lock:
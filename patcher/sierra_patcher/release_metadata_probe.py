@@ -5,6 +5,7 @@ import json
 from pathlib import Path
 
 from .archived_snapshot import read_archived_snapshot
+from .manifest_index import ManifestIndex
 from .web_download import (
     DownloadError,
     _download_objects,
@@ -75,15 +76,20 @@ def probe_archived_live_version(snapshot_root: str | Path) -> str | None:
     """Read metadata.info directly from an Archived snapshot object store."""
 
     info = read_archived_snapshot(snapshot_root)
-    manifest = json.loads(info.manifest_path.read_text(encoding="utf-8"))
-    metadata_entry = next(
-        (
-            item
-            for item in manifest.get("files", [])
-            if isinstance(item, dict) and item.get("path") == _METADATA_PATH
-        ),
-        None,
-    )
+    index = ManifestIndex.for_manifest(info.manifest_path)
+    if index is not None:
+        with index:
+            metadata_entry = index.lookup(_METADATA_PATH)
+    else:
+        manifest = json.loads(info.manifest_path.read_text(encoding="utf-8"))
+        metadata_entry = next(
+            (
+                item
+                for item in manifest.get("files", [])
+                if isinstance(item, dict) and item.get("path") == _METADATA_PATH
+            ),
+            None,
+        )
     if metadata_entry is None:
         raise DownloadError(f"archived snapshot does not contain {_METADATA_PATH}")
 
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from .delta_references import load_delta_references
+from .hybrid_payload import SOLID_DIR, extract_solid_member, payload_fanout_sources, solid_member_paths
+from .hygiene import is_package_excluded
+from .paths import ZSTD_EXE
+from .proc import Cancelled, run_quiet
+from .source_integrity import (
+    _load_source_hash_manifest,
+    _safe_relative_path,
+    _sha256_file,
+    _valid_sha256,
+)
+from .zstd_patch import _called_process_detail, _python_io_path, _replace_file, _stage_external_input
+
+
+# Per-file SHA-256 of the finished target tree, written beside
+# source_hashes.json at generation time. It lets an installed folder be
+# checked later and only the damaged files rebuilt: payload targets from
+# their full payload, delta targets from a matching Live source, and
+# untouched files by copying them from Live.
+TARGET_HASHES_FILENAME = "target_hashes.json"
+TARGET_HASHES_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class DamagedFile:
+    path: str
+    reason: str  # "missing", "size" or "sha256"
+    expected_sha256: str
+
+
+def _raise_if_cancelled(cancel_event) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise Cancelled()
+
+
+def _run_pool(items: list, work, *, workers: int, phase: str, verb: str, on_progress, cancel_event) -> list:
+    results = []
+    if not items:
+        return results
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(int(workers), len(items), 64))) as executor:
+        futures = {executor.submit(work, item): item for item in items}
+        for future in as_completed(futures):
+            _raise_if_cancelled(cancel_event)
+            try:
+                results.append(future.result())
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                raise
+            completed += 1
+            if on_progress is not None:
+                on_progress(phase, completed, len(items), f"{verb} {completed}/{len(items)} files")
+    return results
+
+
+def build_target_hash_manifest(
+    target_root: str | Path,
+    storage_root: str | Path,
+    *,
+    workers: int = 8,
+    on_progress=None,
+    cancel_event=None,
+) -> Path:
+    """Record size and SHA-256 for every file the finished install will hold."""
+
+    target_root_path = Path(target_root)
+    files: list[Path] = []
+    for current, dirnames, filenames in os.walk(_python_io_path(target_root_path)):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = target_root_path / Path(current).relative_to(_python_io_path(target_root_path)) / name
+            if not is_package_excluded(path, target_root_path):
+                files.append(path)
+
+    def hash_target(path: Path) -> dict:
+        _raise_if_cancelled(cancel_event)
+        return {
+            "path": path.relative_to(target_root_path).as_posix(),
+            "size": os.path.getsize(_python_io_path(path)),
+            "sha256": _sha256_file(path, cancel_event),
+        }
+
+    entries = _run_pool(
+        files,
+        hash_target,
+        workers=workers,
+        phase="target-hash:build",
+        verb="hashed",
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+    )
+    entries.sort(key=lambda item: item["path"])
+
+    storage_root_path = Path(storage_root)
+    storage_root_path.mkdir(parents=True, exist_ok=True)
+    output = storage_root_path / TARGET_HASHES_FILENAME
+    temp = output.with_name(output.name + ".tmp")
+    try:
+        temp.write_text(
+            json.dumps(
+                {
+                    "format_version": TARGET_HASHES_FORMAT_VERSION,
+                    "algorithm": "sha256",
+                    "files": entries,
+                },
+                indent=2,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(_python_io_path(temp), _python_io_path(output))
+    finally:
+        temp.unlink(missing_ok=True)
+    return output
+
+
+def load_target_hashes(storage_root: str | Path) -> list[dict] | None:
+    """Return normalized entries, or ``None`` for packages without target hashes."""
+
+    manifest_path = Path(storage_root) / TARGET_HASHES_FILENAME
+    if not os.path.isfile(_python_io_path(manifest_path)):
+        return None
+    try:
+        data = json.loads(Path(_python_io_path(manifest_path)).read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise RuntimeError("target hash manifest is not valid JSON") from exc
+    if data.get("format_version") != TARGET_HASHES_FORMAT_VERSION or data.get("algorithm") != "sha256":
+        raise RuntimeError(
+            f"unsupported target hash manifest version: {data.get('format_version')!r}"
+        )
+    if not isinstance(data.get("files"), list):
+        raise RuntimeError("target hash manifest files must be a list")
+
+    entries = []
+    for item in data["files"]:
+        if not isinstance(item, dict):
+            raise RuntimeError("target hash manifest contains an invalid file entry")
+        relative = _safe_relative_path(str(item.get("path", ""))).as_posix()
+        sha256 = _valid_sha256(item.get("sha256"))
+        try:
+            size = int(item.get("size"))
+        except (TypeError, ValueError):
+            size = -1
+        if sha256 is None or size < 0:
+            raise RuntimeError(f"target hash manifest has an invalid entry for: {relative}")
+        entries.append({"path": relative, "size": size, "sha256": sha256})
+    return entries
+
+
+def find_damaged_files(
+    storage_root: str | Path,
+    destination: str | Path,
+    *,
+    workers: int = 8,
+    on_progress=None,
+    cancel_event=None,
+) -> tuple[int, list[DamagedFile]] | None:
+    """Hash the installed tree against target_hashes.json.
+
+    Digests go through the persistent hash cache, so re-checking a healthy
+    folder only stats it. Returns ``None`` when the package has no target
+    hashes (releases generated before repair support).
+    """
+
+    entries = load_target_hashes(storage_root)
+    if entries is None:
+        return None
+    destination_path = Path(destination)
+
+    def check(entry: dict) -> DamagedFile | None:
+        _raise_if_cancelled(cancel_event)
+        path = destination_path / entry["path"]
+        try:
+            size = os.path.getsize(_python_io_path(path))
+        except OSError:
+            return DamagedFile(entry["path"], "missing", entry["sha256"])
+        if size != entry["size"]:
+            return DamagedFile(entry["path"], "size", entry["sha256"])
+        if _sha256_file(path, cancel_event) != entry["sha256"]:
+            return DamagedFile(entry["path"], "sha256", entry["sha256"])
+        return None
+
+    results = _run_pool(
+        entries,
+        check,
+        workers=workers,
+        phase="repair:scan",
+        verb="checked",
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+    )
+    damaged = sorted((item for item in results if item is not None), key=lambda item: item.path)
+    return len(entries), damaged
+
+
+def _digest(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(_python_io_path(path), "rb") as handle:
+        for block in iter(lambda: handle.read(4 * 1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _zstd_decode(args: list[str], output: str, cancel_event=None) -> None:
+    try:
+        run_quiet(
+            [ZSTD_EXE, "-d", "-f", *args, "-o", output, "-T1", "--long=31"],
+            check=True,
+            capture=True,
+            cancel_event=cancel_event,
+        )
+    except subprocess.CalledProcessError as exc:
+        raise RuntimeError(f"zstd failed: {_called_process_detail(exc)}") from exc
+
+
+def repair_files(
+    damaged: list[DamagedFile],
+    destination: str | Path,
+    *,
+    patch_root: str | Path,
+    payload_root: str | Path,
+    storage_root: str | Path,
+    live_root: str | Path | None,
+    workers: int = 4,
+    on_progress=None,
+    cancel_event=None,
+) -> tuple[list[str], list[tuple[str, str]]]:
+    """Rebuild each damaged file into a temporary file and replace it once verified.
+
+    Returns the repaired paths and ``(path, reason)`` for files that could not
+    be rebuilt, e.g. because the matching Live source is gone.
+    """
+
+    destination_path = Path(destination)
+    patch_root_path = Path(patch_root)
+    payload_root_path = Path(payload_root)
+    live_path = Path(live_root) if live_root else None
+    source_hashes = {
+        entry["path"]: entry["sha256"] for entry in (_load_source_hash_manifest(storage_root) or [])
+    }
+    solid_paths = set(solid_member_paths(payload_root_path))
+    references = load_delta_references(storage_root)
+    fanout_sources = payload_fanout_sources(storage_root)
+
+    def live_file_matching(relative: str, expected: str | None) -> Path | str:
+        if live_path is None:
+            return "no Live game folder to rebuild from"
+        source = live_path / relative
+        if not os.path.isfile(_python_io_path(source)):
+            return "Live file is missing"
+        if expected is None or _sha256_file(source, cancel_event) != expected:
+            return "Live file does not match this release"
+        return source
+
+    def repair(item: DamagedFile) -> tuple[str, str | None]:
+        _raise_if_cancelled(cancel_event)
+        relative = item.path
+        # A fan-out copy is rebuilt from the payload it was copied from.
+        payload_relative = fanout_sources.get(relative, relative)
+        target = destination_path / relative
+        payload = payload_root_path / (payload_relative + ".zst")
+        patch = patch_root_path / (relative + ".zst")
+        os.makedirs(_python_io_path(target.parent), exist_ok=True)
+        stage_dir = tempfile.mkdtemp(prefix="sierra_repair_", dir=os.fspath(destination_path))
+        output = os.path.join(stage_dir, "repaired.out")
+        try:
+            if os.path.isfile(_python_io_path(payload)):
+                _zstd_decode([_stage_external_input(payload, stage_dir, "payload.zst")], output, cancel_event)
+            elif payload_relative in solid_paths:
+                extract_solid_member(payload_root_path, payload_relative, output, cancel_event)
+            elif os.path.isfile(_python_io_path(patch)):
+                reference = references.get(relative, relative)
+                source = live_file_matching(reference, source_hashes.get(reference))
+                if isinstance(source, str):
+                    return relative, source
+                _zstd_decode(
+                    [
+                        "--patch-from",
+                        _stage_external_input(source, stage_dir, "source.bin"),
+                        _stage_external_input(patch, stage_dir, "patch.zst"),
+                    ],
+                    output,
+                    cancel_event,
+                )
+            else:
+                # Not shipped by the package: the install kept the Live file.
+                source = live_file_matching(relative, item.expected_sha256)
+                if isinstance(source, str):
+                    return relative, source
+                shutil.copyfile(_python_io_path(source), _python_io_path(output))
+            _raise_if_cancelled(cancel_event)
+            if _digest(output) != item.expected_sha256:
+                return relative, "rebuilt file does not match target_hashes.json"
+            _replace_file(output, target)
+            return relative, None
+        except Cancelled:
+            raise
+        except Exception as exc:
+            return relative, str(exc)
+        finally:
+            shutil.rmtree(stage_dir, ignore_errors=True)
+
+    results = _run_pool(
+        damaged,
+        repair,
+        workers=workers,
+        phase="repair:apply",
+        verb="repaired",
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+    )
+    repaired = sorted(path for path, error in results if error is None)
+    failed = sorted((path, error) for path, error in results if error is not None)
+    return repaired, failed
+
+
+def package_filter_for(damaged: list[DamagedFile], storage_root: str | Path | None = None):
+    """``path_filter`` that fetches only what could rebuild ``damaged``.
+
+    That is storage/, the damaged files' own patches and payloads (or, for
+    fan-out copies listed in ``storage_root``, the payload they copy), and
+    the (small) solid payload archives, whose members are only known from
+    their index.
+    """
+
+    fanout_sources = payload_fanout_sources(storage_root) if storage_root is not None else {}
+    wanted = set()
+    for item in damaged:
+        wanted.add(f"patchfiles/{item.path}.zst")
+        wanted.add(f"payloads/{fanout_sources.get(item.path, item.path)}.zst")
+
+    def accept(path: Path) -> bool:
+        parts = path.parts
+        return (
+            bool(parts)
+            and (parts[0] == "storage" or parts[:2] == ("payloads", SOLID_DIR) or path.as_posix() in wanted)
+        )
+
+    return accept
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+
+# Optional, local-only acceleration index for repository tooling. It is never
+# part of what gets uploaded to HFS: releases/ and objects/ stay authoritative
+# and every indexed release is checked against its manifest's size/mtime
+# (and, where a stale answer would be unsafe, its SHA-256) before the index
+# answers for it.
+REPOSITORY_INDEX_NAME = "repository_index.sqlite"
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS releases (
+    id TEXT PRIMARY KEY,
+    manifest_size INTEGER NOT NULL,
+    manifest_mtime_ns INTEGER NOT NULL,
+    manifest_sha256 TEXT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    file_count INTEGER NOT NULL,
+    logical_bytes INTEGER NOT NULL,
+    live_version TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    release_id TEXT NOT NULL REFERENCES releases(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (release_id, path)
+);
+CREATE TABLE IF NOT EXISTS file_objects (
+    release_id TEXT NOT NULL REFERENCES releases(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    object_id TEXT NOT NULL,
+    PRIMARY KEY (release_id, path, position)
+);
+CREATE INDEX IF NOT EXISTS file_objects_by_object ON file_objects(object_id);
+CREATE TABLE IF NOT EXISTS objects (
+    id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    ref_count INTEGER NOT NULL
+);
+"""
+
+
+class RepositoryIndexError(RuntimeError):
+    pass
+
+
+def index_path(repository_root: str | Path) -> Path:
+    return Path(repository_root) / REPOSITORY_INDEX_NAME
+
+
+def _manifest_path(repository_root: Path, package_id: str) -> Path:
+    return repository_root / "releases" / package_id / "manifest.json"
+
+
+class RepositoryIndex:
+    """SQLite view of releases, files, objects and reference counts."""
+
+    def __init__(self, repository_root: str | Path, *, create: bool = False):
+        self.root = Path(repository_root).resolve()
+        self.path = index_path(self.root)
+        if not create and not self.path.is_file():
+            raise RepositoryIndexError(f"repository index does not exist: {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30)
+        try:
+            self._db.execute("PRAGMA foreign_keys = ON")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            version = self._db.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, _SCHEMA_VERSION):
+                raise RepositoryIndexError(f"unsupported repository index version: {version}")
+            with self._db:
+                self._db.executescript(_SCHEMA)
+                self._db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        except Exception:
+            self._db.close()
+            raise
+
+    @classmethod
+    def open_existing(cls, repository_root: str | Path) -> RepositoryIndex | None:
+        """Open the index only if the maintainer has created one."""
+        if not index_path(repository_root).is_file():
+            return None
+        try:
+            return cls(repository_root)
+        except (sqlite3.Error, RepositoryIndexError):
+            return None
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> RepositoryIndex:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def is_current(self, package_id: str, *, check_sha256: bool = False) -> bool:
+        """Whether the release's rows still describe its manifest.
+
+        Size and mtime alone can miss a manifest replaced by a copy or
+        restore that kept both; ``check_sha256`` also compares the bytes.
+        """
+        row = self._db.execute(
+            "SELECT manifest_size, manifest_mtime_ns, manifest_sha256 FROM releases WHERE id = ?",
+            (package_id,),
+        ).fetchone()
+        if row is None:
+            return False
+        manifest_path = _manifest_path(self.root, package_id)
+        try:
+            stat = manifest_path.stat()
+            if (stat.st_size, stat.st_mtime_ns) != tuple(row[:2]):
+                return False
+            return not check_sha256 or hashlib.sha256(manifest_path.read_bytes()).hexdigest() == row[2]
+        except OSError:
+            return False
+
+    def release_ids(self) -> list[str]:
+        rows = self._db.execute("SELECT id FROM releases ORDER BY lower(id)").fetchall()
+        return [row[0] for row in rows]
+
+    def record_release(self, package_id: str, metadata: dict | None = None) -> None:
+        """Replace one release's rows from its manifest in a single transaction."""
+        manifest_path = _manifest_path(self.root, package_id)
+        stat = manifest_path.stat()
+        raw = manifest_path.read_bytes()
+        try:
+            manifest = json.loads(raw.decode("utf-8"))
+        except Exception as exc:
+            raise RepositoryIndexError(f"manifest is not valid JSON: {manifest_path}") from exc
+
+        files = []
+        object_rows = []
+        object_sizes: dict[str, int] = {}
+        for entry in manifest.get("files", []):
+            try:
+                path = str(entry["path"])
+                files.append((package_id, path, int(entry["size"]), str(entry["sha256"]).lower()))
+                for position, obj in enumerate(entry["objects"]):
+                    object_id = str(obj["id"]).lower()
+                    object_sizes[object_id] = int(obj["size"])
+                    object_rows.append((package_id, path, position, object_id))
+            except (KeyError, TypeError, ValueError) as exc:
+                raise RepositoryIndexError(
+                    f"manifest entry cannot be indexed in {package_id}: {entry!r}"
+                ) from exc
+
+        live_version = None
+        if isinstance(metadata, dict):
+            live_version = str(metadata.get("version") or "").strip() or None
+
+        with self._db:
+            previous = {
+                row[0]
+                for row in self._db.execute(
+                    "SELECT DISTINCT object_id FROM file_objects WHERE release_id = ?",
+                    (package_id,),
+                )
+            }
+            self._db.execute("DELETE FROM releases WHERE id = ?", (package_id,))
+            self._db.execute(
+                "INSERT INTO releases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    package_id,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    hashlib.sha256(raw).hexdigest(),
+                    int(manifest.get("chunk_size") or 0),
+                    len(files),
+                    sum(item[2] for item in files),
+                    live_version,
+                    None if metadata is None else json.dumps(metadata, ensure_ascii=False),
+                ),
+            )
+            self._db.executemany("INSERT INTO files VALUES (?, ?, ?, ?)", files)
+            self._db.executemany("INSERT INTO file_objects VALUES (?, ?, ?, ?)", object_rows)
+            self._db.executemany(
+                "INSERT INTO objects VALUES (?, ?, 0) ON CONFLICT(id) DO NOTHING",
+                object_sizes.items(),
+            )
+            self._refresh_ref_counts(previous | set(object_sizes))
+
+    def remove_release(self, package_id: str) -> None:
+        with self._db:
+            previous = {
+                row[0]
+                for row in self._db.execute(
+                    "SELECT DISTINCT object_id FROM file_objects WHERE release_id = ?",
+                    (package_id,),
+                )
+            }
+            self._db.execute("DELETE FROM releases WHERE id = ?", (package_id,))
+            self._refresh_ref_counts(previous)
+
+    def _refresh_ref_counts(self, object_ids: set[str]) -> None:
+        rows = [(object_id,) for object_id in object_ids]
+        self._db.executemany(
+            "UPDATE objects SET ref_count = "
+            "(SELECT COUNT(*) FROM file_objects WHERE object_id = objects.id) WHERE id = ?",
+            rows,
+        )
+        self._db.execute("DELETE FROM objects WHERE ref_count = 0")
+
+    def release_metadata(self, package_id: str) -> dict | None:
+        row = self._db.execute(
+            "SELECT metadata FROM releases WHERE id = ?", (package_id,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def release_entries(self, package_id: str) -> list[dict]:
+        """Rebuild the manifest ``files`` list for one release in path order."""
+        objects_by_path: dict[str, list[dict]] = {}
+        for path, object_id, size in self._db.execute(
+            "SELECT f.path, f.object_id, o.size FROM file_objects f "
+            "JOIN objects o ON o.id = f.object_id "
+            "WHERE f.release_id = ? ORDER BY f.path, f.position",
+            (package_id,),
+        ):
+            objects_by_path.setdefault(path, []).append({"id": object_id, "size": size})
+        return [
+            {"path": path, "size": size, "sha256": sha256, "objects": objects_by_path.get(path, [])}
+            for path, size, sha256 in self._db.execute(
+                "SELECT path, size, sha256 FROM files WHERE release_id = ? ORDER BY path",
+                (package_id,),
+            )
+        ]
+
+    def iter_live_object_ids(self) -> Iterator[str]:
+        for (object_id,) in self._db.execute("SELECT id FROM objects ORDER BY id"):
+            yield object_id
+
+    def object_ref_count(self, object_id: str) -> int:
+        row = self._db.execute(
+            "SELECT ref_count FROM objects WHERE id = ?", (object_id,)
+        ).fetchone()
+        return 0 if row is None else int(row[0])
+
+
+def record_published_release(repository_root: str | Path, package_id: str, metadata: dict | None) -> None:
+    """Update an existing index after publish; repositories without one are left alone."""
+    index = RepositoryIndex.open_existing(repository_root)
+    if index is None:
+        return
+    with index:
+        index.record_release(package_id, metadata)
+
+
+def metadata_from_file(path: str | Path) -> dict | None:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
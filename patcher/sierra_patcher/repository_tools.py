@@ -1,21 +1,31 @@
 from __future__ import annotations
 
+import bisect
 import hashlib
 import json
 import os
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 from typing import Callable
 
+from .manifest_index import ManifestIndex, write_manifest_index
 from .package_format import HYBRID_PACKAGE_DIRS
+from .repository_index import RepositoryIndex, index_path
 from .web_catalog import CatalogRelease, build_catalog
 from .web_delivery import _promote_object
+from .web_download import SUPPORTED_MANIFEST_VERSIONS
 
 
 METADATA_LOGICAL_PATH = "storage/metadata.info"
 _IO_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_VERIFY_WORKERS = min(8, max(2, os.cpu_count() or 4))
+# Objects and temp files younger than this are never collected: a publish or
+# metadata edit may be writing them before its manifest reaches releases/.
+DEFAULT_GC_GRACE_SECONDS = 60 * 60
+_DIGEST_TAIL = 31
 
 
 class RepositoryToolError(RuntimeError):
@@ -30,6 +40,22 @@ class ReleaseVerification:
     total_logical_bytes: int
 
 
+@dataclass(frozen=True)
+class GarbageCollectionReport:
+    release_count: int
+    live_object_count: int
+    unreferenced_object_count: int
+    unreferenced_bytes: int
+    abandoned_temp_count: int
+    abandoned_temp_bytes: int
+    dry_run: bool
+    quarantine_root: Path | None = None
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        return self.unreferenced_bytes + self.abandoned_temp_bytes
+
+
 def _raise_if_cancelled(cancel_event) -> None:
     if cancel_event is not None and cancel_event.is_set():
         raise RepositoryToolError("repository operation cancelled")
@@ -110,7 +136,7 @@ def load_manifest(repository_root: str | Path, package_id: str) -> dict:
         manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
     except Exception as exc:
         raise RepositoryToolError("release manifest is not valid JSON") from exc
-    if manifest.get("format_version") != 1:
+    if manifest.get("format_version") not in SUPPORTED_MANIFEST_VERSIONS:
         raise RepositoryToolError(
             f"unsupported manifest format: {manifest.get('format_version')!r}"
         )
@@ -146,7 +172,9 @@ def _read_entry_bytes(
     if not isinstance(objects, list):
         raise RepositoryToolError(f"invalid object list for {logical_path}")
 
-    output = bytearray()
+    chunks: list[bytes] = []
+    file_hash = hashlib.sha256()
+    file_bytes = 0
     for obj in objects:
         _raise_if_cancelled(cancel_event)
         if not isinstance(obj, dict):
@@ -155,28 +183,63 @@ def _read_entry_bytes(
         object_size = obj.get("size")
         if not _valid_object_id(object_id) or not isinstance(object_size, int) or object_size < 0:
             raise RepositoryToolError(f"invalid object metadata for {logical_path}")
+        if file_bytes + object_size > expected_size:
+            raise RepositoryToolError(f"logical file size mismatch: {logical_path}")
         object_path = repository_root / "objects" / object_id[:2] / object_id
         if not object_path.is_file():
             raise RepositoryToolError(f"missing repository object: {object_id}")
-        data = object_path.read_bytes()
-        if len(data) != object_size:
+        object_hash = hashlib.sha256()
+        object_bytes = 0
+        with object_path.open("rb") as stream:
+            while True:
+                _raise_if_cancelled(cancel_event)
+                block = stream.read(min(_IO_BLOCK_SIZE, object_size - object_bytes + 1))
+                if not block:
+                    break
+                object_bytes += len(block)
+                if object_bytes > object_size:
+                    break
+                object_hash.update(block)
+                file_hash.update(block)
+                chunks.append(block)
+        if object_bytes != object_size:
             raise RepositoryToolError(f"object size mismatch: {object_id}")
-        if hashlib.sha256(data).hexdigest() != object_id:
+        if object_hash.hexdigest() != object_id:
             raise RepositoryToolError(f"object SHA-256 mismatch: {object_id}")
-        output.extend(data)
+        file_bytes += object_bytes
 
-    payload = bytes(output)
-    if len(payload) != expected_size:
+    if file_bytes != expected_size:
         raise RepositoryToolError(f"logical file size mismatch: {logical_path}")
-    if hashlib.sha256(payload).hexdigest() != expected_hash:
+    if file_hash.hexdigest() != expected_hash:
         raise RepositoryToolError(f"logical file SHA-256 mismatch: {logical_path}")
+    payload = b"".join(chunks)
     return payload
 
 
+def _indexed_entry(root: Path, package_id: str, logical_path: str) -> dict | None:
+    index = ManifestIndex.for_manifest(root / "releases" / package_id / "manifest.json")
+    if index is None:
+        return None
+    with index:
+        if index.package_id != package_id:
+            return None
+        return index.lookup(logical_path)
+
+
 def load_release_metadata(repository_root: str | Path, package_id: str) -> dict:
     root = Path(repository_root).resolve()
-    manifest = load_manifest(root, package_id)
-    payload = _read_entry_bytes(root, _entry_for_path(manifest, METADATA_LOGICAL_PATH))
+    package_id = _safe_release_id(package_id)
+    index = RepositoryIndex.open_existing(root)
+    if index is not None:
+        with index:
+            if index.is_current(package_id):
+                metadata = index.release_metadata(package_id)
+                if metadata is not None:
+                    return metadata
+    entry = _indexed_entry(root, package_id, METADATA_LOGICAL_PATH)
+    if entry is None:
+        entry = _entry_for_path(load_manifest(root, package_id), METADATA_LOGICAL_PATH)
+    payload = _read_entry_bytes(root, entry)
     try:
         metadata = json.loads(payload.decode("utf-8"))
     except Exception as exc:
@@ -246,101 +309,609 @@ def update_release_metadata(
 
     manifest_path = root / "releases" / package_id / "manifest.json"
     _atomic_json(manifest_path, manifest)
+    write_manifest_index(manifest_path)
+    index = RepositoryIndex.open_existing(root)
+    if index is not None:
+        with index:
+            index.record_release(package_id, metadata)
     return object_id
 
 
+def sync_repository_index(
+    repository_root: str | Path,
+    *,
+    create: bool = True,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    cancel_event=None,
+) -> list[str]:
+    """Bring the SQLite repository index up to date with releases/.
+
+    Only releases whose manifest size or mtime changed are re-read; vanished
+    releases are dropped. Returns the IDs that were (re)indexed.
+    """
+    root = Path(repository_root).resolve()
+    if not create and not index_path(root).is_file():
+        return []
+    releases = list_releases(root)
+    refreshed: list[str] = []
+    with RepositoryIndex(root, create=True) as index:
+        for stale in set(index.release_ids()) - set(releases):
+            index.remove_release(stale)
+        for position, release in enumerate(releases, 1):
+            _raise_if_cancelled(cancel_event)
+            if not index.is_current(release):
+                entry = _indexed_entry(root, release, METADATA_LOGICAL_PATH)
+                manifest = load_manifest(root, release) if entry is None else None
+                try:
+                    if entry is None:
+                        entry = _entry_for_path(manifest, METADATA_LOGICAL_PATH)
+                    payload = _read_entry_bytes(root, entry, cancel_event=cancel_event)
+                    metadata = json.loads(payload.decode("utf-8"))
+                    if not isinstance(metadata, dict):
+                        metadata = None
+                except (RepositoryToolError, ValueError):
+                    metadata = None
+                index.record_release(release, metadata)
+                refreshed.append(release)
+            if on_progress:
+                on_progress(position, len(releases), f"releases/{release}")
+    return refreshed
+
+
 def rebuild_catalog(repository_root: str | Path) -> tuple[Path, list[str]]:
     root = Path(repository_root).resolve()
     root.mkdir(parents=True, exist_ok=True)
+    # With an index present this turns per-release metadata reconstruction
+    # into a lookup for every release whose manifest is unchanged.
+    sync_repository_index(root, create=False)
     releases = list_releases(root)
     catalog_releases: list[CatalogRelease] = []
     for release in releases:
+        upgrade_from = upgrade_to = None
         try:
             metadata = load_release_metadata(root, release)
             required_live_version = str(metadata.get("version") or "").strip() or None
+            upgrade_from = str(metadata.get("upgrade_from") or "").strip() or None
+            upgrade_to = str(metadata.get("upgrade_to") or "").strip() or None
         except RepositoryToolError:
             required_live_version = None
-        catalog_releases.append(CatalogRelease(release, required_live_version))
+        catalog_releases.append(
+            CatalogRelease(
+                release,
+                required_live_version,
+                upgrade_from=upgrade_from,
+                upgrade_to=upgrade_to,
+            )
+        )
     catalog_path = root / "catalog.json"
     _atomic_json(catalog_path, build_catalog(catalog_releases))
     return catalog_path, releases
 
 
+@dataclass(frozen=True)
+class VerificationIssue:
+    package_id: str
+    path: str
+    object_id: str | None
+    problem: str
+    detail: str
+
+    def to_dict(self) -> dict:
+        return {
+            "package_id": self.package_id,
+            "path": self.path,
+            "object_id": self.object_id,
+            "problem": self.problem,
+            "detail": self.detail,
+        }
+
+
+@dataclass(frozen=True)
+class RepositoryVerificationReport:
+    releases: tuple[ReleaseVerification, ...]
+    unique_object_count: int
+    unique_object_bytes: int
+    issues: tuple[VerificationIssue, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def to_dict(self) -> dict:
+        return {
+            "format_version": 1,
+            "ok": self.ok,
+            "unique_objects": self.unique_object_count,
+            "unique_object_bytes": self.unique_object_bytes,
+            "releases": [
+                {
+                    "package_id": release.package_id,
+                    "files": release.file_count,
+                    "object_references": release.object_references,
+                    "logical_bytes": release.total_logical_bytes,
+                    "ok": not any(issue.package_id == release.package_id for issue in self.issues),
+                }
+                for release in self.releases
+            ],
+            "issues": [issue.to_dict() for issue in self.issues],
+        }
+
+
+_VERIFICATION_PROBLEMS = {
+    "manifest": "invalid manifest",
+    "missing_object": "missing object",
+    "unreadable_object": "unreadable object",
+    "object_size": "object size mismatch",
+    "object_sha256": "object SHA-256 mismatch",
+    "file_size": "logical file size mismatch",
+    "file_sha256": "logical file SHA-256 mismatch",
+}
+
+
+def _hash_stream_into(paths: list[Path], cancel_event) -> tuple[int, str]:
+    digest = hashlib.sha256()
+    total = 0
+    for path in paths:
+        with path.open("rb") as stream:
+            while True:
+                _raise_if_cancelled(cancel_event)
+                block = stream.read(_IO_BLOCK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                total += len(block)
+    return total, digest.hexdigest()
+
+
+def _parse_release_entries(
+    package_id: str,
+    manifest: dict,
+    objects: dict[str, int],
+    issues: list[VerificationIssue],
+) -> list[tuple[str, int, str, list[str]]]:
+    entries: list[tuple[str, int, str, list[str]]] = []
+    for index, entry in enumerate(manifest.get("files", []), 1):
+        logical_path = str(entry.get("path", "")) if isinstance(entry, dict) else ""
+        try:
+            if not isinstance(entry, dict):
+                raise RepositoryToolError(f"manifest file entry {index} is invalid")
+            _safe_logical_path(logical_path)
+            expected_size = entry.get("size")
+            expected_hash = str(entry.get("sha256", "")).lower()
+            object_list = entry.get("objects")
+            if not isinstance(expected_size, int) or expected_size < 0:
+                raise RepositoryToolError(f"invalid logical size: {logical_path}")
+            if not _valid_object_id(expected_hash):
+                raise RepositoryToolError(f"invalid logical SHA-256: {logical_path}")
+            if not isinstance(object_list, list):
+                raise RepositoryToolError(f"invalid object list: {logical_path}")
+            object_ids: list[str] = []
+            for obj in object_list:
+                if not isinstance(obj, dict):
+                    raise RepositoryToolError(f"invalid object entry: {logical_path}")
+                object_id = str(obj.get("id", "")).lower()
+                object_size = obj.get("size")
+                if (
+                    not _valid_object_id(object_id)
+                    or not isinstance(object_size, int)
+                    or object_size < 0
+                ):
+                    raise RepositoryToolError(f"invalid object metadata: {logical_path}")
+                if objects.setdefault(object_id, object_size) != object_size:
+                    raise RepositoryToolError(
+                        f"object {object_id} is listed with conflicting sizes"
+                    )
+                object_ids.append(object_id)
+        except RepositoryToolError as exc:
+            issues.append(VerificationIssue(package_id, logical_path, None, "manifest", str(exc)))
+            continue
+        entries.append((logical_path, expected_size, expected_hash, object_ids))
+    return entries
+
+
+def verify_releases(
+    repository_root: str | Path,
+    package_ids: list[str] | None = None,
+    *,
+    workers: int = DEFAULT_VERIFY_WORKERS,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    cancel_event=None,
+) -> RepositoryVerificationReport:
+    """Verify one or more releases, reading each unique object once.
+
+    Objects shared by several files or releases are hashed a single time in a
+    thread pool. A logical file backed by one object is proven by that object
+    hash; multi-object files are re-streamed only after all their objects
+    passed. Problems are collected into the report instead of stopping at the
+    first one.
+    """
+    root = Path(repository_root).resolve()
+    release_ids = list_releases(root) if package_ids is None else [
+        _safe_release_id(package_id) for package_id in package_ids
+    ]
+    issues: list[VerificationIssue] = []
+    objects: dict[str, int] = {}
+    releases: list[tuple[str, list[tuple[str, int, str, list[str]]]]] = []
+
+    index = RepositoryIndex.open_existing(root)
+    try:
+        for package_id in release_ids:
+            _raise_if_cancelled(cancel_event)
+            if index is not None and index.is_current(package_id, check_sha256=True):
+                # Plan from indexed rows; the manifest is unchanged since then.
+                manifest = {"files": index.release_entries(package_id)}
+            else:
+                try:
+                    manifest = load_manifest(root, package_id)
+                except RepositoryToolError as exc:
+                    issues.append(VerificationIssue(package_id, "", None, "manifest", str(exc)))
+                    releases.append((package_id, []))
+                    continue
+            releases.append(
+                (package_id, _parse_release_entries(package_id, manifest, objects, issues))
+            )
+            del manifest
+    finally:
+        if index is not None:
+            index.close()
+
+    def object_path(object_id: str) -> Path:
+        return root / "objects" / object_id[:2] / object_id
+
+    def check_object(object_id: str) -> str | None:
+        path = object_path(object_id)
+        if not path.is_file():
+            return "missing_object"
+        size, digest = _hash_stream_into([path], cancel_event)
+        if size != objects[object_id]:
+            return "object_size"
+        if digest != object_id:
+            return "object_sha256"
+        return None
+
+    max_workers = max(1, min(int(workers or DEFAULT_VERIFY_WORKERS), 32))
+    object_failures: dict[str, tuple[str, str]] = {}
+    steps_total = len(objects) + sum(len(entries) for _package_id, entries in releases)
+    steps_done = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(check_object, object_id): object_id for object_id in objects}
+        try:
+            for future in as_completed(futures):
+                _raise_if_cancelled(cancel_event)
+                object_id = futures[future]
+                try:
+                    problem = future.result()
+                except OSError as exc:
+                    object_failures[object_id] = ("unreadable_object", str(exc))
+                else:
+                    if problem:
+                        object_failures[object_id] = (problem, f"objects/{object_id[:2]}/{object_id}")
+                steps_done += 1
+                if on_progress:
+                    on_progress(steps_done, max(steps_total, 1), f"objects/{object_id[:2]}/{object_id}")
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        def check_file(paths: list[Path]) -> tuple[int, str]:
+            return _hash_stream_into(paths, cancel_event)
+
+        file_futures = {}
+        results: list[ReleaseVerification] = []
+        for package_id, entries in releases:
+            object_references = 0
+            logical_bytes = 0
+            for logical_path, expected_size, expected_hash, object_ids in entries:
+                object_references += len(object_ids)
+                logical_bytes += expected_size
+                broken = [object_id for object_id in object_ids if object_id in object_failures]
+                for object_id in broken:
+                    problem, detail = object_failures[object_id]
+                    issues.append(
+                        VerificationIssue(package_id, logical_path, object_id, problem, detail)
+                    )
+                if broken:
+                    continue
+                declared = sum(objects[object_id] for object_id in object_ids)
+                if declared != expected_size:
+                    issues.append(
+                        VerificationIssue(
+                            package_id,
+                            logical_path,
+                            None,
+                            "file_size",
+                            f"objects add up to {declared} bytes, manifest says {expected_size}",
+                        )
+                    )
+                elif len(object_ids) == 1:
+                    if object_ids[0] != expected_hash:
+                        issues.append(
+                            VerificationIssue(
+                                package_id,
+                                logical_path,
+                                None,
+                                "file_sha256",
+                                "single-object file hash differs from its object ID",
+                            )
+                        )
+                else:
+                    future = pool.submit(check_file, [object_path(object_id) for object_id in object_ids])
+                    file_futures[future] = (package_id, logical_path, expected_size, expected_hash)
+                    continue
+                steps_done += 1
+                if on_progress:
+                    on_progress(steps_done, max(steps_total, 1), logical_path)
+            results.append(
+                ReleaseVerification(
+                    package_id=package_id,
+                    file_count=len(entries),
+                    object_references=object_references,
+                    total_logical_bytes=logical_bytes,
+                )
+            )
+
+        try:
+            for future in as_completed(file_futures):
+                _raise_if_cancelled(cancel_event)
+                package_id, logical_path, expected_size, expected_hash = file_futures[future]
+                try:
+                    size, digest = future.result()
+                except OSError as exc:
+                    issues.append(
+                        VerificationIssue(package_id, logical_path, None, "unreadable_object", str(exc))
+                    )
+                else:
+                    if size != expected_size:
+                        issues.append(
+                            VerificationIssue(
+                                package_id, logical_path, None, "file_size", f"read {size} bytes"
+                            )
+                        )
+                    elif digest != expected_hash:
+                        issues.append(
+                            VerificationIssue(
+                                package_id, logical_path, None, "file_sha256", f"actual {digest}"
+                            )
+                        )
+                steps_done += 1
+                if on_progress:
+                    on_progress(steps_done, max(steps_total, 1), logical_path)
+        except BaseException:
+            for future in file_futures:
+                future.cancel()
+            raise
+
+    return RepositoryVerificationReport(
+        releases=tuple(results),
+        unique_object_count=len(objects),
+        unique_object_bytes=sum(objects.values()),
+        issues=tuple(issues),
+    )
+
+
 def verify_release(
     repository_root: str | Path,
     package_id: str,
     *,
+    workers: int = DEFAULT_VERIFY_WORKERS,
     on_progress: Callable[[int, int, str], None] | None = None,
     cancel_event=None,
 ) -> ReleaseVerification:
-    root = Path(repository_root).resolve()
     package_id = _safe_release_id(package_id)
-    manifest = load_manifest(root, package_id)
-    files = manifest.get("files", [])
-    total_files = len(files)
-    object_references = 0
-    logical_bytes = 0
+    report = verify_releases(
+        repository_root,
+        [package_id],
+        workers=workers,
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+    )
+    if report.issues:
+        issue = report.issues[0]
+        subject = issue.object_id or issue.path or package_id
+        label = _VERIFICATION_PROBLEMS.get(issue.problem, issue.problem)
+        raise RepositoryToolError(f"{label}: {subject} ({issue.detail})")
+    return report.releases[0]
+
+
+class _LiveObjectSet:
+    """Compact set of SHA-256 object IDs used by the GC mark phase.
+
+    IDs are stored as raw 32-byte digests split into 256 buckets by their
+    first byte, so each bucket keeps a sorted run of fixed-width 31-byte tails.
+    New references are appended to a pending run and merged once it grows,
+    keeping memory close to 31 bytes per unique live object.
+    """
+
+    def __init__(self) -> None:
+        self._sorted = [bytearray() for _ in range(256)]
+        self._pending = [bytearray() for _ in range(256)]
+
+    def add(self, object_id: str) -> None:
+        digest = bytes.fromhex(object_id)
+        bucket = digest[0]
+        pending = self._pending[bucket]
+        pending += digest[1:]
+        if len(pending) >= max(len(self._sorted[bucket]), 64 * 1024 * _DIGEST_TAIL):
+            self._merge(bucket)
+
+    def _merge(self, bucket: int) -> None:
+        pending = self._pending[bucket]
+        if not pending:
+            return
+        merged = self._sorted[bucket] + pending
+        tails = sorted(
+            {bytes(merged[i : i + _DIGEST_TAIL]) for i in range(0, len(merged), _DIGEST_TAIL)}
+        )
+        self._sorted[bucket] = bytearray(b"".join(tails))
+        self._pending[bucket] = bytearray()
+
+    def freeze(self) -> None:
+        for bucket in range(256):
+            self._merge(bucket)
+
+    def __len__(self) -> int:
+        return sum(len(run) + len(pending) for run, pending in zip(self._sorted, self._pending)) // _DIGEST_TAIL
+
+    def __contains__(self, object_id: str) -> bool:
+        digest = bytes.fromhex(object_id)
+        run = self._sorted[digest[0]]
+        tail = digest[1:]
+        count = len(run) // _DIGEST_TAIL
+        index = bisect.bisect_left(
+            range(count),
+            tail,
+            key=lambda item: run[item * _DIGEST_TAIL : (item + 1) * _DIGEST_TAIL],
+        )
+        return index < count and run[index * _DIGEST_TAIL : (index + 1) * _DIGEST_TAIL] == tail
 
-    for index, entry in enumerate(files, 1):
+
+def _mark_live_objects(
+    root: Path,
+    releases: list[str],
+    *,
+    on_progress: Callable[[int, int, str], None] | None,
+    cancel_event,
+) -> _LiveObjectSet:
+    live = _LiveObjectSet()
+    for index, release in enumerate(releases, 1):
         _raise_if_cancelled(cancel_event)
-        if not isinstance(entry, dict):
-            raise RepositoryToolError(f"manifest file entry {index} is invalid")
-        logical_path = str(entry.get("path", ""))
-        _safe_logical_path(logical_path)
-        expected_size = entry.get("size")
-        expected_hash = str(entry.get("sha256", "")).lower()
-        objects = entry.get("objects")
-        if not isinstance(expected_size, int) or expected_size < 0:
-            raise RepositoryToolError(f"invalid logical size: {logical_path}")
-        if not _valid_object_id(expected_hash):
-            raise RepositoryToolError(f"invalid logical SHA-256: {logical_path}")
-        if not isinstance(objects, list):
-            raise RepositoryToolError(f"invalid object list: {logical_path}")
-
-        file_hash = hashlib.sha256()
-        file_bytes = 0
-        for obj in objects:
-            _raise_if_cancelled(cancel_event)
-            if not isinstance(obj, dict):
-                raise RepositoryToolError(f"invalid object entry: {logical_path}")
-            object_id = str(obj.get("id", "")).lower()
-            object_size = obj.get("size")
-            if not _valid_object_id(object_id) or not isinstance(object_size, int) or object_size < 0:
-                raise RepositoryToolError(f"invalid object metadata: {logical_path}")
-            object_path = root / "objects" / object_id[:2] / object_id
-            if not object_path.is_file():
-                raise RepositoryToolError(f"missing object {object_id} for {logical_path}")
-
-            object_hash = hashlib.sha256()
-            object_bytes = 0
-            with object_path.open("rb") as stream:
-                while True:
-                    _raise_if_cancelled(cancel_event)
-                    block = stream.read(_IO_BLOCK_SIZE)
-                    if not block:
-                        break
-                    object_hash.update(block)
-                    file_hash.update(block)
-                    object_bytes += len(block)
-                    file_bytes += len(block)
-
-            if object_bytes != object_size:
-                raise RepositoryToolError(f"object size mismatch: {object_id}")
-            if object_hash.hexdigest() != object_id:
-                raise RepositoryToolError(f"object SHA-256 mismatch: {object_id}")
-            object_references += 1
-
-        if file_bytes != expected_size:
-            raise RepositoryToolError(f"logical file size mismatch: {logical_path}")
-        if file_hash.hexdigest() != expected_hash:
-            raise RepositoryToolError(f"logical file SHA-256 mismatch: {logical_path}")
-        logical_bytes += file_bytes
+        # One manifest at a time: the live set is the only state that grows.
+        manifest = load_manifest(root, release)
+        for entry in manifest["files"]:
+            if not isinstance(entry, dict) or not isinstance(entry.get("objects"), list):
+                raise RepositoryToolError(f"release {release} has an invalid file entry")
+            for obj in entry["objects"]:
+                object_id = str(obj.get("id", "")).lower() if isinstance(obj, dict) else ""
+                if not _valid_object_id(object_id):
+                    raise RepositoryToolError(f"release {release} references an invalid object ID")
+                live.add(object_id)
+        del manifest
         if on_progress:
-            on_progress(index, max(total_files, 1), logical_path)
+            on_progress(index, len(releases), f"releases/{release}")
+    live.freeze()
+    return live
+
+
+def _dispose(path: Path, quarantine_path: Path | None) -> None:
+    if quarantine_path is None:
+        path.unlink()
+        return
+    quarantine_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(path, quarantine_path)
+
 
-    return ReleaseVerification(
-        package_id=package_id,
-        file_count=total_files,
-        object_references=object_references,
-        total_logical_bytes=logical_bytes,
+def collect_garbage(
+    repository_root: str | Path,
+    *,
+    dry_run: bool = True,
+    quarantine: bool = False,
+    grace_seconds: float = DEFAULT_GC_GRACE_SECONDS,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    cancel_event=None,
+) -> GarbageCollectionReport:
+    """Remove objects no release manifest references.
+
+    The mark phase reads every ``releases/*/manifest.json``; any unreadable
+    manifest aborts the run because its objects cannot be proven dead. Only
+    a dry run takes its live set from the SQLite index; a sweep always marks
+    from the manifests themselves. With
+    ``quarantine`` the sweep moves files below ``quarantine/<timestamp>/``
+    instead of deleting them, so a mistaken run can be undone by moving them
+    back.
+    """
+    root = Path(repository_root).resolve()
+    objects_root = root / "objects"
+    releases = list_releases(root)
+    if dry_run and index_path(root).is_file():
+        # Planning only: re-read changed manifests, then take the live set
+        # from SQL. Deleting on the index's word could remove objects of a
+        # manifest replaced with the same size and mtime.
+        sync_repository_index(root, create=False, on_progress=on_progress, cancel_event=cancel_event)
+        live = _LiveObjectSet()
+        with RepositoryIndex(root) as index:
+            for object_id in index.iter_live_object_ids():
+                live.add(object_id)
+        live.freeze()
+    else:
+        live = _mark_live_objects(root, releases, on_progress=on_progress, cancel_event=cancel_event)
+
+    quarantine_root: Path | None = None
+    if quarantine and not dry_run:
+        quarantine_root = root / "quarantine" / time.strftime("%Y%m%d-%H%M%S")
+    cutoff = time.time() - max(0.0, float(grace_seconds))
+
+    unreferenced_count = 0
+    unreferenced_bytes = 0
+    temp_count = 0
+    temp_bytes = 0
+
+    prefixes: list[os.DirEntry] = []
+    if objects_root.is_dir():
+        with os.scandir(objects_root) as entries:
+            prefixes = sorted(
+                (entry for entry in entries if entry.is_dir(follow_symlinks=False)),
+                key=lambda entry: entry.name,
+            )
+
+    for index, prefix in enumerate(prefixes, 1):
+        _raise_if_cancelled(cancel_event)
+        is_temp = prefix.name == ".tmp"
+        if not is_temp and (
+            len(prefix.name) != 2 or any(ch not in "0123456789abcdef" for ch in prefix.name)
+        ):
+            continue
+        with os.scandir(prefix.path) as entries:
+            candidates = [entry for entry in entries if entry.is_file(follow_symlinks=False)]
+        for entry in candidates:
+            _raise_if_cancelled(cancel_event)
+            if not is_temp and (
+                not _valid_object_id(entry.name)
+                or not entry.name.startswith(prefix.name)
+                or entry.name in live
+            ):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            if is_temp:
+                temp_count += 1
+                temp_bytes += stat.st_size
+            else:
+                unreferenced_count += 1
+                unreferenced_bytes += stat.st_size
+            if dry_run:
+                continue
+            target = (
+                quarantine_root / "objects" / prefix.name / entry.name
+                if quarantine_root is not None
+                else None
+            )
+            try:
+                _dispose(Path(entry.path), target)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                raise RepositoryToolError(f"could not remove {entry.path}: {exc}") from exc
+        if not dry_run:
+            try:
+                os.rmdir(prefix.path)
+            except OSError:
+                pass
+        if on_progress:
+            on_progress(index, len(prefixes), f"objects/{prefix.name}")
+
+    return GarbageCollectionReport(
+        release_count=len(releases),
+        live_object_count=len(live),
+        unreferenced_object_count=unreferenced_count,
+        unreferenced_bytes=unreferenced_bytes,
+        abandoned_temp_count=temp_count,
+        abandoned_temp_bytes=temp_bytes,
+        dry_run=dry_run,
+        quarantine_root=quarantine_root,
     )
@@ -28,17 +28,32 @@ def enable_runtime_requirement_hooks() -> None:
     # enables source-integrity hooks first, so both post-generation manifests are
     # produced without changing the hybrid patch engine itself.
     original_generate = gui_web.generate_patches
+    original_generate_set = cli.generate_release_set
 
-    def generate_with_runtime_requirements(*args, **kwargs):
-        result = original_generate(*args, **kwargs)
-
-        target_root = _argument(args, kwargs, 1, "dest_root")
+    def write_manifest(target_root, patch_root) -> None:
         if target_root is None:
             raise RuntimeError("could not determine target SPT root for .NET prerequisite discovery")
-
-        manifest = write_runtime_requirements_manifest(target_root, STORAGE_out_DIR)
+        storage_root = Path(patch_root).parent / "storage" if patch_root is not None else STORAGE_out_DIR
+        manifest = write_runtime_requirements_manifest(target_root, storage_root)
         print(f"runtime requirements manifest ready: {manifest}")
+
+    def with_runtime_requirements(generate):
+        def generate_with_runtime_requirements(*args, **kwargs):
+            result = generate(*args, **kwargs)
+            write_manifest(_argument(args, kwargs, 1, "dest_root"), _argument(args, kwargs, 2, "out_root"))
+            return result
+
+        return generate_with_runtime_requirements
+
+    generate_with_runtime_requirements = with_runtime_requirements(original_generate)
+
+    def generate_set_with_runtime_requirements(*args, **kwargs):
+        result = original_generate_set(*args, **kwargs)
+        for target_root, patch_root, _missing_root in _argument(args, kwargs, 1, "targets") or []:
+            write_manifest(target_root, patch_root)
         return result
 
     gui_web.generate_patches = generate_with_runtime_requirements
     cli.generate_patches = generate_with_runtime_requirements
+    cli.generate_release_set = generate_set_with_runtime_requirements
+    cli.generate_patches_distributed = with_runtime_requirements(cli.generate_patches_distributed)
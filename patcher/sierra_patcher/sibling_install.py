@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from .game_copy import _clone_file, _remove_failed_copy, _same_volume
+from .hash_cache import remember_sha256
+from .hygiene import is_package_excluded
+from .install_receipt import find_installs
+from .repair import (
+    DamagedFile,
+    _raise_if_cancelled,
+    _run_pool,
+    load_target_hashes,
+    package_filter_for,
+    repair_files,
+)
+from .source_integrity import _sha256_file
+from .zstd_patch import _python_io_path
+
+
+# Installing a release that is already installed in another folder on this
+# machine: the new folder is built from that sibling instead of copying Live
+# and decoding every patch and payload again. Each sibling file is checked
+# against storage/target_hashes.json first; files that no longer match are
+# rebuilt like ``repair`` does.
+#
+# The two folders must stay independent: mods and users edit plugins, configs
+# and SPT database files in place, and a hard link would carry such an edit
+# into the sibling while its receipt still calls it verified. Large files are
+# reflinked where the volume supports it and copied everywhere else.
+_CLONE_MIN_BYTES = 1024 * 1024
+_COPY_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SiblingReuse:
+    sibling: Path
+    linked: int
+    copied: int
+    repaired: int
+
+
+def destination_is_empty(destination: str | Path) -> bool:
+    path = Path(destination)
+    if not path.exists():
+        return True
+    return path.is_dir() and not any(path.iterdir())
+
+
+def _copy_verified(source: Path, destination: Path, expected_sha256: str, cancel_event=None) -> bool:
+    source_stat = os.stat(_python_io_path(source))
+    digest = hashlib.sha256()
+    with open(_python_io_path(source), "rb") as reader, open(_python_io_path(destination), "wb") as writer:
+        while True:
+            _raise_if_cancelled(cancel_event)
+            block = reader.read(_COPY_CHUNK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+            writer.write(block)
+    os.utime(_python_io_path(destination), ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    if digest.hexdigest() != expected_sha256:
+        _remove_failed_copy(destination)
+        return False
+    remember_sha256(_python_io_path(destination), expected_sha256, os.stat(_python_io_path(destination)))
+    return True
+
+
+def clone_sibling_install(
+    sibling: str | Path,
+    destination: str | Path,
+    storage_root: str | Path,
+    *,
+    workers: int = 8,
+    on_progress=None,
+    cancel_event=None,
+) -> tuple[int, int, list[DamagedFile]] | None:
+    """Reflink or copy every verified target file from ``sibling``.
+
+    Returns ``(linked, copied, damaged)``; ``linked`` counts reflinks and
+    ``damaged`` lists target files the sibling no longer holds intact.
+    ``None`` means the package has no target_hashes.json and cannot be
+    checked.
+    """
+
+    entries = load_target_hashes(storage_root)
+    if entries is None:
+        return None
+    sibling_path = Path(sibling)
+    destination_path = Path(destination)
+    os.makedirs(_python_io_path(destination_path), exist_ok=True)
+    clone_files = _same_volume(sibling_path, destination_path)
+
+    # Recreate the sibling's folder layout, including empty folders SPT
+    # expects, but not its logs.
+    for current, dirnames, _filenames in os.walk(_python_io_path(sibling_path)):
+        dirnames.sort()
+        relative = Path(current).relative_to(_python_io_path(sibling_path))
+        for name in dirnames:
+            if not is_package_excluded(sibling_path / relative / name, sibling_path):
+                os.makedirs(_python_io_path(destination_path / relative / name), exist_ok=True)
+
+    def clone(entry: dict) -> tuple[str, DamagedFile | None]:
+        _raise_if_cancelled(cancel_event)
+        source = sibling_path / entry["path"]
+        target = destination_path / entry["path"]
+        try:
+            size = os.path.getsize(_python_io_path(source))
+        except OSError:
+            return "damaged", DamagedFile(entry["path"], "missing", entry["sha256"])
+        if size != entry["size"]:
+            return "damaged", DamagedFile(entry["path"], "size", entry["sha256"])
+        if _sha256_file(source, cancel_event) != entry["sha256"]:
+            return "damaged", DamagedFile(entry["path"], "sha256", entry["sha256"])
+        os.makedirs(_python_io_path(target.parent), exist_ok=True)
+        if clone_files and size >= _CLONE_MIN_BYTES and _clone_file(source, target):
+            return "linked", None
+        if _copy_verified(source, target, entry["sha256"], cancel_event):
+            return "copied", None
+        return "damaged", DamagedFile(entry["path"], "sha256", entry["sha256"])
+
+    results = _run_pool(
+        entries,
+        clone,
+        workers=workers,
+        phase="install:sibling",
+        verb="reused",
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+    )
+    linked = sum(1 for kind, _ in results if kind == "linked")
+    copied = sum(1 for kind, _ in results if kind == "copied")
+    damaged = sorted((item for _, item in results if item is not None), key=lambda item: item.path)
+    return linked, copied, damaged
+
+
+def reuse_sibling_install(
+    source,
+    storage_root: str | Path,
+    destination: str | Path,
+    package_id: str,
+    *,
+    live_root: str | Path | None,
+    workers: int = 8,
+    on_progress=None,
+    cancel_event=None,
+    log=print,
+) -> SiblingReuse | None:
+    """Build an empty ``destination`` from a registered install of ``package_id``.
+
+    ``source`` is the release's package source; it is only asked for the
+    patches and payloads of files the sibling could not supply. Returns
+    ``None`` (and leaves the destination untouched) when there is no usable
+    sibling, so the caller continues with a normal install.
+    """
+
+    if not destination_is_empty(destination) or load_target_hashes(storage_root) is None:
+        return None
+    siblings = find_installs(package_id, exclude=destination)
+    if not siblings:
+        return None
+    sibling = siblings[0]
+    log(f"[sibling] building {destination} from the {package_id} install in {sibling}")
+
+    linked, copied, damaged = clone_sibling_install(
+        sibling,
+        destination,
+        storage_root,
+        workers=workers,
+        on_progress=on_progress,
+        cancel_event=cancel_event,
+    )
+    repaired: list[str] = []
+    if damaged:
+        log(f"[sibling] {len(damaged)} file(s) changed in {sibling}; rebuilding them from the package")
+        layout = source.prepare(
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+            path_filter=package_filter_for(damaged, storage_root),
+        )
+        repaired, failed = repair_files(
+            damaged,
+            destination,
+            patch_root=layout.patch_root,
+            payload_root=layout.payload_root,
+            storage_root=layout.storage_root,
+            live_root=live_root,
+            workers=workers,
+            on_progress=on_progress,
+            cancel_event=cancel_event,
+        )
+        if failed:
+            for path, reason in failed:
+                log(f"[sibling] could not rebuild {path}: {reason}")
+            raise RuntimeError(
+                f"{len(failed)} file(s) could not be rebuilt while reusing {sibling}. "
+                "Delete the destination and install again."
+            )
+    log(f"[sibling] reused {linked} linked and {copied} copied file(s), rebuilt {len(repaired)}")
+    return SiblingReuse(sibling, linked, copied, len(repaired))
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import web_download
+from .media_io import advise_sequential
+
+
+# Optional container layout for Archived snapshots: objects are appended to
+# a few large segment files and located through packs/index.json, so copying
+# a snapshot to a FAT32/exFAT stick or a share moves a handful of files at
+# sequential speed instead of thousands of small ones. Existing segments are
+# never rewritten; packing again appends new segments for loose objects.
+PACK_DIR = "packs"
+PACK_INDEX_NAME = "index.json"
+PACK_FORMAT_VERSION = 1
+# Stays well below FAT32's 4 GiB file size limit.
+DEFAULT_SEGMENT_BYTES = 1024 * 1024 * 1024
+_IO_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class SnapshotPackError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class PackedObject:
+    segment: int
+    offset: int
+    size: int
+
+
+@dataclass(frozen=True)
+class PackReport:
+    packed_objects: int
+    packed_bytes: int
+    new_segments: tuple[str, ...]
+    removed_loose: int
+
+
+def pack_index_path(snapshot_root: str | Path) -> Path:
+    return Path(snapshot_root) / PACK_DIR / PACK_INDEX_NAME
+
+
+def _read_index(snapshot_root: Path) -> tuple[list[str], dict[str, PackedObject]]:
+    path = pack_index_path(snapshot_root)
+    if not path.is_file():
+        return [], {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise SnapshotPackError("Snapshot pack index is not valid JSON") from exc
+    if not isinstance(data, dict) or data.get("format_version") != PACK_FORMAT_VERSION:
+        raise SnapshotPackError(
+            f"Unsupported snapshot pack index version: {data.get('format_version')!r}"
+        )
+    segments = data.get("segments")
+    objects = data.get("objects")
+    if not isinstance(segments, list) or not isinstance(objects, dict):
+        raise SnapshotPackError("Snapshot pack index is malformed")
+    parsed: dict[str, PackedObject] = {}
+    for object_id, location in objects.items():
+        try:
+            segment, offset, size = (int(value) for value in location)
+        except (TypeError, ValueError) as exc:
+            raise SnapshotPackError(f"Snapshot pack index entry is malformed: {object_id}") from exc
+        if not 0 <= segment < len(segments) or offset < 0 or size < 0:
+            raise SnapshotPackError(f"Snapshot pack index entry is out of range: {object_id}")
+        parsed[object_id] = PackedObject(segment, offset, size)
+    return [str(name) for name in segments], parsed
+
+
+class _ObjectReader:
+    """Read exactly one object's bytes out of a segment file."""
+
+    def __init__(self, handle, size: int):
+        self._handle = handle
+        self._remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        block = self._handle.read(size)
+        self._remaining -= len(block)
+        if not block and self._remaining:
+            raise web_download.DownloadError("snapshot pack segment is truncated")
+        return block
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> _ObjectReader:
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+class PackedObjectStore:
+    """Objects of a snapshot: packed segments first, loose ``objects/`` otherwise.
+
+    Passed to the materializer in place of an object directory; it only needs
+    ``open_object``.
+    """
+
+    def __init__(self, snapshot_root: str | Path):
+        self.root = Path(snapshot_root)
+        self.loose_root = self.root / "objects"
+        self.segments, self.objects = _read_index(self.root)
+
+    def segment_path(self, index: int) -> Path:
+        return self.root / PACK_DIR / self.segments[index]
+
+    def loose_path(self, object_id: str) -> Path:
+        return self.loose_root / object_id[:2] / object_id
+
+    def __contains__(self, object_id: str) -> bool:
+        return object_id in self.objects or web_download._exists(self.loose_path(object_id))
+
+    def open_object(self, object_id: str, size: int):
+        packed = self.objects.get(object_id)
+        if packed is None:
+            path = self.loose_path(object_id)
+            if not web_download._exists(path) or web_download._size(path) != size:
+                raise web_download.DownloadError(f"required object is missing: {object_id}")
+            handle = open(web_download._io_path(path), "rb")
+            advise_sequential(handle)
+            return handle
+        if packed.size != size:
+            raise web_download.DownloadError(f"required object is missing: {object_id}")
+        handle = open(web_download._io_path(self.segment_path(packed.segment)), "rb")
+        try:
+            advise_sequential(handle)
+            handle.seek(packed.offset)
+        except Exception:
+            handle.close()
+            raise
+        return _ObjectReader(handle, size)
+
+    def read_order(self, object_id: str) -> tuple:
+        """Sort key that walks segments front to back; loose objects last."""
+        packed = self.objects.get(object_id)
+        if packed is None:
+            return (len(self.segments), 0, object_id)
+        return (packed.segment, packed.offset, "")
+
+
+def has_pack_index(snapshot_root: str | Path) -> bool:
+    return pack_index_path(snapshot_root).is_file()
+
+
+def _write_index(snapshot_root: Path, segments: list[str], objects: dict[str, PackedObject]) -> None:
+    path = pack_index_path(snapshot_root)
+    temp = path.with_name(path.name + ".tmp")
+    data = {
+        "format_version": PACK_FORMAT_VERSION,
+        "segments": segments,
+        "objects": {
+            object_id: [packed.segment, packed.offset, packed.size]
+            for object_id, packed in sorted(
+                objects.items(), key=lambda item: (item[1].segment, item[1].offset)
+            )
+        },
+    }
+    try:
+        temp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(web_download._io_path(temp), web_download._io_path(path))
+    finally:
+        temp.unlink(missing_ok=True)
+
+
+def pack_objects(
+    snapshot_root: str | Path,
+    object_ids: list[str],
+    *,
+    segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    keep_loose: bool = False,
+    on_progress=None,
+    cancel_event=None,
+) -> PackReport:
+    """Append the loose ``object_ids`` (in the given order) to new segments.
+
+    Every object is SHA-256 checked while it is copied; the index is replaced
+    only after all new segments are complete, so an interrupted run leaves the
+    snapshot readable exactly as before.
+    """
+
+    root = Path(snapshot_root)
+    store = PackedObjectStore(root)
+    segments, objects = list(store.segments), dict(store.objects)
+    pending = []
+    for object_id in dict.fromkeys(object_ids):
+        if object_id in objects:
+            continue
+        path = store.loose_path(object_id)
+        if not web_download._exists(path):
+            raise SnapshotPackError(f"Archived object is missing: {object_id}")
+        pending.append((object_id, path, web_download._size(path)))
+
+    pack_root = root / PACK_DIR
+    web_download._mkdir(pack_root)
+    new_segments: list[str] = []
+    total_bytes = sum(size for _, _, size in pending)
+    written_bytes = 0
+    writer = None
+    temp_path = final_path = None
+    offset = 0
+
+    def finish_segment() -> None:
+        nonlocal writer
+        if writer is None:
+            return
+        writer.flush()
+        os.fsync(writer.fileno())
+        writer.close()
+        writer = None
+        os.replace(web_download._io_path(temp_path), web_download._io_path(final_path))
+
+    try:
+        for object_id, path, size in pending:
+            if cancel_event is not None and cancel_event.is_set():
+                raise SnapshotPackError("Snapshot packing cancelled")
+            if writer is None or (offset and offset + size > segment_bytes):
+                finish_segment()
+                name = f"pack-{len(segments):04d}.dat"
+                segments.append(name)
+                new_segments.append(name)
+                final_path = pack_root / name
+                temp_path = final_path.with_name(name + ".tmp")
+                writer = open(web_download._io_path(temp_path), "wb")
+                offset = 0
+
+            object_hash = hashlib.sha256()
+            with open(web_download._io_path(path), "rb") as reader:
+                while True:
+                    block = reader.read(_IO_BLOCK_SIZE)
+                    if not block:
+                        break
+                    writer.write(block)
+                    object_hash.update(block)
+            if object_hash.hexdigest() != object_id:
+                raise SnapshotPackError(f"Archived object failed SHA-256 verification: {object_id}")
+            objects[object_id] = PackedObject(len(segments) - 1, offset, size)
+            offset += size
+            written_bytes += size
+            if on_progress:
+                on_progress(
+                    "archive:pack",
+                    written_bytes,
+                    max(total_bytes, 1),
+                    f"packed {object_id[:12]} into {segments[-1]}",
+                )
+        finish_segment()
+    finally:
+        if writer is not None:
+            writer.close()
+        if temp_path is not None:
+            web_download._unlink(temp_path)
+
+    if new_segments:
+        _write_index(root, segments, objects)
+
+    removed = 0
+    if not keep_loose:
+        for object_id in objects:
+            path = store.loose_path(object_id)
+            if web_download._exists(path):
+                web_download._unlink(path)
+                removed += 1
+        if store.loose_root.is_dir():
+            for directory in sorted(store.loose_root.iterdir(), reverse=True):
+                if directory.is_dir() and not any(directory.iterdir()):
+                    directory.rmdir()
+    return PackReport(len(pending), written_bytes, tuple(new_segments), removed)
@@ -6,7 +6,9 @@ import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
+from typing import Mapping
 
+from .hash_cache import cached_sha256, known_sha256
 from .i18n import tr
 from .proc import Cancelled
 from .zstd_patch import _python_io_path
@@ -15,6 +17,15 @@ from .zstd_patch import _python_io_path
 SOURCE_HASHES_FILENAME = "source_hashes.json"
 SOURCE_HASHES_FORMAT_VERSION = 1
 _HASH_CHUNK_SIZE = 4 * 1024 * 1024
+# Sampled fingerprints: the first and last MiB plus a few strided blocks.
+# The parameters are written into source_hashes.json so installers always
+# read the same ranges the generator hashed.
+SOURCE_SAMPLING = {
+    "version": 1,
+    "edge_bytes": 1024 * 1024,
+    "strides": 4,
+    "stride_bytes": 64 * 1024,
+}
 
 
 @dataclass(frozen=True)
@@ -32,6 +43,9 @@ class SourceIntegrityReport:
     total: int
     matched: int
     mismatches: tuple[SourceHashMismatch, ...]
+    # Files that passed the fast pass but never got their full SHA-256
+    # because the run stopped early; neither matched nor mismatched.
+    unchecked: int = 0
 
     @property
     def failed(self) -> int:
@@ -44,14 +58,43 @@ def _raise_if_cancelled(cancel_event) -> None:
 
 
 def _sha256_file(path: str | Path, cancel_event=None) -> str:
+    def compute() -> str:
+        digest = hashlib.sha256()
+        with open(_python_io_path(path), "rb") as handle:
+            while True:
+                _raise_if_cancelled(cancel_event)
+                chunk = handle.read(_HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    return cached_sha256(_python_io_path(path), compute)
+
+
+def _sample_ranges(size: int, sampling: dict) -> list[tuple[int, int]]:
+    edge = int(sampling["edge_bytes"])
+    strides = int(sampling["strides"])
+    stride_bytes = int(sampling["stride_bytes"])
+    if size <= 2 * edge + strides * stride_bytes:
+        return [(0, size)]
+    span = size - 2 * edge
+    ranges = [(0, edge)]
+    for index in range(1, strides + 1):
+        center = edge + span * index // (strides + 1)
+        ranges.append((center - stride_bytes // 2, stride_bytes))
+    ranges.append((size - edge, edge))
+    return ranges
+
+
+def _sampled_sha256(path: str | Path, size: int, sampling: dict, cancel_event=None) -> str:
+    """Hash the sampled ranges of a file whose size is already known to match."""
     digest = hashlib.sha256()
     with open(_python_io_path(path), "rb") as handle:
-        while True:
+        for offset, length in _sample_ranges(size, sampling):
             _raise_if_cancelled(cancel_event)
-            chunk = handle.read(_HASH_CHUNK_SIZE)
-            if not chunk:
-                break
-            digest.update(chunk)
+            handle.seek(offset)
+            digest.update(handle.read(length))
     return digest.hexdigest()
 
 
@@ -71,38 +114,54 @@ def build_source_hash_manifest(
     on_progress=None,
     cancel_event=None,
 ) -> Path:
-    """Record exact source hashes for every file that receives a delta patch."""
+    """Record exact source hashes for every file that receives a delta patch.
+
+    A target patched from a Live file at another path (delta_references.json)
+    records that reference file instead; a reference shared by several
+    targets is listed once.
+    """
+
+    from .delta_references import load_delta_references
 
     source_root_path = Path(source_root)
     patch_root_path = Path(patch_root)
     storage_root_path = Path(storage_root)
-    patch_files = sorted(patch_root_path.rglob("*.zst"))
-    total = len(patch_files)
+    references = load_delta_references(storage_root_path)
+    source_paths = sorted(
+        {
+            references.get(relative, relative)
+            for relative in (
+                patch_file.relative_to(patch_root_path).with_suffix("").as_posix()
+                for patch_file in patch_root_path.rglob("*.zst")
+            )
+        }
+    )
+    total = len(source_paths)
 
     if on_progress is not None:
         on_progress("source-hash:build", 0, max(total, 1), f"hashed 0/{total} delta sources")
 
-    def hash_source(patch_file: Path) -> dict:
+    def hash_source(relative_text: str) -> dict:
         _raise_if_cancelled(cancel_event)
-        relative = patch_file.relative_to(patch_root_path).with_suffix("")
-        relative_text = relative.as_posix()
-        source_file = source_root_path / relative
+        source_file = source_root_path / relative_text
         if not os.path.isfile(_python_io_path(source_file)):
             raise RuntimeError(
                 f"delta source disappeared while building integrity data: {relative_text}"
             )
+        size = int(os.path.getsize(_python_io_path(source_file)))
         return {
             "path": relative_text,
-            "size": int(os.path.getsize(_python_io_path(source_file))),
+            "size": size,
             "sha256": _sha256_file(source_file, cancel_event),
+            "sample_sha256": _sampled_sha256(source_file, size, SOURCE_SAMPLING, cancel_event),
         }
 
     entries: list[dict] = []
-    if patch_files:
-        max_workers = max(1, min(int(workers), len(patch_files), 64))
+    if source_paths:
+        max_workers = max(1, min(int(workers), len(source_paths), 64))
         completed = 0
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(hash_source, patch): patch for patch in patch_files}
+            futures = {executor.submit(hash_source, path): path for path in source_paths}
             for future in as_completed(futures):
                 _raise_if_cancelled(cancel_event)
                 try:
@@ -125,6 +184,7 @@ def build_source_hash_manifest(
     payload = {
         "format_version": SOURCE_HASHES_FORMAT_VERSION,
         "algorithm": "sha256",
+        "sampling": SOURCE_SAMPLING,
         "files": entries,
     }
 
@@ -142,7 +202,16 @@ def build_source_hash_manifest(
     return output
 
 
-def _load_source_hash_manifest(storage_root: str | Path) -> list[dict] | None:
+def _valid_sha256(value) -> str | None:
+    text = str(value or "").strip().lower()
+    if len(text) != 64 or any(ch not in "0123456789abcdef" for ch in text):
+        return None
+    return text
+
+
+def _read_source_hash_manifest(storage_root: str | Path) -> tuple[list[dict], dict | None] | None:
+    """Return normalized entries and the sampling parameters, if any."""
+
     manifest_path = Path(storage_root) / SOURCE_HASHES_FILENAME
     if not os.path.isfile(_python_io_path(manifest_path)):
         return None
@@ -164,6 +233,18 @@ def _load_source_hash_manifest(storage_root: str | Path) -> list[dict] | None:
     if not isinstance(files, list):
         raise RuntimeError("source integrity manifest files must be a list")
 
+    # Sampling is an optional accelerator; manifests from older generators, or
+    # with a scheme this build does not know, simply skip the fast pass.
+    sampling = data.get("sampling")
+    try:
+        if not isinstance(sampling, dict) or sampling.get("version") != 1:
+            raise ValueError
+        sampling = {key: int(sampling[key]) for key in SOURCE_SAMPLING}
+        if min(sampling["edge_bytes"], sampling["strides"], sampling["stride_bytes"]) < 0:
+            raise ValueError
+    except (KeyError, TypeError, ValueError):
+        sampling = None
+
     normalized: list[dict] = []
     seen: set[str] = set()
     for item in files:
@@ -173,8 +254,8 @@ def _load_source_hash_manifest(storage_root: str | Path) -> list[dict] | None:
         if relative in seen:
             raise RuntimeError(f"source integrity manifest contains duplicate path: {relative}")
         seen.add(relative)
-        sha256 = str(item.get("sha256", "")).strip().lower()
-        if len(sha256) != 64 or any(ch not in "0123456789abcdef" for ch in sha256):
+        sha256 = _valid_sha256(item.get("sha256"))
+        if sha256 is None:
             raise RuntimeError(f"source integrity manifest has invalid SHA-256 for: {relative}")
         try:
             size = int(item.get("size"))
@@ -182,10 +263,22 @@ def _load_source_hash_manifest(storage_root: str | Path) -> list[dict] | None:
             raise RuntimeError(f"source integrity manifest has invalid size for: {relative}") from exc
         if size < 0:
             raise RuntimeError(f"source integrity manifest has invalid size for: {relative}")
-        normalized.append({"path": relative, "size": size, "sha256": sha256})
+        entry = {"path": relative, "size": size, "sha256": sha256}
+        sample_sha256 = _valid_sha256(item.get("sample_sha256"))
+        if sampling is not None and sample_sha256 is not None:
+            entry["sample_sha256"] = sample_sha256
+        normalized.append(entry)
 
     normalized.sort(key=lambda item: item["path"])
-    return normalized
+    return normalized, sampling
+
+
+def _load_source_hash_manifest(storage_root: str | Path) -> list[dict] | None:
+    manifest = _read_source_hash_manifest(storage_root)
+    return None if manifest is None else manifest[0]
+
+
+_NEEDS_FULL_HASH = object()
 
 
 def verify_destination_sources(
@@ -193,27 +286,57 @@ def verify_destination_sources(
     destination_root: str | Path,
     *,
     workers: int = 8,
+    known_hashes: Mapping[str, str] | None = None,
+    sample_only: bool = False,
     on_progress=None,
     cancel_event=None,
 ) -> SourceIntegrityReport | None:
     """Verify every delta reference before any patch is applied.
 
+    A fast pass runs first: presence, size, any digest that is already known,
+    and the sampled fingerprint when the package provides one. If anything
+    fails there the report is returned immediately, so a wrong Tarkov build is
+    rejected in seconds. Otherwise every remaining file gets the full SHA-256
+    check, which is always required before patching.
+
+    ``known_hashes`` maps POSIX relative paths to digests that were already
+    verified for this destination, such as the map returned by
+    ``copy_live_game``; those files are only checked for presence and size.
+    ``sample_only`` stops after the fast pass and reports the files that
+    still need the full hash as unchecked.
+
     Returns ``None`` for legacy packages that do not contain source_hashes.json.
     """
 
-    entries = _load_source_hash_manifest(storage_root)
-    if entries is None:
+    manifest = _read_source_hash_manifest(storage_root)
+    if manifest is None:
         return None
+    entries, sampling = manifest
 
     destination_root_path = Path(destination_root)
     total = len(entries)
     if on_progress is not None:
         on_progress("source-hash:verify", 0, max(total, 1), f"verified 0/{total} source files")
 
-    def verify(entry: dict) -> SourceHashMismatch | None:
+    def destination_for(entry: dict) -> Path:
+        return destination_root_path.joinpath(*PurePosixPath(entry["path"]).parts)
+
+    def sha_mismatch(entry: dict, actual_sha: str) -> SourceHashMismatch | None:
+        if actual_sha == entry["sha256"]:
+            return None
+        return SourceHashMismatch(
+            path=entry["path"],
+            reason="sha256",
+            expected_sha256=entry["sha256"],
+            actual_sha256=actual_sha,
+            expected_size=entry["size"],
+            actual_size=entry["size"],
+        )
+
+    def quick_check(entry: dict):
         _raise_if_cancelled(cancel_event)
         relative = entry["path"]
-        destination_file = destination_root_path.joinpath(*PurePosixPath(relative).parts)
+        destination_file = destination_for(entry)
         expected_size = int(entry["size"])
         expected_sha = str(entry["sha256"])
 
@@ -235,48 +358,78 @@ def verify_destination_sources(
                 actual_size=actual_size,
             )
 
-        actual_sha = _sha256_file(destination_file, cancel_event)
-        if actual_sha != expected_sha:
-            return SourceHashMismatch(
-                path=relative,
-                reason="sha256",
-                expected_sha256=expected_sha,
-                actual_sha256=actual_sha,
-                expected_size=expected_size,
-                actual_size=actual_size,
-            )
-        return None
+        known = (known_hashes or {}).get(relative) or known_sha256(
+            _python_io_path(destination_file)
+        )
+        if known is not None:
+            return sha_mismatch(entry, known)
+
+        sample_sha = entry.get("sample_sha256")
+        if sampling is not None and sample_sha is not None:
+            if _sampled_sha256(destination_file, actual_size, sampling, cancel_event) != sample_sha:
+                return SourceHashMismatch(
+                    path=relative,
+                    reason="sample",
+                    expected_sha256=expected_sha,
+                    expected_size=expected_size,
+                    actual_size=actual_size,
+                )
+        return _NEEDS_FULL_HASH
 
-    mismatches: list[SourceHashMismatch] = []
-    if entries:
-        max_workers = max(1, min(int(workers), len(entries), 64))
+    def full_check(entry: dict) -> SourceHashMismatch | None:
+        _raise_if_cancelled(cancel_event)
+        return sha_mismatch(entry, _sha256_file(destination_for(entry), cancel_event))
+
+    def run(items: list[dict], check, phase: str, verb: str) -> list:
+        results = []
+        if not items:
+            return results
+        max_workers = max(1, min(int(workers), len(items), 64))
         completed = 0
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(verify, entry): entry for entry in entries}
+            futures = {executor.submit(check, entry): entry for entry in items}
             for future in as_completed(futures):
                 _raise_if_cancelled(cancel_event)
                 try:
-                    mismatch = future.result()
+                    result = future.result()
                 except Exception:
                     for pending in futures:
                         pending.cancel()
                     raise
-                if mismatch is not None:
-                    mismatches.append(mismatch)
+                results.append((futures[future], result))
                 completed += 1
                 if on_progress is not None:
                     on_progress(
-                        "source-hash:verify",
+                        phase,
                         completed,
-                        total,
-                        f"verified {completed}/{total} source files",
+                        len(items),
+                        f"{verb} {completed}/{len(items)} source files",
                     )
+        return results
+
+    mismatches: list[SourceHashMismatch] = []
+    needs_full: list[dict] = []
+    for entry, result in run(entries, quick_check, "source-hash:sample", "checked"):
+        if result is _NEEDS_FULL_HASH:
+            needs_full.append(entry)
+        elif result is not None:
+            mismatches.append(result)
+
+    unchecked = 0
+    if not mismatches and not sample_only:
+        for _entry, result in run(needs_full, full_check, "source-hash:verify", "verified"):
+            if result is not None:
+                mismatches.append(result)
+
+    else:
+        unchecked = len(needs_full)
 
     mismatches.sort(key=lambda item: item.path)
     return SourceIntegrityReport(
         total=total,
-        matched=total - len(mismatches),
+        matched=total - len(mismatches) - unchecked,
         mismatches=tuple(mismatches),
+        unchecked=unchecked,
     )
 
 
@@ -290,6 +443,8 @@ def describe_source_mismatch(mismatch: SourceHashMismatch) -> str:
             f"{mismatch.path}: size mismatch "
             f"(expected {mismatch.expected_size:,}, found {mismatch.actual_size:,} bytes)"
         )
+    if mismatch.reason == "sample":
+        return f"{mismatch.path}: content mismatch in sampled blocks"
     return (
         f"{mismatch.path}: SHA-256 mismatch "
         f"(expected {mismatch.expected_sha256}, found {mismatch.actual_sha256})"
@@ -308,6 +463,8 @@ def _localized_source_mismatch(mismatch: SourceHashMismatch) -> str:
             expected=mismatch.expected_size,
             actual=mismatch.actual_size,
         )
+    if mismatch.reason == "sample":
+        return tr("{path}: content mismatch in sampled blocks", path=mismatch.path)
     return tr(
         "{path}: SHA-256 mismatch (expected {expected_sha}, found {actual_sha})",
         path=mismatch.path,
@@ -324,12 +481,13 @@ def format_source_integrity_summary(
     lines = [
         tr("The selected Tarkov copy does not match the source files required by this release."),
         "",
-        tr("Checked: {count}", count=report.total),
+        tr("Checked: {count}", count=report.total - report.unchecked),
         tr("Matched: {count}", count=report.matched),
         tr("Mismatched: {count}", count=report.failed),
-        "",
-        tr("No game files were modified."),
     ]
+    if report.unchecked:
+        lines.append(tr("Not checked: {count}", count=report.unchecked))
+    lines.extend(["", tr("No game files were modified.")])
     if report.mismatches:
         lines.extend(["", tr("Examples:")])
         for mismatch in report.mismatches[:max_items]:
@@ -5,8 +5,9 @@ from pathlib import Path
 
 from . import cli, gui_web
 from .gui_resilient import ResilientSierraPatcherGUI
-from .paths import STORAGE_out_DIR
+from .repair import build_target_hash_manifest
 from .source_integrity import (
+    _load_source_hash_manifest,
     build_source_hash_manifest,
     describe_source_mismatch,
     format_source_integrity_summary,
@@ -45,8 +46,8 @@ def enable_source_integrity_hooks() -> None:
 
     New Web releases fetch only ``storage/`` first. Existing-copy installs verify
     that destination before the full package download. Automatic-copy installs
-    verify the detected Live folder, copy it, verify the copied destination, and
-    only then allow the full package download to continue.
+    copy the detected Live folder, check the delta sources against the hashes
+    the copy produced, and only then allow the full package download to continue.
     """
 
     global _ENABLED
@@ -55,32 +56,83 @@ def enable_source_integrity_hooks() -> None:
     _ENABLED = True
 
     original_generate = gui_web.generate_patches
+    original_generate_set = cli.generate_release_set
 
-    def generate_with_source_hashes(*args, **kwargs):
-        result = original_generate(*args, **kwargs)
-
-        source_root = _argument(args, kwargs, 0, "source_root")
-        patch_root = _argument(args, kwargs, 2, "out_root")
-        workers = int(kwargs.get("workers", 8))
-        on_progress = kwargs.get("on_progress")
-        cancel_event = kwargs.get("cancel_event")
-
-        if source_root is None or patch_root is None:
-            raise RuntimeError("could not determine source/patch roots for integrity manifest")
-
+    def write_integrity_manifests(source_root, target_root, patch_root, workers, on_progress, cancel_event):
+        storage_root = Path(patch_root).parent / "storage"
         manifest_path = build_source_hash_manifest(
             source_root,
             patch_root,
-            STORAGE_out_DIR,
+            storage_root,
             workers=workers,
             on_progress=on_progress,
             cancel_event=cancel_event,
         )
         print(f"source integrity manifest ready: {manifest_path}")
+
+        # Per-file hashes of the finished tree let ``repair`` find and rebuild
+        # only the installed files that were damaged later.
+        if target_root is not None:
+            target_manifest = build_target_hash_manifest(
+                target_root,
+                storage_root,
+                workers=workers,
+                on_progress=on_progress,
+                cancel_event=cancel_event,
+            )
+            print(f"target hash manifest ready: {target_manifest}")
+
+    def with_source_hashes(generate):
+        # Local and distributed generators share the leading
+        # (source_root, dest_root, out_root) parameters.
+        def generate_with_source_hashes(*args, **kwargs):
+            result = generate(*args, **kwargs)
+
+            source_root = _argument(args, kwargs, 0, "source_root")
+            target_root = _argument(args, kwargs, 1, "dest_root")
+            patch_root = _argument(args, kwargs, 2, "out_root")
+            if source_root is None or patch_root is None:
+                raise RuntimeError("could not determine source/patch roots for integrity manifest")
+
+            write_integrity_manifests(
+                source_root,
+                target_root,
+                patch_root,
+                int(kwargs.get("workers", 8)),
+                kwargs.get("on_progress"),
+                kwargs.get("cancel_event"),
+            )
+            return result
+
+        return generate_with_source_hashes
+
+    generate_with_source_hashes = with_source_hashes(original_generate)
+
+    def generate_set_with_source_hashes(*args, **kwargs):
+        result = original_generate_set(*args, **kwargs)
+
+        source_root = _argument(args, kwargs, 0, "source_root")
+        targets = _argument(args, kwargs, 1, "targets")
+        if source_root is None or targets is None:
+            raise RuntimeError("could not determine source/package roots for integrity manifests")
+
+        # The Live files shared by several targets come from the hash cache
+        # after the first manifest.
+        for target_root, patch_root, _missing_root in targets:
+            write_integrity_manifests(
+                source_root,
+                target_root,
+                patch_root,
+                int(kwargs.get("workers", 8)),
+                kwargs.get("on_progress"),
+                kwargs.get("cancel_event"),
+            )
         return result
 
     gui_web.generate_patches = generate_with_source_hashes
     cli.generate_patches = generate_with_source_hashes
+    cli.generate_release_set = generate_set_with_source_hashes
+    cli.generate_patches_distributed = with_source_hashes(cli.generate_patches_distributed)
 
     # Automatic Web installs now complete the copy during the early storage-only
     # preflight. gui_web still reaches its historical copy call later, after the
@@ -96,6 +148,7 @@ def enable_source_integrity_hooks() -> None:
         source_version=None,
         on_progress=None,
         cancel_event=None,
+        **options,
     ):
         key = _copy_key(source, destination, source_version)
         if key in early_completed_copies:
@@ -114,6 +167,7 @@ def enable_source_integrity_hooks() -> None:
             source_version=source_version,
             on_progress=on_progress,
             cancel_event=cancel_event,
+            **options,
         )
 
     gui_web.copy_live_game = copy_live_game_once
@@ -136,6 +190,8 @@ def enable_source_integrity_hooks() -> None:
         *,
         mark_verified: bool = True,
         post_copy: bool = False,
+        known_hashes=None,
+        sample_only: bool = False,
     ):
         def progress(_phase, current, total, message):
             self._set_phase("Verifying source files")
@@ -145,6 +201,8 @@ def enable_source_integrity_hooks() -> None:
             storage_root,
             root,
             workers=workers,
+            known_hashes=known_hashes,
+            sample_only=sample_only,
             on_progress=progress,
             cancel_event=cancel_event,
         )
@@ -160,7 +218,8 @@ def enable_source_integrity_hooks() -> None:
         if report.failed:
             self._log(
                 f"[integrity] source preflight FAILED for {root}: "
-                f"{report.matched}/{report.total} matched, {report.failed} mismatched"
+                f"{report.matched}/{report.total} matched, {report.failed} mismatched, "
+                f"{report.unchecked} not checked"
             )
             for mismatch in report.mismatches:
                 self._log(f"[integrity] {describe_source_mismatch(mismatch)}")
@@ -178,6 +237,14 @@ def enable_source_integrity_hooks() -> None:
             self._cancel.set()
             return False, report
 
+        if report.unchecked:
+            self._log(
+                f"[integrity] sampled source preflight passed for {root}: "
+                f"{report.matched}/{report.total} matched, "
+                f"{report.unchecked} left for the full SHA-256 check"
+            )
+            return True, report
+
         self._log(
             f"[integrity] source preflight passed for {root}: "
             f"{report.total}/{report.total} matched"
@@ -189,11 +256,13 @@ def enable_source_integrity_hooks() -> None:
     def verify_source_files(self, storage_root, destination, workers=8, cancel_event=None) -> bool:
         """Verify the source that will actually feed the delta patches.
 
-        For Automatic Copy, the detected Live install is verified first, copied,
-        then the newly-created destination is independently verified. The copy
-        engine itself verifies every copied file; the second source-hash pass
-        additionally proves that the destination still matches this release's
-        exact delta inputs before the full package download begins.
+        For Automatic Copy, the delta sources are first checked in Live by size
+        and sampled blocks, so a wrong build is rejected before anything is
+        copied. The install is then copied and read in full once: the copy
+        engine hashes every file as it copies it, reads back the delta sources,
+        and returns the verified digests. The source-hash pass then checks this
+        release's exact delta inputs against those digests before the full
+        package download begins.
         """
 
         _ensure_run_state(self)
@@ -279,37 +348,47 @@ def enable_source_integrity_hooks() -> None:
             self._stop_with_message("Version mismatch", message)
             return False
 
-        self._log("[integrity] verifying detected Live Tarkov before automatic copy")
-        live_ok, live_report = _verify_root(
+        entries = _load_source_hash_manifest(storage_root)
+
+        # Legacy packages do not provide exact source hashes. Preserve their old
+        # behavior: defer the copy to the normal install worker after preparation.
+        if entries is None:
+            self._log(
+                "[integrity] WARNING: source_hashes.json is not present in this package "
+                f"(looked in {storage_root}); legacy package: automatic copy remains in "
+                "the normal install stage"
+            )
+            return True
+
+        # Reject a wrong Live build in seconds, before copying tens of GiB.
+        # The sizes and sampled blocks are read from Live itself; the full
+        # proof below still runs on the hashes the copy produces.
+        live_ok, _live_report = _verify_root(
             self,
             storage_root,
             live_path,
             workers,
             cancel_event,
             mark_verified=False,
+            sample_only=True,
         )
         if not live_ok:
+            self._log("[copy] Live Tarkov does not match this release's delta sources; nothing was copied")
             return False
 
-        # Legacy packages do not provide exact source hashes. Preserve their old
-        # behavior: defer the copy to the normal install worker after preparation.
-        if live_report is None:
-            self._log(
-                "[integrity] legacy package: automatic copy remains in the normal install stage"
-            )
-            return True
-
         self._log(f"[copy] early verified copy start source={live_path} destination={destination}")
-        original_copy_live_game(
+        verified_hashes = original_copy_live_game(
             live_path,
             destination,
             source_version=source_version,
+            full_verify_paths=[entry["path"] for entry in entries],
             on_progress=self._web_progress_callback(),
             cancel_event=cancel_event,
+            **self._copy_link_options(storage_root),
         )
         self._log(
             "[copy] Live game copy passed whole-copy verification; "
-            "re-checking release delta inputs"
+            "checking release delta inputs against the copy hashes"
         )
 
         destination_ok, destination_report = _verify_root(
@@ -319,10 +398,11 @@ def enable_source_integrity_hooks() -> None:
             workers,
             cancel_event,
             post_copy=True,
+            known_hashes=verified_hashes,
         )
         if not destination_ok:
             self._log(
-                "[copy] copied destination failed release source verification; no patches "
+                "[copy] Live Tarkov does not match this release's delta sources; no patches "
                 "were applied. Delete the destination before retrying."
             )
             return False
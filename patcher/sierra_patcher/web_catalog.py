@@ -18,6 +18,15 @@ CATALOG_PLACEHOLDER = "choose version"
 class CatalogRelease:
     id: str
     required_live_version: str | None = None
+    # Upgrade packages patch an installed release (upgrade_from) into another
+    # (upgrade_to) instead of a fresh Live copy. They are not offered as
+    # standalone choices.
+    upgrade_from: str | None = None
+    upgrade_to: str | None = None
+
+    @property
+    def is_upgrade(self) -> bool:
+        return bool(self.upgrade_from and self.upgrade_to)
 
 
 class _TrustedCatalogRedirectHandler(urllib.request.HTTPRedirectHandler):
@@ -94,20 +103,48 @@ def parse_release_catalog(data: dict) -> list[CatalogRelease]:
         if not release_id or release_id in seen:
             continue
         required_live_version = None
+        upgrade_from = upgrade_to = None
         if isinstance(item, dict):
             raw_required_version = item.get("required_live_version")
             if isinstance(raw_required_version, str):
                 required_live_version = raw_required_version.strip() or None
+            raw_from = item.get("upgrade_from")
+            raw_to = item.get("upgrade_to")
+            if isinstance(raw_from, str) and isinstance(raw_to, str):
+                upgrade_from = raw_from.strip() or None
+                upgrade_to = raw_to.strip() or None
+                if not (upgrade_from and upgrade_to):
+                    upgrade_from = upgrade_to = None
         seen.add(release_id)
         result.append(
             CatalogRelease(
                 id=release_id,
                 required_live_version=required_live_version,
+                upgrade_from=upgrade_from,
+                upgrade_to=upgrade_to,
             )
         )
     return result
 
 
+def find_upgrade(
+    releases: Iterable[CatalogRelease],
+    installed_id: str | None,
+    target_id: str,
+) -> CatalogRelease | None:
+    """Return the upgrade package that turns ``installed_id`` into ``target_id``."""
+
+    if not installed_id or installed_id == target_id:
+        return None
+    for release in releases:
+        if release.is_upgrade and (release.upgrade_from, release.upgrade_to) == (
+            installed_id,
+            target_id,
+        ):
+            return release
+    return None
+
+
 def fetch_release_catalog_details(*, timeout: float = 10.0) -> list[CatalogRelease]:
     """Fetch release IDs and optional pre-download compatibility metadata."""
 
@@ -124,9 +161,12 @@ def build_catalog(release_ids: Iterable[str | CatalogRelease]) -> dict:
     seen: set[str] = set()
     catalog_releases = []
     for value in release_ids:
+        upgrade = None
         if isinstance(value, CatalogRelease):
             release_id = value.id.strip()
             required_live_version = str(value.required_live_version or "").strip() or None
+            if value.is_upgrade:
+                upgrade = (value.upgrade_from.strip(), value.upgrade_to.strip())
         else:
             release_id = str(value).strip()
             required_live_version = None
@@ -136,6 +176,8 @@ def build_catalog(release_ids: Iterable[str | CatalogRelease]) -> dict:
         item = {"id": release_id}
         if required_live_version:
             item["required_live_version"] = required_live_version
+        if upgrade:
+            item["upgrade_from"], item["upgrade_to"] = upgrade
         catalog_releases.append(item)
     return {
         "format_version": CATALOG_FORMAT_VERSION,
@@ -11,10 +11,18 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Iterable
 
+from .manifest_index import write_manifest_index
+from .repository_index import metadata_from_file, record_published_release
 from .web_catalog import CatalogRelease, build_catalog, parse_release_catalog
 
 
-MANIFEST_FORMAT_VERSION = 1
+# Version 2 marks packages that need the newer installer: upgrade packages
+# (which only apply on top of their "from" release), solid payload archives,
+# a payload dictionary, cross-file delta references or fanned-out duplicate
+# payloads. Plain packages keep version 1 so older clients still
+# install them; those clients reject version 2 instead of breaking silently.
+MANIFEST_FORMAT_VERSION = 2
+_PLAIN_MANIFEST_FORMAT_VERSION = 1
 DEFAULT_CHUNK_SIZE = 256 * 1024 * 1024
 DEFAULT_PUBLISH_WORKERS = min(8, max(2, os.cpu_count() or 4))
 _IO_BLOCK_SIZE = 4 * 1024 * 1024
@@ -48,6 +56,24 @@ def _iter_package_files(canonical_root: Path) -> Iterable[tuple[str, Path]]:
                 yield path.relative_to(canonical_root).as_posix(), path
 
 
+def _manifest_format_version(canonical_root: Path, logical_paths: Iterable[str]) -> int:
+    """Return the manifest version a package and its published files require."""
+    from .delta_references import DELTA_REFERENCES_FILENAME
+    from .hybrid_payload import PAYLOAD_DICTIONARY_NAME, PAYLOAD_FANOUT_FILENAME, SOLID_DIR
+
+    if _package_upgrade(canonical_root) is not None:
+        return MANIFEST_FORMAT_VERSION
+    solid_prefix = f"payloads/{SOLID_DIR}/"
+    storage_files = {
+        f"storage/{name}"
+        for name in (PAYLOAD_DICTIONARY_NAME, DELTA_REFERENCES_FILENAME, PAYLOAD_FANOUT_FILENAME)
+    }
+    for path in logical_paths:
+        if path.startswith(solid_prefix) or path in storage_files:
+            return MANIFEST_FORMAT_VERSION
+    return _PLAIN_MANIFEST_FORMAT_VERSION
+
+
 def _catalog_release_ids(repository_root: Path, current_package_id: str) -> list[str]:
     """Collect release IDs without opening any manifests."""
     result: list[str] = []
@@ -104,29 +130,51 @@ def _package_required_live_version(canonical_root: Path) -> str | None:
     return cleaned or None
 
 
+def _package_upgrade(canonical_root: Path) -> tuple[str, str] | None:
+    """Return (from, to) release IDs when the package is an upgrade package."""
+    metadata_path = canonical_root / "storage" / "metadata.info"
+    try:
+        data = json.loads(metadata_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict):
+        return None
+    upgrade_from = str(data.get("upgrade_from") or "").strip()
+    upgrade_to = str(data.get("upgrade_to") or "").strip()
+    if not upgrade_from or not upgrade_to:
+        return None
+    return upgrade_from, upgrade_to
+
+
 def _write_catalog(
     repository_root: Path,
     package_id: str,
     cancel_event=None,
     *,
     required_live_version: str | None = None,
+    upgrade: tuple[str, str] | None = None,
 ) -> Path:
     _raise_if_cancelled(cancel_event)
     catalog_path = repository_root / "catalog.json"
     temp_catalog = repository_root / "catalog.json.tmp"
-    existing_versions = {}
+    existing_releases: dict[str, CatalogRelease] = {}
     if catalog_path.is_file():
         try:
             existing = json.loads(catalog_path.read_text(encoding="utf-8"))
-            existing_versions = {
-                release.id: release.required_live_version
-                for release in parse_release_catalog(existing)
+            existing_releases = {
+                release.id: release for release in parse_release_catalog(existing)
             }
         except Exception:
             pass
-    existing_versions[package_id] = required_live_version
+    upgrade_from, upgrade_to = upgrade or (None, None)
+    existing_releases[package_id] = CatalogRelease(
+        package_id,
+        required_live_version,
+        upgrade_from=upgrade_from,
+        upgrade_to=upgrade_to,
+    )
     releases = [
-        CatalogRelease(release_id, existing_versions.get(release_id))
+        existing_releases.get(release_id, CatalogRelease(release_id))
         for release_id in _catalog_release_ids(repository_root, package_id)
     ]
     data = build_catalog(releases)
@@ -421,11 +469,16 @@ def publish_web_package(
     manifest_files = [item.manifest_entry for item in published]
     object_ids = {oid for item in published for oid in item.object_ids}
     manifest = {
-        "format_version": MANIFEST_FORMAT_VERSION,
+        "format_version": _manifest_format_version(
+            canonical_root, (item.manifest_entry["path"] for item in published)
+        ),
         "package_id": package_id,
         "chunk_size": chunk_size,
         "files": manifest_files,
     }
+    upgrade = _package_upgrade(canonical_root)
+    if upgrade is not None:
+        manifest["upgrade"] = {"from": upgrade[0], "to": upgrade[1]}
 
     manifest_path = release_dir / "manifest.json"
     temp_manifest = manifest_path.with_suffix(".json.tmp")
@@ -438,6 +491,16 @@ def publish_web_package(
         os.replace(temp_manifest, manifest_path)
     finally:
         temp_manifest.unlink(missing_ok=True)
+    # Compiled lookup sidecar; upload it with the manifest. Readers trust it
+    # when the manifest's size, mtime and ctime match those it records,
+    # otherwise compare the manifest's SHA-256, and fall back to JSON if it
+    # is stale.
+    write_manifest_index(manifest_path)
+    record_published_release(
+        repository_root,
+        package_id,
+        metadata_from_file(canonical_root / "storage" / "metadata.info"),
+    )
 
     # Publish/update the tiny version index only after the release manifest is
     # complete. When deploying to HFS, catalog.json should likewise be uploaded
@@ -447,6 +510,7 @@ def publish_web_package(
         package_id,
         cancel_event,
         required_live_version=_package_required_live_version(canonical_root),
+        upgrade=upgrade,
     )
 
     return PublishResult(
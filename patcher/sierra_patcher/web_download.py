@@ -15,9 +15,14 @@ from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 from typing import Callable
 
+from .hash_cache import remember_sha256
+from .media_io import advise_sequential
+
 
 TRUSTED_REPOSITORY_BASE = "https://52sierra.net/patcher/repo/"
 DOWNLOAD_ATTEMPTS = 3
+# Release manifest versions this client installs; see web_delivery.
+SUPPORTED_MANIFEST_VERSIONS = (1, 2)
 DEFAULT_DOWNLOAD_WORKERS = 16
 DEFAULT_MATERIALIZE_WORKERS = 12
 _IO_BLOCK_SIZE = 4 * 1024 * 1024
@@ -66,6 +71,7 @@ def _size(path: str | Path) -> int:
 def _sha256_file(path: str | Path, block_size: int = _IO_BLOCK_SIZE, cancel_event=None) -> str:
     h = hashlib.sha256()
     with open(_io_path(path), "rb") as stream:
+        advise_sequential(stream)
         while True:
             _raise_if_cancelled(cancel_event)
             block = stream.read(block_size)
@@ -80,13 +86,16 @@ def _verify_file(
     expected_size: int | None,
     expected_sha256: str | None,
     cancel_event=None,
+    block_size: int = _IO_BLOCK_SIZE,
 ) -> bool:
     try:
         _raise_if_cancelled(cancel_event)
         if expected_size is not None and _size(path) != expected_size:
             return False
-        if expected_sha256 and _sha256_file(path, cancel_event=cancel_event).lower() != expected_sha256.lower():
-            return False
+        if expected_sha256:
+            actual = _sha256_file(path, block_size, cancel_event=cancel_event)
+            if actual.lower() != expected_sha256.lower():
+                return False
         return True
     except OSError:
         return False
@@ -243,6 +252,12 @@ def _stream_request(
         raise DownloadError(f"download verification failed for {destination.name}")
 
     os.replace(_io_path(part), _io_path(destination))
+    if expected_sha256:
+        # Let later consumers (e.g. Archived snapshot seeding) skip a re-hash.
+        try:
+            remember_sha256(destination, expected_sha256, os.stat(_io_path(destination)))
+        except OSError:
+            pass
 
 
 def _download_with_retries(
@@ -303,7 +318,7 @@ def fetch_manifest(package_id: str, cache_root: str | Path, *, cancel_event=None
     except Exception as exc:
         raise DownloadError("downloaded manifest is not valid JSON") from exc
 
-    if data.get("format_version") != 1:
+    if data.get("format_version") not in SUPPORTED_MANIFEST_VERSIONS:
         raise DownloadError(f"unsupported manifest version: {data.get('format_version')!r}")
     if data.get("package_id") != package_id:
         raise DownloadError("manifest package_id does not match requested package")
@@ -507,12 +522,35 @@ def _download_objects(
                 raise
 
 
+def _open_object(object_cache, object_spec: _ObjectSpec):
+    """Open one object from a cache directory, or from a store with ``open_object``."""
+
+    open_object = getattr(object_cache, "open_object", None)
+    if open_object is not None:
+        return open_object(object_spec.object_id, object_spec.size)
+    local_object = object_cache / object_spec.object_id[:2] / object_spec.object_id
+    if not _exists(local_object) or _size(local_object) != object_spec.size:
+        raise DownloadError(f"required object is missing: {object_spec.object_id}")
+    source = open(_io_path(local_object), "rb")
+    advise_sequential(source)
+    return source
+
+
 def _materialize_one_file(
     spec: _FileSpec,
     package_root: Path,
     object_cache: Path,
     cancel_event=None,
+    verify_objects: bool = False,
+    block_size: int = _IO_BLOCK_SIZE,
 ) -> str:
+    """Assemble one logical file from its objects and verify its SHA-256.
+
+    With ``verify_objects`` every object is also hashed as it streams past, so
+    callers that cannot trust the object store (Archived snapshots) get both
+    checks from a single read of each object.
+    """
+
     _raise_if_cancelled(cancel_event)
     final_path = package_root / spec.path
     _mkdir(final_path.parent)
@@ -530,18 +568,23 @@ def _materialize_one_file(
         with open(_io_path(temp_path), "wb") as assembled:
             for object_spec in spec.objects:
                 _raise_if_cancelled(cancel_event)
-                local_object = object_cache / object_spec.object_id[:2] / object_spec.object_id
-                if not _exists(local_object) or _size(local_object) != object_spec.size:
-                    raise DownloadError(f"required object is missing: {object_spec.object_id}")
-                with open(_io_path(local_object), "rb") as source:
+                object_hash = hashlib.sha256() if verify_objects else None
+                with _open_object(object_cache, object_spec) as source:
                     while True:
                         _raise_if_cancelled(cancel_event)
-                        block = source.read(_IO_BLOCK_SIZE)
+                        block = source.read(block_size)
                         if not block:
                             break
                         assembled.write(block)
                         file_hash.update(block)
+                        if object_hash is not None:
+                            object_hash.update(block)
                         written += len(block)
+                if object_hash is not None and object_hash.hexdigest() != object_spec.object_id:
+                    raise DownloadError(
+                        f"object failed SHA-256 verification: {object_spec.object_id} "
+                        f"(actual {object_hash.hexdigest()})"
+                    )
 
         _raise_if_cancelled(cancel_event)
         if written != spec.size or file_hash.hexdigest() != spec.sha256:
@@ -560,7 +603,11 @@ def _materialize_files(
     workers: int,
     on_progress,
     cancel_event=None,
+    verify_objects: bool = False,
+    block_size: int = _IO_BLOCK_SIZE,
 ) -> None:
+    """Rebuild ``files`` with up to ``workers`` threads, starting them in list order."""
+
     _raise_if_cancelled(cancel_event)
     if not files:
         if on_progress:
@@ -570,7 +617,15 @@ def _materialize_files(
     completed = 0
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = {
-            executor.submit(_materialize_one_file, spec, package_root, object_cache, cancel_event): spec
+            executor.submit(
+                _materialize_one_file,
+                spec,
+                package_root,
+                object_cache,
+                cancel_event,
+                verify_objects,
+                block_size,
+            ): spec
             for spec in files
         }
         for future in as_completed(futures):
@@ -336,13 +336,18 @@ def _apply_single(
     dest_dir: Path,
     patch_root: Path,
     cancel_event=None,
+    reference: str | None = None,
 ) -> bool:
     rel = patch_file.relative_to(patch_root).with_suffix("")
-    old_file = dest_dir / rel
+    # Patches listed in delta_references.json decode from a Live file at
+    # another path and create ``rel``.
+    target_file = dest_dir / rel
+    old_file = dest_dir / reference if reference else target_file
 
     if not old_file.exists():
-        _log(f"missing target: {rel}")
+        _log(f"missing target: {reference or rel}")
         return False
+    os.makedirs(_python_io_path(target_file.parent), exist_ok=True)
 
     # Normal short paths keep the old fast path. Long paths are staged at the
     # destination root so zstd only sees short file names and the final replace
@@ -350,11 +355,11 @@ def _apply_single(
     needs_stage = (
         _external_path_is_long(old_file)
         or _external_path_is_long(patch_file)
-        or _external_path_is_long(old_file.with_suffix(old_file.suffix + ".new"))
+        or _external_path_is_long(target_file.with_suffix(target_file.suffix + ".new"))
     )
 
     if not needs_stage:
-        tmp = old_file.with_suffix(old_file.suffix + ".new")
+        tmp = target_file.with_suffix(target_file.suffix + ".new")
         try:
             run_quiet(
                 [
@@ -378,7 +383,7 @@ def _apply_single(
                     tmp.unlink()
                 return False
 
-            os.replace(tmp, old_file)
+            os.replace(tmp, target_file)
             return True
 
         except subprocess.CalledProcessError as e:
@@ -420,7 +425,7 @@ def _apply_single(
         ):
             return False
 
-        _replace_file(staged_output, old_file)
+        _replace_file(staged_output, target_file)
         return True
     finally:
         shutil.rmtree(stage_dir, ignore_errors=True)
@@ -440,9 +445,12 @@ def apply_all_patches(
     point at a materialized web package cache.
     """
 
+    from .delta_references import package_delta_references
+
     patch_root = Path(patch_root)
     zstd_files = list(patch_root.rglob("*.zst"))
     total = len(zstd_files)
+    references = package_delta_references(patch_root)
 
     if not zstd_files:
         print("No .zst patches found.")
@@ -462,7 +470,14 @@ def apply_all_patches(
     ) as bar:
         with ThreadPoolExecutor(max_workers=workers) as ex:
             futs = {
-                ex.submit(_apply_single, p, Path(dest_dir), patch_root, cancel_event): p
+                ex.submit(
+                    _apply_single,
+                    p,
+                    Path(dest_dir),
+                    patch_root,
+                    cancel_event,
+                    references.get(p.relative_to(patch_root).with_suffix("").as_posix()),
+                ): p
                 for p in zstd_files
             }
             for fut in as_completed(futs):
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import archived_snapshot, web_download
+from sierra_patcher.archived_snapshot import (
+    ARCHIVED_SNAPSHOT_MARKER,
+    ArchivedSnapshotError,
+    archive_web_release,
+    read_archived_snapshot,
+)
+from sierra_patcher.package_source import ArchivedSnapshotSource
+
+from tests.test_repository_tools import _write_release
+
+
+def _write_snapshot(root: Path, package_id: str, files: dict[str, bytes]) -> None:
+    _write_release(root, package_id, files)
+    (root / ARCHIVED_SNAPSHOT_MARKER).write_text(
+        json.dumps(
+            {
+                "format_version": 1,
+                "type": "sierra_archived_snapshot",
+                "package_id": package_id,
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+class ArchivedSnapshotStorageTests(unittest.TestCase):
+    def test_prepare_storage_only_reads_storage_objects(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            snapshot = Path(temporary) / "snapshot"
+            cache = Path(temporary) / "cache"
+            _write_snapshot(
+                snapshot,
+                "4.0.13",
+                {
+                    "storage/source_hashes.json": b"{}",
+                    "storage/metadata.info": b"{}",
+                    "patchfiles/EscapeFromTarkov_Data/level0.zst": b"delta",
+                },
+            )
+            # A damaged patch object must not matter to the storage-only pass.
+            for path in (snapshot / "objects").rglob("*"):
+                if path.is_file() and path.read_bytes() == b"delta":
+                    path.write_bytes(b"DELTA")
+
+            source = ArchivedSnapshotSource(snapshot, cache, materialize_workers=2)
+            storage_root = source.prepare_storage()
+
+            self.assertEqual(
+                sorted(path.name for path in storage_root.iterdir()),
+                ["metadata.info", "source_hashes.json"],
+            )
+            self.assertFalse((storage_root.parent / "patchfiles").exists())
+
+            with self.assertRaises(ArchivedSnapshotError):
+                source.prepare()
+
+
+class ArchivedSnapshotMaterializeTests(unittest.TestCase):
+    FILES = {
+        "storage/metadata.info": b"{}",
+        "patchfiles/EscapeFromTarkov_Data/level0.zst": b"delta" * 100,
+        "storage/source_hashes.json": b"payload" * 100,
+    }
+
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.snapshot = Path(self._temporary.name) / "snapshot"
+        self.cache = Path(self._temporary.name) / "cache"
+        _write_snapshot(self.snapshot, "4.0.13", self.FILES)
+        self.objects = [path for path in (self.snapshot / "objects").rglob("*") if path.is_file()]
+
+    def tearDown(self) -> None:
+        self._temporary.cleanup()
+
+    def _opened_objects(self, source: ArchivedSnapshotSource) -> list[str]:
+        real_open = open
+        opened = []
+
+        def tracking_open(path, *args, **kwargs):
+            if Path(path).parent.parent.name == "objects":
+                opened.append(Path(path).name)
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch("builtins.open", tracking_open):
+            source.prepare()
+        return opened
+
+    def test_objects_are_verified_while_the_package_is_rebuilt(self) -> None:
+        source = ArchivedSnapshotSource(self.snapshot, self.cache, materialize_workers=2)
+        with mock.patch.object(archived_snapshot, "_verify_archived_objects") as separate:
+            opened = self._opened_objects(source)
+
+        separate.assert_not_called()
+        self.assertEqual(sorted(opened), sorted(path.name for path in self.objects))
+        layout = source.prepare()
+        self.assertEqual(
+            (Path(layout.patch_root) / "EscapeFromTarkov_Data" / "level0.zst").read_bytes(),
+            b"delta" * 100,
+        )
+
+    def test_damaged_object_fails_the_single_pass(self) -> None:
+        damaged = next(path for path in self.objects if path.read_bytes() == b"payload" * 100)
+        damaged.write_bytes(b"PAYLOAD" * 100)
+        source = ArchivedSnapshotSource(self.snapshot, self.cache, materialize_workers=2)
+
+        with self.assertRaises(ArchivedSnapshotError) as raised:
+            source.prepare()
+        self.assertIn("SHA-256", str(raised.exception))
+        self.assertIn(damaged.name, str(raised.exception))
+        self.assertFalse(
+            (self.cache / "packages" / "4.0.13" / "storage" / "source_hashes.json").exists()
+        )
+
+    def test_diagnostic_mode_scans_objects_before_rebuilding(self) -> None:
+        source = ArchivedSnapshotSource(
+            self.snapshot, self.cache, materialize_workers=2, verify_objects_first=True
+        )
+        with mock.patch.object(
+            web_download, "_verify_file", wraps=web_download._verify_file
+        ) as verify_file:
+            source.prepare()
+        self.assertEqual(verify_file.call_count, len(self.objects))
+
+
+class ArchiveFromWebCacheTests(unittest.TestCase):
+    FILES = {
+        "storage/metadata.info": b"{}",
+        "patchfiles/EscapeFromTarkov_Data/level0.zst": b"delta" * 100,
+    }
+    NEXT_FILES = {
+        "storage/metadata.info": b"{}",
+        "patchfiles/EscapeFromTarkov_Data/level0.zst": b"next delta" * 100,
+    }
+
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.cache = Path(self._temporary.name) / "web_cache"
+        self.snapshot = Path(self._temporary.name) / "snapshot"
+        _write_release(self.cache, "4.0.13", self.FILES)
+        self.manifest = json.loads(
+            (self.cache / "releases" / "4.0.13" / "manifest.json").read_text(encoding="utf-8")
+        )
+        self.object_ids = [entry["objects"][0]["id"] for entry in self.manifest["files"]]
+
+    def tearDown(self) -> None:
+        self._temporary.cleanup()
+
+    def _archive(self, downloaded: list[str], package_id: str = "4.0.13", **options):
+        manifest = self.manifest
+        if package_id != "4.0.13":
+            manifest = json.loads(
+                (self.cache / "releases" / package_id / "manifest.json").read_text(encoding="utf-8")
+            )
+        by_id = {
+            hashlib.sha256(data).hexdigest(): data
+            for data in (*self.FILES.values(), *self.NEXT_FILES.values())
+        }
+
+        def download(url, destination, **_kwargs):
+            downloaded.append(Path(destination).name)
+            Path(destination).parent.mkdir(parents=True, exist_ok=True)
+            Path(destination).write_bytes(by_id[Path(destination).name])
+
+        with mock.patch.object(
+            web_download, "fetch_manifest", return_value=manifest
+        ), mock.patch.object(web_download, "_download_with_retries", side_effect=download):
+            return archive_web_release(
+                package_id,
+                self.snapshot,
+                self.cache,
+                download_workers=2,
+                include_patcher=False,
+                **options,
+            )
+
+    def _snapshot_object(self, object_id: str) -> Path:
+        return self.snapshot / "objects" / object_id[:2] / object_id
+
+    def _cache_object(self, object_id: str) -> Path:
+        return self.cache / "objects" / object_id[:2] / object_id
+
+    def test_cached_release_is_archived_without_downloading(self) -> None:
+        downloaded: list[str] = []
+        info = self._archive(downloaded)
+
+        self.assertEqual(downloaded, [])
+        self.assertEqual(read_archived_snapshot(self.snapshot).package_id, info.package_id)
+        for object_id in self.object_ids:
+            self.assertTrue(self._snapshot_object(object_id).samefile(self._cache_object(object_id)))
+
+    def test_other_volume_copies_and_verifies(self) -> None:
+        downloaded: list[str] = []
+        with mock.patch.object(archived_snapshot, "_same_volume", return_value=False):
+            self._archive(downloaded)
+
+        self.assertEqual(downloaded, [])
+        for object_id in self.object_ids:
+            snapshot_object = self._snapshot_object(object_id)
+            self.assertFalse(snapshot_object.samefile(self._cache_object(object_id)))
+            self.assertEqual(snapshot_object.read_bytes(), self._cache_object(object_id).read_bytes())
+
+    def test_damaged_or_missing_cache_objects_are_downloaded(self) -> None:
+        damaged, missing = self.object_ids
+        self._cache_object(damaged).write_bytes(b"x" * self._cache_object(damaged).stat().st_size)
+        self._cache_object(missing).unlink()
+
+        downloaded: list[str] = []
+        self._archive(downloaded)
+
+        self.assertEqual(sorted(downloaded), sorted(self.object_ids))
+        self.assertFalse(self._cache_object(damaged).exists())
+        for object_id in self.object_ids:
+            data = self._snapshot_object(object_id).read_bytes()
+            self.assertEqual(hashlib.sha256(data).hexdigest(), object_id)
+
+    def test_second_release_shares_the_object_store(self) -> None:
+        _write_release(self.cache, "4.0.14", self.NEXT_FILES)
+        first: list[str] = []
+        second: list[str] = []
+        self._archive(first, reuse_web_cache=False)
+        info = self._archive(second, "4.0.14", reuse_web_cache=False)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, [hashlib.sha256(b"next delta" * 100).hexdigest()])
+        self.assertEqual(info.releases, ("4.0.13", "4.0.14"))
+        self.assertEqual(read_archived_snapshot(self.snapshot).package_id, "4.0.14")
+        self.assertEqual(
+            [entry["id"] for entry in json.loads((self.snapshot / "catalog.json").read_text())["releases"]],
+            ["4.0.13", "4.0.14"],
+        )
+        with self.assertRaises(ArchivedSnapshotError):
+            read_archived_snapshot(self.snapshot, "4.0.12")
+
+        source = ArchivedSnapshotSource(
+            self.snapshot, Path(self._temporary.name) / "install", package_id="4.0.13"
+        )
+        layout = source.prepare()
+        self.assertEqual(layout.package_id, "4.0.13")
+        self.assertEqual(
+            (Path(layout.patch_root) / "EscapeFromTarkov_Data" / "level0.zst").read_bytes(),
+            b"delta" * 100,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import hybrid_payload
+from sierra_patcher.compression_policy import cap_zstd_level, decide
+from sierra_patcher.hybrid_payload import GENERATION_REPORT_NAME, generate_patches
+
+
+_ZSTD = shutil.which("zstd")
+
+
+class CompressionPolicyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+
+    def tearDown(self) -> None:
+        self._temporary.cleanup()
+
+    def test_levels_are_only_ever_lowered(self) -> None:
+        self.assertEqual(cap_zstd_level(["--ultra", "-22", "--long=31"], 3), ["-3", "--long=31"])
+        self.assertEqual(cap_zstd_level(["-3", "--long=31"], 19), ["-3", "--long=31"])
+        self.assertEqual(cap_zstd_level(["--ultra", "-22", "--long=31"], None), ["--ultra", "-22", "--long=31"])
+
+    def test_sampled_data_picks_the_class(self) -> None:
+        packed = self.root / "sound.bundle"
+        packed.write_bytes(os.urandom(600 * 1024))
+        config = self.root / "config.bundle"
+        config.write_bytes(b'{"enabled": true, "items": []}\n' * 20000)
+
+        noisy = decide(packed, ["--ultra", "-22", "--long=31"])
+        self.assertEqual((noisy.file_class, noisy.level), ("incompressible", 3))
+        self.assertGreater(noisy.full_size_floor(1000), 900)
+
+        plain = decide(config, ["--ultra", "-22", "--long=31"])
+        self.assertEqual((plain.file_class, plain.level), ("bundle", 19))
+        self.assertIsNone(plain.full_size_floor(1000))
+
+    @unittest.skipUnless(_ZSTD, "zstd is not installed")
+    def test_thin_samples_do_not_skip_the_full_probe(self) -> None:
+        # Noise wherever the sample reads, with a compressible stretch between.
+        size = 8 * 1024 * 1024
+        middle = b'{"sound": "footstep", "volume": 0.8}\n' * (1600 * 1024 // 37)
+        start = int(size * 0.4)
+        data = bytearray(os.urandom(size))
+        data[start : start + len(middle)] = middle
+        source = self.root / "Live"
+        target = self.root / "SPT"
+        for root, content in ((source, os.urandom(size)), (target, bytes(data))):
+            (root / "Data").mkdir(parents=True)
+            (root / "Data" / "ambience.bank").write_bytes(content)
+
+        decision = decide(target / "Data" / "ambience.bank", ["-3"])
+        self.assertEqual(decision.file_class, "incompressible")
+        self.assertIsNone(decision.full_size_floor(size))
+
+        with mock.patch.object(hybrid_payload, "ZSTD_EXE", _ZSTD):
+            generate_patches(
+                str(source),
+                str(target),
+                str(self.root / "package" / "patchfiles"),
+                str(self.root / "package" / "additional_files"),
+                workers=1,
+                zstd_args=["-3"],
+            )
+
+        report = json.loads((self.root / "package" / GENERATION_REPORT_NAME).read_text(encoding="utf-8"))
+        (record,) = report["files"]
+        self.assertEqual((record["full_probe"], record["kind"]), ("ran", "full"))
+
+    @unittest.skipUnless(_ZSTD, "zstd is not installed")
+    def test_generation_skips_full_probes_that_cannot_win(self) -> None:
+        source = self.root / "Live"
+        target = self.root / "SPT"
+        noise = os.urandom(1024 * 1024)
+        text = b'{"name": "item", "price": 1000, "weight": 0.5}\n' * 4000
+        for root, noise_data, text_data in (
+            (source, noise, text),
+            (target, noise[:4096] + b"changed" + noise[4103:], text.replace(b"1000", b"2000")),
+        ):
+            (root / "Data").mkdir(parents=True)
+            (root / "Data" / "audio.bank").write_bytes(noise_data)
+            (root / "Data" / "items.json").write_bytes(text_data)
+
+        delta_args = []
+        original = hybrid_payload._generate_delta
+
+        def record(*args, **kwargs):
+            delta_args.append(kwargs["zstd_args"])
+            return original(*args, **kwargs)
+
+        with mock.patch.object(hybrid_payload, "ZSTD_EXE", _ZSTD), \
+                mock.patch.object(hybrid_payload, "_generate_delta", side_effect=record):
+            generate_patches(
+                str(source),
+                str(target),
+                str(self.root / "package" / "patchfiles"),
+                str(self.root / "package" / "additional_files"),
+                workers=2,
+                zstd_args=["-19", "--long=31"],
+            )
+
+        report = json.loads((self.root / "package" / GENERATION_REPORT_NAME).read_text(encoding="utf-8"))
+        files = {item["path"]: item for item in report["files"]}
+        self.assertEqual(
+            {key: files["Data/audio.bank"][key] for key in ("class", "level", "full_probe", "kind")},
+            {"class": "incompressible", "level": 3, "full_probe": "skipped", "kind": "delta"},
+        )
+        self.assertEqual(
+            {key: files["Data/items.json"][key] for key in ("class", "level", "full_probe")},
+            {"class": "text", "level": 19, "full_probe": "ran"},
+        )
+        self.assertEqual(report["summary"]["full_probes_skipped"], 1)
+        # Only the full candidate is capped; both deltas keep the preset.
+        self.assertEqual(delta_args, [["-19", "--long=31"]] * 2)
+        self.assertTrue((self.root / "package" / "patchfiles" / "Data" / "audio.bank.zst").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
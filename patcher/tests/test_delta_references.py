@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import hybrid_payload, patch_apply, zstd_patch
+from sierra_patcher.delta_references import ReferenceFinder, load_delta_references
+from sierra_patcher.hybrid_payload import generate_patches
+from sierra_patcher.patch_apply import apply_patches_resilient
+from sierra_patcher.source_integrity import build_source_hash_manifest
+
+
+_ZSTD = shutil.which("zstd")
+
+
+def _asset(seed: int, size: int = 512 * 1024) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+class ReferenceFinderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.live = self.root / "Live"
+        self.target = self.root / "SPT"
+
+    def tearDown(self) -> None:
+        self._temporary.cleanup()
+
+    def _write(self, path: Path, data: bytes) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def test_identical_then_name_then_sketch(self) -> None:
+        moved = _asset(1)
+        renamed = _asset(2)
+        edited = bytearray(_asset(3))
+        self._write(self.live / "Data/old/moved.bundle", moved)
+        self._write(self.live / "Data/old/sounds.bank", renamed)
+        self._write(self.live / "Data/old/map.assets", bytes(edited))
+        edited[1000:1010] = b"0123456789"
+
+        finder = ReferenceFinder(self.live, self.target)
+        cases = {
+            "Data/new/renamed.bundle": (moved, ("Data/old/moved.bundle", "identical")),
+            "Data/new/sounds.bank": (_asset(4), ("Data/old/sounds.bank", "name")),
+            "Data/new/level.assets": (bytes(edited), ("Data/old/map.assets", "sketch")),
+        }
+        for relative, (data, expected) in cases.items():
+            with self.subTest(relative):
+                found = finder.find(relative, self._write(self.target / relative, data))
+                self.assertEqual((found.path, found.match), expected)
+
+        self.assertIsNone(finder.find("Data/new/other.dll", self._write(self.target / "Data/new/other.dll", _asset(5))))
+
+    def test_references_changed_by_the_release_are_not_used(self) -> None:
+        self._write(self.live / "Data/shared.bundle", _asset(1))
+        self._write(self.target / "Data/shared.bundle", _asset(2))
+        copy = self._write(self.target / "Data/copy/shared.bundle", _asset(1))
+
+        self.assertIsNone(ReferenceFinder(self.live, self.target).find("Data/copy/shared.bundle", copy))
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class CrossPathDeltaTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.live = self.root / "Live"
+        self.target = self.root / "SPT"
+        self.package = self.root / "package"
+        self.storage = self.package / "storage"
+
+        asset = bytearray(_asset(7, 2 * 1024 * 1024))
+        (self.live / "EscapeFromTarkov_Data/StreamingAssets/old").mkdir(parents=True)
+        (self.live / "EscapeFromTarkov_Data/StreamingAssets/old/weapons.bundle").write_bytes(bytes(asset))
+        asset[4096:4200] = os.urandom(104)
+        (self.target / "EscapeFromTarkov_Data/StreamingAssets/new").mkdir(parents=True)
+        (self.target / "EscapeFromTarkov_Data/StreamingAssets/new/weapons.bundle").write_bytes(bytes(asset))
+
+        self._patches = [
+            mock.patch.object(module, "ZSTD_EXE", _ZSTD) for module in (hybrid_payload, patch_apply, zstd_patch)
+        ]
+        for patch in self._patches:
+            patch.start()
+        generate_patches(
+            str(self.live),
+            str(self.target),
+            str(self.package / "patchfiles"),
+            str(self.package / "additional_files"),
+            workers=2,
+        )
+        build_source_hash_manifest(self.live, self.package / "patchfiles", self.storage, workers=2)
+
+    def tearDown(self) -> None:
+        for patch in self._patches:
+            patch.stop()
+        self._temporary.cleanup()
+
+    def test_moved_file_ships_as_a_delta_against_its_old_path(self) -> None:
+        moved = "EscapeFromTarkov_Data/StreamingAssets/new/weapons.bundle"
+        old = "EscapeFromTarkov_Data/StreamingAssets/old/weapons.bundle"
+        patch = self.package / "patchfiles" / (moved + ".zst")
+        self.assertLess(patch.stat().st_size, 64 * 1024)
+        self.assertEqual(load_delta_references(self.storage), {moved: old})
+        hashes = json.loads((self.storage / "source_hashes.json").read_text(encoding="utf-8"))
+        self.assertEqual([entry["path"] for entry in hashes["files"]], [old])
+
+        for name, apply in (
+            ("resilient", lambda destination: apply_patches_resilient(
+                destination, workers=2, patch_root=self.package / "patchfiles")),
+            ("legacy", lambda destination: zstd_patch.apply_all_patches(
+                str(destination), workers=2, use_tqdm=False, patch_root=self.package / "patchfiles")),
+        ):
+            with self.subTest(name):
+                destination = self.root / f"install-{name}"
+                shutil.copytree(self.live, destination)
+                apply(destination)
+                self.assertEqual((destination / moved).read_bytes(), (self.target / moved).read_bytes())
+                self.assertTrue((destination / old).is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import distributed_generation, hybrid_payload, patch_apply
+from sierra_patcher.distributed_generation import generate_patches_distributed, partition_jobs
+from sierra_patcher.hybrid_payload import GENERATION_REPORT_NAME, apply_payloads, finalize_payloads
+from sierra_patcher.patch_apply import apply_patches_resilient
+
+
+_ZSTD = shutil.which("zstd")
+_PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+# A worker process; "hang" makes it claim a job and never finish it.
+_WORKER = """
+import sys, time
+from sierra_patcher import distributed_generation, hybrid_payload
+hybrid_payload.ZSTD_EXE = sys.argv[2]
+if sys.argv[3] == "hang":
+    distributed_generation._process_target_file = lambda *args: time.sleep(3600)
+distributed_generation.run_worker(sys.argv[1], threads=2, worker_id=sys.argv[3], wait_seconds=60)
+"""
+
+
+class PartitionTests(unittest.TestCase):
+    def test_large_files_run_alone_and_first(self) -> None:
+        sizes = {"a.bundle": 300, "b.json": 10, "c.json": 20, "d.bank": 120, "e.txt": 5}
+        with mock.patch.object(distributed_generation, "JOB_TARGET_BYTES", 100), \
+                mock.patch.object(distributed_generation, "JOB_MAX_FILES", 2):
+            self.assertEqual(
+                partition_jobs(sizes),
+                [["a.bundle"], ["d.bank"], ["c.json", "b.json"], ["e.txt"]],
+            )
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class DistributedGenerationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.live = self.root / "Live"
+        self.target = self.root / "SPT"
+        self.package = self.root / "package"
+        self.queue = self.root / "queue"
+        self.processes: list[subprocess.Popen] = []
+
+        rng = random.Random(5)
+        for number in range(4):
+            data = bytearray(rng.randbytes(512 * 1024))
+            (self.live / "Data").mkdir(parents=True, exist_ok=True)
+            (self.live / "Data" / f"level{number}.assets").write_bytes(bytes(data))
+            data[number * 1000 : number * 1000 + 32] = os.urandom(32)
+            (self.target / "Data").mkdir(parents=True, exist_ok=True)
+            (self.target / "Data" / f"level{number}.assets").write_bytes(bytes(data))
+        (self.target / "SPT" / "configs").mkdir(parents=True)
+        for name in ("bot", "core", "ragfair"):
+            (self.target / "SPT" / "configs" / f"{name}.json").write_text(json.dumps({"name": name}) * 50)
+        (self.target / "BepInEx").mkdir()
+        (self.target / "BepInEx" / "core.dll").write_bytes(rng.randbytes(400 * 1024))
+
+        self._patches = [
+            mock.patch.object(module, "ZSTD_EXE", _ZSTD) for module in (hybrid_payload, patch_apply)
+        ]
+        self._patches.append(mock.patch.object(distributed_generation, "JOB_TARGET_BYTES", 600 * 1024))
+        for patch in self._patches:
+            patch.start()
+
+    def tearDown(self) -> None:
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+        for patch in self._patches:
+            patch.stop()
+        self._temporary.cleanup()
+
+    def _start_worker(self, name: str) -> subprocess.Popen:
+        environment = dict(os.environ, PYTHONPATH=str(_PACKAGE_ROOT))
+        process = subprocess.Popen(
+            [sys.executable, "-c", _WORKER, str(self.queue), _ZSTD, name],
+            cwd=_PACKAGE_ROOT,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.processes.append(process)
+        return process
+
+    def _coordinate_in_thread(self, errors: list) -> threading.Thread:
+        def coordinate() -> None:
+            try:
+                generate_patches_distributed(
+                    str(self.live),
+                    str(self.target),
+                    str(self.package / "patchfiles"),
+                    str(self.package / "additional_files"),
+                    self.queue,
+                    zstd_args=["-3", "--long=31"],
+                    lease_seconds=1.0,
+                )
+            except BaseException as exc:
+                errors.append(exc)
+
+        coordinator = threading.Thread(target=coordinate)
+        coordinator.start()
+        return coordinator
+
+    def test_accepted_jobs_are_not_claimed_again(self) -> None:
+        processed = []
+        original = distributed_generation._process_target_file
+
+        def record(source_root, target_root, target_file, *args):
+            processed.append(Path(target_file).relative_to(self.target).as_posix())
+            return original(source_root, target_root, target_file, *args)
+
+        errors = []
+        coordinator = self._coordinate_in_thread(errors)
+        with mock.patch.object(distributed_generation, "_process_target_file", side_effect=record):
+            distributed_generation.run_worker(self.queue, threads=2, worker_id="solo", wait_seconds=60)
+        coordinator.join(timeout=120)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(processed), len(set(processed)))
+        self.assertEqual(len(processed), 8)
+
+    def test_worker_exits_cleanly_when_the_run_ends_under_its_job(self) -> None:
+        (self.queue / "jobs").mkdir(parents=True)
+        (self.queue / "leases").mkdir()
+        (self.queue / "results").mkdir()
+        distributed_generation._write_json(
+            self.queue / distributed_generation.RUN_FILENAME,
+            {
+                "format_version": distributed_generation.QUEUE_FORMAT_VERSION,
+                "run_id": "run",
+                "source_root": str(self.live),
+                "dest_root": str(self.target),
+                "zstd_args": ["-3"],
+                "lease_seconds": 60.0,
+            },
+        )
+        distributed_generation._write_json(self.queue / "jobs" / "000000.json", {"files": ["Data/level0.assets"]})
+
+        def end_run(*_args):
+            # What the coordinator's final cleanup does to a running job.
+            for name in ("jobs", "leases", "results"):
+                shutil.rmtree(self.queue / name)
+            distributed_generation._write_json(
+                self.queue / distributed_generation.DONE_FILENAME, {"run_id": "run", "status": "failed"}
+            )
+            raise OSError("staging folder removed")
+
+        with mock.patch.object(distributed_generation, "_process_target_file", side_effect=end_run):
+            distributed_generation.run_worker(self.queue, threads=1, worker_id="late", wait_seconds=5)
+
+        self.assertEqual(sorted(path.name for path in self.queue.iterdir()), ["done.json", "run.json"])
+
+    def test_workers_survive_a_dead_worker_and_build_the_package(self) -> None:
+        errors = []
+        coordinator = self._coordinate_in_thread(errors)
+
+        # The first worker takes a job and dies holding its lease.
+        hung = self._start_worker("hang")
+        deadline = time.monotonic() + 60
+        while not list((self.queue / "leases").glob("*.json")):
+            self.assertLess(time.monotonic(), deadline, "no worker claimed a job")
+            time.sleep(0.05)
+        hung.kill()
+
+        healthy = [self._start_worker(f"worker-{number}") for number in range(2)]
+        coordinator.join(timeout=120)
+        self.assertFalse(coordinator.is_alive())
+        self.assertEqual(errors, [])
+        for process in healthy:
+            self.assertEqual(process.wait(timeout=30), 0)
+
+        report = json.loads((self.package / GENERATION_REPORT_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(report["summary"]["delta"], 4)
+        self.assertEqual(report["summary"]["additional"], 4)
+        self.assertEqual(sorted(path.name for path in self.queue.iterdir()), ["done.json", "run.json"])
+
+        finalize_payloads(self.package / "additional_files", self.package / "storage")
+        installed = self.root / "installed"
+        shutil.copytree(self.live, installed)
+        apply_patches_resilient(installed, workers=2, patch_root=self.package / "patchfiles")
+        apply_payloads(self.package / "storage", installed)
+        for path in self.target.rglob("*"):
+            if path.is_file():
+                relative = path.relative_to(self.target)
+                self.assertEqual((installed / relative).read_bytes(), path.read_bytes(), relative)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import tempfile
 import threading
@@ -95,6 +96,166 @@ class GameCopyTests(unittest.TestCase):
             self.assertFalse((destination / COPY_STATE_FILENAME).exists())
             self.assertEqual((destination / "EscapeFromTarkov_Data.bin").read_bytes(), payload)
 
+    def test_small_files_are_batched_and_large_files_run_alone(self) -> None:
+        files = [
+            (Path(f"s{i}"), Path(f"d{i}"), size)
+            for i, size in enumerate([10, 20, game_copy._LARGE_FILE_BYTES, 30, 40])
+        ]
+        with mock.patch.object(game_copy, "_BATCH_MAX_FILES", 2):
+            units = game_copy._copy_units(files)
+        self.assertEqual(
+            [[item[2] for item in unit] for unit in units],
+            [[10, 20], [game_copy._LARGE_FILE_BYTES], [30, 40]],
+        )
+
+    def test_parallel_copy_verifies_every_file_and_reports_throughput(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            source = root / "Live"
+            destination = root / "SPT"
+            (source / "EscapeFromTarkov_Data" / "StreamingAssets").mkdir(parents=True)
+            (source / "EscapeFromTarkov.exe").write_bytes(b"exe")
+            expected = {}
+            for index in range(40):
+                relative = Path("EscapeFromTarkov_Data") / "StreamingAssets" / f"bundle{index}"
+                expected[relative] = os.urandom(1000 + index)
+                (source / relative).write_bytes(expected[relative])
+            expected[Path("resources.assets")] = os.urandom(300_000)
+            (source / "resources.assets").write_bytes(expected[Path("resources.assets")])
+
+            messages = []
+            with mock.patch.object(game_copy, "_LARGE_FILE_BYTES", 200_000), mock.patch.object(
+                game_copy, "_BATCH_MAX_FILES", 8
+            ):
+                copy_live_game(
+                    source,
+                    destination,
+                    source_version="1.0",
+                    workers=4,
+                    on_progress=lambda *args: messages.append(args),
+                )
+
+            for relative, data in expected.items():
+                self.assertEqual((destination / relative).read_bytes(), data)
+            self.assertFalse((destination / COPY_STATE_FILENAME).exists())
+            self.assertRegex(messages[-1][3], r"complete \(\d+ MB/s\)")
+            copied = [args[1] for args in messages if args[3].startswith("Copying")]
+            self.assertEqual(max(copied), sum(len(data) for data in expected.values()) + 3)
+
+    def test_link_copy_links_untouched_files_and_copies_modified_ones(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            source = root / "Live"
+            destination = root / "SPT"
+            (source / "EscapeFromTarkov_Data").mkdir(parents=True)
+            (source / "EscapeFromTarkov.exe").write_bytes(b"exe")
+            (source / "EscapeFromTarkov_Data" / "level0").write_bytes(b"patched later")
+            (source / "EscapeFromTarkov_Data" / "sharedassets0").write_bytes(b"unchanged")
+
+            with mock.patch.object(game_copy, "_link_file", wraps=game_copy._link_file) as link:
+                copy_live_game(
+                    source,
+                    destination,
+                    source_version="1.0",
+                    link_unchanged=True,
+                    modified_paths={"EscapeFromTarkov_Data/level0"},
+                )
+
+            linked = {Path(call.args[1]).relative_to(destination) for call in link.call_args_list}
+            self.assertEqual(
+                linked,
+                {Path("EscapeFromTarkov.exe"), Path("EscapeFromTarkov_Data") / "sharedassets0"},
+            )
+            copied = destination / "EscapeFromTarkov_Data" / "level0"
+            self.assertFalse(os.path.samefile(copied, source / "EscapeFromTarkov_Data" / "level0"))
+            self.assertEqual(copied.read_bytes(), b"patched later")
+            self.assertEqual(
+                (destination / "EscapeFromTarkov_Data" / "sharedassets0").read_bytes(),
+                b"unchanged",
+            )
+            self.assertFalse((destination / COPY_STATE_FILENAME).exists())
+
+    def test_link_copy_falls_back_to_copying_when_linking_fails(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            source = root / "Live"
+            destination = root / "SPT"
+            source.mkdir()
+            (source / "EscapeFromTarkov.exe").write_bytes(b"exe")
+
+            with mock.patch.object(game_copy, "_link_file", return_value=False):
+                copy_live_game(source, destination, source_version="1.0", link_unchanged=True)
+
+            self.assertFalse(os.path.samefile(destination / "EscapeFromTarkov.exe", source / "EscapeFromTarkov.exe"))
+            self.assertEqual((destination / "EscapeFromTarkov.exe").read_bytes(), b"exe")
+
+    def test_package_touched_paths_reads_sources_deletions_and_payloads(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            package = Path(temporary)
+            storage = package / "storage"
+            storage.mkdir()
+            (storage / "source_hashes.json").write_text(
+                '{"format_version": 1, "algorithm": "sha256", "files": '
+                '[{"path": "EscapeFromTarkov_Data/level0", "size": 1, "sha256": "' + "a" * 64 + '"}]}',
+                encoding="utf-8",
+            )
+            (storage / "delete_list.txt").write_text("BattlEye\\BEService.exe\n\n", encoding="utf-8")
+            (package / "payloads" / "BepInEx").mkdir(parents=True)
+            (package / "payloads" / "BepInEx" / "config.cfg.zst").write_bytes(b"")
+
+            self.assertEqual(
+                game_copy.package_touched_paths(storage),
+                {
+                    "EscapeFromTarkov_Data/level0",
+                    "BattlEye\\BEService.exe",
+                    "BepInEx/config.cfg",
+                },
+            )
+
+    def test_only_patched_files_get_a_full_read_back(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            source = root / "Live"
+            destination = root / "SPT"
+            source.mkdir()
+            (source / "EscapeFromTarkov.exe").write_bytes(b"exe")
+            (source / "patched.bin").write_bytes(b"patched" * 100)
+
+            real_sha256 = game_copy._sha256_file
+            with mock.patch.object(game_copy, "_sha256_file", side_effect=real_sha256) as hashed:
+                verified = copy_live_game(
+                    source,
+                    destination,
+                    source_version="1.0",
+                    full_verify_paths=["patched.bin"],
+                )
+
+            self.assertEqual(
+                [Path(call.args[0]) for call in hashed.call_args_list],
+                [destination / "patched.bin"],
+            )
+            self.assertEqual(verified["EscapeFromTarkov.exe"], hashlib.sha256(b"exe").hexdigest())
+
+    def test_corrupt_final_block_fails_the_cheap_read_back(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            source = root / "Live"
+            destination = root / "SPT"
+            source.mkdir()
+            (source / "EscapeFromTarkov.exe").write_bytes(b"exe")
+            real_copystat = game_copy.shutil.copystat
+
+            def corrupt_then_copystat(source_file, destination_file):
+                if destination_file.endswith("EscapeFromTarkov.exe"):
+                    Path(destination_file).write_bytes(b"exx")
+                return real_copystat(source_file, destination_file)
+
+            with mock.patch.object(game_copy.shutil, "copystat", side_effect=corrupt_then_copystat):
+                with self.assertRaisesRegex(RuntimeError, "final block"):
+                    copy_live_game(source, destination, source_version="1.0", full_verify_paths=[])
+
+            self.assertFalse((destination / "EscapeFromTarkov.exe").exists())
+
     def test_verification_failure_keeps_resume_state_and_removes_bad_file(self) -> None:
         with tempfile.TemporaryDirectory() as temporary:
             root = Path(temporary)
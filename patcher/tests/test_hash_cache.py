@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher.game_copy import copy_live_game
+from sierra_patcher.hash_cache import (
+    FORCE_REHASH_ENV,
+    cached_sha256,
+    disable_hash_cache,
+    enable_hash_cache,
+    set_force_rehash,
+)
+from sierra_patcher.source_integrity import verify_destination_sources
+
+
+class HashCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        enable_hash_cache(self.root / "hash_cache.sqlite")
+
+    def tearDown(self) -> None:
+        disable_hash_cache()
+        set_force_rehash(False)
+        self._temporary.cleanup()
+
+    def _counting(self, value: str):
+        calls = []
+
+        def compute() -> str:
+            calls.append(1)
+            return value
+
+        return compute, calls
+
+    def test_unchanged_file_is_answered_from_the_cache(self) -> None:
+        path = self.root / "file.bin"
+        path.write_bytes(b"abc")
+        compute, calls = self._counting("a" * 64)
+
+        self.assertEqual(cached_sha256(path, compute), "a" * 64)
+        self.assertEqual(cached_sha256(path, compute), "a" * 64)
+        self.assertEqual(len(calls), 1)
+
+        # A reopened cache still knows the file.
+        enable_hash_cache(self.root / "other.sqlite")
+        enable_hash_cache(self.root / "hash_cache.sqlite")
+        self.assertEqual(cached_sha256(path, compute), "a" * 64)
+        self.assertEqual(len(calls), 1)
+
+    def test_modified_file_is_hashed_again(self) -> None:
+        path = self.root / "file.bin"
+        path.write_bytes(b"abc")
+        compute, calls = self._counting("a" * 64)
+        cached_sha256(path, compute)
+
+        path.write_bytes(b"abcd")
+        cached_sha256(path, compute)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        cached_sha256(path, compute)
+        self.assertEqual(len(calls), 3)
+
+    def test_forced_rehash_ignores_and_refreshes_cached_digests(self) -> None:
+        path = self.root / "file.bin"
+        path.write_bytes(b"abc")
+        cached_sha256(path, lambda: "a" * 64)
+
+        set_force_rehash(True)
+        self.assertEqual(cached_sha256(path, lambda: "b" * 64), "b" * 64)
+        set_force_rehash(False)
+        self.assertEqual(cached_sha256(path, lambda: "c" * 64), "b" * 64)
+
+        with mock.patch.dict(os.environ, {FORCE_REHASH_ENV: "1"}):
+            self.assertEqual(cached_sha256(path, lambda: "d" * 64), "d" * 64)
+
+    def test_disabled_cache_always_computes(self) -> None:
+        disable_hash_cache()
+        path = self.root / "file.bin"
+        path.write_bytes(b"abc")
+        compute, calls = self._counting("a" * 64)
+        cached_sha256(path, compute)
+        cached_sha256(path, compute)
+        self.assertEqual(len(calls), 2)
+
+    def test_source_preflight_after_copy_reuses_copy_hashes(self) -> None:
+        live = self.root / "Live"
+        destination = self.root / "SPT"
+        (live / "EscapeFromTarkov_Data").mkdir(parents=True)
+        (live / "EscapeFromTarkov.exe").write_bytes(b"exe")
+        (live / "EscapeFromTarkov_Data" / "level0").write_bytes(b"level0" * 1000)
+        storage = self.root / "storage"
+        storage.mkdir()
+        (storage / "source_hashes.json").write_text(
+            json.dumps(
+                {
+                    "format_version": 1,
+                    "algorithm": "sha256",
+                    "files": [
+                        {
+                            "path": "EscapeFromTarkov_Data/level0",
+                            "size": 6000,
+                            "sha256": hashlib.sha256(b"level0" * 1000).hexdigest(),
+                        }
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        verified = copy_live_game(
+            live,
+            destination,
+            source_version="1.0",
+            full_verify_paths=["EscapeFromTarkov_Data/level0"],
+        )
+        self.assertEqual(
+            set(verified), {"EscapeFromTarkov.exe", "EscapeFromTarkov_Data/level0"}
+        )
+
+        with mock.patch("sierra_patcher.source_integrity.open", create=True) as opened:
+            report = verify_destination_sources(storage, destination, workers=1)
+            report_live = verify_destination_sources(storage, live, workers=1)
+        opened.assert_not_called()
+        self.assertEqual((report.failed, report_live.failed), (0, 0))
+
+        disable_hash_cache()
+        with mock.patch("sierra_patcher.source_integrity.open", create=True) as opened:
+            report = verify_destination_sources(
+                storage, destination, workers=1, known_hashes=verified
+            )
+        opened.assert_not_called()
+        self.assertEqual(report.failed, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from sierra_patcher.hygiene import is_package_excluded
+from sierra_patcher.install_receipt import (
+    INSTALL_RECEIPT_NAME,
+    clear_install_receipt,
+    find_installs,
+    read_install_receipt,
+    register_install,
+    write_install_receipt,
+)
+
+
+class InstallReceiptTests(unittest.TestCase):
+    def test_receipt_round_trip_and_clear(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            self.assertIsNone(read_install_receipt(temporary))
+
+            write_install_receipt(temporary, "4.0.13", live_version="1.1.0.46699")
+            receipt = read_install_receipt(temporary)
+            self.assertEqual(receipt.package_id, "4.0.13")
+            self.assertEqual(receipt.live_version, "1.1.0.46699")
+
+            clear_install_receipt(temporary)
+            self.assertIsNone(read_install_receipt(temporary))
+            clear_install_receipt(temporary)
+
+    def test_damaged_receipt_is_ignored(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            (Path(temporary) / INSTALL_RECEIPT_NAME).write_text("{", encoding="utf-8")
+            self.assertIsNone(read_install_receipt(temporary))
+
+    def test_receipt_never_ships_in_generated_packages(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            self.assertTrue(is_package_excluded(root / INSTALL_RECEIPT_NAME, root))
+            self.assertFalse(is_package_excluded(root / "BepInEx" / INSTALL_RECEIPT_NAME, root))
+
+    def test_registry_follows_the_receipts(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            registry = root / "installs.json"
+            first, second = root / "first", root / "second"
+            for folder in (first, second):
+                folder.mkdir()
+                write_install_receipt(folder, "4.0.13")
+                register_install(folder, registry=registry)
+            register_install(first, registry=registry)
+
+            self.assertEqual(find_installs("4.0.13", registry=registry), [first.resolve(), second.resolve()])
+            self.assertEqual(find_installs("4.0.13", exclude=first, registry=registry), [second.resolve()])
+
+            # A folder re-patched to another release, or mid-install, is skipped.
+            write_install_receipt(second, "4.0.14")
+            clear_install_receipt(first)
+            self.assertEqual(find_installs("4.0.13", registry=registry), [])
+            self.assertEqual(find_installs("4.0.14", registry=registry), [second.resolve()])
+
+
+if __name__ == "__main__":
+    unittest.main()
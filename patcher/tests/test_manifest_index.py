@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import manifest_index
+from sierra_patcher.manifest_index import (
+    ManifestIndex,
+    ManifestIndexError,
+    index_path_for,
+    write_manifest_index,
+)
+
+
+def _entry(path: str, parts: list[bytes]) -> dict:
+    data = b"".join(parts)
+    return {
+        "path": path,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "objects": [
+            {"id": hashlib.sha256(part).hexdigest(), "size": len(part)} for part in parts
+        ],
+    }
+
+
+class ManifestIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp = tempfile.TemporaryDirectory()
+        self.manifest_path = Path(self._temp.name) / "releases" / "4.0.1" / "manifest.json"
+        self.manifest_path.parent.mkdir(parents=True)
+        self.manifest = {
+            "format_version": 1,
+            "package_id": "4.0.1",
+            "chunk_size": 4,
+            "files": [
+                _entry("storage/metadata.info", [b"{}"]),
+                _entry("payloads/Ünïcode/a.dll.zst", [b"abcd", b"ef"]),
+                _entry("patchfiles/empty.zst", []),
+            ],
+        }
+        self.manifest_path.write_text(json.dumps(self.manifest), encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._temp.cleanup()
+
+    def test_lookup_and_iteration_match_the_json_manifest(self) -> None:
+        write_manifest_index(self.manifest_path)
+
+        with ManifestIndex.for_manifest(self.manifest_path) as index:
+            self.assertEqual(index.package_id, "4.0.1")
+            self.assertEqual(index.chunk_size, 4)
+            self.assertEqual(len(index), 3)
+            for entry in self.manifest["files"]:
+                self.assertEqual(index.lookup(entry["path"]), entry)
+            self.assertIsNone(index.lookup("storage/missing.info"))
+            self.assertEqual(
+                [entry["path"] for entry in index.iter_entries()],
+                sorted(entry["path"] for entry in self.manifest["files"]),
+            )
+
+    def test_stale_or_missing_index_is_ignored(self) -> None:
+        self.assertIsNone(ManifestIndex.for_manifest(self.manifest_path))
+
+        write_manifest_index(self.manifest_path)
+        self.manifest["files"].pop()
+        self.manifest_path.write_text(json.dumps(self.manifest), encoding="utf-8")
+
+        self.assertIsNone(ManifestIndex.for_manifest(self.manifest_path))
+        with self.assertRaises(ManifestIndexError):
+            ManifestIndex(index_path_for(self.manifest_path), manifest_sha256="0" * 64)
+
+    def test_unchanged_manifest_is_not_reread(self) -> None:
+        write_manifest_index(self.manifest_path)
+
+        with mock.patch.object(manifest_index.hashlib, "sha256", side_effect=AssertionError):
+            with ManifestIndex.for_manifest(self.manifest_path) as index:
+                self.assertEqual(len(index), 3)
+
+        # Any other stat falls back to comparing the manifest's SHA-256.
+        self.manifest_path.write_text(json.dumps(self.manifest) + " ", encoding="utf-8")
+        self.assertIsNone(ManifestIndex.for_manifest(self.manifest_path))
+
+    def test_truncated_index_is_rejected(self) -> None:
+        index_path = write_manifest_index(self.manifest_path)
+        index_path.write_bytes(index_path.read_bytes()[:-3])
+
+        self.assertIsNone(ManifestIndex.for_manifest(self.manifest_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
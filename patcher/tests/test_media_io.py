@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher.media_io import (
+    MEDIA_OVERRIDE_ENV,
+    MEDIA_ROTATIONAL,
+    MEDIA_SSD,
+    detect_media,
+    disk_order,
+    plan_reads,
+)
+from sierra_patcher.package_source import ArchivedSnapshotSource
+
+from tests.test_archived_snapshot import _write_snapshot
+
+
+class ReadPlanTests(unittest.TestCase):
+    def test_ssd_keeps_the_requested_concurrency(self) -> None:
+        with mock.patch.dict(os.environ, {MEDIA_OVERRIDE_ENV: MEDIA_SSD}):
+            plan = plan_reads(".", 12)
+        self.assertEqual((plan.media, plan.workers, plan.sequential), (MEDIA_SSD, 12, False))
+
+    def test_seeking_media_use_few_sequential_streams_with_large_reads(self) -> None:
+        with mock.patch.dict(os.environ, {MEDIA_OVERRIDE_ENV: MEDIA_ROTATIONAL}):
+            rotational = plan_reads(".", 12)
+        with mock.patch.dict(os.environ, {MEDIA_OVERRIDE_ENV: "network"}):
+            network = plan_reads(".", 12)
+        self.assertEqual((rotational.workers, rotational.sequential), (1, True))
+        self.assertEqual((network.workers, network.sequential), (2, True))
+        with mock.patch.dict(os.environ, {MEDIA_OVERRIDE_ENV: MEDIA_SSD}):
+            self.assertGreater(rotational.block_size, plan_reads(".", 12).block_size)
+
+    def test_detection_never_raises(self) -> None:
+        with mock.patch.dict(os.environ, {MEDIA_OVERRIDE_ENV: ""}):
+            self.assertIsInstance(detect_media("/definitely/not/here"), str)
+
+    def test_disk_order_keeps_every_item(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            paths = []
+            for name in ("c", "a", "b"):
+                (root / name).write_bytes(name.encode() * 4096)
+                paths.append(root / name)
+            items = ["missing", *paths, None]
+            ordered = disk_order(items, lambda item: root / item if item == "missing" else item)
+        self.assertEqual(ordered[0], None)
+        self.assertEqual(ordered[-1], "missing")
+        self.assertEqual(sorted(map(str, ordered[1:-1])), sorted(map(str, paths)))
+
+
+class ArchivedSnapshotReadPlanTests(unittest.TestCase):
+    def test_rotational_snapshot_is_rebuilt_by_one_stream(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            snapshot = Path(temporary) / "snapshot"
+            _write_snapshot(
+                snapshot,
+                "4.0.13",
+                {f"storage/file{index}.bin": bytes([index]) * 1000 for index in range(8)},
+            )
+            messages = []
+            source = ArchivedSnapshotSource(snapshot, Path(temporary) / "cache", materialize_workers=8)
+            with mock.patch.dict(os.environ, {MEDIA_OVERRIDE_ENV: MEDIA_ROTATIONAL}):
+                storage_root = source.prepare_storage(
+                    on_progress=lambda phase, current, total, message: messages.append(message)
+                )
+
+            self.assertEqual(len(list(storage_root.iterdir())), 8)
+        self.assertIn("Reading snapshot (rotational media, 1 read stream)", messages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import hybrid_payload, repair
+from sierra_patcher.game_copy import package_touched_paths
+from sierra_patcher.hybrid_payload import (
+    apply_payloads,
+    finalize_payloads,
+    generate_patches,
+    load_payload_fanout,
+    read_solid_index,
+)
+from sierra_patcher.repair import DamagedFile, package_filter_for, repair_files
+
+
+_ZSTD = shutil.which("zstd")
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class PayloadFanoutTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.source = self.root / "Live"
+        self.target = self.root / "SPT"
+        self.package = self.root / "package"
+        self.storage = self.package / "storage"
+
+        # The same plugin shipped by three mods, and one config shipped twice.
+        self.plugin = os.urandom(300 * 1024)
+        self.config = b'{"enabled": true, "lootMultiplier": 2}\n' * 8
+        self.files = {
+            "BepInEx/plugins/ModA/shared.dll": self.plugin,
+            "BepInEx/plugins/ModB/shared.dll": self.plugin,
+            "BepInEx/plugins/ModC/shared.dll": self.plugin,
+            "SPT/user/mods/a/config.json": self.config,
+            "SPT/user/mods/b/config.json": self.config,
+        }
+        (self.source / "EscapeFromTarkov_Data").mkdir(parents=True)
+        (self.source / "EscapeFromTarkov_Data" / "globalgamemanagers").write_bytes(b"live")
+        shutil.copytree(self.source, self.target)
+        for relative, data in self.files.items():
+            (self.target / relative).parent.mkdir(parents=True, exist_ok=True)
+            (self.target / relative).write_bytes(data)
+
+        self._patches = [
+            mock.patch.object(hybrid_payload, "ZSTD_EXE", _ZSTD),
+            mock.patch.object(repair, "ZSTD_EXE", _ZSTD),
+        ]
+        for patch in self._patches:
+            patch.start()
+        stage = self.package / "additional_files"
+        generate_patches(str(self.source), str(self.target), str(self.package / "patchfiles"), str(stage), workers=2)
+        finalize_payloads(stage, self.storage)
+        self.payloads = self.package / "payloads"
+
+    def tearDown(self) -> None:
+        for patch in self._patches:
+            patch.stop()
+        self._temporary.cleanup()
+
+    def test_duplicates_ship_one_payload(self) -> None:
+        self.assertEqual(
+            load_payload_fanout(self.storage),
+            {
+                "BepInEx/plugins/ModA/shared.dll": [
+                    "BepInEx/plugins/ModB/shared.dll",
+                    "BepInEx/plugins/ModC/shared.dll",
+                ],
+                "SPT/user/mods/a/config.json": ["SPT/user/mods/b/config.json"],
+            },
+        )
+        self.assertEqual(
+            sorted(path.relative_to(self.payloads).as_posix() for path in self.payloads.rglob("*.dll.zst")),
+            ["BepInEx/plugins/ModA/shared.dll.zst"],
+        )
+        members = [member["path"] for archive in read_solid_index(self.payloads) for member in archive["members"]]
+        self.assertEqual(members, ["SPT/user/mods/a/config.json"])
+        self.assertEqual(package_touched_paths(self.storage), set(self.files))
+
+    def test_install_writes_every_copy(self) -> None:
+        destination = self.root / "installed"
+        destination.mkdir()
+        progress = []
+        # Every copy takes the large-file path; it must never share the leader's inode.
+        with mock.patch.object(hybrid_payload, "_FANOUT_CLONE_MIN_BYTES", 0):
+            apply_payloads(self.storage, destination, on_progress=lambda *args: progress.append(args[1:3]))
+
+        for relative, data in self.files.items():
+            self.assertEqual((destination / relative).read_bytes(), data)
+        self.assertEqual(progress[-1], (5, 5))
+        self.assertEqual(list(destination.rglob("*.sierra-fanout")), [])
+
+        leader = destination / "BepInEx/plugins/ModA/shared.dll"
+        with open(leader, "r+b") as stream:
+            stream.write(b"edited")
+        self.assertEqual((destination / "BepInEx/plugins/ModB/shared.dll").read_bytes(), self.plugin)
+
+    def test_repair_rebuilds_a_copy_from_its_leader(self) -> None:
+        damaged = DamagedFile(
+            "BepInEx/plugins/ModC/shared.dll", "missing", hashlib.sha256(self.plugin).hexdigest()
+        )
+        wanted = package_filter_for([damaged], self.storage)
+        self.assertTrue(wanted(Path("payloads/BepInEx/plugins/ModA/shared.dll.zst")))
+        self.assertFalse(wanted(Path("payloads/BepInEx/plugins/ModB/shared.dll.zst")))
+
+        installed = self.root / "installed"
+        shutil.copytree(self.target, installed)
+        (installed / damaged.path).unlink()
+        repaired, failed = repair_files(
+            [damaged],
+            installed,
+            patch_root=self.package / "patchfiles",
+            payload_root=self.payloads,
+            storage_root=self.storage,
+            live_root=None,
+        )
+        self.assertEqual((repaired, failed), ([damaged.path], []))
+        self.assertEqual((installed / damaged.path).read_bytes(), self.plugin)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import delta_references, hybrid_payload, patch_apply
+from sierra_patcher.hybrid_payload import GENERATION_REPORT_NAME, apply_payloads, finalize_payloads, generate_release_set
+from sierra_patcher.patch_apply import apply_patches_resilient
+
+
+_ZSTD = shutil.which("zstd")
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class ReleaseSetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.live = self.root / "Live"
+        self._patches = [
+            mock.patch.object(module, "ZSTD_EXE", _ZSTD) for module in (hybrid_payload, patch_apply)
+        ]
+        for patch in self._patches:
+            patch.start()
+
+        base = random.Random(1).randbytes(1024 * 1024)
+        (self.live / "Data").mkdir(parents=True)
+        (self.live / "Data" / "level.assets").write_bytes(base)
+        (self.live / "Data" / "unchanged.dll").write_bytes(b"same in every release")
+
+        # Current and experimental SPT trees built from the same Live client.
+        self.targets = {}
+        for number, name in enumerate(("current", "experimental"), start=2):
+            tree = self.root / name
+            shutil.copytree(self.live, tree)
+            edited = bytearray(base)
+            edited[number * 4096 : number * 4096 + 64] = os.urandom(64)
+            (tree / "Data" / "level.assets").write_bytes(bytes(edited))
+            (tree / "SPT").mkdir()
+            (tree / "SPT" / "release.json").write_text(json.dumps({"release": name}))
+            self.targets[name] = tree
+
+    def tearDown(self) -> None:
+        for patch in self._patches:
+            patch.stop()
+        self._temporary.cleanup()
+
+    def test_targets_share_one_pass_and_get_their_own_packages(self) -> None:
+        calls = []
+        original = hybrid_payload._process_target_file
+
+        def record(source_root, target_root, target_file, *args):
+            calls.append((Path(target_root).name, Path(os.path.relpath(target_file, target_root)).as_posix()))
+            return original(source_root, target_root, target_file, *args)
+
+        packages = {name: self.root / "output" / name for name in self.targets}
+        progress = []
+        with mock.patch.object(hybrid_payload, "_process_target_file", side_effect=record), \
+                mock.patch.object(hybrid_payload, "SourceIndex", wraps=delta_references.SourceIndex) as index:
+            counts = generate_release_set(
+                str(self.live),
+                [
+                    (str(tree), str(packages[name] / "patchfiles"), str(packages[name] / "additional_files"))
+                    for name, tree in self.targets.items()
+                ],
+                workers=1,
+                on_progress=lambda *args: progress.append(args[1:3]),
+            )
+
+        self.assertEqual(index.call_count, 1)
+        self.assertEqual(counts, [3, 3])
+        self.assertEqual(progress[-1], (6, 6))
+        # The same Live file is processed for every target back to back.
+        self.assertEqual(
+            calls[:2], [("current", "Data/level.assets"), ("experimental", "Data/level.assets")]
+        )
+
+        for name, tree in self.targets.items():
+            with self.subTest(name):
+                package = packages[name]
+                finalize_payloads(package / "additional_files", package / "storage")
+                report = json.loads((package / GENERATION_REPORT_NAME).read_text(encoding="utf-8"))
+                self.assertEqual(report["summary"]["delta"], 1)
+
+                installed = self.root / f"installed-{name}"
+                shutil.copytree(self.live, installed)
+                apply_patches_resilient(installed, workers=2, patch_root=package / "patchfiles")
+                apply_payloads(package / "storage", installed)
+                for relative in ("Data/level.assets", "Data/unchanged.dll", "SPT/release.json"):
+                    self.assertEqual((installed / relative).read_bytes(), (tree / relative).read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
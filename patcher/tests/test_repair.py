@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import repair
+from sierra_patcher.repair import build_target_hash_manifest, find_damaged_files, repair_files
+from sierra_patcher.source_integrity import build_source_hash_manifest
+
+
+_ZSTD = shutil.which("zstd")
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class RepairTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.live = self.root / "Live"
+        self.target = self.root / "SPT"
+        self.package = self.root / "package"
+        self.patches = self.package / "patchfiles"
+        self.payloads = self.package / "payloads"
+        self.storage = self.package / "storage"
+
+        old = bytes(range(256)) * 512
+        files = {
+            "Data/level0": (old, old[:1000] + b"patched" + old[1000:]),  # delta
+            "Data/unchanged.bin": (b"same" * 100, b"same" * 100),  # kept from Live
+            "BepInEx/plugin.dll": (None, b"new plugin" * 50),  # payload
+        }
+        for relative, (live_data, target_data) in files.items():
+            if live_data is not None:
+                self._write(self.live / relative, live_data)
+            self._write(self.target / relative, target_data)
+
+        self.patches.joinpath("Data").mkdir(parents=True)
+        self._zstd(["--patch-from", str(self.live / "Data/level0"), str(self.target / "Data/level0"),
+                    "-o", str(self.patches / "Data/level0.zst")])
+        self.payloads.joinpath("BepInEx").mkdir(parents=True)
+        self._zstd([str(self.target / "BepInEx/plugin.dll"), "-o", str(self.payloads / "BepInEx/plugin.dll.zst")])
+
+        build_source_hash_manifest(self.live, self.patches, self.storage, workers=2)
+        build_target_hash_manifest(self.target, self.storage, workers=2)
+
+        self.installed = self.root / "installed"
+        shutil.copytree(self.target, self.installed)
+        self._zstd_patch = mock.patch.object(repair, "ZSTD_EXE", _ZSTD)
+        self._zstd_patch.start()
+
+    def tearDown(self) -> None:
+        self._zstd_patch.stop()
+        self._temporary.cleanup()
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    @staticmethod
+    def _zstd(args: list[str]) -> None:
+        subprocess.run([_ZSTD, "-q", "-f", "--long=31", *args], check=True, capture_output=True)
+
+    def _repair(self, damaged, live_root=None):
+        return repair_files(
+            damaged,
+            self.installed,
+            patch_root=self.patches,
+            payload_root=self.payloads,
+            storage_root=self.storage,
+            live_root=self.live if live_root is None else live_root,
+            workers=2,
+        )
+
+    def test_healthy_install_has_nothing_to_repair(self) -> None:
+        self.assertEqual(find_damaged_files(self.storage, self.installed, workers=2), (3, []))
+
+    def test_only_damaged_files_are_rebuilt(self) -> None:
+        (self.installed / "Data/level0").write_bytes(b"x" * len((self.target / "Data/level0").read_bytes()))
+        (self.installed / "BepInEx/plugin.dll").unlink()
+        (self.installed / "Data/unchanged.bin").write_bytes(b"short")
+
+        checked, damaged = find_damaged_files(self.storage, self.installed, workers=2)
+        self.assertEqual(checked, 3)
+        self.assertEqual(
+            [(item.path, item.reason) for item in damaged],
+            [("BepInEx/plugin.dll", "missing"), ("Data/level0", "sha256"), ("Data/unchanged.bin", "size")],
+        )
+
+        repaired, failed = self._repair(damaged)
+        self.assertEqual((len(repaired), failed), (3, []))
+        for relative in ("Data/level0", "BepInEx/plugin.dll", "Data/unchanged.bin"):
+            self.assertEqual((self.installed / relative).read_bytes(), (self.target / relative).read_bytes())
+        self.assertEqual(find_damaged_files(self.storage, self.installed, workers=2), (3, []))
+
+    def test_delta_targets_need_a_matching_live_source(self) -> None:
+        original = (self.installed / "Data/level0").read_bytes()
+        (self.installed / "Data/level0").write_bytes(b"broken")
+        (self.live / "Data/level0").write_bytes(b"updated live build")
+
+        _checked, damaged = find_damaged_files(self.storage, self.installed, workers=2)
+        repaired, failed = self._repair(damaged)
+
+        self.assertEqual(repaired, [])
+        self.assertEqual(failed, [("Data/level0", "Live file does not match this release")])
+        self.assertEqual((self.installed / "Data/level0").read_bytes(), b"broken")
+        self.assertNotEqual(original, b"broken")
+        self.assertEqual([path.name for path in self.installed.iterdir() if path.name.startswith("sierra_repair_")], [])
+
+    def test_packages_without_target_hashes_are_reported(self) -> None:
+        (self.storage / repair.TARGET_HASHES_FILENAME).unlink()
+        self.assertIsNone(find_damaged_files(self.storage, self.installed))
+
+
+if __name__ == "__main__":
+    unittest.main()
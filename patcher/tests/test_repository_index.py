@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import repository_tools
+from sierra_patcher.repository_index import RepositoryIndex, index_path
+from sierra_patcher.repository_tools import (
+    collect_garbage,
+    load_release_metadata,
+    sync_repository_index,
+    update_release_metadata,
+)
+
+from tests.test_repository_tools import _age, _write_object, _write_release
+
+
+class RepositoryIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp.name)
+        _write_release(
+            self.root,
+            "4.0.1",
+            {"storage/metadata.info": b'{"version": "1.0"}', "payloads/a.zst": b"shared"},
+        )
+        _write_release(
+            self.root,
+            "4.0.2",
+            {"storage/metadata.info": b'{"version": "1.1"}', "payloads/a.zst": b"shared"},
+        )
+
+    def tearDown(self) -> None:
+        self._temp.cleanup()
+
+    def test_sync_records_releases_metadata_and_reference_counts(self) -> None:
+        self.assertEqual(sync_repository_index(self.root), ["4.0.1", "4.0.2"])
+
+        shared = hashlib.sha256(b"shared").hexdigest()
+        with RepositoryIndex(self.root) as index:
+            self.assertEqual(index.release_ids(), ["4.0.1", "4.0.2"])
+            self.assertEqual(index.release_metadata("4.0.2"), {"version": "1.1"})
+            self.assertEqual(index.object_ref_count(shared), 2)
+            self.assertEqual(len(list(index.iter_live_object_ids())), 3)
+            self.assertEqual(
+                [entry["path"] for entry in index.release_entries("4.0.1")],
+                ["payloads/a.zst", "storage/metadata.info"],
+            )
+
+        self.assertEqual(sync_repository_index(self.root), [])
+
+    def test_removed_release_drops_its_references(self) -> None:
+        sync_repository_index(self.root)
+        manifest = self.root / "releases" / "4.0.2" / "manifest.json"
+        manifest.unlink()
+        manifest.parent.rmdir()
+
+        sync_repository_index(self.root)
+
+        with RepositoryIndex(self.root) as index:
+            self.assertEqual(index.release_ids(), ["4.0.1"])
+            self.assertEqual(index.object_ref_count(hashlib.sha256(b"shared").hexdigest()), 1)
+            self.assertEqual(
+                index.object_ref_count(hashlib.sha256(b'{"version": "1.1"}').hexdigest()), 0
+            )
+
+    def test_metadata_comes_from_index_until_manifest_changes(self) -> None:
+        sync_repository_index(self.root)
+
+        with mock.patch.object(repository_tools, "_read_entry_bytes", side_effect=AssertionError):
+            self.assertEqual(load_release_metadata(self.root, "4.0.1"), {"version": "1.0"})
+
+        manifest = self.root / "releases" / "4.0.1" / "manifest.json"
+        stat = manifest.stat()
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        with RepositoryIndex(self.root) as index:
+            self.assertFalse(index.is_current("4.0.1"))
+        self.assertEqual(load_release_metadata(self.root, "4.0.1"), {"version": "1.0"})
+
+    def test_metadata_edit_updates_the_index_transactionally(self) -> None:
+        sync_repository_index(self.root)
+
+        update_release_metadata(self.root, "4.0.1", {"version": "2.0"})
+
+        with RepositoryIndex(self.root) as index:
+            self.assertTrue(index.is_current("4.0.1"))
+            self.assertEqual(index.release_metadata("4.0.1"), {"version": "2.0"})
+            self.assertEqual(
+                index.object_ref_count(hashlib.sha256(b'{"version": "1.0"}').hexdigest()), 0
+            )
+
+    def test_garbage_collection_uses_indexed_live_set(self) -> None:
+        sync_repository_index(self.root)
+        orphan = _write_object(self.root, b"orphan")
+        for path in (self.root / "objects").rglob("*"):
+            if path.is_file():
+                _age(path)
+
+        with mock.patch.object(repository_tools, "_mark_live_objects", side_effect=AssertionError):
+            report = collect_garbage(self.root)
+
+        self.assertEqual(report.live_object_count, 3)
+        self.assertEqual(report.unreferenced_object_count, 1)
+        self.assertTrue((self.root / "objects" / orphan[:2] / orphan).is_file())
+
+    def test_sweep_marks_from_manifests_the_index_missed(self) -> None:
+        sync_repository_index(self.root)
+        manifest = self.root / "releases" / "4.0.2" / "manifest.json"
+        stat = manifest.stat()
+        # Swap in a manifest of the same size and mtime that references "swapd".
+        replacement = manifest.read_bytes().replace(
+            hashlib.sha256(b"shared").hexdigest().encode(), _write_object(self.root, b"swapd").encode()
+        ).replace(b'"size": 6', b'"size": 5').replace(b'"chunk_size": 1024', b'"chunk_size": 4096')
+        self.assertEqual(len(replacement), stat.st_size)
+        manifest.write_bytes(replacement)
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        for path in (self.root / "objects").rglob("*"):
+            if path.is_file():
+                _age(path)
+
+        with RepositoryIndex(self.root) as index:
+            self.assertTrue(index.is_current("4.0.2"))
+            self.assertFalse(index.is_current("4.0.2", check_sha256=True))
+        collect_garbage(self.root, dry_run=False)
+
+        swapped = hashlib.sha256(b"swapd").hexdigest()
+        self.assertTrue((self.root / "objects" / swapped[:2] / swapped).is_file())
+
+    def test_repositories_without_an_index_are_not_given_one(self) -> None:
+        repository_tools.rebuild_catalog(self.root)
+
+        self.assertFalse(index_path(self.root).exists())
+        self.assertEqual(
+            json.loads((self.root / "catalog.json").read_text(encoding="utf-8"))["releases"][0]["id"],
+            "4.0.1",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import repository_tools
+from sierra_patcher.manifest_index import ManifestIndex, write_manifest_index
+
+from sierra_patcher.repository_tools import (
+    RepositoryToolError,
+    _LiveObjectSet,
+    collect_garbage,
+    load_release_metadata,
+    update_release_metadata,
+    verify_release,
+    verify_releases,
+)
+
+
+def _write_object(root: Path, data: bytes) -> str:
+    object_id = hashlib.sha256(data).hexdigest()
+    path = root / "objects" / object_id[:2] / object_id
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return object_id
+
+
+def _write_release(root: Path, package_id: str, files: dict[str, bytes]) -> None:
+    entries = []
+    for logical_path, data in files.items():
+        object_id = _write_object(root, data)
+        entries.append(
+            {
+                "path": logical_path,
+                "size": len(data),
+                "sha256": object_id,
+                "objects": [{"id": object_id, "size": len(data)}],
+            }
+        )
+    manifest_path = root / "releases" / package_id / "manifest.json"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "format_version": 1,
+                "package_id": package_id,
+                "chunk_size": 1024,
+                "files": entries,
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def _age(path: Path, seconds: float = 7200) -> None:
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+class LiveObjectSetTests(unittest.TestCase):
+    def test_membership_survives_merges_and_duplicates(self) -> None:
+        live = _LiveObjectSet()
+        ids = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(2000)]
+        for object_id in ids + ids[:500]:
+            live.add(object_id)
+        live.freeze()
+
+        self.assertEqual(len(live), 2000)
+        self.assertTrue(all(object_id in live for object_id in ids))
+        self.assertNotIn(hashlib.sha256(b"missing").hexdigest(), live)
+
+
+class GarbageCollectionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp.name)
+        _write_release(self.root, "4.0.1", {"storage/metadata.info": b"{}", "payloads/a.zst": b"shared"})
+        _write_release(self.root, "4.0.2", {"storage/metadata.info": b"[]", "payloads/a.zst": b"shared"})
+        self.orphan = _write_object(self.root, b"superseded release data")
+        self.orphan_path = self.root / "objects" / self.orphan[:2] / self.orphan
+        self.temp_file = self.root / "objects" / ".tmp" / "abandoned.tmp"
+        self.temp_file.parent.mkdir(parents=True)
+        self.temp_file.write_bytes(b"partial")
+        for path in (self.root / "objects").rglob("*"):
+            if path.is_file():
+                _age(path)
+
+    def tearDown(self) -> None:
+        self._temp.cleanup()
+
+    def test_dry_run_reports_without_touching_objects(self) -> None:
+        report = collect_garbage(self.root)
+
+        self.assertTrue(report.dry_run)
+        self.assertEqual(report.release_count, 2)
+        self.assertEqual(report.live_object_count, 3)
+        self.assertEqual(report.unreferenced_object_count, 1)
+        self.assertEqual(report.unreferenced_bytes, len(b"superseded release data"))
+        self.assertEqual(report.abandoned_temp_count, 1)
+        self.assertEqual(report.reclaimable_bytes, len(b"superseded release data") + len(b"partial"))
+        self.assertTrue(self.orphan_path.is_file())
+        self.assertTrue(self.temp_file.is_file())
+
+    def test_sweep_deletes_only_unreferenced_objects(self) -> None:
+        collect_garbage(self.root, dry_run=False)
+
+        self.assertFalse(self.orphan_path.exists())
+        self.assertFalse(self.temp_file.exists())
+        remaining = [path for path in (self.root / "objects").rglob("*") if path.is_file()]
+        self.assertEqual(len(remaining), 3)
+
+    def test_quarantine_moves_objects_aside(self) -> None:
+        report = collect_garbage(self.root, dry_run=False, quarantine=True)
+
+        self.assertIsNotNone(report.quarantine_root)
+        self.assertFalse(self.orphan_path.exists())
+        self.assertTrue(
+            (report.quarantine_root / "objects" / self.orphan[:2] / self.orphan).is_file()
+        )
+
+    def test_recent_objects_are_left_for_in_flight_publishes(self) -> None:
+        fresh = _write_object(self.root, b"object written before its manifest")
+
+        report = collect_garbage(self.root, dry_run=False)
+
+        self.assertEqual(report.unreferenced_object_count, 1)
+        self.assertTrue((self.root / "objects" / fresh[:2] / fresh).is_file())
+
+    def test_invalid_manifest_aborts_before_sweeping(self) -> None:
+        (self.root / "releases" / "4.0.2" / "manifest.json").write_text("{", encoding="utf-8")
+
+        with self.assertRaises(RepositoryToolError):
+            collect_garbage(self.root, dry_run=False)
+        self.assertTrue(self.orphan_path.is_file())
+
+
+class VerifyReleasesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp.name)
+        _write_release(self.root, "4.0.1", {"storage/metadata.info": b"{}", "payloads/a.zst": b"shared"})
+        _write_release(self.root, "4.0.2", {"storage/metadata.info": b"[]", "payloads/a.zst": b"shared"})
+
+    def tearDown(self) -> None:
+        self._temp.cleanup()
+
+    def _add_multi_object_file(self, package_id: str, parts: list[bytes]) -> None:
+        manifest_path = self.root / "releases" / package_id / "manifest.json"
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        data = b"".join(parts)
+        manifest["files"].append(
+            {
+                "path": "patchfiles/big.bin.zst",
+                "size": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "objects": [
+                    {"id": _write_object(self.root, part), "size": len(part)} for part in parts
+                ],
+            }
+        )
+        manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    def test_shared_objects_are_hashed_once_across_releases(self) -> None:
+        self._add_multi_object_file("4.0.2", [b"first half ", b"second half"])
+        calls: list[int] = []
+        original = repository_tools._hash_stream_into
+
+        def counting(paths, cancel_event):
+            calls.append(len(paths))
+            return original(paths, cancel_event)
+
+        with mock.patch.object(repository_tools, "_hash_stream_into", side_effect=counting):
+            report = verify_releases(self.root, workers=4)
+
+        self.assertTrue(report.ok)
+        self.assertEqual(report.unique_object_count, 5)
+        # Five unique objects plus one re-stream for the two-object file.
+        self.assertEqual(sorted(calls), [1, 1, 1, 1, 1, 2])
+        self.assertEqual([release.package_id for release in report.releases], ["4.0.1", "4.0.2"])
+        self.assertEqual(report.releases[1].object_references, 4)
+
+    def test_corrupt_shared_object_is_reported_for_every_release(self) -> None:
+        object_id = hashlib.sha256(b"shared").hexdigest()
+        (self.root / "objects" / object_id[:2] / object_id).write_bytes(b"sharEd")
+
+        report = verify_releases(self.root)
+
+        self.assertFalse(report.ok)
+        self.assertEqual(
+            sorted((issue.package_id, issue.problem) for issue in report.issues),
+            [("4.0.1", "object_sha256"), ("4.0.2", "object_sha256")],
+        )
+        data = json.loads(json.dumps(report.to_dict()))
+        self.assertFalse(data["ok"])
+        self.assertEqual(data["issues"][0]["object_id"], object_id)
+
+    def test_single_release_verification_raises_first_problem(self) -> None:
+        object_id = hashlib.sha256(b"shared").hexdigest()
+        (self.root / "objects" / object_id[:2] / object_id).unlink()
+
+        with self.assertRaisesRegex(RepositoryToolError, "missing object"):
+            verify_release(self.root, "4.0.1")
+
+    def test_single_release_verification_totals(self) -> None:
+        result = verify_release(self.root, "4.0.1")
+
+        self.assertEqual(result.file_count, 2)
+        self.assertEqual(result.object_references, 2)
+        self.assertEqual(result.total_logical_bytes, len(b"{}") + len(b"shared"))
+
+
+class ReleaseMetadataTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temp = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp.name)
+        _write_release(self.root, "4.0.1", {"storage/metadata.info": b'{"version": "1.0"}'})
+        self.manifest_path = self.root / "releases" / "4.0.1" / "manifest.json"
+
+    def tearDown(self) -> None:
+        self._temp.cleanup()
+
+    def test_metadata_is_read_through_a_current_index(self) -> None:
+        write_manifest_index(self.manifest_path)
+
+        with mock.patch.object(repository_tools, "load_manifest", side_effect=AssertionError):
+            self.assertEqual(load_release_metadata(self.root, "4.0.1"), {"version": "1.0"})
+
+    def test_metadata_edit_recompiles_the_index(self) -> None:
+        write_manifest_index(self.manifest_path)
+
+        object_id = update_release_metadata(self.root, "4.0.1", {"version": "2.0"})
+
+        with ManifestIndex.for_manifest(self.manifest_path) as index:
+            self.assertEqual(index.lookup("storage/metadata.info")["sha256"], object_id)
+        self.assertEqual(load_release_metadata(self.root, "4.0.1"), {"version": "2.0"})
+
+
+if __name__ == "__main__":
+    unittest.main()
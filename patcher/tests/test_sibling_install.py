@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import functools
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import repair, sibling_install
+from sierra_patcher.install_receipt import find_installs, register_install, write_install_receipt
+from sierra_patcher.package_source import PackageLayout
+from sierra_patcher.repair import build_target_hash_manifest
+from sierra_patcher.sibling_install import clone_sibling_install, reuse_sibling_install
+
+
+_ZSTD = shutil.which("zstd")
+_LARGE = bytes(range(256)) * 8192  # 2 MiB, above the reflink threshold
+
+
+class SiblingInstallTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.sibling = self.root / "SPT-profile-a"
+        self.destination = self.root / "SPT-profile-b"
+        self.package = self.root / "package"
+        self.storage = self.package / "storage"
+        for relative, data in {
+            "EscapeFromTarkov_Data/level0": _LARGE,
+            "SPT/user/mods/config.json": b'{"enabled": true}',
+            "BepInEx/plugins/spt-core.dll": b"core" * 100,
+        }.items():
+            (self.sibling / relative).parent.mkdir(parents=True, exist_ok=True)
+            (self.sibling / relative).write_bytes(data)
+        (self.sibling / "Logs").mkdir()
+        (self.sibling / "Logs" / "spt.log").write_text("runtime")
+        (self.sibling / "SPT" / "user" / "profiles").mkdir(parents=True)
+        build_target_hash_manifest(self.sibling, self.storage, workers=2)
+
+        write_install_receipt(self.sibling, "4.0.13")
+        self.registry = self.root / "installs.json"
+        register_install(self.sibling, registry=self.registry)
+        self._registry_patch = mock.patch.object(
+            sibling_install, "find_installs", functools.partial(find_installs, registry=self.registry)
+        )
+        self._registry_patch.start()
+
+    def tearDown(self) -> None:
+        self._registry_patch.stop()
+        self._temporary.cleanup()
+
+    def test_large_files_are_reflinked_and_small_files_copied(self) -> None:
+        cloned = []
+
+        def clone(source, target):
+            # Stand-in for a reflink-capable volume.
+            cloned.append(Path(source).relative_to(self.sibling).as_posix())
+            shutil.copy2(source, target)
+            return True
+
+        with mock.patch.object(sibling_install, "_clone_file", side_effect=clone):
+            linked, copied, damaged = clone_sibling_install(self.sibling, self.destination, self.storage, workers=2)
+
+        self.assertEqual((linked, copied, damaged), (1, 2, []))
+        self.assertEqual(cloned, ["EscapeFromTarkov_Data/level0"])
+        config = self.destination / "SPT/user/mods/config.json"
+        self.assertFalse(os.path.samefile(self.sibling / "SPT/user/mods/config.json", config))
+        self.assertEqual(config.read_bytes(), b'{"enabled": true}')
+        self.assertTrue((self.destination / "SPT/user/profiles").is_dir())
+        self.assertFalse((self.destination / "Logs").exists())
+
+    def test_editing_a_large_file_leaves_the_sibling_unchanged(self) -> None:
+        clone_sibling_install(self.sibling, self.destination, self.storage, workers=2)
+
+        large = self.destination / "EscapeFromTarkov_Data/level0"
+        self.assertFalse(os.path.samefile(self.sibling / "EscapeFromTarkov_Data/level0", large))
+        with open(large, "r+b") as stream:
+            stream.write(b"edited in place")
+        self.assertEqual((self.sibling / "EscapeFromTarkov_Data/level0").read_bytes(), _LARGE)
+
+    def test_other_releases_and_non_empty_destinations_are_not_reused(self) -> None:
+        source = mock.Mock()
+        self.assertIsNone(
+            reuse_sibling_install(source, self.storage, self.destination, "4.0.14", live_root=None, log=lambda _m: None)
+        )
+        self.destination.mkdir()
+        (self.destination / "EscapeFromTarkov.exe").write_bytes(b"live copy")
+        self.assertIsNone(
+            reuse_sibling_install(source, self.storage, self.destination, "4.0.13", live_root=None, log=lambda _m: None)
+        )
+        source.prepare.assert_not_called()
+
+    @unittest.skipUnless(_ZSTD, "zstd is not installed")
+    def test_changed_sibling_files_are_rebuilt_from_the_package(self) -> None:
+        payloads = self.package / "payloads"
+        (payloads / "BepInEx/plugins").mkdir(parents=True)
+        subprocess.run(
+            [_ZSTD, "-q", "-f", str(self.sibling / "BepInEx/plugins/spt-core.dll"), "-o",
+             str(payloads / "BepInEx/plugins/spt-core.dll.zst")],
+            check=True,
+            capture_output=True,
+        )
+        (self.sibling / "BepInEx/plugins/spt-core.dll").write_bytes(b"edited by a mod manager")
+
+        requested = []
+
+        def prepare(on_progress=None, cancel_event=None, path_filter=None):
+            requested.extend(
+                path
+                for path in ("storage/target_hashes.json", "patchfiles/EscapeFromTarkov_Data/level0.zst",
+                             "payloads/BepInEx/plugins/spt-core.dll.zst")
+                if path_filter(Path(path))
+            )
+            return PackageLayout(self.package, self.package / "patchfiles", payloads, self.storage, "web", "4.0.13")
+
+        source = mock.Mock()
+        source.prepare.side_effect = prepare
+        with mock.patch.object(repair, "ZSTD_EXE", _ZSTD):
+            reused = reuse_sibling_install(
+                source, self.storage, self.destination, "4.0.13", live_root=None, workers=2, log=lambda _m: None
+            )
+
+        # level0 is reflinked or copied depending on the volume.
+        self.assertEqual(
+            (reused.sibling, reused.linked + reused.copied, reused.repaired), (self.sibling.resolve(), 2, 1)
+        )
+        self.assertEqual(requested, ["storage/target_hashes.json", "payloads/BepInEx/plugins/spt-core.dll.zst"])
+        self.assertEqual((self.destination / "BepInEx/plugins/spt-core.dll").read_bytes(), b"core" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
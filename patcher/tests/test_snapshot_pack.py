@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import web_download
+from sierra_patcher.archived_snapshot import (
+    ArchivedSnapshotError,
+    archive_web_release,
+    pack_archived_snapshot,
+    read_archived_snapshot,
+)
+from sierra_patcher.package_source import ArchivedSnapshotSource
+from sierra_patcher.snapshot_pack import PACK_DIR, PackedObjectStore, pack_index_path
+
+from tests.test_archived_snapshot import _write_snapshot
+from tests.test_repository_tools import _write_release
+
+
+FILES = {
+    "storage/metadata.info": b"{}",
+    "storage/source_hashes.json": b"hashes" * 50,
+    "patchfiles/EscapeFromTarkov_Data/level0.zst": b"delta" * 400,
+    "patchfiles/EscapeFromTarkov_Data/level1.zst": b"other" * 400,
+}
+
+
+class SnapshotPackTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.base = Path(self._temporary.name)
+        self.snapshot = self.base / "snapshot"
+        _write_snapshot(self.snapshot, "4.0.13", FILES)
+
+    def tearDown(self) -> None:
+        self._temporary.cleanup()
+
+    def _prepare(self, package_id: str | None = None):
+        source = ArchivedSnapshotSource(
+            self.snapshot, self.base / "cache", materialize_workers=4, package_id=package_id
+        )
+        return source.prepare()
+
+    def test_packed_snapshot_installs_from_segments(self) -> None:
+        report = pack_archived_snapshot(self.snapshot, segment_bytes=2500)
+
+        self.assertEqual(report.packed_objects, 4)
+        self.assertGreater(len(report.new_segments), 1)
+        self.assertEqual(report.removed_loose, 4)
+        self.assertFalse(any(path.is_file() for path in (self.snapshot / "objects").rglob("*")))
+        self.assertEqual(read_archived_snapshot(self.snapshot).package_id, "4.0.13")
+
+        layout = self._prepare()
+        self.assertEqual(
+            (Path(layout.patch_root) / "EscapeFromTarkov_Data" / "level1.zst").read_bytes(),
+            b"other" * 400,
+        )
+
+    def test_damaged_segment_is_rejected_by_object_hash(self) -> None:
+        pack_archived_snapshot(self.snapshot)
+        store = PackedObjectStore(self.snapshot)
+        packed = store.objects[hashlib.sha256(b"delta" * 400).hexdigest()]
+        segment = store.segment_path(packed.segment)
+        data = bytearray(segment.read_bytes())
+        data[packed.offset + 10] ^= 0xFF
+        segment.write_bytes(bytes(data))
+
+        with self.assertRaises(ArchivedSnapshotError) as raised:
+            self._prepare()
+        self.assertIn("SHA-256", str(raised.exception))
+
+    def test_new_release_is_added_loose_and_packed_by_appending(self) -> None:
+        pack_archived_snapshot(self.snapshot)
+        first_segment = self.snapshot / PACK_DIR / "pack-0000.dat"
+        first_bytes = first_segment.read_bytes()
+
+        web = self.base / "web"
+        next_files = dict(FILES, **{"patchfiles/EscapeFromTarkov_Data/level0.zst": b"next" * 400})
+        _write_release(web, "4.0.14", next_files)
+        manifest = json.loads((web / "releases" / "4.0.14" / "manifest.json").read_text())
+        downloaded = []
+
+        def download(url, destination, **_kwargs):
+            downloaded.append(Path(destination).name)
+            Path(destination).parent.mkdir(parents=True, exist_ok=True)
+            Path(destination).write_bytes(b"next" * 400)
+
+        with mock.patch.object(
+            web_download, "fetch_manifest", return_value=manifest
+        ), mock.patch.object(web_download, "_download_with_retries", side_effect=download):
+            archive_web_release(
+                "4.0.14",
+                self.snapshot,
+                self.base / "cache",
+                download_workers=2,
+                include_patcher=False,
+                reuse_web_cache=False,
+            )
+        self.assertEqual(downloaded, [hashlib.sha256(b"next" * 400).hexdigest()])
+
+        # Mixed packed + loose snapshots install both releases.
+        self.assertEqual(
+            (Path(self._prepare("4.0.14").patch_root) / "EscapeFromTarkov_Data" / "level0.zst").read_bytes(),
+            b"next" * 400,
+        )
+
+        report = pack_archived_snapshot(self.snapshot)
+        self.assertEqual((report.packed_objects, report.new_segments), (1, ("pack-0001.dat",)))
+        self.assertEqual(first_segment.read_bytes(), first_bytes)
+        self.assertEqual(
+            (Path(self._prepare("4.0.13").patch_root) / "EscapeFromTarkov_Data" / "level0.zst").read_bytes(),
+            b"delta" * 400,
+        )
+
+    def test_failed_pack_leaves_the_snapshot_unchanged(self) -> None:
+        damaged = next(
+            path
+            for path in (self.snapshot / "objects").rglob("*")
+            if path.is_file() and path.read_bytes() == b"other" * 400
+        )
+        damaged.write_bytes(b"OTHER" * 400)
+
+        with self.assertRaises(ArchivedSnapshotError):
+            pack_archived_snapshot(self.snapshot)
+
+        self.assertFalse(pack_index_path(self.snapshot).exists())
+        self.assertEqual(len([path for path in (self.snapshot / "objects").rglob("*") if path.is_file()]), 4)
+        self.assertEqual(list((self.snapshot / PACK_DIR).glob("*.tmp")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
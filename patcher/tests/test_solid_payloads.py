@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import hybrid_payload, repair
+from sierra_patcher.game_copy import package_touched_paths
+from sierra_patcher.hybrid_payload import (
+    PAYLOAD_DICTIONARY_NAME,
+    SOLID_DIR,
+    apply_payloads,
+    finalize_payloads,
+    generate_patches,
+    read_solid_index,
+    solid_payload_dictionary,
+)
+from sierra_patcher.repair import DamagedFile, build_target_hash_manifest, repair_files
+
+
+_ZSTD = shutil.which("zstd")
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class SolidPayloadTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.source = self.root / "Live"
+        self.target = self.root / "SPT"
+        self.package = self.root / "package"
+        self.small = {
+            f"SPT/locales/{language}.json": (f'{{"language": "{language}", "greeting": "hello"}}' * 20).encode()
+            for language in ("en", "fr", "de", "ko")
+        }
+        self.large = os.urandom(512 * 1024)
+        (self.source / "EscapeFromTarkov_Data").mkdir(parents=True)
+        (self.source / "EscapeFromTarkov_Data" / "globalgamemanagers").write_bytes(b"live")
+        for relative, data in {**self.small, "BepInEx/plugins/large.dll": self.large}.items():
+            (self.target / relative).parent.mkdir(parents=True, exist_ok=True)
+            (self.target / relative).write_bytes(data)
+        (self.target / "EscapeFromTarkov_Data").mkdir(parents=True)
+        (self.target / "EscapeFromTarkov_Data" / "globalgamemanagers").write_bytes(b"live")
+
+        self._patches = [
+            mock.patch.object(hybrid_payload, "ZSTD_EXE", _ZSTD),
+            mock.patch.object(repair, "ZSTD_EXE", _ZSTD),
+        ]
+        for patch in self._patches:
+            patch.start()
+        stage = self.package / "additional_files"
+        generate_patches(str(self.source), str(self.target), str(self.package / "patchfiles"), str(stage), workers=2)
+        finalize_payloads(stage, self.package / "storage")
+        self.payloads = self.package / "payloads"
+
+    def tearDown(self) -> None:
+        for patch in self._patches:
+            patch.stop()
+        self._temporary.cleanup()
+
+    def test_small_payloads_share_one_archive_and_large_ones_stay_per_file(self) -> None:
+        archives = read_solid_index(self.payloads)
+        self.assertEqual(len(archives), 1)
+        self.assertEqual(sorted(member["path"] for member in archives[0]["members"]), sorted(self.small))
+        self.assertTrue((self.payloads / "BepInEx/plugins/large.dll.zst").is_file())
+        self.assertFalse((self.payloads / "SPT/locales/en.json.zst").exists())
+        self.assertEqual(
+            package_touched_paths(self.package / "storage"),
+            {*self.small, "BepInEx/plugins/large.dll"},
+        )
+
+    def test_install_writes_every_member(self) -> None:
+        destination = self.root / "installed"
+        destination.mkdir()
+        progress = []
+        apply_payloads(self.package / "storage", destination, on_progress=lambda *args: progress.append(args[1:3]))
+
+        for relative, data in self.small.items():
+            self.assertEqual((destination / relative).read_bytes(), data)
+        self.assertEqual((destination / "BepInEx/plugins/large.dll").read_bytes(), self.large)
+        self.assertEqual(progress[-1], (5, 5))
+        self.assertEqual([path.name for path in destination.iterdir() if path.name.startswith("sierra_")], [])
+
+    def test_damaged_archive_member_fails_the_install(self) -> None:
+        index = self.payloads / SOLID_DIR / "index.json"
+        index.write_text(index.read_text().replace(read_solid_index(self.payloads)[0]["members"][0]["sha256"], "0" * 64))
+        destination = self.root / "installed"
+        destination.mkdir()
+        with mock.patch.object(hybrid_payload.time, "sleep"):
+            with self.assertRaises(RuntimeError) as raised:
+                apply_payloads(self.package / "storage", destination)
+        self.assertIn("SHA-256", str(raised.exception))
+
+    def test_repair_extracts_a_single_member(self) -> None:
+        storage = self.package / "storage"
+        build_target_hash_manifest(self.target, storage, workers=2)
+        installed = self.root / "installed"
+        shutil.copytree(self.target, installed)
+        (installed / "SPT/locales/ko.json").unlink()
+
+        expected = hybrid_payload.hashlib.sha256(self.small["SPT/locales/ko.json"]).hexdigest()
+        repaired, failed = repair_files(
+            [DamagedFile("SPT/locales/ko.json", "missing", expected)],
+            installed,
+            patch_root=self.package / "patchfiles",
+            payload_root=self.payloads,
+            storage_root=storage,
+            live_root=None,
+        )
+        self.assertEqual((repaired, failed), (["SPT/locales/ko.json"], []))
+        self.assertEqual((installed / "SPT/locales/ko.json").read_bytes(), self.small["SPT/locales/ko.json"])
+
+    def test_too_few_members_ship_no_dictionary(self) -> None:
+        self.assertFalse((self.package / "storage" / PAYLOAD_DICTIONARY_NAME).exists())
+        self.assertIsNone(solid_payload_dictionary(self.payloads))
+        self.assertFalse(read_solid_index(self.payloads)[0]["dictionary"])
+
+
+@unittest.skipUnless(_ZSTD, "zstd is not installed")
+class PayloadDictionaryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.package = self.root / "package"
+        self.storage = self.package / "storage"
+        self.payloads = self.package / "payloads"
+        self._patch = mock.patch.object(hybrid_payload, "ZSTD_EXE", _ZSTD)
+        self._patch.start()
+
+        # Many small, structurally similar configs, like SPT's item templates.
+        self.files = {}
+        self.stage = self.package / "additional_files"
+        for number in range(24):
+            relative = f"SPT/user/mods/mod-{number:03d}/config.json"
+            data = (
+                '{\n  "enabled": true,\n  "debugLogging": false,\n  "lootMultiplier": %d,\n'
+                '  "traderPriceMultiplier": %d.%d,\n  "blacklist": ["5449016a4bdc2d6f028b456f", "%024x"]\n}\n'
+                % (number % 7, number % 3, number, number * 7919)
+            ).encode()
+            self.files[relative] = data
+            staged = self.stage / (relative + hybrid_payload._SOLID_STAGED_SUFFIX)
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            staged.write_bytes(data)
+
+    def tearDown(self) -> None:
+        self._patch.stop()
+        self._temporary.cleanup()
+
+    def _finalize(self, archive_bytes: int) -> None:
+        with mock.patch.object(hybrid_payload, "SOLID_ARCHIVE_BYTES", archive_bytes), \
+                mock.patch.object(hybrid_payload, "PAYLOAD_DICTIONARY_MAX_BYTES", 1024):
+            finalize_payloads(self.stage, self.storage)
+
+    def test_dictionary_is_shipped_and_installs_round_trip(self) -> None:
+        # Archives of about one file each, where a dictionary pays off most.
+        self._finalize(256)
+        archives = read_solid_index(self.payloads)
+        self.assertEqual(len(archives), 24)
+        self.assertTrue(all(archive["dictionary"] for archive in archives))
+        self.assertEqual(solid_payload_dictionary(self.payloads), self.storage / PAYLOAD_DICTIONARY_NAME)
+
+        destination = self.root / "installed"
+        destination.mkdir()
+        apply_payloads(self.storage, destination)
+        for relative, data in self.files.items():
+            self.assertEqual((destination / relative).read_bytes(), data)
+
+        (self.storage / PAYLOAD_DICTIONARY_NAME).write_bytes(b"not the trained dictionary")
+        with self.assertRaises(RuntimeError) as raised:
+            apply_payloads(self.storage, destination)
+        self.assertIn("SHA-256", str(raised.exception))
+
+    def test_one_large_archive_ships_without_a_dictionary(self) -> None:
+        self._finalize(hybrid_payload.SOLID_ARCHIVE_BYTES)
+        self.assertEqual(len(read_solid_index(self.payloads)), 1)
+        self.assertFalse((self.storage / PAYLOAD_DICTIONARY_NAME).exists())
+        self.assertIsNone(solid_payload_dictionary(self.payloads))
+
+
+if __name__ == "__main__":
+    unittest.main()
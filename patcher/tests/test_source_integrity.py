@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sierra_patcher import source_integrity
+from sierra_patcher.source_integrity import (
+    SOURCE_HASHES_FILENAME,
+    SOURCE_SAMPLING,
+    _sample_ranges,
+    build_source_hash_manifest,
+    verify_destination_sources,
+)
+
+
+class SampledFingerprintTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary = tempfile.TemporaryDirectory()
+        self.root = Path(self._temporary.name)
+        self.live = self.root / "Live"
+        patches = self.root / "patchfiles"
+        self.storage = self.root / "storage"
+        self.big = bytes(range(256)) * (12 * 1024)
+        for relative, data in (("Data/big.assets", self.big), ("Data/small.bin", b"small")):
+            (self.live / relative).parent.mkdir(parents=True, exist_ok=True)
+            (self.live / relative).write_bytes(data)
+            (patches / (relative + ".zst")).parent.mkdir(parents=True, exist_ok=True)
+            (patches / (relative + ".zst")).write_bytes(b"")
+        build_source_hash_manifest(self.live, patches, self.storage, workers=2)
+
+    def tearDown(self) -> None:
+        self._temporary.cleanup()
+
+    def test_ranges_cover_small_files_and_sample_large_ones(self) -> None:
+        self.assertEqual(_sample_ranges(10, SOURCE_SAMPLING), [(0, 10)])
+        size = 64 * 1024 * 1024
+        ranges = _sample_ranges(size, SOURCE_SAMPLING)
+        self.assertEqual(ranges[0], (0, SOURCE_SAMPLING["edge_bytes"]))
+        self.assertEqual(ranges[-1], (size - SOURCE_SAMPLING["edge_bytes"], SOURCE_SAMPLING["edge_bytes"]))
+        self.assertEqual(len(ranges), SOURCE_SAMPLING["strides"] + 2)
+
+    def test_generation_records_sampling_and_fingerprints(self) -> None:
+        data = json.loads((self.storage / SOURCE_HASHES_FILENAME).read_text(encoding="utf-8"))
+        self.assertEqual(data["sampling"], SOURCE_SAMPLING)
+        self.assertTrue(all(len(entry["sample_sha256"]) == 64 for entry in data["files"]))
+
+    def test_same_size_wrong_build_is_rejected_without_full_hashing(self) -> None:
+        wrong = bytearray(self.big)
+        wrong[-1] ^= 0xFF
+        (self.live / "Data" / "big.assets").write_bytes(bytes(wrong))
+
+        with mock.patch.object(source_integrity, "_sha256_file") as full_hash, \
+                mock.patch.object(source_integrity, "known_sha256", return_value=None):
+            report = verify_destination_sources(self.storage, self.live, workers=2)
+
+        full_hash.assert_not_called()
+        self.assertEqual([(item.path, item.reason) for item in report.mismatches], [("Data/big.assets", "sample")])
+        # small.bin passed the fast pass only, so it is not reported as matched.
+        self.assertEqual((report.matched, report.unchecked), (0, 1))
+        self.assertIn("Not checked: 1", source_integrity.format_source_integrity_summary(report))
+        self.assertIn("sampled blocks", source_integrity.describe_source_mismatch(report.mismatches[0]))
+
+    def test_matching_samples_still_require_the_full_hash(self) -> None:
+        # A change outside the sampled ranges passes the fast pass but not the proof.
+        wrong = bytearray(self.big)
+        offset = SOURCE_SAMPLING["edge_bytes"] + 10
+        self.assertFalse(
+            any(start <= offset < start + length for start, length in _sample_ranges(len(wrong), SOURCE_SAMPLING))
+        )
+        wrong[offset] ^= 0xFF
+        (self.live / "Data" / "big.assets").write_bytes(bytes(wrong))
+
+        report = verify_destination_sources(self.storage, self.live, workers=2)
+        self.assertEqual([(item.path, item.reason) for item in report.mismatches], [("Data/big.assets", "sha256")])
+
+        (self.live / "Data" / "big.assets").write_bytes(self.big)
+        report = verify_destination_sources(self.storage, self.live, workers=2)
+        self.assertEqual((report.total, report.failed), (2, 0))
+
+    def test_sample_only_leaves_the_full_hash_to_a_later_pass(self) -> None:
+        with mock.patch.object(source_integrity, "_sha256_file") as full_hash, \
+                mock.patch.object(source_integrity, "known_sha256", return_value=None):
+            report = verify_destination_sources(self.storage, self.live, workers=2, sample_only=True)
+
+        full_hash.assert_not_called()
+        self.assertEqual((report.total, report.matched, report.failed, report.unchecked), (2, 0, 0, 2))
+
+    def test_manifests_without_sampling_use_the_full_hash_only(self) -> None:
+        path = self.storage / SOURCE_HASHES_FILENAME
+        data = json.loads(path.read_text(encoding="utf-8"))
+        del data["sampling"]
+        path.write_text(json.dumps(data), encoding="utf-8")
+        wrong = bytearray(self.big)
+        wrong[0] ^= 0xFF
+        (self.live / "Data" / "big.assets").write_bytes(bytes(wrong))
+
+        report = verify_destination_sources(self.storage, self.live, workers=2)
+        self.assertEqual([item.reason for item in report.mismatches], ["sha256"])
+
+
+if __name__ == "__main__":
+    unittest.main()
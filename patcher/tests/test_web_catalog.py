@@ -166,6 +166,85 @@ class WebCatalogTests(unittest.TestCase):
                 ),
             )
 
+    def test_upgrade_entries_round_trip_and_are_matched_by_pair(self) -> None:
+        upgrade = CatalogRelease(
+            "4.0.12-to-4.0.13",
+            "1.1.0.46699",
+            upgrade_from="4.0.12",
+            upgrade_to="4.0.13",
+        )
+        releases = web_catalog.parse_release_catalog(
+            web_catalog.build_catalog([CatalogRelease("4.0.13", "1.1.0.46699"), upgrade])
+        )
+
+        self.assertEqual(releases[1], upgrade)
+        self.assertTrue(releases[1].is_upgrade)
+        self.assertFalse(releases[0].is_upgrade)
+        self.assertIs(web_catalog.find_upgrade(releases, "4.0.12", "4.0.13"), releases[1])
+        self.assertIsNone(web_catalog.find_upgrade(releases, "4.0.11", "4.0.13"))
+        self.assertIsNone(web_catalog.find_upgrade(releases, None, "4.0.13"))
+
+    def test_incomplete_upgrade_pair_is_treated_as_a_full_release(self) -> None:
+        releases = web_catalog.parse_release_catalog(
+            {
+                "format_version": 1,
+                "releases": [{"id": "odd", "upgrade_from": "4.0.12"}],
+            }
+        )
+        self.assertEqual(releases, [CatalogRelease("odd")])
+
+    def test_publisher_records_upgrade_pair_from_package_metadata(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            package = root / "package"
+            (package / "storage").mkdir(parents=True)
+            (package / "storage" / "metadata.info").write_text(
+                json.dumps(
+                    {
+                        "version": "1.1.0.46699",
+                        "upgrade_from": "4.0.12",
+                        "upgrade_to": "4.0.13",
+                    }
+                ),
+                encoding="utf-8",
+            )
+            repository = root / "repository"
+
+            result = web_delivery.publish_web_package(package, repository, "4.0.12-to-4.0.13")
+
+            manifest = json.loads(result.manifest_path.read_text(encoding="utf-8"))
+            self.assertEqual(manifest["upgrade"], {"from": "4.0.12", "to": "4.0.13"})
+            self.assertEqual(
+                web_catalog.parse_release_catalog(
+                    json.loads(result.catalog_path.read_text(encoding="utf-8"))
+                ),
+                [CatalogRelease("4.0.12-to-4.0.13", "1.1.0.46699", "4.0.12", "4.0.13")],
+            )
+
+    def test_new_payload_layouts_publish_a_version_2_manifest(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary:
+            root = Path(temporary)
+            package = root / "package"
+            (package / "storage").mkdir(parents=True)
+            (package / "storage" / "metadata.info").write_text("{}", encoding="utf-8")
+            repository = root / "repository"
+
+            plain = web_delivery.publish_web_package(package, repository, "4.0.12")
+            (package / "storage" / "payload_fanout.json").write_text("{}", encoding="utf-8")
+            fanout = web_delivery.publish_web_package(package, repository, "4.0.13")
+            (package / "storage" / "payload_fanout.json").unlink()
+            (package / "storage" / "metadata.info").write_text(
+                json.dumps({"upgrade_from": "4.0.12", "upgrade_to": "4.0.13"}), encoding="utf-8"
+            )
+            upgrade = web_delivery.publish_web_package(package, repository, "4.0.12-to-4.0.13")
+
+            versions = [
+                json.loads(result.manifest_path.read_text(encoding="utf-8"))["format_version"]
+                for result in (plain, fanout, upgrade)
+            ]
+            self.assertEqual(versions, [1, 2, 2])
+            self.assertEqual(repository_tools.load_manifest(repository, "4.0.13")["package_id"], "4.0.13")
+
 
 if __name__ == "__main__":
     unittest.main()